@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from app.gesture.backends import BACKENDS, create_backend
+from app.gesture.detector import GestureDetector
+from app.gesture.landmarks import MIDDLE_MCP, NUM_LANDMARKS, WRIST
+from app.gesture.synthetic import HandRenderer, SyntheticHand
+
+
+def render_video(path, seconds, fps, seed):
+    # Video sintetis seperti dari kamera (belum di-mirror); backend synthetic
+    # dengan seed dan fps sama memberi landmark yang dipakai untuk merender
+    hand = SyntheticHand(seed=seed)
+    renderer = HandRenderer(noise=2.0, seed=seed)
+    height, width = renderer.shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Tidak bisa menulis video {path}")
+    frame = np.empty(renderer.shape, dtype=np.uint8)
+    for i in range(int(seconds * fps)):
+        writer.write(cv2.flip(renderer.render(hand.landmarks(i / fps), frame), 1))
+    writer.release()
+
+
+def run_backend(path, name, params, roi, max_frames):
+    # Semua backend melewati GestureDetector yang sama (flip, ROI, rules)
+    # tanpa motion gate, jadi latency = biaya per frame saat deploy
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise RuntimeError(f"Video tidak bisa dibuka: {path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    if name == "synthetic":
+        params = dict({"fps": fps}, **params)
+
+    detector = GestureDetector(camera=None, roi=roi, motion_gate=False, backend=create_backend(name, **params))
+    warm_up = detector.warm_up()
+
+    latencies, landmarks, armed = [], [], []
+    size = None
+    try:
+        while max_frames is None or len(latencies) < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            size = frame.shape[1], frame.shape[0]
+            started = time.perf_counter()
+            # Timestamp dari posisi frame di video, bukan jam saat decode
+            data = detector.process(frame, len(latencies) / fps)
+            latencies.append(time.perf_counter() - started)
+
+            lm = detector.prev_landmarks
+            landmarks.append(lm.copy() if lm is not None else np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32))
+            armed.append(bool(data["armed"]))
+    finally:
+        capture.release()
+        detector.backend.close()
+
+    latencies = np.array(latencies)
+    return {
+        "frames": len(latencies),
+        "warm_up_ms": warm_up * 1000,
+        "fps": len(latencies) / latencies.sum() if len(latencies) else 0.0,
+        "latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "latency_p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "detected": float(np.mean(~np.isnan(np.stack(landmarks)[:, 0, 0]))),
+        "_landmarks": np.stack(landmarks),
+        "_armed": np.array(armed),
+        "_size": size,
+    }
+
+
+def agreement(result, reference):
+    # Dibandingkan per frame dengan backend acuan: kesepakatan ada/tidaknya
+    # tangan, jarak landmark (piksel video dan relatif terhadap panjang
+    # telapak wrist -> middle MCP acuan) dan kesepakatan status armed
+    n = min(result["frames"], reference["frames"])
+    ours, ref = result["_landmarks"][:n], reference["_landmarks"][:n]
+    present, ref_present = ~np.isnan(ours[:, 0, 0]), ~np.isnan(ref[:, 0, 0])
+    both = present & ref_present
+
+    out = {
+        "presence_agreement": float(np.mean(present == ref_present)) if n else None,
+        "armed_agreement": float(np.mean(result["_armed"][:n] == reference["_armed"][:n])) if n else None,
+        "landmark_error_px": None,
+        "landmark_error_palm": None,
+    }
+    if both.any():
+        scale = np.array(result["_size"], dtype=np.float32)
+        distance = np.linalg.norm((ours[both, :, :2] - ref[both, :, :2]) * scale, axis=2)
+        palm = np.linalg.norm((ref[both, MIDDLE_MCP, :2] - ref[both, WRIST, :2]) * scale, axis=1)
+        out["landmark_error_px"] = float(distance.mean())
+        out["landmark_error_palm"] = float(np.mean(distance.mean(axis=1) / np.maximum(palm, 1e-6)))
+    return out
+
+
+def fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def main(args):
+    tmpdir = None
+    path = args.video
+    reference = args.reference
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "synthetic.avi")
+        render_video(path, args.seconds, args.fps, args.seed)
+        reference = reference or "synthetic"
+        print(f"Tidak ada video, memakai video sintetis {args.seconds:g} detik (acuan = landmark sintetis)")
+    reference = reference or "mediapipe"
+
+    params = {"onnx": {"model_path": args.model}} if args.model else {}
+    results = {}
+    for name in args.backends:
+        try:
+            results[name] = run_backend(path, name, params.get(name, {}), args.roi, args.max_frames)
+        except (ImportError, RuntimeError) as e:
+            print(f"{name:>10}: tidak tersedia ({e})")
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    if not results:
+        return 1
+
+    ref = results.get(reference)
+    if ref is None:
+        print(f"Backend acuan {reference} tidak tersedia, agreement tidak dihitung")
+    print(f"ROI {'aktif' if args.roi else 'mati'}; agreement terhadap {reference}")
+    print(f"{'backend':>10} {'frames':>7} {'fps':>8} {'p50 ms':>7} {'p95 ms':>7} {'warm ms':>8} "
+          f"{'detect':>7} {'presence':>9} {'armed':>6} {'err px':>7} {'err/palm':>9}")
+
+    report = {}
+    for name, result in results.items():
+        row = {k: v for k, v in result.items() if not k.startswith("_")}
+        if ref is not None:
+            row.update(agreement(result, ref))
+        report[name] = row
+        print(f"{name:>10} {row['frames']:>7} {row['fps']:>8.1f} {row['latency_p50_ms']:>7.2f} "
+              f"{row['latency_p95_ms']:>7.2f} {row['warm_up_ms']:>8.0f} {row['detected']:>7.1%} "
+              f"{fmt(row.get('presence_agreement'), '>9.1%')} {fmt(row.get('armed_agreement'), '>6.1%')} "
+              f"{fmt(row.get('landmark_error_px'), '>7.1f')} {fmt(row.get('landmark_error_palm'), '>9.2f')}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"video": args.video, "reference": reference, "roi": args.roi, "backends": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FPS, latency dan agreement landmark tiap backend inferensi")
+    parser.add_argument("video", nargs="?", help="video rekaman; tanpa ini dirender video sintetis")
+    parser.add_argument("--backends", nargs="+", choices=tuple(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--reference", choices=tuple(BACKENDS), help="backend acuan agreement")
+    parser.add_argument("--model", help="path model ONNX (default GESTURE_LANDMARK_MODEL)")
+    parser.add_argument("--no-roi", dest="roi", action="store_false", help="selalu inferensi frame penuh")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=20.0, help="durasi video sintetis")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS video sintetis")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import socket
+import time
+import numpy as np
+import websockets
+from app.gesture.pipeline import GesturePipeline
+from app.gesture.synthetic import SyntheticDetector
+from app.websocket import handler as ws_handler
+from app.websocket import sender
+from app.websocket.protocol import decode_binary
+
+# Mode: (SO_SNDBUF server, client mengirim ACK)
+MODES = {
+    "tanpa pacing": (0, False),
+    "buffer kecil": (8192, False),
+    "buffer kecil + ACK": (8192, True),
+}
+
+
+class ThrottledProxy:
+    # Proxy TCP lokal yang meniru link lambat: arah server -> client dibatasi
+    # `bandwidth` byte/detik, arah sebaliknya diteruskan apa adanya. Buffer
+    # proxy kecil (StreamReader limit, SO_RCVBUF) supaya tekanan balik
+    # sampai ke socket server seperti pada Wi-Fi yang penuh.
+
+    def __init__(self, upstream_port, bandwidth, chunk=32, rcvbuf=4096):
+        self.upstream_port = upstream_port
+        self.bandwidth = bandwidth
+        self.chunk = chunk
+        self.rcvbuf = rcvbuf
+        self.server = None
+
+    async def start(self, port):
+        self.server = await asyncio.start_server(self._handle, "localhost", port)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _pipe(self, reader, writer, throttled):
+        try:
+            while data := await reader.read(self.chunk):
+                writer.write(data)
+                await writer.drain()
+                if throttled:
+                    await asyncio.sleep(len(data) / self.bandwidth)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, ("localhost", self.upstream_port))
+        upstream_reader, upstream_writer = await asyncio.open_connection(sock=sock, limit=self.chunk)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer, False),
+            self._pipe(upstream_reader, client_writer, True),
+        )
+
+
+async def run_client(port, station_id, seconds, ack):
+    # Umur tiap frame saat diterima client: epoch encoder sesi + timestamp
+    # capture di frame biner (proses yang sama, jam monotonic yang sama)
+    station = ws_handler.stations[station_id]
+    ages, shots = [], 0
+    async with websockets.connect(f"ws://localhost:{port}/station/{station_id}") as ws:
+        await ws.send(json.dumps({"type": "CONTROL", "action": "SET_FORMAT", "format": "binary"}))
+        await ws.send(json.dumps({"type": "CONTROL", "action": "START"}))
+        if ack:
+            await ws.send(json.dumps({"type": "ACK"}))
+        session = None
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            try:
+                message = await asyncio.wait_for(ws.recv(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            if isinstance(message, str):
+                continue
+            now = time.monotonic()
+            if session is None:
+                session = next(iter(station.clients))
+            data = decode_binary(message)
+            # t dalam ms dan wrap 32 bit; cukup untuk durasi benchmark
+            ages.append(now - (session.encoder.epoch + data["t"] / 1000))
+            shots += data["shoot"]
+            if ack:
+                await ws.send(json.dumps({"type": "ACK", "seq": data["seq"]}))
+        produced = session.subscription.shots if session is not None else 0
+        window = session.window.stats() if session is not None else {}
+    return np.array(ages), shots, produced, window
+
+
+async def run_mode(args, send_buffer, ack, station_id):
+    sender.SEND_BUFFER = send_buffer
+    pipeline = GesturePipeline(SyntheticDetector(fps=args.fps))
+    ws_handler.register_station(station_id, pipeline)
+    proxy = ThrottledProxy(args.port, args.bandwidth)
+    await proxy.start(args.proxy_port)
+    try:
+        return await run_client(args.proxy_port, station_id, args.seconds, ack)
+    finally:
+        await proxy.close()
+        pipeline.stop()
+        del ws_handler.stations[station_id]
+
+
+async def main(args):
+    report = {}
+    print(f"Link {args.bandwidth:g} B/s server->client, sumber sintetis {args.fps:g} FPS, "
+          f"{args.seconds:g} detik per mode, window ACK {sender.SEND_WINDOW}")
+    print(f"{'mode':>20} {'fps':>6} {'umur p50':>9} {'p95':>7} {'max':>7} {'1 dtk akhir':>12} {'shoot':>7}")
+    failed = False
+    async with websockets.serve(ws_handler.handler, "localhost", args.port):
+        for i, (label, (send_buffer, ack)) in enumerate(MODES.items()):
+            with contextlib.redirect_stdout(io.StringIO()):
+                ages, shots, produced, window = await run_mode(args, send_buffer, ack, f"bench{i}")
+            if not len(ages):
+                print(f"{label:>20}: tidak ada frame diterima")
+                failed = True
+                continue
+            ms = ages * 1000
+            tail = ms[-max(1, int(len(ms) / args.seconds)):]
+            row = {
+                "fps": len(ms) / args.seconds,
+                "age_p50_ms": float(np.percentile(ms, 50)),
+                "age_p95_ms": float(np.percentile(ms, 95)),
+                "age_max_ms": float(ms.max()),
+                "age_last_second_ms": float(tail.mean()),
+                "shots_received": int(shots),
+                "shots_produced": int(produced),
+                "window": window,
+            }
+            report[label] = row
+            print(f"{label:>20} {row['fps']:>6.1f} {row['age_p50_ms']:>7.0f}ms {row['age_p95_ms']:>5.0f}ms "
+                  f"{row['age_max_ms']:>5.0f}ms {row['age_last_second_ms']:>10.0f}ms {shots:>3}/{produced:<3}")
+    if ack_row := report.get("buffer kecil + ACK"):
+        print(f"Umur via ACK di server (capture -> ACK): rata-rata {ack_row['window'].get('age_mean_ms') or 0:.0f} ms, "
+              f"RTT rata-rata {ack_row['window'].get('rtt_mean_ms') or 0:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Umur frame gesture di link lambat, dengan dan tanpa pacing/ACK")
+    parser.add_argument("--bandwidth", type=float, default=400.0, help="byte/detik server -> client")
+    parser.add_argument("--fps", type=float, default=60.0, help="FPS sumber sintetis")
+    parser.add_argument("--seconds", type=float, default=8.0)
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--proxy-port", type=int, default=8792)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
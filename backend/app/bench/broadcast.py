@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from app.websocket.broadcaster import GestureBroadcaster
+
+
+class SyntheticSource:
+    # Pengganti GesturePipeline: menerbitkan gesture palsu pada FPS tetap.
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps
+        self._seq = 0
+        self._result = None
+        self._result_time = 0.0
+        self._event = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        next_time = time.monotonic()
+        while True:
+            t = self._seq * self.interval
+            self._result = {
+                "x": 0.5 + 0.3 * math.sin(t),
+                "y": 0.5 + 0.3 * math.cos(t),
+                "armed": True,
+                "shoot": False
+            }
+            self._result_time = time.monotonic()
+            self._seq += 1
+            event = self._event
+            self._event = asyncio.Event()
+            event.set()
+
+            next_time += self.interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+
+    @property
+    def result_seq(self):
+        return self._seq
+
+    async def next_result(self, after_seq=0, timeout=None):
+        while self._seq <= after_seq:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return after_seq, None, None
+        return self._seq, self._result, self._result_time
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def simulated_client(broadcaster, duration, send_delay):
+    subscription = broadcaster.subscribe()
+    received = 0
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            item = await subscription.get(timeout=0.5)
+            if item is None:
+                continue
+            json.dumps(item[1])
+            received += 1
+            if send_delay:
+                await asyncio.sleep(send_delay)
+            else:
+                await asyncio.sleep(0)
+    finally:
+        broadcaster.unsubscribe(subscription)
+    return received / duration, subscription.dropped
+
+
+async def run_round(clients, fps, duration, slow_clients):
+    source = SyntheticSource(fps)
+    source.start()
+    broadcaster = GestureBroadcaster(source)
+
+    tasks = [simulated_client(broadcaster, duration, 0) for _ in range(clients)]
+    tasks += [simulated_client(broadcaster, duration, 0.2) for _ in range(slow_clients)]
+    results = await asyncio.gather(*tasks)
+
+    await broadcaster.stop()
+    source.stop()
+    return results[:clients], results[clients:]
+
+
+async def main(args):
+    print(f"Producer FPS: {args.fps}, durasi per ronde: {args.duration}s, slow clients: {args.slow}")
+    print(f"{'clients':>8} {'mean fps':>10} {'min fps':>10} {'max fps':>10} {'slow fps':>10}")
+    for clients in args.clients:
+        fast, slow = await run_round(clients, args.fps, args.duration, args.slow)
+        rates = [r for r, _ in fast]
+        slow_rate = sum(r for r, _ in slow) / len(slow) if slow else float("nan")
+        print(f"{clients:>8} {sum(rates) / len(rates):>10.1f} {min(rates):>10.1f} "
+              f"{max(rates):>10.1f} {slow_rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fan-out GestureBroadcaster")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 5, 10, 20, 50])
+    parser.add_argument("--slow", type=int, default=1, help="jumlah client lambat (200 ms per kirim)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import tempfile
+import cv2
+import numpy as np
+from app.bench.backends import render_video
+from app.gesture.capture import (
+    CAPTURE_SIZE, PROBE_FOURCCS, PROBE_FPS, DeviceCapture, ImageDirectoryCapture, SyntheticCapture,
+    VideoFileCapture, measure_reads, probe_device,
+)
+
+# Sumber yang diputar pada FPS tertentu harus mencapai FPS itu dalam
+# toleransi ini
+FPS_TOLERANCE = 0.1
+
+
+def write_images(video, directory, count):
+    # Direktori JPEG dari frame video, untuk ImageDirectoryCapture
+    cap = cv2.VideoCapture(video)
+    written = 0
+    while written < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        cv2.imwrite(os.path.join(directory, f"frame-{written:05d}.jpg"), frame)
+        written += 1
+    cap.release()
+    return written
+
+
+def measure(capture, frames, target_fps=None):
+    capture.open()
+    try:
+        intervals, reads = measure_reads(capture, frames)
+    finally:
+        capture.release()
+    if not len(intervals):
+        return {"ok": False, "frames": 0}
+    fps = 1.0 / intervals.mean()
+    return {
+        "frames": len(reads),
+        "fps": float(fps),
+        "target_fps": target_fps,
+        "interval_p50_ms": float(np.percentile(intervals, 50) * 1000),
+        "interval_p95_ms": float(np.percentile(intervals, 95) * 1000),
+        "jitter_ms": float(intervals.std() * 1000),
+        "read_p50_ms": float(np.percentile(reads, 50) * 1000),
+        "read_p95_ms": float(np.percentile(reads, 95) * 1000),
+        "ok": target_fps is None or abs(fps - target_fps) <= target_fps * FPS_TOLERANCE,
+    }
+
+
+def device_variants(index, size, buffer_size):
+    # Default driver (tanpa FOURCC, buffer bawaan) lalu setiap mode probe
+    yield "default driver", DeviceCapture(index, fourcc="", size=size, fps=30.0, buffer_size=0)
+    for fourcc in PROBE_FOURCCS:
+        for fps in PROBE_FPS:
+            yield f"{fourcc} @{fps:g}", DeviceCapture(index, fourcc=fourcc, size=size, fps=fps, buffer_size=buffer_size)
+    yield "auto", DeviceCapture(index, fourcc="auto", size=size, buffer_size=buffer_size)
+
+
+def main(args):
+    report = {"sources": {}}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video = args.video
+        if video is None:
+            video = os.path.join(tmpdir, "synthetic.avi")
+            render_video(video, args.seconds, args.fps, args.seed)
+        images = os.path.join(tmpdir, "images")
+        os.mkdir(images)
+        count = write_images(video, images, int(args.seconds * args.fps))
+        fps = cv2.VideoCapture(video).get(cv2.CAP_PROP_FPS) or args.fps
+
+        rows.append(("synthetic", SyntheticCapture(fps=args.fps), args.fps))
+        rows.append(("video real-time", VideoFileCapture(video), fps))
+        rows.append(("video decode", VideoFileCapture(video, realtime=False), None))
+        rows.append((f"gambar ({count})", ImageDirectoryCapture(images, fps=args.fps), args.fps))
+        rows.append(("gambar decode", ImageDirectoryCapture(images, fps=args.fps, realtime=False), None))
+        if args.device is not None:
+            size = tuple(args.size)
+            report["probe"] = probe_device(args.device, size, buffer_size=args.buffer)
+            for label, capture in device_variants(args.device, size, args.buffer):
+                rows.append((f"kamera {label}", capture, None))
+
+        print(f"{'sumber':>22} {'fps':>7} {'interval p50':>13} {'p95':>7} {'jitter':>7} "
+              f"{'read p50':>9} {'p95':>7}  mode")
+        ok = True
+        for label, capture, target in rows:
+            try:
+                result = measure(capture, args.frames, target)
+            except RuntimeError as e:
+                print(f"{label:>22} gagal: {e}")
+                report["sources"][label] = {"ok": False, "error": str(e)}
+                ok = False
+                continue
+            mode = getattr(capture, "mode", None)
+            result["mode"] = mode
+            report["sources"][label] = result
+            if not result["frames"]:
+                print(f"{label:>22} tidak ada frame")
+                ok = False
+                continue
+            ok = ok and result["ok"]
+            described = f"{mode['fourcc'] or '?'} {mode['width']}x{mode['height']} buffer {mode['buffer_size']}" if mode else ""
+            print(f"{label:>22} {result['fps']:>7.1f} {result['interval_p50_ms']:>10.1f} ms {result['interval_p95_ms']:>7.1f} "
+                  f"{result['jitter_ms']:>7.2f} {result['read_p50_ms']:>6.2f} ms {result['read_p95_ms']:>7.2f}  "
+                  f"{described}{'' if result['ok'] else 'GAGAL: target ' + format(target, 'g') + ' FPS'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FPS nyata, jitter interval frame dan lama read() per sumber capture")
+    parser.add_argument("--video", help="file video; tanpa ini dirender video sintetis")
+    parser.add_argument("--device", type=int, help="index kamera: ukur juga default driver, setiap mode probe dan auto")
+    parser.add_argument("--size", type=int, nargs=2, default=CAPTURE_SIZE, metavar=("W", "H"))
+    parser.add_argument("--buffer", type=int, default=1, help="CAP_PROP_BUFFERSIZE untuk mode kamera")
+    parser.add_argument("--frames", type=int, default=120, help="frame terukur per sumber")
+    parser.add_argument("--seconds", type=float, default=6.0, help="panjang video sintetis")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from app.gesture.classifier import ClassifierRules, GestureClassifier, train_sessions
+from app.gesture.processor import GestureProcessor
+from app.gesture.recording import record_synthetic
+from app.gesture.synthetic import SyntheticHand
+
+# Batas biaya inferensi classifier per frame (fitur + MLP + keputusan)
+INFERENCE_LIMIT_US = 200.0
+# Tembakan dianggap terdeteksi jika muncul paling lambat sekian frame
+# setelah hentakan dimulai
+SHOOT_MATCH_FRAMES = 3
+
+# nama: (scale, roll, yaw) SyntheticHand
+CONDITIONS = {
+    "normal": (1.0, 0.0, 0.0),
+    "tangan kecil": (0.4, 0.0, 0.0),
+    "miring 45": (1.0, 45.0, 0.0),
+    "miring -70": (1.0, -70.0, 0.0),
+    "menyamping 60": (1.0, 0.0, 60.0),
+    "kecil + miring": (0.45, -40.0, 30.0),
+}
+
+
+def training_sessions(directory, count, seconds, seed):
+    # Sesi sintetis berlabel maksud generator dengan ukuran dan orientasi
+    # tangan acak; seed berbeda dari sesi uji
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"train-{i:02d}.grec")
+        record_synthetic(path, seconds=seconds, seed=seed + 1000 + i, truth=True, rest=2.0 * (i % 2),
+                         scale=float(rng.uniform(0.35, 1.2)), roll=float(rng.uniform(-80, 80)),
+                         yaw=float(rng.uniform(-60, 60)))
+        paths.append(path)
+    return paths
+
+
+def rising(flags):
+    flags = np.asarray(flags, dtype=bool)
+    return np.flatnonzero(flags & ~np.concatenate([[False], flags[:-1]]))
+
+
+def match_shots(expected, actual):
+    matched = 0
+    used = set()
+    for start in expected:
+        for frame in actual:
+            if start <= frame <= start + SHOOT_MATCH_FRAMES and frame not in used:
+                used.add(frame)
+                matched += 1
+                break
+    return matched, len(actual) - len(used)
+
+
+def run_condition(make_rules, condition, seconds, fps, seeds):
+    # Akurasi armed per frame, tembakan terdeteksi/palsu, dan biaya rules
+    # per frame terhadap maksud generator
+    scale, roll, yaw = condition
+    armed_ok = frames = shots = matched = extra = 0
+    costs = []
+    for seed in seeds:
+        hand = SyntheticHand(seed=seed, scale=scale, roll=roll, yaw=yaw)
+        clock = [1000.0]
+        rules = make_rules(lambda: clock[0])
+        processor = GestureProcessor(clock=lambda: clock[0], rules=rules)
+        truth_shoot, output_shoot = [], []
+        for i in range(int(seconds * fps)):
+            t = i / fps
+            clock[0] = 1000.0 + t
+            lm = hand.landmarks(t)
+            truth = hand.truth(t)
+            started = time.perf_counter()
+            data = processor.update(lm)
+            costs.append(time.perf_counter() - started)
+            if truth is not None:
+                frames += 1
+                armed_ok += data["armed"] == truth[0]
+            truth_shoot.append(truth is not None and truth[1])
+            output_shoot.append(data["shoot"])
+        expected, actual = rising(truth_shoot), rising(output_shoot)
+        hit, false = match_shots(expected, actual)
+        shots += len(expected)
+        matched += hit
+        extra += false
+    return {
+        "armed_accuracy": armed_ok / max(frames, 1),
+        "shots": shots,
+        "shots_detected": matched,
+        "shots_false": extra,
+        "update_p50_us": float(np.percentile(costs, 50) * 1e6),
+    }
+
+
+def inference_cost(model, seconds, fps, repeat):
+    # Biaya ClassifierRules saja (fitur + MLP + keputusan) per frame bertangan
+    hand = SyntheticHand(seed=7)
+    frames = [lm for lm in (hand.landmarks(i / fps) for i in range(int(seconds * fps))) if lm is not None]
+    clock = [0.0]
+    rules = ClassifierRules(model, clock=lambda: clock[0])
+    costs = np.empty(len(frames) * repeat)
+    for r in range(repeat):
+        for i, lm in enumerate(frames):
+            clock[0] = (r * len(frames) + i) / fps
+            started = time.perf_counter()
+            armed = rules.is_armed(lm)
+            rules.detect_shoot(lm, armed)
+            costs[r * len(frames) + i] = time.perf_counter() - started
+    return float(np.percentile(costs, 50) * 1e6), float(np.percentile(costs, 99) * 1e6)
+
+
+def load_cost(path, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        GestureClassifier.load(path)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model_path = args.model
+        if model_path is None:
+            model_path = os.path.join(tmpdir, "classifier.npz")
+            paths = training_sessions(tmpdir, args.train_sessions, args.train_seconds, args.seed)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                train_sessions(paths, model_path, epochs=args.epochs, seed=args.seed)
+            print(f"Training: {len(paths)} sesi sintetis x {args.train_seconds:g} detik, "
+                  f"{time.perf_counter() - started:.1f} detik")
+        model = GestureClassifier.load(model_path)
+        size = os.path.getsize(model_path)
+        load_ms = load_cost(model_path)
+
+    print(f"Bobot: {size} byte, dimuat dalam {load_ms:.2f} ms, fitur {model.feature_size}, "
+          f"hidden {len(model.b1)}")
+    variants = {
+        "heuristik": None,
+        "classifier": lambda clock: ClassifierRules(model, clock=clock),
+    }
+    seeds = [args.seed + 500 + i for i in range(args.test_sessions)]
+    report = {"conditions": {}, "model_bytes": size, "load_ms": load_ms}
+    print(f"{'kondisi':>15} {'rules':>11} {'armed':>7} {'shoot':>9} {'palsu':>6} {'us/frame':>9}")
+    for label, condition in CONDITIONS.items():
+        report["conditions"][label] = {}
+        for name, make_rules in variants.items():
+            result = run_condition(make_rules or (lambda clock: None), condition, args.seconds, args.fps, seeds)
+            report["conditions"][label][name] = result
+            print(f"{label:>15} {name:>11} {result['armed_accuracy'] * 100:>6.1f}% "
+                  f"{result['shots_detected']:>4}/{result['shots']:<4} {result['shots_false']:>6} "
+                  f"{result['update_p50_us']:>9.1f}")
+
+    p50, p99 = inference_cost(model, args.seconds, args.fps, args.repeat)
+    report["inference_p50_us"], report["inference_p99_us"] = p50, p99
+    ok = p50 < INFERENCE_LIMIT_US
+    print(f"Inferensi classifier: p50 {p50:.1f} us, p99 {p99:.1f} us "
+          f"(batas {INFERENCE_LIMIT_US:g} us){'' if ok else '  GAGAL'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classifier gesture vs heuristik: akurasi per kondisi tangan dan latency")
+    parser.add_argument("--model", help="file bobot; tanpa ini dilatih dari sesi sintetis")
+    parser.add_argument("--train-sessions", type=int, default=12)
+    parser.add_argument("--train-seconds", type=float, default=40.0)
+    parser.add_argument("--epochs", type=int, default=40)
+    parser.add_argument("--test-sessions", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=24.0, help="detik per sesi uji")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
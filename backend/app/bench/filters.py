@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import tempfile
+import numpy as np
+from app.bench.replay import expand_paths
+from app.gesture.filters import create_filter
+from app.gesture.landmarks import INDEX_TIP
+from app.gesture.recording import FLAG_HAS_HAND, load_session, record_synthetic
+from app.gesture.synthetic import SyntheticHand
+
+# (label, nama filter, parameter, ekstrapolasi latency)
+CONFIGS = (
+    ("raw", None, {}, False),
+    ("ema (lama)", "ema", {}, False),
+    ("one_euro", "one_euro", {}, False),
+    ("one_euro+pred", "one_euro", {}, True),
+    ("kalman", "kalman", {}, False),
+    ("kalman+pred", "kalman", {}, True),
+)
+
+# Jitter dilaporkan dalam piksel layar 1920x1080
+SCREEN = np.array([1920.0, 1080.0])
+STILL_SPEED = 0.005
+LAG_SHIFTS_MS = np.arange(-60, 201, 2)
+
+
+def session_traces(records, truth=None):
+    # Potong sesi jadi segmen kontinu (tangan terlihat). Tiap segmen:
+    # (waktu, posisi mentah ujung telunjuk, fungsi posisi sebenarnya).
+    timestamps = records["timestamp"]
+    present = (records["flags"] & FLAG_HAS_HAND) != 0
+    raw = np.asarray(records["landmarks"][:, INDEX_TIP, :2], dtype=np.float64)
+
+    segments = []
+    start = None
+    for i in range(len(records) + 1):
+        if i < len(records) and present[i]:
+            if start is None:
+                start = i
+            continue
+        if start is not None and i - start >= 10:
+            t = np.asarray(timestamps[start:i], dtype=np.float64)
+            segments.append((t, raw[start:i], truth or centered_truth(t, raw[start:i])))
+        start = None
+    return segments
+
+
+def centered_truth(t, raw, window=5):
+    # Rekaman kamera tidak punya posisi sebenarnya; pakai rata-rata bergerak
+    # terpusat (non-kausal, tanpa lag) sebagai acuan
+    kernel = np.ones(window) / window
+    pad = window // 2
+    padded = np.pad(raw, ((pad, pad), (0, 0)), mode="edge")
+    smooth = np.stack([np.convolve(padded[:, k], kernel, mode="valid") for k in range(2)], axis=1)
+
+    def truth(times):
+        return np.stack([np.interp(times, t, smooth[:, k]) for k in range(2)], axis=1)
+    return truth
+
+
+def synthetic_truth(hand, start_time):
+    def truth(times):
+        out = np.empty((len(times), 2))
+        last = None
+        for n, time_s in enumerate(times):
+            lm = hand.landmarks(time_s - start_time)
+            last = lm[INDEX_TIP, :2] if lm is not None else last
+            out[n] = last if last is not None else np.nan
+        return out
+    return truth
+
+
+def run_filter(segments, name, params, predict, latency):
+    errors, jitter, lags = [], [], []
+    for t, raw, truth in segments:
+        output = np.empty_like(raw)
+        cursor = create_filter(name, **params) if name else None
+        for i in range(len(t)):
+            if cursor is None:
+                output[i] = raw[i]
+                continue
+            x, y = cursor.update(raw[i, 0], raw[i, 1], t[i])
+            if predict:
+                x, y = cursor.predict(latency)
+            output[i] = (x, y)
+
+        # Output dibandingkan dengan posisi tangan saat ditampilkan (t + latency)
+        shown = t + latency
+        actual = truth(shown)
+        speed = np.linalg.norm(np.gradient(actual, t, axis=0), axis=1)
+        moving = speed >= STILL_SPEED
+        valid = ~np.isnan(actual[:, 0])
+
+        errors.append(((output - actual) * SCREEN)[moving & valid])
+
+        still = ~moving[1:] & ~moving[:-1] & valid[1:]
+        jitter.append((np.diff(output, axis=0) * SCREEN)[still])
+
+        # Lag: pergeseran waktu yang paling menyamakan output dengan truth
+        if (moving & valid).sum() > 10:
+            rmse = [np.sqrt(np.nanmean(((output - truth(shown - s / 1000)) * SCREEN)[moving & valid] ** 2))
+                    for s in LAG_SHIFTS_MS]
+            lags.append(LAG_SHIFTS_MS[int(np.nanargmin(rmse))])
+
+    errors = np.concatenate(errors)
+    jitter = np.concatenate(jitter)
+    return {
+        "rmse_px": float(np.sqrt(np.mean(np.sum(errors ** 2, axis=1)))) if len(errors) else None,
+        "lag_ms": float(np.median(lags)) if lags else None,
+        "jitter_px": float(np.sqrt(np.mean(np.sum(jitter ** 2, axis=1)))) if len(jitter) else None,
+    }
+
+
+def main(args):
+    paths = expand_paths(args.sessions)
+    sessions = []
+    tmpdir = None
+    if paths:
+        for path in paths:
+            sessions.append(session_traces(load_session(path)))
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        for seed in range(args.synthetic):
+            path = os.path.join(tmpdir.name, f"synthetic_{seed}.grec")
+            record_synthetic(path, seconds=args.seconds, seed=seed, rest=args.rest)
+            truth = synthetic_truth(SyntheticHand(seed=seed, noise=0.0, rest=args.rest), 1000.0)
+            sessions.append(session_traces(load_session(path), truth))
+        print(f"Tidak ada file rekaman, memakai {args.synthetic} sesi sintetis (truth = tangan tanpa noise)")
+
+    segments = [segment for session in sessions for segment in session]
+    latency = args.latency_ms / 1000
+    print(f"Latency capture -> tampil diasumsikan {args.latency_ms:g} ms; error dan jitter dalam piksel 1920x1080")
+    print(f"{'filter':>15} {'rmse px':>8} {'lag ms':>7} {'jitter px':>10}")
+
+    report = {}
+    for label, name, params, predict in CONFIGS:
+        result = run_filter(segments, name, params, predict, latency)
+        report[label] = result
+        print(f"{label:>15} {result['rmse_px']:>8.1f} {result['lag_ms']:>7.0f} {result['jitter_px']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lag dan jitter filter cursor pada rekaman landmark")
+    parser.add_argument("sessions", nargs="*", help="file .grec atau pola glob")
+    parser.add_argument("--synthetic", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--rest", type=float, default=2.0, help="detik diam per siklus sesi sintetis")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="latency capture -> tampil untuk ekstrapolasi")
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    main(parser.parse_args())
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from app.bench.backends import render_video
+from app.bench.classifier import rising
+from app.gesture.backends import create_backend
+from app.gesture.capture import VideoFileCapture
+from app.gesture.detector import GestureDetector
+from app.gesture.processor import GestureProcessor
+from app.gesture.rules import REFERENCE_FPS
+from app.gesture.synthetic import SyntheticHand
+
+# Selisih rasio tembakan terdeteksi antar FPS (terhadap 30 FPS) yang masih
+# dianggap "sama"
+DETECTION_TOLERANCE = 0.1
+# Dengan noise landmark, tembakan palsu per linimasa boleh sekian lebih
+# banyak (relatif) dari 30 FPS
+NOISE_FALSE_MARGIN = 0.2
+# Tembakan dianggap terdeteksi jika output naik selama hentakan (0.1 detik di
+# SyntheticHand); sesudahnya tangan melompat kembali dan lompatan itu tidak
+# boleh dihitung sebagai deteksi
+SHOOT_MATCH_SECONDS = 0.095
+
+# nama: fungsi (jumlah frame, fps, rng) -> timestamp frame (detik)
+TIMELINES = {
+    "15 FPS": lambda n, fps, rng: np.arange(n) / 15.0,
+    "30 FPS": lambda n, fps, rng: np.arange(n) / 30.0,
+    "60 FPS": lambda n, fps, rng: np.arange(n) / 60.0,
+    # Interval 30 FPS +-40%, seperti kamera yang tersendat di bawah beban
+    "30 FPS jitter": lambda n, fps, rng: np.cumsum(rng.uniform(0.6, 1.4, n)) / 30.0,
+}
+
+
+def run_timeline(timestamps, scale, noise, seed, per_frame):
+    # Output GestureProcessor untuk satu tangan sintetis pada timestamp
+    # tertentu. per_frame: clock maju tepat 1/REFERENCE_FPS per frame
+    # berapapun interval sebenarnya, sama dengan delta wrist per frame tanpa
+    # skala interval (perilaku lama; cooldown ikut dihitung dalam frame)
+    hand = SyntheticHand(seed=seed, noise=noise, scale=scale)
+    clock = [0.0]
+    processor = GestureProcessor(clock=lambda: clock[0])
+    truth_shoot, output_shoot = [], []
+    armed_ok = frames = 0
+    for i, t in enumerate(timestamps.tolist()):
+        clock[0] = 100.0 + (i / REFERENCE_FPS if per_frame else t)
+        data = processor.update(hand.landmarks(t))
+        truth = hand.truth(t)
+        if truth is not None:
+            frames += 1
+            armed_ok += data["armed"] == truth[0]
+        truth_shoot.append(truth is not None and truth[1])
+        output_shoot.append(data["shoot"])
+    return truth_shoot, output_shoot, armed_ok, frames
+
+
+def shot_times(flags, timestamps):
+    return timestamps[rising(flags)]
+
+
+def match_times(expected, actual):
+    # match_shots() dengan jendela waktu, bukan jumlah frame
+    matched = 0
+    used = set()
+    for start in expected.tolist():
+        for i, t in enumerate(actual.tolist()):
+            if start <= t <= start + SHOOT_MATCH_SECONDS and i not in used:
+                used.add(i)
+                matched += 1
+                break
+    return matched, len(actual) - len(used)
+
+
+def frame_rates(seconds, scales, noise, seeds):
+    # Rasio tembakan terdeteksi, tembakan palsu dan akurasi armed per
+    # linimasa dan ukuran tangan, dengan skala interval vs per frame
+    rng = np.random.default_rng(0)
+    results = {}
+    for label, timeline in TIMELINES.items():
+        results[label] = {}
+        for scale in scales:
+            for per_frame in (False, True):
+                shots = matched = false = armed_ok = frames = 0
+                for seed in seeds:
+                    timestamps = timeline(int(seconds * 60), 60, rng)
+                    timestamps = timestamps[timestamps < seconds]
+                    truth, output, ok, count = run_timeline(timestamps, scale, noise, seed, per_frame)
+                    expected, actual = shot_times(truth, timestamps), shot_times(output, timestamps)
+                    hit, extra = match_times(expected, actual)
+                    shots += len(expected)
+                    matched += hit
+                    false += extra
+                    armed_ok += ok
+                    frames += count
+                key = f"{scale:g}/{'per_frame' if per_frame else 'timestamp'}"
+                results[label][key] = {
+                    "shots": shots,
+                    "detected": matched / max(shots, 1),
+                    "false": false,
+                    "armed_accuracy": armed_ok / max(frames, 1),
+                }
+    return results
+
+
+def replay_runs(video, fps, seed):
+    # Video yang sama lewat GestureDetector: real-time (timestamp jam),
+    # secepat decode dengan timestamp linimasa video, dan secepat decode
+    # dengan timestamp saat diproses (perilaku lama). Referensi: setiap
+    # frame diproses dengan timestamp i / fps.
+    def detector(realtime):
+        capture = VideoFileCapture(video, realtime=realtime, loop=False)
+        return GestureDetector(camera=capture, roi=False, motion_gate=False,
+                               backend=create_backend("synthetic", seed=seed, fps=fps))
+
+    def run(det, timestamp):
+        outputs = []
+        started = time.perf_counter()
+        frame = None
+        while True:
+            frame = det.grab(frame)
+            if frame is None:
+                break
+            data = det.process(frame, timestamp(det, len(outputs)))
+            outputs.append((data["armed"], data["shoot"], data["x"], data["y"]))
+        elapsed = time.perf_counter() - started
+        det.release()
+        return outputs, elapsed
+
+    runs = {}
+    runs["referensi"] = run(detector(False), lambda det, i: 5000.0 + i / fps)
+    runs["secepat CPU, linimasa"] = run(detector(False), lambda det, i: det.captured_at)
+    runs["real-time, jam capture"] = run(detector(True), lambda det, i: det.captured_at)
+    runs["secepat CPU, jam proses"] = run(detector(False), lambda det, i: None)
+    return runs
+
+
+def detection_gap(rates, scales):
+    # Mode dt vs 30 FPS pada ukuran tangan yang sama: selisih terbesar rasio
+    # terdeteksi (dua arah), kekurangan terbesar (hanya yang lebih rendah),
+    # tembakan palsu terbanyak per linimasa dan tembakan palsu 30 FPS
+    base = rates["30 FPS"]
+    spread = shortfall = 0.0
+    false = [0] * len(rates)
+    for i, rows in enumerate(rates.values()):
+        for scale in scales:
+            key = f"{scale:g}/timestamp"
+            gap = rows[key]["detected"] - base[key]["detected"]
+            spread = max(spread, abs(gap))
+            shortfall = max(shortfall, -gap)
+            false[i] += rows[key]["false"]
+    base_false = sum(base[f"{scale:g}/timestamp"]["false"] for scale in scales)
+    return spread, shortfall, max(false), base_false
+
+
+def print_rates(title, rates, scales):
+    print(title)
+    header = "".join(f"{f'tangan {scale:g} ' + mode:>22}" for scale in scales for mode in ("dt", "frame"))
+    print(f"{'linimasa':>14}{header}")
+    for label, rows in rates.items():
+        cells = []
+        for scale in scales:
+            for mode in ("timestamp", "per_frame"):
+                r = rows[f"{scale:g}/{mode}"]
+                cells.append(f"{r['detected'] * 100:>15.0f}% ({r['false']:>3})")
+        print(f"{label:>14}" + "".join(cells))
+
+
+def main(args):
+    seeds = [args.seed + i for i in range(args.sessions)]
+    report = {}
+    ok = True
+    report["frame_rates"] = frame_rates(args.seconds, args.scales, 0.0, seeds)
+    report["frame_rates_noise"] = frame_rates(args.seconds, args.scales, args.noise, seeds)
+    print_rates(f"Tembakan terdeteksi (palsu), {args.sessions} sesi x {args.seconds:g} detik, tanpa noise:",
+                report["frame_rates"], args.scales)
+    print_rates(f"Dengan noise landmark {args.noise:g}:", report["frame_rates_noise"], args.scales)
+
+    # Dengan skala interval, rasio terdeteksi tiap FPS harus dekat 30 FPS.
+    # Gerakan murni: kecepatan hentakan sama di setiap FPS, jadi deteksinya
+    # harus sama dan tanpa tembakan palsu.
+    spread, _, false, _ = detection_gap(report["frame_rates"], args.scales)
+    report["detection_spread"] = spread
+    fps_ok = spread <= DETECTION_TOLERANCE and false == 0
+    ok = ok and fps_ok
+    print(f"Selisih terbesar rasio terdeteksi vs 30 FPS (dt, tanpa noise): {spread * 100:.1f}% "
+          f"(batas {DETECTION_TOLERANCE * 100:g}%), {false} tembakan palsu{'' if fps_ok else '  GAGAL'}")
+
+    # Dengan noise: FPS lain tidak boleh mendeteksi jauh lebih sedikit dari
+    # 30 FPS (FPS rendah boleh lebih baik, noise-nya ikut terskala turun)
+    _, shortfall, false, base_false = detection_gap(report["frame_rates_noise"], args.scales)
+    report["detection_shortfall_noise"] = shortfall
+    noise_ok = shortfall <= DETECTION_TOLERANCE and false <= base_false * (1 + NOISE_FALSE_MARGIN)
+    ok = ok and noise_ok
+    print(f"Kekurangan terbesar rasio terdeteksi vs 30 FPS (dt, noise {args.noise:g}): {shortfall * 100:.1f}% "
+          f"(batas {DETECTION_TOLERANCE * 100:g}%), tembakan palsu per linimasa paling banyak {false} "
+          f"(30 FPS {base_false}, batas +{NOISE_FALSE_MARGIN * 100:g}%){'' if noise_ok else '  GAGAL'}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video = os.path.join(tmpdir, "replay.avi")
+        render_video(video, args.replay_seconds, args.fps, args.seed)
+        runs = replay_runs(video, args.fps, args.seed)
+    reference = runs["referensi"][0]
+    report["replay"] = {}
+    print(f"Replay video {args.replay_seconds:g} detik ({len(reference)} frame) lewat GestureDetector:")
+    print(f"{'run':>26} {'detik':>7} {'x real-time':>12} {'beda':>6} {'tembak':>7}")
+    for label, (outputs, elapsed) in runs.items():
+        diffs = sum(a != b for a, b in zip(outputs, reference)) + abs(len(outputs) - len(reference))
+        shots = int(np.count_nonzero(rising([o[1] for o in outputs])))
+        speed = args.replay_seconds / elapsed
+        report["replay"][label] = {"seconds": elapsed, "speed": speed, "diffs": diffs, "shots": shots}
+        print(f"{label:>26} {elapsed:>7.2f} {speed:>11.1f}x {diffs:>6} {shots:>7}")
+    replay_ok = report["replay"]["secepat CPU, linimasa"]["diffs"] == 0
+    ok = ok and replay_ok
+    if not replay_ok:
+        print("GAGAL: replay secepat CPU berbeda dari referensi")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deteksi tembakan di 15/30/60 FPS dan replay lebih cepat dari real-time")
+    parser.add_argument("--seconds", type=float, default=30.0, help="detik per sesi sintetis")
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.3], help="ukuran tangan sintetis")
+    parser.add_argument("--noise", type=float, default=0.0005, help="noise landmark untuk tabel kedua")
+    parser.add_argument("--replay-seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS video replay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
@@ -0,0 +1,158 @@
+import argparse
+import json
+import time
+import numpy as np
+from app.gesture.engine import Gesture, GestureEngine, angle, any_of, at_least, axis_delta, distance, finger
+from app.gesture.finger_state import FingerStateDetector
+from app.gesture.gestures import ARMED, GESTURES, POINTING
+from app.gesture.landmarks import FINGERS
+from app.gesture.synthetic import SyntheticHand
+
+# Biaya 20 gesture dalam satu engine boleh paling banyak sekian kali biaya
+# rata-rata engine satu gesture
+MAX_RATIO = 2.0
+TIPS = (4, 8, 12, 16, 20)
+
+
+def legacy_is_armed(lm):
+    # Heuristik jarak y GestureRules.is_armed sebelum rule engine
+    y = lm[:, 1].tolist()
+    index_straight = y[8] < y[6]
+    middle_bent = (y[12] - y[10]) > 0.003 or (y[12] - y[9]) > 0.002
+    ring_bent = (y[16] - y[14]) > 0.003 or (y[16] - y[13]) > 0.002
+    pinky_bent = (y[20] - y[18]) > 0.003 or (y[20] - y[17]) > 0.002
+    return index_straight and sum([middle_bent, ring_bent, pinky_bent]) >= 2
+
+
+def legacy_pointing(lm, detector):
+    # Versi sudut yang dulu dihitung lalu dibuang di GestureRules.is_armed
+    states = detector.get_all_finger_states(lm)
+    folded = sum(states[name] in ['FOLDED', 'NEUTRAL'] for name in ('middle', 'ring', 'pinky'))
+    return states['index'] != 'FOLDED' and folded >= 2
+
+
+def make_gestures(count):
+    # Gesture bawaan lalu variasi deterministik dengan campuran fitur
+    # (status jari, jarak, sudut, selisih koordinat, jendela waktu)
+    gestures = list(GESTURES)
+    states = (("EXTENDED",), ("FOLDED",), ("NEUTRAL", "FOLDED"), ("EXTENDED", "NEUTRAL"))
+    i = 0
+    while len(gestures) < count:
+        a, b = TIPS[i % 5], TIPS[(i + 2) % 5]
+        gestures.append(Gesture(
+            f"variasi_{i}",
+            finger(FINGERS[i % 5], *states[i % 4]),
+            any_of(distance(a, b, "<", 0.4 + 0.1 * (i % 4), scaled=True),
+                   angle(a - 3, a - 2, a - 1, ">", 0.3 + 0.05 * i)),
+            at_least(1, axis_delta(a, 0, "<", -0.05 * (i % 3)), finger(FINGERS[(i + 1) % 5], "FOLDED")),
+            window=1 + i % 4,
+        ))
+        i += 1
+    return gestures
+
+
+def make_frames(count, seed):
+    # Setengah dari SyntheticHand, setengah tangan acak supaya semua
+    # status jari ikut muncul
+    hand = SyntheticHand(seed=seed)
+    rng = np.random.default_rng(seed)
+    frames = []
+    t = 0.0
+    while len(frames) < count // 2:
+        lm = hand.landmarks(t)
+        t += 1 / 30
+        if lm is not None:
+            frames.append(lm)
+    base = frames[0]
+    while len(frames) < count:
+        frames.append((base + rng.normal(0, 0.05, base.shape)).astype(np.float32))
+    return frames
+
+
+def measure(fn, frames, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for lm in frames:
+            fn(lm)
+        best = min(best, (time.perf_counter() - started) / len(frames))
+    return best * 1e6
+
+
+def check(frames, gestures):
+    # Engine gabungan vs engine per gesture, ARMED vs heuristik lama,
+    # POINTING vs FingerStateDetector, evaluasi batch vs per tangan dan
+    # evaluate_rows() vs evaluate()
+    engine = GestureEngine(gestures)
+    singles = [GestureEngine([g]) for g in gestures]
+    detector = FingerStateDetector()
+    armed, pointing = engine.index[ARMED.name], engine.index[POINTING.name]
+    diffs = {"engine_vs_single": 0, "armed_vs_legacy": 0, "pointing_vs_finger_state": 0, "batch_vs_single": 0,
+             "rows_vs_batch": 0}
+    for lm in frames:
+        active = engine.update(lm)
+        expected = np.array([single.update(lm)[0] for single in singles])
+        diffs["engine_vs_single"] += int((active != expected).sum())
+        raw = engine.evaluate(lm)
+        diffs["armed_vs_legacy"] += bool(raw[armed]) != legacy_is_armed(lm)
+        diffs["pointing_vs_finger_state"] += bool(raw[pointing]) != legacy_pointing(lm, detector)
+    batch = np.stack(frames[:64])
+    diffs["batch_vs_single"] = int((engine.evaluate(batch) != np.stack([engine.evaluate(lm) for lm in batch])).sum())
+    # Jalur list (hanya literal axis, seperti ARMED) vs evaluate()
+    armed_only = GestureEngine([ARMED])
+    rows = np.array(armed_only.evaluate_rows(batch), dtype=bool)
+    diffs["rows_vs_batch"] = int((rows != armed_only.evaluate(batch)).sum())
+    return diffs
+
+
+def main(args):
+    frames = make_frames(args.frames, args.seed)
+    gestures = make_gestures(args.gestures)
+    engine = GestureEngine(gestures)
+    print(f"{len(frames)} frame, {len(gestures)} gesture, {engine.literal_count} literal, "
+          f"{'tabel per gesture' if engine.table is not None else f'{len(engine.layers)} lapis gerbang'}")
+
+    diffs = check(frames, gestures)
+    for label, count in diffs.items():
+        print(f"  berbeda {label}: {count}")
+    failed = any(diffs.values())
+
+    singles = [GestureEngine([g]) for g in gestures]
+    single_costs = [measure(single.evaluate, frames, args.repeat) for single in singles]
+    one = float(np.mean(single_costs))
+    heaviest = int(np.argmax(single_costs))
+    rows = {
+        "1 gesture (rata-rata)": one,
+        f"1 gesture (termahal: {gestures[heaviest].name})": single_costs[heaviest],
+        f"{len(gestures)} gesture, satu engine": measure(engine.evaluate, frames, args.repeat),
+        f"{len(gestures)} gesture, engine terpisah": measure(
+            lambda lm: [single.evaluate(lm) for single in singles], frames, args.repeat),
+        f"{len(gestures)} gesture + jendela waktu": measure(engine.update, frames, args.repeat),
+    }
+    batch = np.stack(frames[:args.hands])
+    rows[f"{len(gestures)} gesture, {args.hands} tangan sekaligus"] = measure(
+        engine.evaluate, [batch] * (len(frames) // args.hands), args.repeat)
+
+    print(f"{'konfigurasi':>36} {'us/frame':>9} {'x 1 gesture':>12}")
+    for label, cost in rows.items():
+        print(f"{label:>36} {cost:>9.1f} {cost / one:>12.2f}")
+    ratio = rows[f"{len(gestures)} gesture, satu engine"] / one
+    if ratio > MAX_RATIO:
+        print(f"GAGAL: {len(gestures)} gesture {ratio:.2f}x biaya satu gesture (batas {MAX_RATIO}x)")
+        failed = True
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"diffs": diffs, "us_per_frame": rows, "ratio": ratio}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rule engine gesture: kesetaraan dan biaya 1 vs banyak gesture")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--gestures", type=int, default=20)
+    parser.add_argument("--hands", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
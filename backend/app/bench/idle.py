@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import time
+from app.gesture.pipeline import MODE_ACTIVE, MODE_PAUSED, MODE_PRESENCE, GesturePipeline
+from app.gesture.synthetic import SyntheticDetector
+
+
+async def measure(pipeline, duration):
+    # CPU seluruh proses (semua thread) dan frame yang diproses selama `duration`
+    frames = pipeline.frames_processed
+    cpu = time.process_time()
+    wall = time.monotonic()
+    await asyncio.sleep(duration)
+    wall = time.monotonic() - wall
+    cpu = time.process_time() - cpu
+    return cpu / wall * 100, (pipeline.frames_processed - frames) / wall
+
+
+async def main(args):
+    detector = SyntheticDetector(fps=args.fps, work_ms=args.work_ms)
+    pipeline = GesturePipeline(detector)
+    pipeline.start()
+
+    print(f"Capture {args.fps:g} FPS, inferensi sintetis {args.work_ms:g} ms/frame")
+    print(f"{'mode':>10} {'CPU %':>7} {'fps':>7}")
+    try:
+        for mode in (MODE_ACTIVE, MODE_PRESENCE, MODE_PAUSED, MODE_ACTIVE):
+            pipeline.set_mode(mode)
+            await asyncio.sleep(0.3)
+            cpu, fps = await measure(pipeline, args.duration)
+            print(f"{mode:>10} {cpu:>7.1f} {fps:>7.1f}")
+
+        pipeline.stop(release=True)
+        cpu, fps = await measure(pipeline, args.duration)
+        print(f"{'stopped':>10} {cpu:>7.1f} {fps:>7.1f}")
+    finally:
+        pipeline.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pemakaian CPU pipeline per mode (active/presence/paused)")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--work-ms", type=float, default=15.0)
+    asyncio.run(main(parser.parse_args()))
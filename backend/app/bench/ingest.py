@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+import websockets
+from app.gesture.processor import GestureProcessor
+from app.gesture.rules import GestureRules
+from app.gesture.synthetic import SyntheticHand
+from app.websocket.ingest import INGEST_PATH, SessionBatch, gestures
+from app.websocket.protocol import (
+    LANDMARK_HAS_HAND, LANDMARK_HEADER, LANDMARK_SCALE, LANDMARK_VERSION, decode_landmarks_into,
+    encode_landmarks, quantize_player,
+)
+
+HANDSHAKE = (
+    f"GET {INGEST_PATH} HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+    "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+).encode()
+# Frame client wajib di-mask; kunci mask 0 membuat payload tidak berubah,
+# jadi generator tidak perlu menyalin/XOR payload
+HEAD_HAND = bytes([0x82, 0x80 | 126]) + (LANDMARK_HEADER.size + 126).to_bytes(2, "big") + bytes(4)
+HEAD_EMPTY = bytes([0x82, 0x80 | LANDMARK_HEADER.size]) + bytes(4)
+# Waktu kirim per seq yang disimpan tiap client (kelipatan pembagi 65536)
+SENT_RING = 256
+# Batas bawah default sesi/core; di mesin satu core yang dibagi dengan
+# generator hasil terbaiknya sekitar 550-700, jadi regresi (mis. batch yang
+# kembali mengolah seluruh kapasitas tiap flush) jatuh di bawah angka ini
+MIN_SESSIONS_PER_CORE = 400
+
+
+def landmark_streams(count, frames, fps, seed):
+    # Byte landmark (tanpa header) dari SyntheticHand; None = tanpa tangan
+    streams = []
+    for i in range(count):
+        hand = SyntheticHand(seed=seed + i)
+        stream = []
+        for f in range(frames):
+            lm = hand.landmarks(f / fps)
+            stream.append(None if lm is None else encode_landmarks(0, 0, lm)[LANDMARK_HEADER.size:])
+        streams.append(stream)
+    return streams
+
+
+def check(sessions, frames, fps, seed):
+    # SessionBatch vs satu GestureProcessor (GestureRules + EmaFilter) per
+    # sesi atas landmark yang sudah melewati kuantisasi int16; sebagian
+    # frame sengaja hilang/tidak terkirim dan sebagian sesi dibuka ulang.
+    # Tiap client punya jam sendiri (offset berbeda, satu melewati wrap u32
+    # timestamp ms); clock processor = timestamp frame client.
+    rng = np.random.default_rng(seed)
+    hands = [SyntheticHand(seed=seed + i, scale=1.0 if i % 2 else 0.5) for i in range(sessions)]
+    offsets = [0xFFFFFFFF - 2000 if i == 1 else 1000 * i for i in range(sessions)]
+    clocks = [[0.0] for _ in range(sessions)]
+
+    # Mode ingest tidak melaporkan gestures, jadi processor pembanding juga tidak
+    def make(clock):
+        return GestureProcessor(clock=lambda: clock[0], rules=GestureRules(clock=lambda: clock[0]), gestures=())
+
+    processors = [make(clock) for clock in clocks]
+    batch = SessionBatch(capacity=8)
+    slots = [batch.open() for _ in range(sessions)]
+    diffs = total = shots = 0
+    for f in range(frames):
+        expected = {}
+        for i in range(sessions):
+            if rng.random() < 0.2:
+                continue
+            lm = hands[i].landmarks(f / fps)
+            if lm is not None and rng.random() < 0.05:
+                lm = None
+            elapsed = offsets[i] + round(f * 1000 / fps)
+            clocks[i][0] = elapsed / 1000
+            payload = encode_landmarks(f, elapsed & 0xFFFFFFFF, lm)
+            batch.submit(slots[i], payload)
+            if lm is not None:
+                values = np.frombuffer(payload, dtype="<i2", offset=LANDMARK_HEADER.size)
+                lm = (values * LANDMARK_SCALE).astype(np.float32).reshape(lm.shape)
+            expected[slots[i]] = quantize_player(processors[i].update(lm))
+        slots_done, *output = batch.update()
+        for slot, gesture in zip(slots_done.tolist(), gestures(*output)):
+            total += 1
+            shots += gesture["shoot"]
+            diffs += expected[slot] != quantize_player(gesture)
+        if f == frames // 2:
+            for i in range(0, sessions, 7):
+                batch.close(slots[i])
+                slots[i] = batch.open()
+                processors[i] = make(clocks[i])
+                offsets[i] -= round(f * 1000 / fps)
+    return total, shots, diffs
+
+
+def processing_cost(sessions, frames, fps, seed, repeat):
+    # CPU per frame tanpa jaringan: decode + SessionBatch.update vs decode
+    # float + GestureProcessor per sesi
+    streams = landmark_streams(8, frames, fps, seed)
+    payloads = [[LANDMARK_HEADER.pack(LANDMARK_VERSION, f, round(f * 1000 / fps),
+                                      0 if lm is None else LANDMARK_HAS_HAND) + (lm or b"")
+                 for f, lm in enumerate(stream)] for stream in streams]
+    clock = [0.0]
+
+    def batched():
+        batch = SessionBatch(capacity=sessions)
+        slots = [batch.open() for _ in range(sessions)]
+        started = time.perf_counter()
+        for f in range(frames):
+            for i, slot in enumerate(slots):
+                batch.submit(slot, payloads[i % 8][(f + i) % frames])
+            batch.update()
+        return time.perf_counter() - started
+
+    def per_session():
+        processors = [GestureProcessor(clock=lambda: clock[0], rules=GestureRules(clock=lambda: clock[0]),
+                                       gestures=())
+                      for _ in range(sessions)]
+        started = time.perf_counter()
+        for f in range(frames):
+            clock[0] = f / fps
+            for i, processor in enumerate(processors):
+                payload = payloads[i % 8][(f + i) % frames]
+                lm = None
+                if len(payload) > LANDMARK_HEADER.size:
+                    values = np.frombuffer(payload, dtype="<i2", offset=LANDMARK_HEADER.size)
+                    lm = (values * LANDMARK_SCALE).astype(np.float32).reshape(21, 3)
+                processor.update(lm)
+        return time.perf_counter() - started
+
+    count = sessions * frames
+    return {
+        "batch_us": min(batched() for _ in range(repeat)) / count * 1e6,
+        "per_session_us": min(per_session() for _ in range(repeat)) / count * 1e6,
+    }
+
+
+def decode_cost(repeat=20000):
+    # Header + salin byte ke baris slot vs JSON 63 float + array baru
+    hand = SyntheticHand(seed=0)
+    lm = next(lm for lm in (hand.landmarks(f / 30) for f in range(300)) if lm is not None)
+    payload = encode_landmarks(1, 1, lm)
+    text = json.dumps({"seq": 1, "t": 1, "landmarks": np.round(lm, 5).tolist()})
+    batch = SessionBatch(capacity=1)
+    out = batch.buffers[batch.open()]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        decode_landmarks_into(payload, out)
+    binary = (time.perf_counter() - started) / repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        np.asarray(json.loads(text)["landmarks"], dtype=np.float32)
+    as_json = (time.perf_counter() - started) / repeat
+    return binary * 1e6, as_json * 1e6, len(payload), len(text)
+
+
+class Meter:
+    def __init__(self):
+        self.recording = False
+        self.latencies = []
+
+
+class LoadClient(asyncio.Protocol):
+    # Client ingest ringan tanpa library websockets: handshake manual, frame
+    # landmark dikirim apa adanya dengan header siap pakai, balasan gesture
+    # dicocokkan dengan waktu kirim lewat seq (frame yang tidak berubah
+    # tidak dibalas)
+
+    def __init__(self, stream, offset, meter):
+        self.stream = stream
+        self.offset = offset
+        self.meter = meter
+        self.buffer = bytearray()
+        self.upgraded = asyncio.get_running_loop().create_future()
+        self.sent_at = [0.0] * SENT_RING
+        self.seq = 0
+        self.received = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(HANDSHAKE)
+
+    def connection_lost(self, exc):
+        if not self.upgraded.done():
+            self.upgraded.set_exception(ConnectionError("koneksi ditutup saat handshake"))
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        if not self.upgraded.done():
+            end = buffer.find(b"\r\n\r\n")
+            if end < 0:
+                return
+            if not buffer.startswith(b"HTTP/1.1 101"):
+                self.upgraded.set_exception(ConnectionError(bytes(buffer[:end]).decode(errors="replace")))
+                return
+            del buffer[:end + 4]
+            self.upgraded.set_result(None)
+
+        now = time.perf_counter()
+        pos = 0
+        while len(buffer) - pos >= 2:
+            opcode, length, head = buffer[pos] & 0x0F, buffer[pos + 1] & 0x7F, 2
+            if length == 126:
+                length, head = int.from_bytes(buffer[pos + 2:pos + 4], "big"), 4
+            if len(buffer) - pos < head + length:
+                break
+            if opcode == 0x2:
+                self.received += 1
+                if self.meter.recording:
+                    seq = buffer[pos + head + 1] | buffer[pos + head + 2] << 8
+                    self.meter.latencies.append(now - self.sent_at[seq % SENT_RING])
+            pos += head + length
+        del buffer[:pos]
+
+    def send_frame(self, timestamp_ms):
+        lm = self.stream[(self.offset + self.seq) % len(self.stream)]
+        if lm is None:
+            payload = HEAD_EMPTY + LANDMARK_HEADER.pack(LANDMARK_VERSION, self.seq & 0xFFFF, timestamp_ms, 0)
+        else:
+            payload = HEAD_HAND + LANDMARK_HEADER.pack(
+                LANDMARK_VERSION, self.seq & 0xFFFF, timestamp_ms, LANDMARK_HAS_HAND) + lm
+        self.transport.write(payload)
+        self.sent_at[self.seq % SENT_RING] = time.perf_counter()
+        self.seq += 1
+
+    def send_text(self, text):
+        data = text.encode()
+        self.transport.write(bytes([0x81, 0x80 | len(data)]) + bytes(4) + data)
+
+
+async def server_stats(control):
+    await control.send(json.dumps({"type": "STATS"}))
+    return json.loads(await control.recv())["ingest"]
+
+
+async def run_round(port, sessions, args, streams):
+    loop = asyncio.get_running_loop()
+    meter = Meter()
+    clients = []
+    for i in range(sessions):
+        _, client = await loop.create_connection(
+            lambda: LoadClient(streams[i % len(streams)], i, meter), "localhost", port)
+        await client.upgraded
+        if args.reply_rate:
+            client.send_text(json.dumps({"type": "CONTROL", "action": "SET_RATE", "max_rate": args.reply_rate}))
+        clients.append(client)
+
+    # Tiap sesi mengirim pada --fps dengan fase tersebar merata
+    period = 1.0 / args.fps
+    buckets = max(1, min(sessions, round(period / 0.002)))
+    groups = [clients[b::buckets] for b in range(buckets)]
+    tick = period / buckets
+    started = loop.time()
+    step = 0
+
+    async def drive(until):
+        nonlocal step
+        while True:
+            target = started + step * tick
+            if target > until:
+                return
+            delay = target - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            timestamp_ms = int(time.monotonic() * 1000) & 0xFFFFFFFF
+            for client in groups[step % buckets]:
+                client.send_frame(timestamp_ms)
+            step += 1
+
+    async with websockets.connect(f"ws://localhost:{port}{INGEST_PATH}") as control:
+        await drive(started + args.warmup)
+        before, wall = await server_stats(control), time.perf_counter()
+        sent_before = [client.seq for client in clients]
+        received_before = [client.received for client in clients]
+        meter.recording = True
+        await drive(loop.time() + args.seconds)
+        meter.recording = False
+        after, wall = await server_stats(control), time.perf_counter() - wall
+        sent = sum(client.seq for client in clients) - sum(sent_before)
+        received = [client.received - before for client, before in zip(clients, received_before)]
+
+    for client in clients:
+        client.transport.close()
+    await asyncio.sleep(0.2)
+
+    frames = after["frames"] - before["frames"]
+    cpu = after["process_time"] - before["process_time"]
+    per_frame = cpu / max(frames, 1)
+    latencies = np.array(meter.latencies) * 1000 if meter.latencies else np.zeros(1)
+    return {
+        "sessions": sessions,
+        "sent_fps": sent / wall,
+        "server_fps": frames / wall,
+        "reply_fps": sum(received) / wall,
+        "server_cpu": cpu / wall,
+        "server_us_per_frame": per_frame * 1e6,
+        # Bagian SessionBatch + encoder; sisanya websockets, asyncio dan kernel
+        "batch_us_per_frame": (after["busy"] - before["busy"]) / max(frames, 1) * 1e6,
+        "sessions_per_core": 1.0 / (per_frame * args.fps) if frames else 0.0,
+        "mean_batch": frames / max(after["batches"] - before["batches"], 1),
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p99_ms": float(np.percentile(latencies, 99)),
+        # Sesi yang sama sekali tidak mendapat balasan selama ronde
+        "starved": sum(count == 0 for count in received),
+    }
+
+
+async def wait_listening(port, process, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Backend berhenti sebelum listening")
+        try:
+            _, writer = await asyncio.open_connection("localhost", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.02)
+    raise TimeoutError("Backend tidak listening")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+async def load_test(args):
+    # Server di proses terpisah (python -m app.main) supaya CPU-nya terukur
+    # sendiri lewat STATS; generator beban di proses ini
+    port = free_port()
+    env = dict(os.environ, GESTURE_PORT=str(port))
+    process = subprocess.Popen([sys.executable, "-m", "app.main"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    streams = landmark_streams(8, int(10 * args.fps), args.fps, args.seed)
+    try:
+        await wait_listening(port, process)
+        return [await run_round(port, sessions, args, streams) for sessions in args.sessions]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(args):
+    failed = False
+    total, shots, diffs = check(args.check_sessions, args.check_frames, args.fps, args.seed)
+    print(f"Kesetaraan SessionBatch vs GestureProcessor per sesi: {total} frame, {shots} shoot, "
+          f"{diffs} berbeda")
+    failed |= diffs > 0
+
+    binary_us, json_us, binary_bytes, json_bytes = decode_cost()
+    print(f"Decode per frame: biner {binary_bytes} byte {binary_us:.2f} us, JSON {json_bytes} byte {json_us:.2f} us")
+    cost = processing_cost(args.cost_sessions, args.cost_frames, args.fps, args.seed, args.repeat)
+    print(f"Rules + cursor per frame ({args.cost_sessions} sesi): batch {cost['batch_us']:.1f} us, "
+          f"GestureProcessor per sesi {cost['per_session_us']:.1f} us")
+
+    rounds = asyncio.run(load_test(args))
+    print(f"Beban lokal ({args.fps:g} FPS per sesi, server satu proses):")
+    print(f"{'sesi':>6} {'kirim/s':>8} {'olah/s':>8} {'balas/s':>8} {'CPU srv':>8} {'us/frame':>9} "
+          f"{'di batch':>9} {'sesi/core':>10} {'batch':>6} {'p50 ms':>7} {'p99 ms':>7}")
+    for r in rounds:
+        print(f"{r['sessions']:>6} {r['sent_fps']:>8.0f} {r['server_fps']:>8.0f} {r['reply_fps']:>8.0f} "
+              f"{r['server_cpu'] * 100:>7.0f}% {r['server_us_per_frame']:>9.1f} {r['batch_us_per_frame']:>9.1f} "
+              f"{r['sessions_per_core']:>10.0f} {r['mean_batch']:>6.1f} {r['latency_p50_ms']:>7.1f} "
+              f"{r['latency_p99_ms']:>7.1f}")
+    # Generator berbagi CPU dengan server di mesin ini; sesi/core dihitung
+    # dari CPU proses server saja
+    best = max(r["sessions_per_core"] for r in rounds)
+    if best < args.min_sessions_per_core:
+        print(f"GAGAL: {best:.0f} sesi per core (minimal {args.min_sessions_per_core})")
+        failed = True
+    if any(r["starved"] for r in rounds):
+        print("GAGAL: ada sesi yang tidak pernah mendapat balasan")
+        failed = True
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"diffs": diffs, "decode_us": {"binary": binary_us, "json": json_us},
+                       "processing": cost, "rounds": rounds}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mode ingest landmark: kesetaraan, biaya per frame dan beban ribuan sesi")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--fps", type=float, default=30.0, help="frame landmark per detik per sesi")
+    parser.add_argument("--seconds", type=float, default=5.0, help="durasi ukur per ronde")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--check-sessions", type=int, default=40)
+    parser.add_argument("--check-frames", type=int, default=600)
+    parser.add_argument("--cost-sessions", type=int, default=1000)
+    parser.add_argument("--cost-frames", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-sessions-per-core", type=float, default=MIN_SESSIONS_PER_CORE,
+                        help="gagal jika kapasitas server di bawah ini (0 = tanpa batas)")
+    parser.add_argument("--reply-rate", type=float, help="SET_RATE tiap sesi (balasan per detik)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
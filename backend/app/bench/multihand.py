@@ -0,0 +1,170 @@
+import argparse
+import json
+import time
+import numpy as np
+from app.gesture.processor import GestureProcessor, MultiHandProcessor
+from app.gesture.synthetic import SyntheticPlayers
+from app.gesture.tracking import HandTracker
+
+COMPARED = ("x", "y", "armed", "shoot", "gestures")
+
+
+def generate(players, frames, fps, seed, dropout):
+    # Landmark per frame per pemain (None jika hilang), dengan hilang acak
+    # beberapa frame berturut-turut seperti deteksi kamera sungguhan
+    source = SyntheticPlayers(players, seed=seed)
+    rng = np.random.default_rng(seed)
+    gaps = [0] * players
+    stream = []
+    for i in range(frames):
+        hands = []
+        for player, lm in enumerate(source.landmarks(i / fps)):
+            if gaps[player] > 0:
+                gaps[player] -= 1
+            elif rng.random() < dropout:
+                gaps[player] = int(rng.integers(1, 10)) - 1
+            elif lm is not None:
+                hands.append((lm, "Right" if player >= players / 2 else "Left", player))
+        if i % 2:
+            hands.reverse()
+        stream.append(hands)
+    return stream
+
+
+def check_equivalence(stream, players, fps):
+    # MultiHandProcessor per track vs satu GestureProcessor per pemain
+    clock = [1000.0]
+    multi = MultiHandProcessor(players, clock=lambda: clock[0])
+    singles = [GestureProcessor(clock=lambda: clock[0]) for _ in range(players)]
+    owner = {}
+    diffs = 0
+    compared = 0
+    for i, hands in enumerate(stream):
+        clock[0] = 1000.0 + i / fps
+        data = multi.update([(lm, handedness) for lm, handedness, _ in hands])
+        landmarks = [None] * players
+        for lm, _, player in hands:
+            landmarks[player] = lm
+        expected = [single.update(lm) for single, lm in zip(singles, landmarks)]
+
+        for slot, d in enumerate(multi.tracker.detections):
+            if d is not None:
+                owner[data["players"][slot]["track"]] = hands[d][2]
+        for player in data["players"]:
+            source = owner.get(player["track"])
+            if source is None:
+                continue
+            compared += 1
+            if any(player[key] != expected[source][key] for key in COMPARED):
+                diffs += 1
+    return compared, diffs
+
+
+def time_frames(steps, stream, fps, repeat):
+    # us/frame per step, median dari repeat kali. Repeat diselang-seling
+    # antar step supaya beban mesin yang berubah selama bench tidak memihak
+    # salah satu, dan median tidak ikut bergeser oleh satu run yang tersendat
+    runs = [[] for _ in steps]
+    for _ in range(repeat):
+        for i, step in enumerate(steps):
+            clock = [1000.0]
+            update = step(lambda: clock[0])
+            started = time.perf_counter()
+            for frame, hands in enumerate(stream):
+                clock[0] = 1000.0 + frame / fps
+                update(hands)
+            runs[i].append(time.perf_counter() - started)
+    return [float(np.median(elapsed)) / len(stream) * 1e6 for elapsed in runs]
+
+
+def single_processor(clock):
+    processor = GestureProcessor(clock=clock)
+
+    def update(hands):
+        processor.update(hands[0][0] if hands else None)
+    return update
+
+
+def looped_processors(players):
+    # Alternatif tanpa batch: tracker + satu GestureProcessor per slot
+    def make(clock):
+        tracker = HandTracker(max_hands=players)
+        processors = [GestureProcessor(clock=clock) for _ in range(players)]
+
+        def update(hands):
+            slots, started = tracker.update([(lm, handedness) for lm, handedness, _ in hands])
+            for slot in started:
+                processors[slot] = GestureProcessor(clock=clock)
+            for processor, lm in zip(processors, slots):
+                processor.update(lm)
+        return update
+    return make
+
+
+def batched_processor(players):
+    def make(clock):
+        processor = MultiHandProcessor(players, clock=clock)
+
+        def update(hands):
+            processor.update([(lm, handedness) for lm, handedness, _ in hands])
+        return update
+    return make
+
+
+def main(args):
+    report = {}
+    streams = {players: generate(players, args.frames, args.fps, args.seed, args.dropout)
+               for players in sorted({1, *args.players})}
+
+    print(f"{args.frames} frame sintetis, hilang acak {args.dropout:.0%} per frame per tangan")
+    print("Kesetaraan MultiHandProcessor vs satu GestureProcessor per pemain:")
+    failed = False
+    for players in args.players:
+        compared, diffs = check_equivalence(streams[players], players, args.fps)
+        report[f"equivalence_{players}"] = {"compared": compared, "diffs": diffs}
+        failed |= diffs > 0
+        print(f"  {players} pemain: {compared} output pemain dibandingkan, {diffs} berbeda")
+
+    print(f"{'konfigurasi':>34} {'us/frame':>9} {'x tunggal':>10}")
+    baseline, = time_frames([single_processor], streams[1], args.fps, args.repeat)
+    rows = [("1 tangan, GestureProcessor", baseline)]
+    costs = {}
+    for players in args.players:
+        costs[players] = time_frames([looped_processors(players), batched_processor(players)],
+                                     streams[players], args.fps, args.repeat)
+        rows.append((f"{players} tangan, loop GestureProcessor", costs[players][0]))
+        rows.append((f"{players} tangan, MultiHandProcessor", costs[players][1]))
+    for label, cost in rows:
+        report[label] = cost
+        print(f"{label:>34} {cost:>9.1f} {cost / baseline:>10.2f}")
+
+    # Rules semua slot satu batch numpy: biaya tetapnya (belasan operasi)
+    # sebanding dengan loop di 2 tangan, tapi tiap tangan tambahan jauh
+    # lebih murah. Gate di jumlah pemain terbesar: tidak lebih lambat dari loop.
+    most = max(args.players)
+    looped, batched = costs[most]
+    if batched > looped:
+        print(f"GAGAL: {most} tangan, MultiHandProcessor lebih lambat dari loop GestureProcessor")
+        failed = True
+    fewest = min(args.players)
+    if most > fewest:
+        per_hand = [(costs[most][i] - costs[fewest][i]) / (most - fewest) for i in range(2)]
+        report["per_hand"] = {"looped": per_hand[0], "batched": per_hand[1]}
+        print(f"Biaya per tangan tambahan: loop {per_hand[0]:.1f} us, MultiHandProcessor {per_hand[1]:.1f} us")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Biaya per frame dan kesetaraan rules beberapa tangan")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--frames", type=int, default=9000)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--dropout", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
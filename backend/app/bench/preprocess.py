@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from app.gesture.preprocess import MIRROR_MODES, FramePreprocessor
+from app.gesture.roi import HandRoi
+from app.gesture.synthetic import HandRenderer, SyntheticHand
+
+# Alokasi per frame di atas ini dianggap alokasi gambar (crop terkecil
+# 128x128 RGB = 48 KB; view/tuple Python hanya ratusan byte)
+ALLOCATION_LIMIT = 4096
+
+
+def render_frames(count, fps, seed):
+    # Frame seperti dari kamera (belum di-mirror) + box ROI tangan dalam
+    # koordinat tampilan dari landmark sintetis
+    hand = SyntheticHand(seed=seed)
+    renderer = HandRenderer(noise=2.0, seed=seed)
+    roi = HandRoi()
+    frames, boxes = [], []
+    for i in range(count):
+        lm = hand.landmarks(i / fps)
+        frames.append(cv2.flip(renderer.render(lm), 1))
+        h, w = frames[-1].shape[:2]
+        boxes.append(roi.box(lm, w, h) if lm is not None else None)
+    return frames, boxes
+
+
+def legacy_prepare(frame, box, long_side):
+    # Cara lama GestureDetector: flip, crop/downscale dan cvtColor masing-
+    # masing mengalokasikan gambar baru
+    frame = cv2.flip(frame, 1)
+    if box is not None:
+        x0, y0, x1, y1 = box
+        w, h = x1 - x0, y1 - y0
+        scale = long_side / max(w, h)
+        frame = cv2.resize(frame[y0:y1, x0:x1], (max(1, round(w * scale)), max(1, round(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+    elif long_side is not None and max(frame.shape[:2]) > long_side:
+        h, w = frame.shape[:2]
+        scale = long_side / max(w, h)
+        frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+SCENARIOS = {
+    # nama: (pakai box ROI, sisi panjang)
+    "frame penuh": (False, None),
+    "diperkecil 512": (False, 512),
+    "ROI 256": (True, 256),
+}
+
+
+def measure(step, frames, boxes, roi, long_side, repeat, warm_frames=5):
+    # Biaya per frame (terbaik dari repeat) dan alokasi puncak per frame
+    # setelah pemanasan, diukur tracemalloc frame demi frame
+    for frame, box in zip(frames[:warm_frames], boxes):
+        step(frame, box if roi else None, long_side)
+
+    allocated = 0
+    tracemalloc.start()
+    try:
+        for frame, box in zip(frames[warm_frames:], boxes[warm_frames:]):
+            if roi and box is None:
+                continue
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            step(frame, box if roi else None, long_side)
+            allocated = max(allocated, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    best = float("inf")
+    pairs = [(frame, box if roi else None) for frame, box in zip(frames, boxes) if box is not None or not roi]
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for frame, box in pairs:
+            step(frame, box, long_side)
+        best = min(best, time.perf_counter() - started)
+    return best / len(pairs) * 1e6, allocated
+
+
+def mirror_difference(frames, boxes, roi, long_side):
+    # Gambar mode landmarks harus tepat cermin gambar mode image, dan titik
+    # yang sama harus kembali ke koordinat tampilan yang sama
+    image, landmarks = FramePreprocessor("image"), FramePreprocessor("landmarks")
+    hand_roi = HandRoi()
+    pixels = points = 0.0
+    for frame, box in zip(frames, boxes):
+        if roi and box is None:
+            continue
+        box = box if roi else None
+        a = image.prepare(frame, box, long_side)
+        b = landmarks.prepare(frame, box, long_side)
+        pixels = max(pixels, float(np.abs(a.astype(np.int16) - b[:, ::-1]).max()))
+
+        h, w = frame.shape[:2]
+        lm = np.array([[0.25, 0.5, 0.0], [0.75, 0.1, 0.0]], dtype=np.float32)
+        mirrored = lm.copy()
+        mirrored[:, 0] = 1 - mirrored[:, 0]
+        if box is not None:
+            hand_roi.to_full_frame(lm, image.source_box, w, h)
+            hand_roi.to_full_frame(mirrored, landmarks.source_box, w, h)
+        landmarks.mirror_landmarks(mirrored)
+        points = max(points, float(np.abs(lm - mirrored).max()))
+    return pixels, points
+
+
+def capture_rows(frames, fps, repeat):
+    # cap.read() baru vs cap.read(image=buffer) pada video MJPG
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "frames.avi")
+        h, w = frames[0].shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+        for frame in frames:
+            writer.write(frame)
+        writer.release()
+
+        rows = {}
+        for label, reuse in (("cap.read()", False), ("cap.read(image=buffer)", True)):
+            best, allocated = float("inf"), 0
+            for _ in range(repeat):
+                capture = cv2.VideoCapture(path)
+                buffer = None
+                count = 0
+                tracemalloc.start()
+                started = time.perf_counter()
+                while True:
+                    before = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    ok, frame = capture.read(buffer)
+                    if not ok:
+                        break
+                    if count >= 2:
+                        allocated = max(allocated, tracemalloc.get_traced_memory()[1] - before)
+                    if reuse:
+                        buffer = frame
+                    count += 1
+                elapsed = time.perf_counter() - started
+                tracemalloc.stop()
+                capture.release()
+                best = min(best, elapsed / max(count, 1))
+            rows[label] = (best * 1e6, allocated, reuse)
+        return rows
+
+
+def main(args):
+    frames, boxes = render_frames(args.frames, args.fps, args.seed)
+    h, w = frames[0].shape[:2]
+    print(f"{args.frames} frame sintetis {w}x{h}, batas alokasi {ALLOCATION_LIMIT} byte/frame")
+
+    variants = {"lama (alokasi)": legacy_prepare}
+    for mode in MIRROR_MODES:
+        variants[f"mirror {mode}"] = FramePreprocessor(mode).prepare
+
+    report = {"preprocess": {}, "mirror": {}, "capture": {}}
+    failed = False
+    print(f"{'skenario':>15} {'varian':>17} {'us/frame':>9} {'x lama':>7} {'alokasi/frame':>14}")
+    for scenario, (roi, long_side) in SCENARIOS.items():
+        baseline = None
+        for label, step in variants.items():
+            cost, allocated = measure(step, frames, boxes, roi, long_side, args.repeat)
+            baseline = baseline or cost
+            buffered = step is not legacy_prepare
+            ok = not buffered or allocated < ALLOCATION_LIMIT
+            failed |= not ok
+            report["preprocess"][f"{scenario}, {label}"] = {"us_per_frame": cost, "allocated_bytes": allocated}
+            print(f"{scenario:>15} {label:>17} {cost:>9.1f} {baseline / cost:>7.2f} "
+                  f"{allocated:>12} B{'' if ok else '  GAGAL'}")
+
+    print("Kesetaraan mode landmarks vs image (gambar dicerminkan, titik dipetakan balik):")
+    for scenario, (roi, long_side) in SCENARIOS.items():
+        pixels, points = mirror_difference(frames, boxes, roi, long_side)
+        report["mirror"][scenario] = {"max_pixel_diff": pixels, "max_point_diff": points}
+        print(f"  {scenario:>15}: selisih piksel maks {pixels:.0f}, selisih titik maks {points:.2e}")
+
+    print("Capture:")
+    for label, (cost, allocated, reuse) in capture_rows(frames, args.fps, args.repeat).items():
+        ok = not reuse or allocated < ALLOCATION_LIMIT
+        failed |= not ok
+        report["capture"][label] = {"us_per_frame": cost, "allocated_bytes": allocated}
+        print(f"  {label:>24} {cost:>9.1f} us/frame {allocated:>10} B/frame{'' if ok else '  GAGAL'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Biaya dan alokasi per frame preprocessing (flip/crop/cvtColor)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
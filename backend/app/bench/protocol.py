@@ -0,0 +1,79 @@
+import argparse
+import json
+import time
+from app.gesture.processor import GestureProcessor
+from app.gesture.synthetic import SyntheticHand
+from app.websocket.protocol import FORMAT_BINARY, FORMAT_JSON, GestureEncoder, decode_binary
+
+# Field pesan JSON lama (sebelum encoder dan field "gestures")
+LEGACY_FIELDS = ("x", "y", "armed", "shoot")
+
+
+def gesture_stream(seconds, fps, seed):
+    # Output GestureProcessor untuk SyntheticHand, dengan timestamp simulasi
+    hand = SyntheticHand(seed=seed)
+    clock = [1000.0]
+    processor = GestureProcessor(clock=lambda: clock[0])
+    stream = []
+    for i in range(int(seconds * fps)):
+        t = i / fps
+        clock[0] = 1000.0 + t
+        stream.append((i + 1, dict(processor.update(hand.landmarks(t))), clock[0]))
+    return stream
+
+
+def run_legacy(stream):
+    sent_bytes = 0
+    start = time.process_time()
+    for _, gesture, _ in stream:
+        sent_bytes += len(json.dumps({key: gesture[key] for key in LEGACY_FIELDS}))
+    return sent_bytes, len(stream), time.process_time() - start
+
+
+def run_encoder(stream, format, max_rate=None):
+    encoder = GestureEncoder(format=format, max_rate=max_rate, epoch=stream[0][2])
+    start = time.process_time()
+    for seq, gesture, captured_at in stream:
+        encoder.encode(seq, gesture, captured_at, now=captured_at)
+    return encoder.bytes_sent, encoder.sent, time.process_time() - start
+
+
+def check_roundtrip(stream):
+    encoder = GestureEncoder(format=FORMAT_BINARY, heartbeat=0.0, epoch=stream[0][2])
+    for seq, gesture, captured_at in stream:
+        decoded = decode_binary(encoder.encode(seq, gesture, captured_at, now=captured_at))
+        if gesture["x"] is not None and abs(decoded["x"] - min(max(gesture["x"], 0.0), 1.0)) > 1e-4:
+            return False
+        if decoded["armed"] != bool(gesture["armed"]) or decoded["shoot"] != bool(gesture["shoot"]):
+            return False
+        if decoded["gestures"] != gesture["gestures"]:
+            return False
+    return True
+
+
+def main(args):
+    stream = gesture_stream(args.seconds, args.fps, args.seed)
+    duration = len(stream) / args.fps
+
+    rows = [
+        ("json, tiap frame (lama)", run_legacy(stream)),
+        ("json + suppression", run_encoder(stream, FORMAT_JSON)),
+        ("binary + suppression", run_encoder(stream, FORMAT_BINARY)),
+        (f"binary + rate {args.rate:g}/s", run_encoder(stream, FORMAT_BINARY, args.rate)),
+    ]
+
+    print(f"Frame: {len(stream)} ({duration:.0f} s @ {args.fps:g} FPS), "
+          f"roundtrip biner OK: {check_roundtrip(stream)}")
+    print(f"{'mode':<26} {'pesan':>7} {'byte/s':>9} {'byte/pesan':>11} {'us/frame':>9}")
+    for name, (sent_bytes, messages, cpu) in rows:
+        print(f"{name:<26} {messages:>7} {sent_bytes / duration:>9.0f} "
+              f"{sent_bytes / max(messages, 1):>11.1f} {cpu / len(stream) * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan protokol gesture JSON vs biner")
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate", type=float, default=20.0)
+    main(parser.parse_args())
@@ -0,0 +1,254 @@
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from app.gesture.motion import MotionGate
+from app.gesture.processor import GestureProcessor
+from app.gesture.recording import FLAG_HAS_HAND, load_session, record_synthetic, recorded_gesture
+from app.gesture.synthetic import HandRenderer, SyntheticHand
+
+XY_TOLERANCE = 1e-4
+# Tembakan dengan motion gate dianggap sama jika muncul paling lambat
+# sekian frame setelah tembakan ground truth
+SHOOT_MATCH_FRAMES = 3
+
+
+def outputs_differ(expected, actual):
+    if expected["armed"] != bool(actual["armed"]) or expected["shoot"] != bool(actual["shoot"]):
+        return True
+    if (expected["x"] is None) != (actual["x"] is None):
+        return True
+    if expected["x"] is None:
+        return False
+    return (abs(expected["x"] - actual["x"]) > XY_TOLERANCE or
+            abs(expected["y"] - actual["y"]) > XY_TOLERANCE)
+
+
+def replay_session(records, make_processor=GestureProcessor, max_diffs=5):
+    # Mendorong satu sesi rekaman lewat GestureProcessor secepat mungkin.
+    # Clock rules diganti timestamp rekaman sehingga cooldown tetap sama
+    # walaupun replay jauh lebih cepat dari real time.
+    clock = [0.0]
+    processor = make_processor(clock=lambda: clock[0])
+
+    timestamps = records["timestamp"].tolist()
+    flags = records["flags"].tolist()
+    landmarks = np.ascontiguousarray(records["landmarks"])
+
+    latencies = np.empty(len(records), dtype=np.float64)
+    diffs = []
+    diff_count = 0
+
+    for i in range(len(records)):
+        clock[0] = timestamps[i]
+        lm = landmarks[i] if flags[i] & FLAG_HAS_HAND else None
+
+        start = time.perf_counter()
+        output = processor.update(lm)
+        latencies[i] = time.perf_counter() - start
+
+        expected = recorded_gesture(records[i])
+        if outputs_differ(expected, output):
+            diff_count += 1
+            if len(diffs) < max_diffs:
+                diffs.append({"frame": i, "expected": expected, "actual": output})
+
+    return latencies, diff_count, diffs
+
+
+def replay_gated(records, gate, make_processor=GestureProcessor, scene=None):
+    # Replay dengan MotionGate: tiap record digambar jadi frame dari
+    # landmark-nya, gate memutuskan dari perbedaan piksel, dan frame yang
+    # dilewati memakai hasil sebelumnya seperti GestureDetector.process().
+    # scene(i) opsional memberi landmark "fisik" untuk digambar (tanpa
+    # jitter MediaPipe yang tidak terlihat di gambar kamera).
+    clock = [0.0]
+    processor = make_processor(clock=lambda: clock[0])
+    renderer = HandRenderer()
+    frame = np.empty(renderer.shape, dtype=np.uint8)
+
+    timestamps = records["timestamp"].tolist()
+    flags = records["flags"].tolist()
+    landmarks = np.ascontiguousarray(records["landmarks"])
+
+    expected_shots = []
+    actual_shots = []
+    cursor_error = []
+    gate_time = 0.0
+    last = None
+
+    for i in range(len(records)):
+        clock[0] = timestamps[i]
+        lm = landmarks[i] if flags[i] & FLAG_HAS_HAND else None
+        renderer.render(lm if scene is None else scene(i), frame)
+
+        start = time.perf_counter()
+        run = gate.should_infer(frame, timestamps[i], last is None or last["shoot"])
+        gate_time += time.perf_counter() - start
+
+        if run:
+            last = processor.update(lm)
+            gate.observe(timestamps[i], lm is not None, last["armed"])
+            output = last
+        else:
+            output = dict(last, shoot=False)
+
+        expected = recorded_gesture(records[i])
+        if expected["shoot"]:
+            expected_shots.append(i)
+        if output["shoot"]:
+            actual_shots.append(i)
+        if expected["x"] is not None and output["x"] is not None:
+            cursor_error.append(max(abs(expected["x"] - output["x"]), abs(expected["y"] - output["y"])))
+
+    delays = []
+    matched = set()
+    for shot in expected_shots:
+        for frame_index in actual_shots:
+            if shot <= frame_index <= shot + SHOOT_MATCH_FRAMES and frame_index not in matched:
+                matched.add(frame_index)
+                delays.append(frame_index - shot)
+                break
+
+    return {
+        "frames": len(records),
+        "skipped": gate.skipped,
+        "gate_us": gate_time / max(len(records), 1) * 1e6,
+        "shots_expected": len(expected_shots),
+        "shots_matched": len(delays),
+        "shots_extra": len(actual_shots) - len(matched),
+        "shot_delay_frames": float(np.mean(delays)) if delays else 0.0,
+        "cursor_error_p99": float(np.percentile(cursor_error, 99)) if cursor_error else 0.0,
+    }
+
+
+def run_gated(paths, motion_ratio, inference_ms, scenes=None):
+    total = {"frames": 0, "skipped": 0, "gate_us": 0.0, "shots_expected": 0,
+             "shots_matched": 0, "shots_extra": 0, "shot_delay_frames": 0.0, "cursor_error_p99": 0.0}
+    for n, path in enumerate(paths):
+        scene = scenes[n] if scenes else None
+        result = replay_gated(load_session(path), MotionGate(motion_ratio=motion_ratio), scene=scene)
+        for key in ("frames", "skipped", "shots_expected", "shots_matched", "shots_extra"):
+            total[key] += result[key]
+        total["gate_us"] += result["gate_us"] * result["frames"]
+        total["shot_delay_frames"] += result["shot_delay_frames"] * result["shots_matched"]
+        total["cursor_error_p99"] = max(total["cursor_error_p99"], result["cursor_error_p99"])
+
+    frames = max(total["frames"], 1)
+    total["gate_us"] /= frames
+    total["shot_delay_frames"] /= max(total["shots_matched"], 1)
+    total["motion_ratio"] = motion_ratio
+    total["skip_ratio"] = total["skipped"] / frames
+    # CPU yang dihemat: inferensi yang dilewati dikurangi biaya gate di semua frame
+    baseline = frames * inference_ms * 1000
+    saved = total["skipped"] * inference_ms * 1000 - frames * total["gate_us"]
+    total["cpu_saved"] = saved / baseline
+    return total
+
+
+def print_gated(results, inference_ms):
+    print(f"Motion gate (inferensi diasumsikan {inference_ms:g} ms/frame):")
+    print(f"{'ratio':>7} {'skip':>6} {'CPU saved':>10} {'gate us':>8} {'shots':>9} {'extra':>6} {'delay fr':>9} {'cursor p99':>11}")
+    for r in results:
+        print(f"{r['motion_ratio']:>7g} {r['skip_ratio'] * 100:>5.1f}% {r['cpu_saved'] * 100:>9.1f}% "
+              f"{r['gate_us']:>8.0f} {r['shots_matched']:>4}/{r['shots_expected']:<4} {r['shots_extra']:>6} "
+              f"{r['shot_delay_frames']:>9.2f} {r['cursor_error_p99']:>11.4f}")
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+
+def run(paths, make_processor=GestureProcessor):
+    all_latencies = []
+    sessions = []
+    total_diffs = 0
+
+    wall_start = time.perf_counter()
+    for path in paths:
+        records = load_session(path)
+        latencies, diff_count, diffs = replay_session(records, make_processor)
+        all_latencies.append(latencies)
+        total_diffs += diff_count
+        sessions.append({"path": path, "frames": len(records), "diffs": diff_count, "examples": diffs})
+    wall = time.perf_counter() - wall_start
+
+    latencies = np.concatenate(all_latencies) if all_latencies else np.zeros(0)
+    frames = len(latencies)
+    return {
+        "sessions": len(paths),
+        "frames": frames,
+        "frames_per_sec": frames / wall if wall > 0 else 0.0,
+        "p50_us": float(np.percentile(latencies, 50) * 1e6) if frames else None,
+        "p99_us": float(np.percentile(latencies, 99) * 1e6) if frames else None,
+        "diff_frames": total_diffs,
+        "per_session": sessions,
+    }
+
+
+def print_report(report):
+    print(f"Sesi: {report['sessions']}, frame: {report['frames']}")
+    print(f"Throughput: {report['frames_per_sec']:.0f} frame/s")
+    print(f"Latency per frame: p50 {report['p50_us']:.1f} us, p99 {report['p99_us']:.1f} us")
+    print(f"Frame berbeda dari ground truth: {report['diff_frames']}")
+    for session in report["per_session"]:
+        for diff in session["examples"]:
+            print(f"  {session['path']} frame {diff['frame']}: "
+                  f"expected {diff['expected']} actual {diff['actual']}")
+
+
+def main(args):
+    paths = expand_paths(args.sessions)
+
+    tmpdir = None
+    scenes = None
+    if not paths:
+        tmpdir = tempfile.TemporaryDirectory()
+        for seed in range(args.synthetic):
+            path = os.path.join(tmpdir.name, f"synthetic_{seed}.grec")
+            record_synthetic(path, seconds=args.seconds, seed=seed, rest=args.rest)
+            paths.append(path)
+        # Sesi sintetis direkam 30 FPS; gambar tangan yang sama tanpa noise
+        scenes = [
+            lambda i, hand=SyntheticHand(seed=seed, noise=0.0, rest=args.rest): hand.landmarks(i / 30.0)
+            for seed in range(args.synthetic)
+        ]
+        print(f"Tidak ada file rekaman, memakai {args.synthetic} sesi sintetis")
+
+    report = run(paths)
+    print_report(report)
+
+    if args.motion_gate:
+        report["motion_gate"] = [run_gated(paths, ratio, args.inference_ms, scenes) for ratio in args.motion_gate]
+        print_gated(report["motion_gate"], args.inference_ms)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+    return 1 if args.fail_on_diff and report["diff_frames"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay rekaman landmark lewat rules, state machine dan EMA")
+    parser.add_argument("sessions", nargs="*", help="file .grec atau pola glob")
+    parser.add_argument("--synthetic", type=int, default=4, help="jumlah sesi sintetis jika tidak ada file")
+    parser.add_argument("--seconds", type=float, default=60.0, help="durasi tiap sesi sintetis")
+    parser.add_argument("--rest", type=float, default=0.0, help="detik tangan diam per siklus sesi sintetis")
+    parser.add_argument("--motion-gate", type=float, nargs="+", metavar="RATIO",
+                        help="evaluasi MotionGate untuk tiap motion_ratio (frame digambar dari landmark)")
+    parser.add_argument("--inference-ms", type=float, default=15.0,
+                        help="biaya inferensi per frame untuk estimasi CPU yang dihemat")
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    parser.add_argument("--fail-on-diff", action="store_true", help="exit code 1 jika output berbeda")
+    raise SystemExit(main(parser.parse_args()))
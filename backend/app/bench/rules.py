@@ -0,0 +1,322 @@
+import argparse
+import time
+from types import SimpleNamespace
+import numpy as np
+from app.gesture.finger_state import FingerStateDetector
+from app.gesture.landmarks import hand_scale, landmarks_to_array, palm_center, palm_normal
+from app.gesture.rules import GestureRules
+from app.gesture.synthetic import SyntheticHand
+
+# Jalur rules per frame (is_armed + detect_shoot) harus minimal sekian kali
+# lebih cepat dari implementasi lama
+MIN_SPEEDUP = 5.0
+
+
+# Implementasi lama berbasis atribut objek landmark, disalin apa adanya
+# sebagai pembanding.
+
+def legacy_compute_angle(p1, p2, p3):
+    v1 = np.array([p1.x - p2.x, p1.y - p2.y, p1.z - p2.z])
+    v2 = np.array([p3.x - p2.x, p3.y - p2.y, p3.z - p2.z])
+    norm1 = np.linalg.norm(v1)
+    norm2 = np.linalg.norm(v2)
+    if norm1 == 0 or norm2 == 0:
+        return np.pi / 2
+    dot_product = np.clip(np.dot(v1 / norm1, v2 / norm2), -1.0, 1.0)
+    return np.arccos(dot_product)
+
+
+def legacy_finger_states(lm):
+    states = {}
+    for name, (mcp, pip, dip, tip) in (('index', (5, 6, 7, 8)), ('middle', (9, 10, 11, 12)),
+                                       ('ring', (13, 14, 15, 16)), ('pinky', (17, 18, 19, 20))):
+        avg = (legacy_compute_angle(lm[mcp], lm[pip], lm[dip]) +
+               legacy_compute_angle(lm[pip], lm[dip], lm[tip])) / 2
+        states[name] = 'EXTENDED' if avg < 0.5 else 'FOLDED' if avg > 1.0 else 'NEUTRAL'
+    avg = (legacy_compute_angle(lm[0], lm[3], lm[4]) + legacy_compute_angle(lm[3], lm[4], lm[5])) / 2
+    states['thumb'] = 'EXTENDED' if avg < 0.6 else 'FOLDED' if avg > 0.9 else 'NEUTRAL'
+    return states
+
+
+def legacy_palm_normal(lm):
+    wrist, index_mcp, pinky_mcp = lm[0], lm[5], lm[17]
+    v1 = np.array([index_mcp.x - wrist.x, index_mcp.y - wrist.y, index_mcp.z - wrist.z])
+    v2 = np.array([pinky_mcp.x - wrist.x, pinky_mcp.y - wrist.y, pinky_mcp.z - wrist.z])
+    normal = np.cross(v1, v2)
+    return normal / np.linalg.norm(normal)
+
+
+def legacy_normalize(lm):
+    wrist, index_mcp, middle_mcp, ring_mcp, pinky_mcp = lm[0], lm[5], lm[9], lm[13], lm[17]
+    center = np.array([
+        (wrist.x + index_mcp.x + middle_mcp.x + ring_mcp.x + pinky_mcp.x) / 5,
+        (wrist.y + index_mcp.y + middle_mcp.y + ring_mcp.y + pinky_mcp.y) / 5,
+        (wrist.z + index_mcp.z + middle_mcp.z + ring_mcp.z + pinky_mcp.z) / 5
+    ])
+    scale = np.linalg.norm(np.array([middle_mcp.x, middle_mcp.y, middle_mcp.z]) -
+                           np.array([wrist.x, wrist.y, wrist.z]))
+    return center, scale
+
+
+class LegacyStateMachine:
+    # GestureStateMachine lama (riwayat list, pop(0)); clock disuntikkan
+    # supaya output bisa dibandingkan, selebihnya apa adanya
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.MIN_ARMED_FRAMES = 1
+        self.MIN_IDLE_FRAMES = 2
+        self.SHOOT_COOLDOWN = 0.3
+        self.ARMED_ENTER_THRESHOLD = 0.3
+        self.ARMED_EXIT_THRESHOLD = 0.1
+        self.current_state = 'idle'
+        self.state_history = []
+        self.history_size = 7
+        self.last_shoot_time = float("-inf")
+        self.armed_frame_count = 0
+        self.idle_frame_count = 0
+
+    def update(self, is_armed_raw, is_shoot_raw):
+        now = self.clock()
+        self.state_history.append(is_armed_raw)
+        if len(self.state_history) > self.history_size:
+            self.state_history.pop(0)
+        armed_ratio = sum(self.state_history) / len(self.state_history)
+
+        if self.current_state == 'idle':
+            if is_armed_raw or armed_ratio >= self.ARMED_ENTER_THRESHOLD:
+                self.armed_frame_count += 1
+                if self.armed_frame_count >= self.MIN_ARMED_FRAMES:
+                    self.current_state = 'armed'
+                    self.idle_frame_count = 0
+            else:
+                self.armed_frame_count = 0
+        elif self.current_state == 'armed':
+            if is_shoot_raw and (now - self.last_shoot_time) > self.SHOOT_COOLDOWN:
+                self.current_state = 'shooting'
+                self.last_shoot_time = now
+                return (self.current_state, True, True)
+            if armed_ratio < self.ARMED_EXIT_THRESHOLD:
+                self.idle_frame_count += 1
+                if self.idle_frame_count >= self.MIN_IDLE_FRAMES:
+                    self.current_state = 'idle'
+                    self.armed_frame_count = 0
+            else:
+                self.idle_frame_count = 0
+                return (self.current_state, True, False)
+        elif self.current_state == 'shooting':
+            self.current_state = 'cooldown'
+            return (self.current_state, True, True)
+        elif self.current_state == 'cooldown':
+            if (now - self.last_shoot_time) > self.SHOOT_COOLDOWN:
+                self.current_state = 'armed' if armed_ratio >= self.ARMED_EXIT_THRESHOLD else 'idle'
+
+        is_armed_stable = self.current_state in ('armed', 'shooting', 'cooldown')
+        return (self.current_state, is_armed_stable, self.current_state == 'shooting')
+
+
+class LegacyRules:
+    # is_armed + detect_shoot GestureRules lama pada objek landmark
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.SHOOT_COOLDOWN = 0.3
+        self.SHOOT_THRESHOLD = 0.002
+        self.MIN_VELOCITY_THRESHOLD = 0.0015
+        self.prev_wrist_y = None
+        self.prev_index_y = None
+        self.velocity_buffer = []
+        self.velocity_buffer_size = 5
+        self.shoot_detected = False
+        self.shoot_frame_count = 0
+        self.state_machine = LegacyStateMachine(clock)
+
+    def is_armed(self, lm):
+        try:
+            finger_states = legacy_finger_states(lm)
+            index_not_folded = finger_states['index'] != 'FOLDED'
+            middle_folded = finger_states['middle'] in ['FOLDED', 'NEUTRAL']
+            ring_folded = finger_states['ring'] in ['FOLDED', 'NEUTRAL']
+            pinky_folded = finger_states['pinky'] in ['FOLDED', 'NEUTRAL']
+            folded_count = sum([middle_folded, ring_folded, pinky_folded])
+            is_armed_angle = (index_not_folded and folded_count >= 2)
+        except Exception:
+            is_armed_angle = False
+
+        index_tip, index_mid = lm[8], lm[6]
+        middle_tip, middle_mid, middle_pip = lm[12], lm[10], lm[9]
+        ring_tip, ring_mid, ring_pip = lm[16], lm[14], lm[13]
+        pinky_tip, pinky_mid, pinky_pip = lm[20], lm[18], lm[17]
+
+        index_straight = index_tip.y < index_mid.y
+        middle_bent = (middle_tip.y - middle_mid.y) > 0.003 or (middle_tip.y - middle_pip.y) > 0.002
+        ring_bent = (ring_tip.y - ring_mid.y) > 0.003 or (ring_tip.y - ring_pip.y) > 0.002
+        pinky_bent = (pinky_tip.y - pinky_mid.y) > 0.003 or (pinky_tip.y - pinky_pip.y) > 0.002
+        bent_count = sum([middle_bent, ring_bent, pinky_bent])
+        is_armed_raw = index_straight and bent_count >= 2
+
+        self.state_machine.update(is_armed_raw, False)
+        return is_armed_raw
+
+    def detect_shoot(self, lm, is_armed_current):
+        wrist = lm[0]
+        index_tip = lm[8]
+        now = self.clock()
+
+        if self.shoot_detected:
+            self.shoot_frame_count += 1
+            if self.shoot_frame_count >= 2:
+                self.shoot_detected = False
+                self.shoot_frame_count = 0
+                return False
+            return True
+
+        if self.prev_wrist_y is not None:
+            delta_y = self.prev_wrist_y - wrist.y
+            self.velocity_buffer.append(abs(delta_y))
+            if len(self.velocity_buffer) > self.velocity_buffer_size:
+                self.velocity_buffer.pop(0)
+            if len(self.velocity_buffer) >= 3:
+                velocities = np.array(self.velocity_buffer)
+                max_velocity = np.max(velocities)
+                std_velocity = np.std(velocities)
+            else:
+                max_velocity = abs(delta_y)
+                std_velocity = 0
+
+            is_moving_down = delta_y > self.SHOOT_THRESHOLD
+            is_moving_up = delta_y < -self.SHOOT_THRESHOLD
+            is_cooldown_ready = now - self.state_machine.last_shoot_time > self.SHOOT_COOLDOWN
+            has_sufficient_velocity = max_velocity > self.MIN_VELOCITY_THRESHOLD
+            has_consistent_movement = std_velocity < max_velocity * 0.7 or len(self.velocity_buffer) < 3
+            is_accelerating = False
+            if len(self.velocity_buffer) >= 2:
+                recent_velocities = self.velocity_buffer[-2:]
+                is_accelerating = recent_velocities[-1] > recent_velocities[0] * 1.2
+
+            is_shoot_raw = (
+                (is_moving_down or is_moving_up) and
+                abs(delta_y) > self.SHOOT_THRESHOLD and
+                is_cooldown_ready
+            )
+            self.state_machine.update(is_armed_raw=is_armed_current, is_shoot_raw=is_shoot_raw)
+
+            if is_shoot_raw and is_armed_current:
+                self.prev_wrist_y = wrist.y
+                self.prev_index_y = index_tip.y
+                self.velocity_buffer = []
+                self.shoot_detected = True
+                self.shoot_frame_count = 0
+                return True
+
+        self.prev_wrist_y = wrist.y
+        self.prev_index_y = index_tip.y
+        return False
+
+
+def legacy_frame(lm):
+    return legacy_finger_states(lm), legacy_palm_normal(lm), legacy_normalize(lm)
+
+
+def vectorized_frame(landmarks, detector, buffer):
+    lm = landmarks_to_array(landmarks, buffer)
+    return detector.get_all_finger_states(lm), palm_normal(lm), (palm_center(lm), hand_scale(lm))
+
+
+def make_frames(count):
+    hand = SyntheticHand(seed=1)
+    frames = []
+    t = 0.0
+    while len(frames) < count:
+        lm = hand.landmarks(t)
+        t += 1 / 30
+        if lm is None:
+            continue
+        frames.append([SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in lm])
+    return frames
+
+
+def rules_path(frames, repeat):
+    # Jalur per frame lengkap: landmark objek -> is_armed -> detect_shoot.
+    # Clock maju 1/30 detik per frame untuk kedua implementasi.
+    clock = [0.0]
+    buffer = np.empty((21, 3), dtype=np.float32)
+
+    def legacy_run():
+        rules = LegacyRules(lambda: clock[0])
+        outputs = []
+        for i, lm in enumerate(frames):
+            clock[0] = i / 30
+            armed = rules.is_armed(lm)
+            outputs.append((armed, rules.detect_shoot(lm, armed)))
+        return outputs
+
+    def current_run():
+        rules = GestureRules(clock=lambda: clock[0])
+        outputs = []
+        for i, landmarks in enumerate(frames):
+            clock[0] = i / 30
+            lm = landmarks_to_array(landmarks, buffer)
+            armed = rules.is_armed(lm)
+            outputs.append((armed, rules.detect_shoot(lm, armed)))
+        return outputs
+
+    mismatches = sum(a != b for a, b in zip(legacy_run(), current_run()))
+    legacy = current = float("inf")
+    for _ in range(repeat):
+        for name, run in (("legacy", legacy_run), ("current", current_run)):
+            start = time.process_time()
+            run()
+            elapsed = (time.process_time() - start) / len(frames)
+            if name == "legacy":
+                legacy = min(legacy, elapsed)
+            else:
+                current = min(current, elapsed)
+    return mismatches, legacy, current
+
+
+def measure(fn, frames):
+    start = time.process_time()
+    for lm in frames:
+        fn(lm)
+    return (time.process_time() - start) / len(frames)
+
+
+def main(args):
+    frames = make_frames(args.frames)
+    detector = FingerStateDetector()
+    buffer = np.empty((21, 3), dtype=np.float32)
+
+    mismatches = 0
+    for lm in frames:
+        old_states, old_normal, (old_center, old_scale) = legacy_frame(lm)
+        new_states, new_normal, (new_center, new_scale) = vectorized_frame(lm, detector, buffer)
+        if (old_states != new_states or not np.allclose(old_normal, new_normal, atol=1e-4) or
+                not np.allclose(old_center, new_center, atol=1e-5) or abs(old_scale - new_scale) > 1e-5):
+            mismatches += 1
+
+    legacy = vectorized = float("inf")
+    for _ in range(args.repeat):
+        legacy = min(legacy, measure(legacy_frame, frames))
+        vectorized = min(vectorized, measure(lambda lm: vectorized_frame(lm, detector, buffer), frames))
+
+    print(f"Frames: {len(frames)}, mismatch geometri: {mismatches}")
+    print(f"Geometri legacy (atribut objek):   {legacy * 1e6:8.1f} us/frame")
+    print(f"Geometri vectorized (array 21x3):  {vectorized * 1e6:8.1f} us/frame")
+    print(f"Speedup geometri: {legacy / vectorized:.1f}x")
+
+    rule_mismatches, legacy_rules, current_rules = rules_path(frames, args.repeat)
+    speedup = legacy_rules / current_rules
+    print(f"Rules per frame (is_armed + detect_shoot), mismatch armed/shoot: {rule_mismatches}")
+    print(f"Rules legacy:   {legacy_rules * 1e6:8.1f} us/frame")
+    print(f"Rules sekarang: {current_rules * 1e6:8.1f} us/frame")
+    ok = speedup >= MIN_SPEEDUP and mismatches == 0 and rule_mismatches == 0
+    print(f"Speedup rules: {speedup:.1f}x (minimal {MIN_SPEEDUP:g}x){'' if ok else '  GAGAL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark matematika finger-state dan orientasi")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=10)
+    raise SystemExit(main(parser.parse_args()))
@@ -0,0 +1,373 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+import websockets
+from app.bench.ingest import free_port, wait_listening
+from app.websocket.protocol import decode_binary
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+# Histogram umur pesan untuk persentil seluruh run tanpa menyimpan setiap
+# sampel (soak berjam-jam): 0.1 ms per bin, bin terakhir menampung >= 2 detik
+AGE_BINS = np.arange(0.0, 2000.1, 0.1)
+
+# metrik ringkasan: (arah lebih baik, selisih absolut yang selalu ditoleransi)
+REGRESSION_METRICS = {
+    "fps_mean": (1, 0.5),
+    "age_p50_ms": (-1, 1.0),
+    "age_p99_ms": (-1, 2.0),
+    "server_cpu_mean": (-1, 0.02),
+    "rss_max_mb": (-1, 5.0),
+}
+
+
+def process_usage(pid):
+    # CPU (detik, semua thread) dan RSS (MB) proses server dari /proc;
+    # None di luar Linux atau jika proses sudah berhenti
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration):
+        return None
+    # fields[0] = field ke-3 (state); utime dan stime field ke-14 dan 15
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, rss / 1024
+
+
+def git_version():
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def percentile(counts, q):
+    # Persentil dari histogram AGE_BINS (batas atas bin)
+    total = counts.sum()
+    if not total:
+        return None
+    index = int(np.searchsorted(np.cumsum(counts), total * q / 100))
+    return float(AGE_BINS[min(index + 1, len(AGE_BINS) - 1)])
+
+
+class Totals:
+    # Penghitung bersama semua client; sampler mengambil selisihnya
+    def __init__(self):
+        self.frames = 0
+        self.ages = []
+        self.connects = 0
+        self.disconnects = 0
+        self.errors = 0
+
+
+class SoakClient:
+    # Client seperti useGestureSocker.js: SET_FORMAT binary dan ACK kosong
+    # saat terhubung, lalu CONTROL START/PAUSE bergantian (play detik main,
+    # pause detik jeda, fase tersebar antar client). Setiap frame di-ACK.
+    # churn > 0: koneksi ditutup dan dibuka lagi setiap churn detik.
+
+    def __init__(self, index, args, totals):
+        self.args = args
+        self.totals = totals
+        cycle = args.play + args.pause
+        self.offset = cycle * index / max(args.clients, 1) if args.pause else 0.0
+        self.playing = False
+        self.active = 0.0
+        self.active_since = 0.0
+        self.connected = False
+
+    def wants_play(self, t):
+        if not self.args.pause:
+            return True
+        return (t + self.offset) % (self.args.play + self.args.pause) < self.args.play
+
+    def next_change(self, t):
+        if not self.args.pause:
+            return float("inf")
+        cycle = self.args.play + self.args.pause
+        phase = (t + self.offset) % cycle
+        return t + (self.args.play - phase if phase < self.args.play else cycle - phase)
+
+    def set_playing(self, playing, now):
+        if playing and not self.playing:
+            self.active_since = now
+        elif self.playing and not playing:
+            self.active += now - self.active_since
+        self.playing = playing
+
+    def active_seconds(self, now):
+        return self.active + (now - self.active_since if self.playing else 0.0)
+
+    async def control(self, ws, started):
+        # Kirim START/PAUSE sesuai skrip; waktu main dihitung sejak perintah
+        while True:
+            now = time.monotonic()
+            playing = self.wants_play(now - started)
+            await ws.send(json.dumps({"type": "CONTROL", "action": "START" if playing else "PAUSE"}))
+            self.set_playing(playing, time.monotonic())
+            await asyncio.sleep(max(0.0, self.next_change(now - started) - (now - started)) + 0.001)
+
+    async def receive(self, ws, connected):
+        # t frame: ms sejak server membuka sesi koneksi ini (epoch). Epoch
+        # tidak dikirim; batas atasnya adalah saat connect() selesai di
+        # client dan setiap (waktu terima - t). Umur dihitung terhadap batas
+        # atas terkecil, jadi tidak pernah negatif dan paling banyak lebih
+        # kecil sebesar umur frame tercepat koneksi ini.
+        totals = self.totals
+        epoch = connected * 1000
+        async for message in ws:
+            if isinstance(message, str):
+                data = json.loads(message)
+                if data.get("type") == "STATUS" and data.get("status") == "ERROR":
+                    totals.errors += 1
+                continue
+            now = time.monotonic() * 1000
+            data = decode_binary(message)
+            # Frame yang di-capture sebelum sesi dibuka (frame pertama setelah
+            # reconnect) punya t negatif yang ter-wrap ke u32
+            t = data["t"] - (1 << 32) if data["t"] >= 1 << 31 else data["t"]
+            epoch = min(epoch, now - t)
+            totals.frames += 1
+            totals.ages.append(now - epoch - t)
+            await ws.send(json.dumps({"type": "ACK", "seq": data["seq"]}))
+
+    async def run(self, url, started, deadline):
+        while time.monotonic() < deadline:
+            until = deadline
+            if self.args.churn:
+                until = min(deadline, time.monotonic() + self.args.churn)
+            try:
+                async with websockets.connect(url) as ws:
+                    connected = time.monotonic()
+                    self.connected = True
+                    self.totals.connects += 1
+                    await ws.send(json.dumps({"type": "CONTROL", "action": "SET_FORMAT", "format": "binary"}))
+                    await ws.send(json.dumps({"type": "ACK"}))
+                    tasks = [asyncio.create_task(self.control(ws, started)),
+                             asyncio.create_task(self.receive(ws, connected))]
+                    done, pending = await asyncio.wait(tasks, timeout=until - time.monotonic(),
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    for task in done:
+                        # receive() hanya selesai sendiri jika server menutup koneksi
+                        task.result()
+                        self.totals.disconnects += 1
+            except (OSError, websockets.ConnectionClosed):
+                self.totals.disconnects += 1
+                await asyncio.sleep(1.0)
+            finally:
+                self.connected = False
+                self.set_playing(False, time.monotonic())
+
+
+async def sample_loop(process, clients, totals, args, started, deadline, on_sample):
+    # Satu sampel setiap --interval detik: FPS per client yang sedang main,
+    # persentil umur pesan, CPU dan RSS server, CPU proses harness
+    counts = np.zeros(len(AGE_BINS), dtype=np.int64)
+    prev = {"t": time.monotonic(), "frames": 0, "active": 0.0,
+            "usage": process_usage(process.pid), "harness": time.process_time()}
+    samples = []
+    while time.monotonic() < deadline:
+        await asyncio.sleep(min(args.interval, max(0.0, deadline - time.monotonic())))
+        now = time.monotonic()
+        usage = process_usage(process.pid)
+        harness = time.process_time()
+        active = sum(client.active_seconds(now) for client in clients)
+        ages = np.array(totals.ages) if totals.ages else None
+        totals.ages = []
+        wall = now - prev["t"]
+        sample = {
+            "t": now - started,
+            "connected": sum(client.connected for client in clients),
+            "playing": sum(client.playing for client in clients),
+            "frames": totals.frames - prev["frames"],
+            "client_seconds": active - prev["active"],
+            "fps": (totals.frames - prev["frames"]) / (active - prev["active"]) if active > prev["active"] else None,
+            "age_p50_ms": float(np.percentile(ages, 50)) if ages is not None else None,
+            "age_p95_ms": float(np.percentile(ages, 95)) if ages is not None else None,
+            "age_p99_ms": float(np.percentile(ages, 99)) if ages is not None else None,
+            "server_cpu": (usage[0] - prev["usage"][0]) / wall if usage and prev["usage"] else None,
+            "rss_mb": usage[1] if usage else None,
+            "harness_cpu": (harness - prev["harness"]) / wall,
+            "warmup": now - started < args.warmup,
+        }
+        if ages is not None and not sample["warmup"]:
+            counts += np.bincount(np.clip((ages / 0.1).astype(np.int64), 0, len(AGE_BINS) - 1),
+                                  minlength=len(AGE_BINS))
+        samples.append(sample)
+        on_sample(sample)
+        prev = {"t": now, "frames": totals.frames, "active": active, "usage": usage, "harness": harness}
+        if process.poll() is not None:
+            break
+    return samples, counts
+
+
+def summarize(samples, counts, totals):
+    measured = [s for s in samples if not s["warmup"]]
+    frames = sum(s["frames"] for s in measured)
+    client_seconds = sum(s["client_seconds"] for s in measured)
+    fps = [s["fps"] for s in measured if s["fps"] is not None]
+    p50 = [s["age_p50_ms"] for s in measured if s["age_p50_ms"] is not None]
+    cpu = [s["server_cpu"] for s in measured if s["server_cpu"] is not None]
+    rss = [(s["t"], s["rss_mb"]) for s in measured if s["rss_mb"] is not None]
+    summary = {
+        "samples": len(measured),
+        "frames": frames,
+        # Frame per detik-client main, bukan rata-rata antar sampel
+        "fps_mean": frames / client_seconds if client_seconds else None,
+        "fps_min": min(fps) if fps else None,
+        "age_p50_ms": percentile(counts, 50),
+        "age_p95_ms": percentile(counts, 95),
+        "age_p99_ms": percentile(counts, 99),
+        "age_max_ms": percentile(counts, 100),
+        "server_cpu_mean": float(np.mean(cpu)) if cpu else None,
+        "server_cpu_max": max(cpu) if cpu else None,
+        "rss_start_mb": rss[0][1] if rss else None,
+        "rss_end_mb": rss[-1][1] if rss else None,
+        "rss_max_mb": max(r for _, r in rss) if rss else None,
+        "rss_growth_mb_per_hour": None,
+        # Umur p50 kuartal terakhir dikurangi kuartal pertama
+        "age_drift_ms": None,
+        "connects": totals.connects,
+        "disconnects": totals.disconnects,
+        "errors": totals.errors,
+    }
+    # Kemiringan RSS di paruh kedua run: allocator dan cache masih tumbuh di
+    # awal lalu mendatar, kebocoran tetap naik sampai akhir
+    later = rss[len(rss) // 2:]
+    if len(later) >= 3:
+        t, r = np.array(later).T
+        summary["rss_growth_mb_per_hour"] = float(np.polyfit(t, r, 1)[0] * 3600)
+    if len(p50) >= 4:
+        quarter = len(p50) // 4
+        summary["age_drift_ms"] = float(np.median(p50[-quarter:]) - np.median(p50[:quarter]))
+    return summary
+
+
+def regressions(summary, baseline, tolerance):
+    # Metrik yang lebih buruk dari baseline melebihi tolerance relatif
+    # sekaligus selisih absolut di REGRESSION_METRICS
+    found = []
+    for name, (better, slack) in REGRESSION_METRICS.items():
+        new, old = summary.get(name), baseline.get(name)
+        if new is None or old is None:
+            continue
+        worse = (old - new) * better
+        if worse > slack and worse > abs(old) * tolerance:
+            found.append({"metric": name, "baseline": old, "value": new})
+    return found
+
+
+def fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+async def soak(args):
+    port = free_port()
+    env = dict(os.environ, GESTURE_SOURCE="synthetic", GESTURE_PORT=str(port),
+               GESTURE_SYNTHETIC_FPS=str(args.fps), GESTURE_SYNTHETIC_WORK_MS=str(args.work_ms))
+    process = subprocess.Popen([sys.executable, "-m", "app.main"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    totals = Totals()
+    clients = [SoakClient(i, args, totals) for i in range(args.clients)]
+    try:
+        await wait_listening(port, process)
+        started = time.monotonic()
+        deadline = started + args.duration
+
+        print(f"{'detik':>7} {'client':>6} {'main':>5} {'fps':>6} {'umur p50':>9} {'p95':>6} {'p99':>6} "
+              f"{'CPU srv':>8} {'RSS MB':>7} {'CPU harness':>11}")
+
+        def on_sample(s):
+            print(f"{s['t']:>7.0f} {s['connected']:>6} {s['playing']:>5} {fmt(s['fps'], '.1f'):>6} "
+                  f"{fmt(s['age_p50_ms'], '.1f'):>6} ms {fmt(s['age_p95_ms'], '.1f'):>6} {fmt(s['age_p99_ms'], '.1f'):>6} "
+                  f"{fmt(s['server_cpu'] and s['server_cpu'] * 100, '.0f'):>7}% {fmt(s['rss_mb'], '.1f'):>7} "
+                  f"{s['harness_cpu'] * 100:>10.0f}%{'  (warm-up)' if s['warmup'] else ''}", flush=True)
+
+        url = f"ws://localhost:{port}"
+        runs = asyncio.gather(*(client.run(url, started, deadline) for client in clients))
+        samples, counts = await sample_loop(process, clients, totals, args, started, deadline, on_sample)
+        await runs
+        alive = process.poll() is None
+    finally:
+        process.terminate()
+        process.wait()
+    return samples, counts, totals, alive
+
+
+def main(args):
+    samples, counts, totals, alive = asyncio.run(soak(args))
+    summary = summarize(samples, counts, totals)
+    summary["server_alive"] = alive
+    print(f"Ringkasan: {args.clients} client, {fmt(summary['fps_mean'], '.1f')} fps per client main "
+          f"(min {fmt(summary['fps_min'], '.1f')}, target {args.fps:g}), umur p50/p95/p99 "
+          f"{fmt(summary['age_p50_ms'], '.1f')}/{fmt(summary['age_p95_ms'], '.1f')}/{fmt(summary['age_p99_ms'], '.1f')} ms")
+    print(f"CPU server rata-rata {fmt(summary['server_cpu_mean'] and summary['server_cpu_mean'] * 100, '.0f')}%, "
+          f"RSS {fmt(summary['rss_start_mb'], '.1f')} -> {fmt(summary['rss_end_mb'], '.1f')} MB "
+          f"({fmt(summary['rss_growth_mb_per_hour'], '+.1f')} MB/jam), drift umur p50 {fmt(summary['age_drift_ms'], '+.2f')} ms, "
+          f"{totals.connects} koneksi, {totals.disconnects} terputus, {totals.errors} error")
+
+    failures = []
+    if not alive:
+        failures.append("server berhenti")
+    if totals.disconnects and not args.churn:
+        failures.append(f"{totals.disconnects} koneksi terputus")
+    if summary["fps_mean"] is None or summary["fps_mean"] < args.fps * args.min_fps_ratio:
+        failures.append(f"fps di bawah {args.min_fps_ratio:g} x target")
+    if args.max_age_p99 is not None and (summary["age_p99_ms"] or 0) > args.max_age_p99:
+        failures.append(f"umur p99 di atas {args.max_age_p99:g} ms")
+    if args.max_rss_growth is not None and (summary["rss_growth_mb_per_hour"] or 0) > args.max_rss_growth:
+        failures.append(f"RSS tumbuh di atas {args.max_rss_growth:g} MB/jam")
+
+    found = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(summary, baseline["summary"], args.tolerance)
+        print(f"Dibandingkan dengan {args.baseline} ({baseline['config'].get('version') or '?'}):")
+        for name in REGRESSION_METRICS:
+            old, new = baseline["summary"].get(name), summary.get(name)
+            worse = any(r["metric"] == name for r in found)
+            print(f"{name:>18} {fmt(old, '.2f'):>9} -> {fmt(new, '.2f'):>9}{'  REGRESI' if worse else ''}")
+        if found:
+            failures.append(f"{len(found)} metrik regresi")
+
+    for failure in failures:
+        print(f"GAGAL: {failure}")
+
+    if args.json:
+        config = dict(vars(args), version=git_version(), python=sys.version.split()[0])
+        with open(args.json, "w") as f:
+            json.dump({"config": config, "summary": summary, "samples": samples,
+                       "regressions": found, "failures": failures}, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji beban/soak end-to-end: app.main dengan detector sintetis dan N client WebSocket")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60.0, help="lama run (detik); soak: mis. 14400")
+    parser.add_argument("--interval", type=float, default=5.0, help="jarak antar sampel (detik)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="sampel awal yang tidak masuk ringkasan (detik)")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS detector sintetis")
+    parser.add_argument("--work-ms", type=float, default=0.0, help="CPU inferensi tiruan per frame (ms)")
+    parser.add_argument("--play", type=float, default=20.0, help="detik main (START) per siklus client")
+    parser.add_argument("--pause", type=float, default=5.0, help="detik jeda (PAUSE) per siklus; 0 = selalu main")
+    parser.add_argument("--churn", type=float, default=0.0, help="buka ulang koneksi setiap sekian detik; 0 = tidak")
+    parser.add_argument("--min-fps-ratio", type=float, default=0.8,
+                        help="fps per client main minimal x --fps (frame tanpa tangan yang tidak berubah tidak dikirim)")
+    parser.add_argument("--max-age-p99", type=float, help="batas umur pesan p99 (ms)")
+    parser.add_argument("--max-rss-growth", type=float, help="batas pertumbuhan RSS server (MB/jam)")
+    parser.add_argument("--baseline", help="laporan JSON run sebelumnya untuk cek regresi")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="selisih relatif vs baseline yang masih diterima")
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import websockets
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def import_time(module):
+    # Proses baru supaya cache modul tidak ikut terukur
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+async def wait_listening(port, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Backend berhenti sebelum listening")
+        try:
+            _, writer = await asyncio.open_connection("localhost", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.005)
+    raise TimeoutError("Backend tidak listening")
+
+
+async def first_gesture(port, timeout):
+    # Waktu sampai status READY dan sampai frame gesture pertama
+    ready = None
+    async with websockets.connect(f"ws://localhost:{port}") as ws:
+        started = time.perf_counter()
+        # START: frame dikirim walau tangan belum terlihat
+        await ws.send(json.dumps({"type": "CONTROL", "action": "START"}))
+        deadline = started + timeout
+        while True:
+            message = await asyncio.wait_for(ws.recv(), deadline - time.perf_counter())
+            if isinstance(message, str):
+                data = json.loads(message)
+                if data.get("type") == "STATUS":
+                    if data["status"] == "ERROR":
+                        raise RuntimeError(data.get("error"))
+                    if data["status"] == "READY":
+                        ready = time.perf_counter() - started
+                    continue
+                if data.get("type"):
+                    continue
+            return ready, time.perf_counter() - started
+
+
+async def run_once(args):
+    env = dict(os.environ, GESTURE_SOURCE=args.source, GESTURE_PORT=str(args.port))
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.main"], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_listening(args.port, process, args.timeout)
+        listening = time.perf_counter() - started
+        ready, gesture = await first_gesture(args.port, args.timeout)
+        return listening, ready, gesture
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def main(args):
+    print("Waktu import (proses baru):")
+    for module in ("app.websocket.handler", "cv2", "app.gesture.detector"):
+        elapsed = import_time(module)
+        label = "gagal (dependensi tidak ada)" if elapsed is None else f"{elapsed * 1000:.0f} ms"
+        print(f"  {module:<24} {label}")
+
+    print(f"Startup backend (GESTURE_SOURCE={args.source}), {args.runs} kali:")
+    results = []
+    for _ in range(args.runs):
+        try:
+            results.append(await run_once(args))
+        except Exception as e:
+            print(f"  gagal: {e}")
+            return 1
+
+    listening, ready, gesture = zip(*results)
+    print(f"  proses -> listening      {statistics.median(listening) * 1000:>7.0f} ms")
+    print(f"  connect -> READY         {statistics.median(ready) * 1000:>7.0f} ms")
+    print(f"  connect -> gesture #1    {statistics.median(gesture) * 1000:>7.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Waktu import, listening dan gesture pertama backend")
+    parser.add_argument("--source", choices=("camera", "synthetic"), default="synthetic")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import os
+import time
+from app.station.manager import StationManager
+
+
+async def run_round(count, duration, fps):
+    manager = StationManager(["synthetic"] * count, inference="synthetic", fps=fps)
+    manager.start()
+    try:
+        # Tunggu semua worker siap (spawn + import) sebelum mulai mengukur
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if all(s.frames_processed > 0 for s in manager.stations.values()):
+                break
+            await asyncio.sleep(0.05)
+
+        before = {i: s.frames_processed for i, s in manager.stations.items()}
+        await asyncio.sleep(duration)
+        processed = {i: s.frames_processed - before[i] for i, s in manager.stations.items()}
+        latency = [s.last_result_latency for s in manager.stations.values()]
+    finally:
+        manager.stop()
+
+    per_station = [n / duration for n in processed.values()]
+    return sum(per_station), min(per_station), max(latency)
+
+
+async def main(args):
+    cpu = os.cpu_count() or 1
+    counts = args.stations or sorted({1, 2, max(1, cpu // 2), cpu})
+
+    print(f"CPU: {cpu}, capture {args.fps:g} FPS per station, beban sintetis per frame")
+    print(f"{'stations':>8} {'total fps':>10} {'min fps':>9} {'speedup':>8} {'efisiensi':>10} {'latency ms':>11}")
+    baseline = None
+    for count in counts:
+        total, minimum, latency = await run_round(count, args.duration, args.fps)
+        if baseline is None:
+            baseline = total / count
+        speedup = total / baseline
+        print(f"{count:>8} {total:>10.1f} {minimum:>9.1f} {speedup:>8.2f} "
+              f"{speedup / count * 100:>9.0f}% {latency * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Skalabilitas throughput multi-station (proses + shared memory)")
+    parser.add_argument("--stations", type=int, nargs="+")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=60.0, help="FPS capture per station")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from app.gesture.processor import GestureProcessor
+from app.gesture.synthetic import SyntheticHand
+from app.telemetry import TelemetrySink, gesture_flags, summaries
+
+# Batas tambahan biaya loop frame per panggilan telemetry (p50)
+FRAME_LIMIT_US = 10.0
+
+
+def gesture_frames(seconds, fps, seed):
+    # Hasil gesture nyata (x, y, armed, shoot) dari tangan sintetis
+    hand = SyntheticHand(seed=seed)
+    clock = [0.0]
+    processor = GestureProcessor(clock=lambda: clock[0])
+    frames = []
+    for i in range(int(seconds * fps)):
+        clock[0] = i / fps
+        frames.append(dict(processor.update(hand.landmarks(i / fps))))
+    return frames
+
+
+def loop_cost(record, frames, fps, pace):
+    # Biaya satu panggilan record() di loop frame. Tanpa pace loop berjalan
+    # secepatnya sementara thread writer menulis batch di tengahnya (rebutan
+    # GIL terlihat di p99/maks). Dengan pace loop tidur sampai frame
+    # berikutnya seperti loop gesture sungguhan; di VM cache dingin setelah
+    # tidur ikut terukur, juga untuk baseline.
+    costs = np.empty(len(frames))
+    period = 1.0 / fps
+    start = time.perf_counter()
+    for i, gesture in enumerate(frames):
+        if pace:
+            delay = start + i * period - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        t = time.monotonic()
+        started = time.perf_counter()
+        record(t, gesture)
+        costs[i] = time.perf_counter() - started
+    return costs
+
+
+def sync_sqlite(path):
+    # Pembanding: INSERT + commit langsung di loop frame
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("CREATE TABLE frames (t REAL, x REAL, y REAL, flags INTEGER, latency_ms REAL)")
+
+    def record(t, gesture):
+        with db:
+            db.execute("INSERT INTO frames VALUES (?, ?, ?, ?, ?)",
+                       (t, gesture["x"], gesture["y"], gesture_flags(gesture), 1.0))
+    return db, record
+
+
+def measure_loop(tmpdir, frames, fps, pace, interval):
+    results = {}
+    results["tanpa telemetry"] = loop_cost(lambda t, gesture: None, frames, fps, pace)
+
+    sink = TelemetrySink(os.path.join(tmpdir, "loop.sqlite"), interval=interval).start()
+    session = sink.open_session("bench", "station")
+    results["TelemetrySink"] = loop_cost(
+        lambda t, gesture: sink.frames(session, t, gesture, 0.001), frames, fps, pace)
+    sink.close_session(session)
+    sink.close()
+
+    db, record = sync_sqlite(os.path.join(tmpdir, "sync.sqlite"))
+    results["SQLite sinkron"] = loop_cost(record, frames, fps, pace)
+    db.close()
+    return results, sink.stats()
+
+
+def overflow(tmpdir, frames, queue_size):
+    # Writer belum berjalan: antrean penuh, sisanya harus dibuang dan
+    # dihitung, tidak menahan producer. Setelah writer jalan, frame yang
+    # tertulis + dibuang = frame yang diproduksi.
+    sink = TelemetrySink(os.path.join(tmpdir, "overflow.sqlite"), queue_size=queue_size)
+    session = sink.open_session("overflow", "station")
+    started = time.perf_counter()
+    for gesture in frames:
+        sink.frames(session, time.monotonic(), gesture)
+    produce_us = (time.perf_counter() - started) / len(frames) * 1e6
+    sink.start()
+    sink.close()
+    stats = sink.stats()
+    # Event sesi memakai satu slot antrean
+    return stats, produce_us, stats["frames_written"] + stats["dropped"] == len(frames)
+
+
+def writer_throughput(tmpdir, frames, sessions):
+    # Kecepatan thread writer menguras antrean penuh (frame per detik)
+    sink = TelemetrySink(os.path.join(tmpdir, "throughput.sqlite"), queue_size=(len(frames) + 2) * sessions)
+    ids = [sink.open_session(f"sesi-{i}", "ingest") for i in range(sessions)]
+    t = time.monotonic()
+    for i, gesture in enumerate(frames):
+        for session in ids:
+            sink.frame(session, t + i / 30, gesture, 0.001)
+    for session in ids:
+        sink.close_session(session)
+    started = time.perf_counter()
+    sink.start()
+    sink.close(timeout=None)
+    elapsed = time.perf_counter() - started
+    return sink.stats(), elapsed, sink.path
+
+
+def main(args):
+    frames = gesture_frames(args.seconds, args.fps, args.seed)
+    loop_frames = frames * (1 if args.pace else args.repeat)
+    report = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results, loop_stats = measure_loop(tmpdir, loop_frames, args.fps, args.pace, args.interval)
+        print(f"Loop frame: {len(loop_frames)} frame"
+              f"{f' @ {args.fps:g} fps (real-time)' if args.pace else ''}, writer tiap {args.interval:g} detik")
+        print(f"{'pencatat':>16} {'p50 us':>8} {'p99 us':>8} {'maks us':>9}")
+        report["loop"] = {}
+        for name, costs in results.items():
+            p50, p99, worst = (float(v) * 1e6 for v in (np.percentile(costs, 50), np.percentile(costs, 99), costs.max()))
+            report["loop"][name] = {"p50_us": p50, "p99_us": p99, "max_us": worst}
+            print(f"{name:>16} {p50:>8.1f} {p99:>8.1f} {worst:>9.1f}")
+        added = report["loop"]["TelemetrySink"]["p50_us"] - report["loop"]["tanpa telemetry"]["p50_us"]
+        report["loop_stats"] = loop_stats
+        print(f"Writer: {loop_stats['batches']} batch, {loop_stats['frames_written']} frame, "
+              f"{loop_stats['dropped']} dibuang")
+
+        stats, produce_us, balanced = overflow(tmpdir, frames * args.overflow_repeat, args.queue)
+        report["overflow"] = dict(stats, produce_us=produce_us, balanced=balanced)
+        print(f"Antrean penuh ({args.queue}): {stats['frames_written']} tertulis + {stats['dropped']} dibuang "
+              f"dari {len(frames) * args.overflow_repeat} frame, {produce_us:.2f} us/frame"
+              f"{'' if balanced else '  GAGAL'}")
+
+        stats, elapsed, path = writer_throughput(tmpdir, frames, args.sessions)
+        rate = stats["frames_written"] / elapsed
+        report["writer"] = dict(stats, frames_per_second=rate)
+        print(f"Writer: {stats['frames_written']} frame dari {args.sessions} sesi dalam {elapsed:.2f} detik "
+              f"({rate:,.0f} frame/detik, batch terakhir {stats['last_batch_ms']:.1f} ms)")
+        started = time.perf_counter()
+        summary = summaries(path)
+        print(f"Ringkasan {len(summary)} sesi dalam {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    ok = added < FRAME_LIMIT_US and balanced and loop_stats["dropped"] == 0
+    print(f"Tambahan biaya loop frame: {added:.2f} us (batas {FRAME_LIMIT_US:g} us){'' if ok else '  GAGAL'}")
+    report["added_us"] = added
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Biaya TelemetrySink di loop frame vs SQLite sinkron, overflow dan kecepatan writer")
+    parser.add_argument("--seconds", type=float, default=20.0, help="detik tangan sintetis per loop")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--pace", action="store_true", help="loop real-time (tidur antar frame)")
+    parser.add_argument("--repeat", type=int, default=20, help="pengulangan frame untuk loop tanpa --pace")
+    parser.add_argument("--interval", type=float, default=0.01, help="jeda writer untuk uji loop (detik)")
+    parser.add_argument("--queue", type=int, default=1000, help="ukuran antrean untuk uji overflow")
+    parser.add_argument("--overflow-repeat", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=50, help="sesi untuk uji kecepatan writer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="simpan laporan ke file JSON")
+    raise SystemExit(main(parser.parse_args()))
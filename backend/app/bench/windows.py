@@ -0,0 +1,122 @@
+import argparse
+import random
+import time
+import numpy as np
+from app.gesture.windows import RollingMode, RollingWindow
+
+
+class LegacyWindow:
+    # Pola lama di rules/state machine: list + pop(0), dihitung ulang tiap frame
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = []
+
+    def push(self, value):
+        self.values.append(value)
+        if len(self.values) > self.capacity:
+            self.values.pop(0)
+
+    def clear(self):
+        self.values = []
+
+
+def legacy_mode(history):
+    # Pola lama di orientation; hanya dibandingkan jika tidak ada seri
+    return max(set(history), key=history.count)
+
+
+def check_window(rng, capacity, steps):
+    # Properti: setelah setiap push, RollingWindow sama dengan hitung ulang
+    # dari list (sum/len, np.max, np.std, dua elemen terakhir)
+    window = RollingWindow(capacity)
+    legacy = LegacyWindow(capacity)
+    scale = rng.choice((1e-3, 1.0, 1e3))
+    for _ in range(steps):
+        if rng.random() < 0.01:
+            window.clear()
+            legacy.clear()
+            continue
+
+        value = rng.random() < 0.5 if rng.random() < 0.3 else rng.uniform(0, scale)
+        window.push(value)
+        legacy.push(value)
+
+        values = legacy.values
+        if len(window) != len(values) or list(window) != [float(v) for v in values]:
+            return "isi"
+        if window.mean != sum(values) / len(values) and not np.isclose(window.mean, sum(values) / len(values), rtol=1e-9):
+            return "mean"
+        if window.max != float(np.max(values)):
+            return "max"
+        if not np.isclose(window.std, np.std(np.array(values, dtype=np.float64)), rtol=1e-6, atol=scale * 1e-9):
+            return "std"
+        if window[-1] != values[-1] or (len(values) >= 2 and window[-2] != values[-2]):
+            return "index"
+    return None
+
+
+def check_mode(rng, capacity, steps, labels):
+    window = RollingMode(capacity)
+    history = []
+    for _ in range(steps):
+        value = rng.choice(labels)
+        mode = window.push(value)
+        history.append(value)
+        if len(history) > capacity:
+            history.pop(0)
+
+        counts = sorted((history.count(label) for label in set(history)), reverse=True)
+        if len(counts) == 1 or counts[0] > counts[1]:
+            if mode != legacy_mode(history):
+                return "mode"
+        elif history.count(mode) != counts[0]:
+            return "mode seri"
+    return None
+
+
+def time_push(window, values, compute):
+    start = time.perf_counter()
+    for value in values:
+        window.push(value)
+        compute(window)
+    return (time.perf_counter() - start) / len(values) * 1e6
+
+
+def legacy_stats(window):
+    values = np.array(window.values)
+    return np.max(values), np.std(values), sum(window.values) / len(window.values)
+
+
+def rolling_stats(window):
+    return window.max, window.std, window.mean
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    failures = 0
+    for case in range(args.cases):
+        capacity = rng.randint(1, 64)
+        error = check_window(rng, capacity, args.steps)
+        error = error or check_mode(rng, capacity, args.steps, ("front", "side", "other")[:rng.randint(1, 3)])
+        if error:
+            failures += 1
+            print(f"GAGAL kasus {case} (capacity {capacity}): {error}")
+    print(f"Properti: {args.cases} kasus x {args.steps} push, gagal: {failures}")
+
+    values = np.random.default_rng(args.seed).uniform(0, 0.01, args.pushes).tolist()
+    print(f"{'window':>7} {'legacy us':>10} {'rolling us':>11} {'speedup':>8}")
+    for capacity in (5, 7, 15, 30, 60, 120):
+        legacy = time_push(LegacyWindow(capacity), values, legacy_stats)
+        rolling = time_push(RollingWindow(capacity), values, rolling_stats)
+        print(f"{capacity:>7} {legacy:>10.2f} {rolling:>11.2f} {legacy / rolling:>7.1f}x")
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RollingWindow/RollingMode vs list + pop(0): kesamaan hasil dan biaya per frame")
+    parser.add_argument("--cases", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--pushes", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    raise SystemExit(1 if main(parser.parse_args()) else 0)
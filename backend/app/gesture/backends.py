@@ -0,0 +1,220 @@
+import os
+import time
+import numpy as np
+from app.gesture.landmarks import NUM_LANDMARKS, landmarks_to_array
+
+# GESTURE_BACKEND memilih backend inferensi landmark (lihat BACKENDS);
+# GESTURE_LANDMARK_MODEL adalah path model ONNX untuk backend "onnx"
+LANDMARK_BACKEND = os.environ.get("GESTURE_BACKEND", "mediapipe")
+LANDMARK_MODEL = os.environ.get("GESTURE_LANDMARK_MODEL")
+
+
+class HandLandmarkBackend:
+    # Antarmuka inferensi landmark tangan. detect() menerima frame RGB uint8
+    # dan mengembalikan array float32 (21, 3) ternormalisasi terhadap frame
+    # itu (x, y 0..1, z skala lebar gambar seperti MediaPipe), atau None jika
+    # tidak ada tangan. Array boleh dipakai ulang backend pada frame
+    # berikutnya; salin jika perlu disimpan.
+    #
+    # reads_pixels=False: backend tidak membaca piksel (sintetis) dan sudah
+    # memberi koordinat tampilan, jadi GestureDetector melewatkan
+    # preprocessing dan ROI. detect_many() untuk
+    # mode beberapa pemain: list (landmark, handedness atau None), paling
+    # banyak max_hands tangan.
+
+    name = None
+    reads_pixels = True
+    max_hands = 1
+
+    def detect(self, rgb):
+        raise NotImplementedError
+
+    def detect_many(self, rgb):
+        lm = self.detect(rgb)
+        return [] if lm is None else [(lm, None)]
+
+    def warm_up(self, sizes):
+        # Inferensi pertama biasanya membayar alokasi/inisialisasi graph
+        started = time.perf_counter()
+        for side in sizes:
+            self.detect(np.zeros((side, side, 3), dtype=np.uint8))
+        return time.perf_counter() - started
+
+    def close(self):
+        pass
+
+
+class MediaPipeBackend(HandLandmarkBackend):
+    # mp.solutions.hands: palm detector + landmark model dengan tracking
+    # internal. model_complexity 0 (lite) atau 1 (full, lebih akurat).
+
+    name = "mediapipe"
+
+    def __init__(self, model_complexity=0, min_detection_confidence=0.5, min_tracking_confidence=0.5, max_hands=1):
+        import mediapipe as mp
+
+        self.max_hands = max_hands
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            model_complexity=model_complexity,
+        )
+        self.buffers = np.empty((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    def detect(self, rgb):
+        result = self.hands.process(rgb)
+        if not result.multi_hand_landmarks:
+            return None
+        return landmarks_to_array(result.multi_hand_landmarks[0].landmark, self.buffers[0])
+
+    def detect_many(self, rgb):
+        result = self.hands.process(rgb)
+        if not result.multi_hand_landmarks:
+            return []
+        return [
+            (landmarks_to_array(hand.landmark, buffer), handedness.classification[0].label)
+            for hand, handedness, buffer in zip(result.multi_hand_landmarks, result.multi_handedness, self.buffers)
+        ]
+
+    def close(self):
+        self.hands.close()
+
+
+class OnnxLandmarkBackend(HandLandmarkBackend):
+    # Model landmark tangan format ONNX (mis. konversi hand_landmark MediaPipe)
+    # lewat ONNX Runtime jika terpasang, selain itu cv2.dnn. Tanpa palm
+    # detector: model dijalankan pada crop ROI dari GestureDetector, dan saat
+    # tracking hilang pada frame penuh yang diperkecil, jadi deteksi ulang
+    # paling andal jika tangan cukup besar di frame.
+    #
+    # Output yang diharapkan seperti model MediaPipe: 63 nilai koordinat
+    # piksel input (x, y, z per landmark) dan skor keberadaan tangan 0..1
+    # (output pertama yang berukuran 1).
+
+    name = "onnx"
+
+    def __init__(self, model_path=None, runtime="auto", input_size=224, layout="nchw", score_threshold=0.5):
+        model_path = model_path or LANDMARK_MODEL
+        if not model_path or not os.path.exists(model_path):
+            raise RuntimeError("Model ONNX tidak ditemukan, set GESTURE_LANDMARK_MODEL")
+
+        import cv2
+        self.cv2 = cv2
+
+        if runtime == "auto":
+            try:
+                import onnxruntime  # noqa: F401
+                runtime = "onnxruntime"
+            except ImportError:
+                runtime = "dnn"
+
+        if runtime == "onnxruntime":
+            import onnxruntime
+
+            self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            model_input = self.session.get_inputs()[0]
+            self.input_name = model_input.name
+            shape = model_input.shape
+            # Layout dan ukuran input dibaca dari model jika tetap
+            layout = "nchw" if shape[1] == 3 else "nhwc"
+            side = shape[2] if layout == "nchw" else shape[1]
+            if isinstance(side, int):
+                input_size = side
+        elif runtime == "dnn":
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+            self.output_names = self.net.getUnconnectedOutLayersNames()
+        else:
+            raise ValueError(f"Runtime ONNX tidak dikenal: {runtime}")
+
+        self.runtime = runtime
+        self.input_size = input_size
+        self.layout = layout
+        self.score_threshold = score_threshold
+        # Frame di-letterbox (pad kanan/bawah) ke persegi input_size
+        self.square = np.zeros((input_size, input_size, 3), dtype=np.uint8)
+        shape = (1, 3, input_size, input_size) if layout == "nchw" else (1, input_size, input_size, 3)
+        self.tensor = np.empty(shape, dtype=np.float32)
+        self.buffer = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+
+    def _run(self, tensor):
+        if self.runtime == "onnxruntime":
+            return self.session.run(None, {self.input_name: tensor})
+        self.net.setInput(tensor)
+        return self.net.forward(self.output_names)
+
+    def detect(self, rgb):
+        h, w = rgb.shape[:2]
+        size = self.input_size
+        scale = size / max(h, w)
+        new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+
+        self.square[:] = 0
+        self.square[:new_h, :new_w] = self.cv2.resize(rgb, (new_w, new_h), interpolation=self.cv2.INTER_LINEAR)
+        pixels = self.square.transpose(2, 0, 1) if self.layout == "nchw" else self.square
+        np.multiply(pixels, 1 / 255, out=self.tensor[0], casting="unsafe")
+
+        landmarks = score = None
+        for output in self._run(self.tensor):
+            output = np.asarray(output).reshape(-1)
+            if output.size == NUM_LANDMARKS * 3 and landmarks is None:
+                landmarks = output
+            elif output.size == 1 and score is None:
+                score = float(output[0])
+        if landmarks is None:
+            raise RuntimeError("Output model tidak berisi 21 landmark")
+        if score is not None and score < self.score_threshold:
+            return None
+
+        # Piksel input -> ternormalisasi terhadap frame asli
+        lm = self.buffer
+        lm[:] = landmarks.reshape(NUM_LANDMARKS, 3)
+        lm[:, 0] /= new_w
+        lm[:, 1] /= new_h
+        lm[:, 2] /= new_w
+        return lm
+
+
+class SyntheticLandmarkBackend(HandLandmarkBackend):
+    # Backend deterministik untuk tes dan benchmark: piksel tidak dibaca,
+    # landmark diambil dari SyntheticHand pada waktu (jumlah detect) / fps.
+    # Video yang dirender dari SyntheticHand dengan seed dan fps sama
+    # menghasilkan ground truth frame demi frame. Dengan max_hands > 1 tiap
+    # pemain punya SyntheticHand sendiri, dan urutan tangan dibalik tiap
+    # frame ganjil seperti urutan MediaPipe yang tidak stabil.
+
+    name = "synthetic"
+    reads_pixels = False
+
+    def __init__(self, seed=0, fps=30.0, noise=0.0005, max_hands=1):
+        from app.gesture.synthetic import SyntheticPlayers
+
+        self.max_hands = max_hands
+        self.players = SyntheticPlayers(max_hands, seed=seed, noise=noise)
+        self.fps = fps
+        self.count = 0
+
+    def detect(self, rgb):
+        hands = self.detect_many(rgb)
+        return hands[0][0] if hands else None
+
+    def detect_many(self, rgb):
+        hands = self.players.hands(self.count / self.fps)
+        if self.count % 2:
+            hands.reverse()
+        self.count += 1
+        return hands
+
+    def warm_up(self, sizes):
+        # Tidak memajukan waktu sintetis
+        return 0.0
+
+
+BACKENDS = {cls.name: cls for cls in (MediaPipeBackend, OnnxLandmarkBackend, SyntheticLandmarkBackend)}
+
+
+def create_backend(name, **params):
+    if name not in BACKENDS:
+        raise ValueError(f"Backend landmark tidak dikenal: {name}")
+    return BACKENDS[name](**params)
@@ -0,0 +1,417 @@
+import os
+import time
+import cv2
+import numpy as np
+
+# Sumber frame: index kamera ("0"), path video, URL stream, direktori
+# gambar, atau "synthetic"
+CAPTURE_SOURCE = os.environ.get("GESTURE_CAMERA", "0")
+# FOURCC kamera: "auto" memilih mode dengan interval frame terendah lewat
+# probe_device(), "" membiarkan default driver (biasanya YUYV)
+CAPTURE_FOURCC = os.environ.get("GESTURE_CAPTURE_FOURCC", "auto")
+CAPTURE_SIZE = tuple(int(v) for v in os.environ.get("GESTURE_CAPTURE_SIZE", "640x480").lower().split("x"))
+CAPTURE_FPS = float(os.environ.get("GESTURE_CAPTURE_FPS", "30"))
+# Frame yang boleh ditahan driver; 1 berarti read() selalu memberi frame
+# terbaru, bukan frame yang sudah menunggu beberapa interval
+CAPTURE_BUFFER = int(os.environ.get("GESTURE_CAPTURE_BUFFER", "1"))
+
+# Kandidat probe_device(): FOURCC x FPS yang diminta pada resolusi tetap
+PROBE_FOURCCS = ("MJPG", "YUYV")
+PROBE_FPS = (60.0, 30.0)
+PROBE_FRAMES = 20
+# Mode dengan interval dalam toleransi ini dianggap sama cepat; urutan
+# PROBE_FOURCCS jadi penentu
+PROBE_TOLERANCE = 0.05
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Hasil probe per index kamera, supaya buka ulang setelah idle tidak
+# mengulang probe beberapa detik
+_probed = {}
+
+
+def fourcc_name(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") if value > 0 else ""
+
+
+class CaptureSource:
+    # Antarmuka sumber frame untuk GestureDetector dan Station:
+    # read(image=None) -> (ok, frame) seperti cv2.VideoCapture; frame ditulis
+    # ke `image` jika ukurannya cocok. `timestamp` adalah waktu capture frame
+    # terakhir dalam skala time.monotonic(); rules menghitung kecepatan dan
+    # cooldown darinya. `live` False untuk sumber rekaman yang diputar ulang
+    # dari awal saat habis.
+    name = "capture"
+    live = True
+
+    def __init__(self):
+        self.timestamp = 0.0
+        self.frames = 0
+        self.failures = 0
+
+    def open(self):
+        pass
+
+    def is_open(self):
+        return True
+
+    def read(self, image=None):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def describe(self):
+        return {"source": self.name, "frames": self.frames, "failures": self.failures}
+
+
+class Pacer:
+    # Menahan read() sumber rekaman pada laju `fps` seperti kamera. Jika
+    # tertinggal (mis. setelah pause) tidak mengejar dengan burst.
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self.next_time = time.monotonic()
+
+    def reset(self):
+        self.next_time = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        self.next_time += self.interval
+        delay = self.next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self.next_time = time.monotonic()
+
+
+class DeviceCapture(CaptureSource):
+    # Webcam lewat cv2.VideoCapture. FOURCC diset sebelum resolusi (urutan
+    # yang dihormati V4L2); MJPG biasanya memberi 30-60 FPS penuh pada
+    # 640x480 di mana YUYV tanpa kompresi dibatasi bandwidth USB. Nilai yang
+    # benar-benar dipakai driver dibaca ulang ke `mode`.
+
+    def __init__(self, index=0, fourcc=CAPTURE_FOURCC, size=CAPTURE_SIZE, fps=CAPTURE_FPS,
+                 buffer_size=CAPTURE_BUFFER, api=cv2.CAP_ANY):
+        super().__init__()
+        self.index = index
+        self.name = f"device:{index}"
+        self.fourcc = fourcc
+        self.size = tuple(size)
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.api = api
+        self.cap = None
+        self.mode = None
+
+    def open(self):
+        if self.is_open():
+            return
+        fourcc = self.fourcc
+        fps = self.fps
+        if fourcc == "auto":
+            best = choose_mode(self.index, self.size, api=self.api)
+            fourcc, fps = (best["fourcc"], best["fps"]) if best is not None else ("", self.fps)
+        self.cap = open_device(self.index, fourcc, self.size, fps, self.buffer_size, self.api)
+        if not self.cap.isOpened():
+            self.cap = None
+            raise RuntimeError(f"Kamera {self.index} tidak bisa dibuka")
+        self.mode = device_mode(self.cap)
+        print(f"Kamera {self.index}: {self.mode['fourcc'] or '?'} {self.mode['width']}x{self.mode['height']} "
+              f"@ {self.mode['fps']:g} FPS, buffer {self.mode['buffer_size']}")
+
+    def is_open(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if ret:
+            self.timestamp = time.monotonic()
+            self.frames += 1
+        else:
+            self.failures += 1
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self):
+        return dict(super().describe(), mode=self.mode)
+
+
+def open_device(index, fourcc, size, fps, buffer_size, api=cv2.CAP_ANY):
+    cap = cv2.VideoCapture(index, api)
+    if not cap.isOpened():
+        return cap
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        # Tidak semua backend mendukung; nilai sebenarnya ada di device_mode()
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+
+def device_mode(cap):
+    return {
+        "fourcc": fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def measure_reads(capture, frames, warmup=5):
+    # Interval antar frame dan lama read() (detik) untuk `frames` frame
+    # setelah beberapa frame pemanasan (auto-exposure, buffer awal)
+    image = None
+    for _ in range(warmup):
+        ok, frame = capture.read(image)
+        if ok:
+            image = frame
+    intervals, reads = [], []
+    last = None
+    for _ in range(frames):
+        started = time.perf_counter()
+        ok, frame = capture.read(image)
+        now = time.perf_counter()
+        if not ok:
+            continue
+        image = frame
+        reads.append(now - started)
+        if last is not None:
+            intervals.append(now - last)
+        last = now
+    return np.array(intervals), np.array(reads)
+
+
+def probe_device(index, size=CAPTURE_SIZE, fourccs=PROBE_FOURCCS, fps_options=PROBE_FPS,
+                 frames=PROBE_FRAMES, buffer_size=CAPTURE_BUFFER, api=cv2.CAP_ANY):
+    # Coba setiap kombinasi FOURCC x FPS dan ukur interval frame yang
+    # sebenarnya; driver sering menerima set() tanpa benar-benar memakainya
+    results = []
+    for fourcc in fourccs:
+        for fps in fps_options:
+            cap = open_device(index, fourcc, size, fps, buffer_size, api)
+            if not cap.isOpened():
+                cap.release()
+                return results
+            try:
+                mode = device_mode(cap)
+                intervals, reads = measure_reads(cap, frames)
+            finally:
+                cap.release()
+            ok = len(intervals) > 0 and (mode["width"], mode["height"]) == tuple(size)
+            results.append({
+                "fourcc": fourcc,
+                "fps": fps,
+                "mode": mode,
+                "ok": ok,
+                "interval_ms": float(np.median(intervals)) * 1000 if len(intervals) else None,
+                "read_ms": float(np.median(reads)) * 1000 if len(reads) else None,
+            })
+    return results
+
+
+def choose_mode(index, size=CAPTURE_SIZE, api=cv2.CAP_ANY):
+    # Mode dengan interval frame terendah pada resolusi yang diminta; hasil
+    # disimpan per index
+    key = (index, tuple(size))
+    if key not in _probed:
+        results = [r for r in probe_device(index, size, api=api) if r["ok"]]
+        best = None
+        if results:
+            fastest = min(r["interval_ms"] for r in results)
+            best = next(r for r in results if r["interval_ms"] <= fastest * (1 + PROBE_TOLERANCE))
+            print(f"Probe kamera {index}: " + ", ".join(
+                f"{r['fourcc']}@{r['fps']:g} {1000 / r['interval_ms']:.1f} FPS" for r in results))
+        _probed[key] = best
+    return _probed[key]
+
+
+class VideoFileCapture(CaptureSource):
+    # File video (atau URL stream) lewat FFmpeg. File diputar pada FPS-nya
+    # sendiri dan diulang dari awal saat habis; URL dianggap live.
+    # realtime=False: secepat decode, dan timestamp mengikuti linimasa video
+    # (saat open + frame / FPS) sehingga rules memberi hasil yang sama
+    # seperti diputar real-time.
+    live = False
+
+    def __init__(self, path, realtime=True, loop=True, fps=None):
+        super().__init__()
+        self.path = path
+        self.name = f"file:{path}"
+        self.stream = "://" in str(path)
+        self.live = self.stream
+        self.realtime = realtime
+        self.loop = loop
+        self.fps = fps
+        self.cap = None
+        self.pacer = None
+        self.interval = 0.0
+        self.start = 0.0
+        self.index = 0
+
+    def open(self):
+        if self.is_open():
+            return
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            self.cap = None
+            raise RuntimeError(f"Sumber video tidak bisa dibuka: {self.path}")
+        fps = self.fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pacer = Pacer(fps if self.realtime and not self.stream else 0.0)
+        self.interval = 1.0 / fps
+        self.start = time.monotonic()
+        self.index = 0
+
+    def is_open(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, image=None):
+        self.pacer.wait()
+        ret, frame = self.cap.read(image)
+        if not ret and self.loop and not self.stream:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+        if ret:
+            if self.realtime or self.stream:
+                self.timestamp = time.monotonic()
+            else:
+                self.timestamp = self.start + self.index * self.interval
+            self.index += 1
+            self.frames += 1
+        else:
+            self.failures += 1
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectoryCapture(CaptureSource):
+    # Gambar di satu direktori, urut nama, diputar pada `fps` dan diulang.
+    # realtime=False: secepat decode dengan timestamp linimasa seperti
+    # VideoFileCapture. Gambar yang ukurannya beda dari gambar pertama
+    # diskalakan.
+    live = False
+
+    def __init__(self, path, fps=CAPTURE_FPS, loop=True, realtime=True):
+        super().__init__()
+        self.path = path
+        self.name = f"images:{path}"
+        self.fps = fps
+        self.loop = loop
+        self.realtime = realtime
+        self.files = None
+        self.position = 0
+        self.shape = None
+        self.pacer = None
+        self.start = 0.0
+        self.index = 0
+
+    def open(self):
+        if self.files is not None:
+            return
+        files = sorted(f for f in os.listdir(self.path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not files:
+            raise RuntimeError(f"Tidak ada gambar di {self.path}")
+        self.files = [os.path.join(self.path, f) for f in files]
+        self.position = 0
+        self.pacer = Pacer(self.fps if self.realtime else 0.0)
+        self.start = time.monotonic()
+        self.index = 0
+
+    def is_open(self):
+        return self.files is not None
+
+    def read(self, image=None):
+        self.pacer.wait()
+        if self.position >= len(self.files):
+            if not self.loop:
+                self.failures += 1
+                return False, None
+            self.position = 0
+        frame = cv2.imread(self.files[self.position])
+        self.position += 1
+        if frame is None:
+            self.failures += 1
+            return False, None
+        if self.shape is None:
+            self.shape = frame.shape
+        if image is None or image.shape != self.shape:
+            image = np.empty(self.shape, dtype=np.uint8)
+        if frame.shape != self.shape:
+            cv2.resize(frame, (self.shape[1], self.shape[0]), dst=image)
+        else:
+            np.copyto(image, frame)
+        if self.realtime:
+            self.timestamp = time.monotonic()
+        else:
+            self.timestamp = self.start + self.index / self.fps
+        self.index += 1
+        self.frames += 1
+        return True, image
+
+    def release(self):
+        self.files = None
+
+
+class SyntheticCapture(CaptureSource):
+    # Sumber frame tanpa kamera untuk benchmark: noise acak yang bergeser
+    # setiap frame (supaya motion gate tidak melewatinya) pada laju `fps`
+    name = "synthetic"
+
+    def __init__(self, shape=(CAPTURE_SIZE[1], CAPTURE_SIZE[0], 3), fps=CAPTURE_FPS):
+        super().__init__()
+        self.shape = tuple(shape)
+        self.fps = fps
+        self.base = np.random.default_rng(0).integers(0, 255, self.shape, dtype=np.uint8)
+        self.pacer = Pacer(fps)
+        self.opened = False
+
+    def open(self):
+        if not self.opened:
+            self.opened = True
+            self.pacer.reset()
+
+    def is_open(self):
+        return self.opened
+
+    def read(self, image=None):
+        self.pacer.wait()
+        self.frames += 1
+        frame = image if image is not None and image.shape == self.base.shape else np.empty_like(self.base)
+        shift = self.frames % 64
+        frame[:, shift:] = self.base[:, :self.base.shape[1] - shift]
+        frame[:, :shift] = self.base[:, self.base.shape[1] - shift:]
+        self.timestamp = time.monotonic()
+        return True, frame
+
+    def release(self):
+        self.opened = False
+
+
+def create_capture(source=CAPTURE_SOURCE, **options):
+    # "0", 1 -> DeviceCapture; "synthetic"; direktori -> ImageDirectoryCapture;
+    # selain itu path video atau URL. options diteruskan ke kelasnya.
+    if isinstance(source, CaptureSource):
+        return source
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return DeviceCapture(int(source), **options)
+    if source == "synthetic":
+        return SyntheticCapture(**options)
+    if os.path.isdir(source):
+        return ImageDirectoryCapture(source, **options)
+    return VideoFileCapture(source, **options)
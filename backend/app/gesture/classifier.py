@@ -0,0 +1,392 @@
+import argparse
+import glob
+import json
+import os
+import time
+from functools import lru_cache
+import numpy as np
+from app.gesture.landmarks import INDEX_TIP, NUM_LANDMARKS, WRIST
+from app.gesture.recording import FLAG_ARMED, FLAG_HAS_HAND, FLAG_SHOOT, load_session
+from app.gesture.rules import BatchedGestureRules, GestureRules
+
+# GESTURE_CLASSIFIER: path file bobot (.npz) dari `python -m
+# app.gesture.classifier train`. Jika diisi, armed/shoot diputuskan
+# classifier, bukan threshold GestureRules.
+CLASSIFIER_MODEL = os.environ.get("GESTURE_CLASSIFIER")
+
+FORMAT_VERSION = 1
+# Frame terakhir yang gerakannya masuk fitur (jendela temporal tembakan)
+MOTION_WINDOW = 4
+SHAPE_SIZE = NUM_LANDMARKS * 3
+# Jeda antar frame di atas ini memutus riwayat gerakan (tangan hilang)
+MAX_GAP = 0.1
+OUTPUTS = ("armed", "shoot")
+# File label ground truth di samping rekaman: sesi.grec -> sesi.labels.json
+LABELS_SUFFIX = ".labels.json"
+
+
+class FeatureWindow:
+    # Vektor fitur per frame, ditulis ke buffer yang sama:
+    #   [0:63]   landmark relatif pusat telapak, dibagi ukuran tangan
+    #   [63:]    MOTION_WINDOW frame terakhir (lama -> baru) perpindahan
+    #            y wrist dan ujung telunjuk ke atas, dibagi ukuran tangan
+    # Dengan normalisasi ini tangan kecil/jauh dan tangan besar/dekat
+    # memberi fitur yang sama.
+
+    def __init__(self, window=MOTION_WINDOW):
+        self.window = window
+        self.size = SHAPE_SIZE + 2 * window
+        self.features = np.zeros(self.size, dtype=np.float32)
+        self.shape = self.features[:SHAPE_SIZE].reshape(NUM_LANDMARKS, 3)
+        self.motion = self.features[SHAPE_SIZE:].reshape(window, 2)
+        self.previous = None
+
+    def clear(self):
+        self.motion[:] = 0
+        self.previous = None
+
+    def push(self, lm, center, scale):
+        np.subtract(lm, center, out=self.shape)
+        self.shape /= scale
+
+        wrist_y, tip_y = float(lm[WRIST, 1]), float(lm[INDEX_TIP, 1])
+        self.motion[:-1] = self.motion[1:]
+        if self.previous is None:
+            self.motion[-1] = 0
+        else:
+            self.motion[-1] = ((self.previous[0] - wrist_y) / scale, (self.previous[1] - tip_y) / scale)
+        self.previous = wrist_y, tip_y
+        return self.features
+
+
+class GestureClassifier:
+    # MLP satu hidden layer (tanh) dengan dua output logistik: armed per
+    # frame dan shoot (hentakan sedang berlangsung). Standardisasi fitur
+    # dilipat ke lapis pertama saat dimuat, jadi inferensi hanya dua matmul.
+
+    def __init__(self, mean, std, w1, b1, w2, b2, window=MOTION_WINDOW, thresholds=(0.5, 0.5), info=None):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.raw = tuple(np.asarray(a, dtype=np.float32) for a in (w1, b1, w2, b2))
+        self.window = window
+        self.thresholds = tuple(thresholds)
+        self.info = info or {}
+
+        w1, b1, w2, b2 = self.raw
+        self.w1 = w1 / self.std[:, None]
+        self.b1 = b1 - (self.mean / self.std) @ w1
+        self.w2, self.b2 = w2, b2
+        # Bandingkan logit, bukan sigmoid: p > t sama dengan logit > log(t / (1 - t))
+        self.cuts = np.log(np.array(self.thresholds) / (1 - np.array(self.thresholds))).astype(np.float32)
+        self._hidden = np.empty(len(b1), dtype=np.float32)
+
+    @property
+    def feature_size(self):
+        return SHAPE_SIZE + 2 * self.window
+
+    def logits(self, features):
+        # features: (feature_size,) atau (n, feature_size)
+        if features.ndim == 1:
+            hidden = np.tanh(features @ self.w1 + self.b1, out=self._hidden)
+        else:
+            hidden = np.tanh(features @ self.w1 + self.b1)
+        return hidden @ self.w2 + self.b2
+
+    def predict(self, features):
+        # bool (..., 2): armed, shoot
+        return self.logits(features) > self.cuts
+
+    def save(self, path):
+        info = dict(self.info, version=FORMAT_VERSION, window=self.window, thresholds=list(self.thresholds))
+        w1, b1, w2, b2 = self.raw
+        with open(path, "wb") as f:
+            np.savez(f, mean=self.mean, std=self.std, w1=w1, b1=b1, w2=w2, b2=b2,
+                     info=np.frombuffer(json.dumps(info).encode(), dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            info = json.loads(data["info"].tobytes())
+            if info.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Versi file classifier tidak didukung: {info.get('version')}")
+            return cls(data["mean"], data["std"], data["w1"], data["b1"], data["w2"], data["b2"],
+                       window=info["window"], thresholds=info["thresholds"], info=info)
+
+
+@lru_cache(maxsize=None)
+def load_classifier(path):
+    # Satu instance per path per proses; setiap station/pemain memakai
+    # bobot yang sama
+    return GestureClassifier.load(path)
+
+
+class ClassifierRules(GestureRules):
+    # Pengganti GestureRules dengan antarmuka yang sama untuk
+    # GestureProcessor. is_armed() menjalankan classifier sekali per frame
+    # (armed dan shoot sekaligus), detect_shoot() memakai hasilnya: satu
+    # tembakan di awal hentakan (output shoot naik), dengan cooldown yang
+    # sama dengan rules. model=None hanya menghitung fitur (untuk training).
+
+    def __init__(self, model, clock=time.monotonic, **kwargs):
+        super().__init__(clock=clock, **kwargs)
+        self.model = model
+        self.window = FeatureWindow(model.window if model is not None else MOTION_WINDOW)
+        self.last_frame_time = None
+        self.last_shot_time = float("-inf")
+        self.shoot_active = False
+        self.shoot_rising = False
+
+    def features(self, lm):
+        # Riwayat gerakan tidak direset bersama rules (reset() dipanggil
+        # tiap frame tidak armed); hanya putus jika ada jeda frame
+        now = self.clock()
+        if self.last_frame_time is None or now - self.last_frame_time > MAX_GAP:
+            self.window.clear()
+        self.last_frame_time = now
+        self._normalize_landmarks(lm)
+        return self.window.push(lm, self.palm_center, self.hand_scale)
+
+    def is_armed(self, lm):
+        armed, shoot = self.model.predict(self.features(lm)).tolist()
+        self.shoot_rising = shoot and not self.shoot_active
+        self.shoot_active = shoot
+        return armed
+
+    def detect_shoot(self, lm, is_armed_current):
+        now = self.clock()
+        if is_armed_current and self.shoot_rising and now - self.last_shot_time > self.SHOOT_COOLDOWN:
+            self.last_shot_time = now
+            return True
+        return False
+
+
+class BatchedClassifierRules:
+    # ClassifierRules untuk beberapa slot dengan antarmuka
+    # BatchedGestureRules (MultiHandProcessor). Fitur tiap tangan dihitung
+    # di FeatureWindow slot-nya, classifier dijalankan sekali untuk semua
+    # tangan (satu matmul (n, feature_size)); tepi naik shoot dan cooldown
+    # per slot disimpan dalam array. clock() skalar.
+
+    def __init__(self, model, capacity, clock=time.monotonic):
+        self.model = model
+        self.clock = clock
+        self.capacity = capacity
+        self.SHOOT_COOLDOWN = 0.3
+        self.slots = [ClassifierRules(model, clock=clock) for _ in range(capacity)]
+        self.features = np.zeros((capacity, model.feature_size), dtype=np.float32)
+        self.shoot_active = np.zeros(capacity, dtype=bool)
+        self.last_shot_time = np.full(capacity, -np.inf)
+
+    def reset(self, slots):
+        # Sama dengan ClassifierRules.reset(): riwayat gerakan hanya putus
+        # karena jeda frame, tepi shoot dan cooldown tetap
+        for slot in np.arange(self.capacity)[slots].reshape(-1).tolist():
+            self.slots[slot].reset()
+
+    def update(self, present, lm):
+        # present: mask (capacity,), lm: (capacity, 21, 3). Mengembalikan
+        # mask armed dan shoot seperti BatchedGestureRules.update
+        now = self.clock()
+        rows = np.flatnonzero(present)
+        for slot in rows.tolist():
+            self.features[slot] = self.slots[slot].features(lm[slot])
+        predicted = self.model.predict(self.features[rows])
+
+        armed = np.zeros(self.capacity, dtype=bool)
+        rising = np.zeros(self.capacity, dtype=bool)
+        armed[rows] = predicted[:, 0]
+        rising[rows] = predicted[:, 1] & ~self.shoot_active[rows]
+        self.shoot_active[rows] = predicted[:, 1]
+        shoot = armed & rising & (now - self.last_shot_time > self.SHOOT_COOLDOWN)
+        self.last_shot_time[shoot] = now
+        return armed, shoot
+
+
+def create_rules(clock=time.monotonic, model_path=None, slots=None):
+    # Rules untuk GestureProcessor: classifier jika ada file bobot
+    # (argumen atau GESTURE_CLASSIFIER), selain itu GestureRules. slots:
+    # rules batch untuk sekian slot (MultiHandProcessor), classifier atau
+    # BatchedGestureRules
+    model_path = model_path or CLASSIFIER_MODEL
+    if slots is not None:
+        if not model_path:
+            return BatchedGestureRules(slots, clock=clock)
+        return BatchedClassifierRules(load_classifier(model_path), slots, clock=clock)
+    if not model_path:
+        return GestureRules(clock=clock)
+    return ClassifierRules(load_classifier(model_path), clock=clock)
+
+
+def labels_path(session_path):
+    return os.path.splitext(session_path)[0] + LABELS_SUFFIX
+
+
+def load_labels(path, records):
+    # Label ground truth per record dari file JSON {"armed": [[mulai,
+    # selesai], ...], "shoot": [...]} dalam detik sejak record pertama;
+    # record di dalam rentang [mulai, selesai) positif, selebihnya negatif.
+    # Flag armed/shoot rekaman kamera adalah output rules saat direkam, jadi
+    # tanpa file ini classifier hanya belajar meniru heuristiknya.
+    with open(path) as f:
+        ranges = json.load(f)
+    if not isinstance(ranges, dict):
+        raise ValueError(f"File label harus objek JSON: {path}")
+    unknown = set(ranges) - set(OUTPUTS)
+    if unknown:
+        raise ValueError(f"Label tidak dikenal di {path}: {', '.join(sorted(unknown))}")
+    timestamps = records["timestamp"]
+    t = timestamps - timestamps[0] if len(timestamps) else timestamps
+    labels = np.zeros((len(records), len(OUTPUTS)), dtype=bool)
+    for i, name in enumerate(OUTPUTS):
+        for span in ranges.get(name, ()):
+            try:
+                start, end = (float(value) for value in span)
+            except (TypeError, ValueError):
+                start = end = None
+            if start is None or not start <= end:
+                raise ValueError(f"Rentang {name} tidak valid di {path}: {span!r}")
+            labels[:, i] |= (t >= start) & (t < end)
+    return labels
+
+
+def session_features(records, window=MOTION_WINDOW, labels=None):
+    # Fitur dan label (armed, shoot) untuk frame yang ada tangannya, dengan
+    # jalur fitur yang sama dengan ClassifierRules. labels: (record, 2) dari
+    # load_labels(); None -> flag armed/shoot rekaman
+    clock = [0.0]
+    rules = ClassifierRules(None, clock=lambda: clock[0])
+    rules.window = FeatureWindow(window)
+    timestamps = records["timestamp"].tolist()
+    flags = records["flags"].tolist()
+    landmarks = np.ascontiguousarray(records["landmarks"])
+
+    rows = [i for i, flag in enumerate(flags) if flag & FLAG_HAS_HAND]
+    features = np.empty((len(rows), rules.window.size), dtype=np.float32)
+    for j, i in enumerate(rows):
+        clock[0] = timestamps[i]
+        features[j] = rules.features(landmarks[i])
+    if labels is not None:
+        return features, labels[rows]
+    labels = np.array([(flags[i] & FLAG_ARMED, flags[i] & FLAG_SHOOT) for i in rows], dtype=bool)
+    return features, labels.reshape(len(rows), len(OUTPUTS))
+
+
+def train(features, labels, hidden=32, epochs=40, batch_size=256, learning_rate=3e-3, seed=0,
+          window=MOTION_WINDOW, log=None):
+    # Adam + binary cross-entropy per output. Kelas positif yang jarang
+    # (frame shoot) diberi bobot neg/pos (maks 20) supaya tidak diabaikan.
+    rng = np.random.default_rng(seed)
+    x = features.astype(np.float32)
+    y = labels.astype(np.float32)
+    mean = x.mean(axis=0)
+    std = np.maximum(x.std(axis=0), 1e-3)
+    x = (x - mean) / std
+
+    positives = np.clip(y.mean(axis=0), 1e-6, 1 - 1e-6)
+    weights = np.minimum((1 - positives) / positives, 20.0).astype(np.float32)
+
+    params = [
+        rng.normal(0, np.sqrt(1 / x.shape[1]), (x.shape[1], hidden)).astype(np.float32),
+        np.zeros(hidden, dtype=np.float32),
+        rng.normal(0, np.sqrt(1 / hidden), (hidden, y.shape[1])).astype(np.float32),
+        np.zeros(y.shape[1], dtype=np.float32),
+    ]
+    moments = [np.zeros_like(p) for p in params]
+    squares = [np.zeros_like(p) for p in params]
+    beta1, beta2, step = 0.9, 0.999, 0
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(x))
+        total = 0.0
+        for start in range(0, len(x), batch_size):
+            index = order[start:start + batch_size]
+            xb, yb = x[index], y[index]
+            w1, b1, w2, b2 = params
+            h = np.tanh(xb @ w1 + b1)
+            p = 1 / (1 + np.exp(-(h @ w2 + b2)))
+            sample_weight = 1 + yb * (weights - 1)
+            total += float(-(sample_weight * (yb * np.log(p + 1e-7) + (1 - yb) * np.log(1 - p + 1e-7))).sum())
+
+            grad_out = sample_weight * (p - yb) / len(xb)
+            grad_h = (grad_out @ w2.T) * (1 - h * h)
+            grads = [xb.T @ grad_h, grad_h.sum(axis=0), h.T @ grad_out, grad_out.sum(axis=0)]
+            step += 1
+            for i, grad in enumerate(grads):
+                moments[i] = beta1 * moments[i] + (1 - beta1) * grad
+                squares[i] = beta2 * squares[i] + (1 - beta2) * grad * grad
+                corrected = moments[i] / (1 - beta1 ** step)
+                params[i] -= learning_rate * corrected / (np.sqrt(squares[i] / (1 - beta2 ** step)) + 1e-8)
+        if log is not None:
+            log(f"epoch {epoch + 1}/{epochs}: loss {total / len(x):.4f}")
+
+    info = {"frames": len(x), "hidden": hidden, "epochs": epochs, "positive_rate": positives.tolist()}
+    return GestureClassifier(mean, std, *params, window=window, info=info)
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+
+def train_sessions(paths, output, log=print, require_labels=False, **kwargs):
+    # Label tiap sesi dari file LABELS_SUFFIX jika ada, selain itu flag
+    # rekaman (hanya ground truth untuk rekaman synthetic --truth).
+    # require_labels: tolak sesi tanpa file label.
+    features, labels = [], []
+    labelled = 0
+    for path in paths:
+        records = load_session(path)
+        truth = None
+        if os.path.exists(labels_path(path)):
+            truth = load_labels(labels_path(path), records)
+            labelled += 1
+        elif require_labels:
+            raise ValueError(f"Sesi tanpa file label: {path} (butuh {labels_path(path)})")
+        session = session_features(records, labels=truth)
+        features.append(session[0])
+        labels.append(session[1])
+    features, labels = np.concatenate(features), np.concatenate(labels)
+    log(f"{len(paths)} sesi ({labelled} dengan file label), {len(features)} frame bertangan, "
+        f"armed {labels[:, 0].mean() * 100:.1f}%, shoot {labels[:, 1].mean() * 100:.1f}%")
+    model = train(features, labels, log=log, **kwargs)
+    predicted = model.predict(features)
+    for i, name in enumerate(OUTPUTS):
+        log(f"Akurasi training {name}: {(predicted[:, i] == labels[:, i]).mean() * 100:.2f}%")
+    model.save(output)
+    log(f"Bobot tersimpan ke {output} ({os.path.getsize(output)} byte)")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training classifier gesture dari sesi rekaman .grec")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = sub.add_parser(
+        "train", help=f"latih dari rekaman (label dari file sesi{LABELS_SUFFIX}, atau flag armed/shoot rekaman)")
+    train_parser.add_argument("sessions", nargs="+", help="file .grec atau pola glob")
+    train_parser.add_argument("--output", "-o", default="gesture_classifier.npz")
+    train_parser.add_argument("--hidden", type=int, default=32)
+    train_parser.add_argument("--epochs", type=int, default=40)
+    train_parser.add_argument("--learning-rate", type=float, default=3e-3)
+    train_parser.add_argument("--seed", type=int, default=0)
+    train_parser.add_argument("--require-labels", action="store_true",
+                              help=f"gagal jika ada sesi tanpa file {LABELS_SUFFIX} (wajib untuk rekaman kamera)")
+
+    info_parser = sub.add_parser("info", help="tampilkan metadata file bobot")
+    info_parser.add_argument("model")
+
+    args = parser.parse_args()
+    if args.command == "train":
+        try:
+            train_sessions(expand_paths(args.sessions), args.output, require_labels=args.require_labels,
+                           hidden=args.hidden, epochs=args.epochs, learning_rate=args.learning_rate, seed=args.seed)
+        except ValueError as e:
+            raise SystemExit(f"GAGAL: {e}")
+    else:
+        started = time.perf_counter()
+        model = GestureClassifier.load(args.model)
+        print(f"Dimuat dalam {(time.perf_counter() - started) * 1000:.2f} ms")
+        print(json.dumps(model.info, indent=2))
@@ -1,47 +1,237 @@
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import deque
 import cv2
-from app.gesture.rules import GestureRules
+import numpy as np
+from app.gesture.backends import BACKENDS, LANDMARK_BACKEND
+from app.gesture.capture import CAPTURE_SOURCE
 from app.gesture.detector import GestureDetector
+from app.gesture.pipeline import LatestSlot
+from app.gesture.synthetic import HAND_CONNECTIONS
 
-detector = GestureDetector()
 
-print("DEBUG CAMERA MODE")
-print("Tekan Q untuk keluar")
+def draw_overlay(image, hands, data):
+    # image sudah di-mirror (koordinat tampilan): kerangka tiap tangan lalu
+    # kursor per pemain, abu-abu / hijau saat armed / merah saat shoot
+    h, w = image.shape[:2]
+    for lm in hands:
+        points = [(int(x * w), int(y * h)) for x, y in lm[:, :2].tolist()]
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(image, points[a], points[b], (200, 200, 200), 1, cv2.LINE_AA)
+        for point in points:
+            cv2.circle(image, point, 3, (255, 255, 255), -1, cv2.LINE_AA)
 
-while True:
-    data = detector.read()
+    for player in data.get("players") or (data,):
+        if player["x"] is None or player["y"] is None:
+            continue
+        cx = int(player["x"] * w)
+        cy = int(player["y"] * h)
 
-    if data is None:
-        print("Gagal baca frame")
-        
-        break
+        color = (150, 150, 150)
+        if player["armed"]:
+            color = (0, 255, 0)
+        if player["shoot"]:
+            color = (0, 0, 255)
 
-    print(data)
+        cv2.circle(image, (cx, cy), 10, color, -1)
+        cv2.line(image, (cx - 15, cy), (cx + 15, cy), color, 2)
+        cv2.line(image, (cx, cy - 15), (cx, cy + 15), color, 2)
+        if "player" in player:
+            cv2.putText(image, str(player["player"] + 1), (cx + 14, cy - 14),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2, cv2.LINE_AA)
+    return image
 
-    ret, frame = detector.cap.read()
-    if not ret:
-        break
 
-    frame = cv2.flip(frame, 1)
+class SegmentedVideoWriter:
+    # cv2.VideoWriter yang membuka file baru tiap segment_frames frame
+    # (0: satu file), supaya rekaman panjang bisa dibuka sebagian.
 
-    if data["x"] is not None and data["y"] is not None:
-        h, w, _ = frame.shape
-        cx = int(data["x"] * w)
-        cy = int(data["y"] * h)
+    def __init__(self, directory, fps=30.0, segment_frames=0, fourcc="MJPG"):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fps = fps
+        self.segment_frames = segment_frames
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.writer = None
+        self.frames = 0
+        self.files = []
 
-        color = (150, 150, 150)
-        if data["armed"]:
-            color = (0, 255, 0)
-        if data["shoot"]:
-            color = (0, 0, 255)
+    def _open(self, shape):
+        self.close()
+        name = time.strftime("debug-%Y%m%d-%H%M%S") + f"-{len(self.files):03d}.avi"
+        path = os.path.join(self.directory, name)
+        self.writer = cv2.VideoWriter(path, self.fourcc, self.fps, (shape[1], shape[0]))
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Tidak bisa menulis video {path}")
+        self.files.append(path)
+        self.frames = 0
+
+    def write(self, image):
+        if self.writer is None or (self.segment_frames and self.frames >= self.segment_frames):
+            self._open(image.shape)
+        self.writer.write(image)
+        self.frames += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class DebugVisualizer:
+    # frame_hook untuk GestureDetector. Di thread deteksi hanya ada satu
+    # pass (flip frame ke buffer dari pool) dan put_nowait; overlay, encode
+    # video dan imshow berjalan di thread lain. Jika thread render
+    # tertinggal, frame baru dibuang (dihitung di dropped), deteksi tidak
+    # pernah menunggu.
+
+    def __init__(self, display=True, record_dir=None, fps=30.0, segment_seconds=60.0, fourcc="MJPG",
+                 queue_size=4):
+        self.queue = queue.Queue(queue_size)
+        # Buffer frame yang bisa dipakai ulang (append/pop deque aman antar thread)
+        self.free = deque()
+        # Frame teranotasi terbaru untuk imshow di main thread
+        self.display = LatestSlot() if display else None
+        self.writer = None
+        if record_dir:
+            self.writer = SegmentedVideoWriter(record_dir, fps, int(segment_seconds * fps), fourcc)
+
+        self.submitted = 0
+        self.dropped = 0
+        self.rendered = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="gesture-debug", daemon=True)
+        self._thread.start()
+
+    def __call__(self, frame, hands, data):
+        buffer = self.free.pop() if self.free else None
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = np.empty_like(frame)
+        # Salinan + mirror dalam satu pass; frame kamera dipakai ulang capture
+        cv2.flip(frame, 1, dst=buffer)
+        try:
+            self.queue.put_nowait((buffer, [lm.copy() for lm in hands], data))
+            self.submitted += 1
+        except queue.Full:
+            self.dropped += 1
+            self.free.append(buffer)
+
+    def _run(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                image, hands, data = item
+                draw_overlay(image, hands, data)
+                if self.writer is not None:
+                    self.writer.write(image)
+                self.rendered += 1
+                if self.display is not None:
+                    image = self.display.put(image)
+                if image is not None:
+                    self.free.append(image)
+        except Exception as e:
+            self.error = e
+            print(f"Error debug visualizer: {e}")
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+    def show(self, timeout=0.05):
+        # Dipanggil dari main thread (GUI OpenCV). False jika Q ditekan
+        image, _ = self.display.take(timeout)
+        if image is not None:
+            cv2.imshow("Gesture Debug Camera", image)
+            self.free.append(image)
+        return cv2.waitKey(1) & 0xFF != ord("q")
+
+    def close(self, timeout=5.0):
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout)
+        if self.display is not None:
+            self.display.close()
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "rendered": self.rendered,
+            "files": list(self.writer.files) if self.writer is not None else [],
+        }
+
+
+def detect_loop(detector, stop, counter):
+    # Thread deteksi: satu capture per iterasi, hanya perubahan status
+    # yang dicetak supaya stdout tidak ikut memperlambat
+    last = None
+    while not stop.is_set():
+        data = detector.read()
+        if data is None:
+            print("Gagal baca frame")
+            break
+        counter[0] += 1
+        state = (data["armed"], data["shoot"])
+        if state != last:
+            print(data)
+            last = state
+    stop.set()
+
+
+def main(args):
+    detector = GestureDetector(camera=args.camera, backend=args.backend, players=args.players)
+    visualizer = DebugVisualizer(display=not args.headless, record_dir=args.record, fps=args.fps,
+                                 segment_seconds=args.segment)
+    detector.frame_hook = visualizer
+
+    print("DEBUG CAMERA MODE")
+    print("Tekan Q untuk keluar" if not args.headless else "Headless, Ctrl+C untuk keluar")
 
-        cv2.circle(frame, (cx, cy), 10, color, -1)
-        cv2.line(frame, (cx - 15, cy), (cx + 15, cy), color, 2)
-        cv2.line(frame, (cx, cy - 15), (cx, cy + 15), color, 2)
+    stop = threading.Event()
+    counter = [0]
+    thread = threading.Thread(target=detect_loop, args=(detector, stop, counter), name="gesture-detect", daemon=True)
+    started = time.monotonic()
+    thread.start()
+    try:
+        while not stop.is_set():
+            if args.seconds is not None and time.monotonic() - started >= args.seconds:
+                break
+            if args.headless:
+                stop.wait(0.1)
+            elif not visualizer.show():
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        thread.join()
+        elapsed = time.monotonic() - started
+        visualizer.close()
+        detector.release()
+        if not args.headless:
+            cv2.destroyAllWindows()
 
-    cv2.imshow("Gesture Debug Camera", frame)
+    stats = visualizer.stats()
+    print(f"{counter[0]} frame dideteksi ({counter[0] / elapsed:.1f} FPS), {stats['rendered']} dirender, "
+          f"{stats['dropped']} dibuang visualizer")
+    for path in stats["files"]:
+        print(f"  video: {path}")
+    return 0 if visualizer.error is None else 1
 
-    if cv2.waitKey(1) & 0xFF == ord("q"):
-        break
 
-detector.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overlay debug gesture pada frame yang sama dengan deteksi")
+    parser.add_argument("--camera", default=CAPTURE_SOURCE,
+                        help="index kamera, path video, direktori gambar atau 'synthetic'")
+    parser.add_argument("--backend", choices=tuple(BACKENDS), default=LANDMARK_BACKEND)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--headless", action="store_true", help="tanpa jendela imshow")
+    parser.add_argument("--record", help="folder untuk video teranotasi")
+    parser.add_argument("--segment", type=float, default=60.0, help="detik per file video (0: satu file)")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS file video")
+    parser.add_argument("--seconds", type=float, default=None, help="berhenti setelah sekian detik")
+    raise SystemExit(main(parser.parse_args()))
@@ -1,161 +1,273 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-from app.gesture.rules import GestureRules
+import time
+from app.gesture.backends import LANDMARK_BACKEND, create_backend
+from app.gesture.capture import CAPTURE_SOURCE, create_capture
+from app.gesture.motion import MOTION_GATE_ENABLED, MotionGate
+from app.gesture.preprocess import MIRROR_MODE, FramePreprocessor
+from app.gesture.processor import GestureProcessor, MultiHandProcessor, any_player
+from app.gesture.roi import AdaptiveResolution, HandRoi
 
-mp_hands = mp.solutions.hands
 
 class GestureDetector:
     
-    def __init__(self):
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            model_complexity=0
-        )
+    def __init__(self, roi=True, cpu_budget_ms=20.0, metrics=None, camera=CAPTURE_SOURCE, motion_gate=MOTION_GATE_ENABLED,
+                 backend=LANDMARK_BACKEND, players=1, mirror=MIRROR_MODE):
+        # backend: nama di BACKENDS atau instance HandLandmarkBackend
+        if isinstance(backend, str):
+            backend = create_backend(backend, **({"max_hands": players} if players > 1 else {}))
+        if backend.max_hands < players:
+            raise ValueError(f"Backend {backend.name} hanya mendukung {backend.max_hands} tangan")
+        self.backend = backend
+
+        # camera: spesifikasi create_capture() (index kamera, path video,
+        # direktori gambar, "synthetic") atau instance CaptureSource.
+        # camera=None: tanpa perangkat capture, frame diberikan lewat process()
+        self.camera = camera
+        self.cap = None
+        self.last_frame = None
+        if camera is not None:
+            self.open()
+
+        # Rules membaca waktu lewat clock ini: timestamp capture frame yang
+        # sedang diproses (time.monotonic), bukan jam saat inferensi selesai,
+        # sehingga kecepatan dan cooldown tidak bergeser oleh antrean atau
+        # beban dan rekaman bisa diputar ulang secepat CPU dengan hasil sama.
+        self.frame_timestamp = time.monotonic()
+        # Timestamp capture frame terakhir dari grab()
+        self.captured_at = 0.0
+        self.processor = GestureProcessor(clock=lambda: self.frame_timestamp)
+        # Mode beberapa pemain: tracking per tangan + rules batch. ROI satu
+        # tangan tidak berlaku, inferensi selalu di frame penuh (diperkecil).
+        self.multi = MultiHandProcessor(players, clock=lambda: self.frame_timestamp) if players > 1 else None
+        self.recorder = None
+        self.metrics = metrics
+
+        # Mode ROI: crop di sekitar tangan dari frame sebelumnya, dengan
+        # resolusi inferensi yang menyesuaikan budget CPU per frame.
+        self.roi_enabled = roi and backend.reads_pixels and self.multi is None
+        self.roi = HandRoi()
+        self.resolution = AdaptiveResolution(budget_ms=cpu_budget_ms)
+        self.prev_landmarks = None
+        self.last_mode = "full"
+        self.roi_frames = 0
+        self.full_frames = 0
+
+        # Motion gate: frame tanpa perubahan berarti memakai hasil sebelumnya
+        # tanpa menjalankan MediaPipe. True -> MotionGate default, atau
+        # instance MotionGate dengan kenop sendiri, atau False.
+        if motion_gate is True:
+            motion_gate = MotionGate()
+        self.motion_gate = motion_gate or None
+        self.last_data = None
+
+        # Flip/crop/cvtColor ke buffer yang dipakai ulang; None jika backend
+        # tidak membaca piksel
+        self.preprocess = FramePreprocessor(mirror) if backend.reads_pixels else None
+
+        # Hook debug opsional: frame_hook(frame, hands, data) dipanggil di
+        # thread inferensi untuk setiap frame yang diproses, termasuk yang
+        # dilewati motion gate. frame adalah frame kamera (belum di-mirror),
+        # hands list landmark (koordinat tampilan) dan data hasil rules.
+        # Frame dan landmark dipakai ulang frame berikutnya; salin jika
+        # disimpan. None: tanpa biaya selain satu pengecekan atribut.
+        self.frame_hook = None
+        self.last_hands = []
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, recorder):
+        # Format .grec menyimpan satu tangan per frame dengan output rules
+        # tangan itu; di mode beberapa pemain landmark dan output tidak
+        # selalu milik pemain yang sama, jadi rekaman ditolak
+        if recorder is not None and self.multi is not None:
+            raise ValueError("Rekaman sesi hanya didukung untuk satu pemain (GESTURE_PLAYERS=1)")
+        self._recorder = recorder
+
+    def open(self):
+        if self.is_open() or self.camera is None:
+            return
 
         print("Mencoba membuka kamera...")
-        self.cap = cv2.VideoCapture(0)
-        
-        if not self.cap.isOpened():
+        cap = create_capture(self.camera)
+        try:
+            cap.open()
+        except RuntimeError:
             print("ERROR: Kamera tidak bisa dibuka. Coba:")
             print("1. Pastikan kamera tidak digunakan aplikasi lain")
-            print("2. Coba ganti index kamera (0 -> 1 atau 2)")
-            raise RuntimeError("Kamera tidak bisa dibuka")
-        
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+            print("2. Coba ganti index kamera (GESTURE_CAMERA=1 atau 2)")
+            raise
+        self.cap = cap
         print("Kamera berhasil dibuka!")
 
-        self.rules = GestureRules()
-        
-        self.cursor_x_ema = None
-        self.cursor_y_ema = None
-        self.ema_alpha = 0.7
-        
-        self.direction_vector_ema = None
-        self.direction_alpha = 0.6
-        
-        self.deadzone_threshold = 0.001
-        
-        self.last_valid_x = None
-        self.last_valid_y = None
-        self.last_valid_armed = False
-        self.loss_frame_count = 0
-        self.max_loss_frames = 5
-
-    def _compute_directional_cursor(self, lm, is_armed):
-        wrist = lm[0]
-        index_tip = lm[8]
-        
-        if is_armed:
-            direction_x = index_tip.x - wrist.x
-            direction_y = index_tip.y - wrist.y
-            
-            direction_mag = np.sqrt(direction_x**2 + direction_y**2)
-            if direction_mag > 0.01:
-                direction_x /= direction_mag
-                direction_y /= direction_mag
-            
-            base_x = index_tip.x
-            base_y = index_tip.y
-            
-            if self.direction_vector_ema is None:
-                self.direction_vector_ema = np.array([direction_x, direction_y])
-            else:
-                self.direction_vector_ema = (
-                    self.direction_alpha * np.array([direction_x, direction_y]) +
-                    (1 - self.direction_alpha) * self.direction_vector_ema
-                )
-            
-            cursor_x = base_x
-            cursor_y = base_y
-        else:
-            cursor_x = index_tip.x
-            cursor_y = index_tip.y
-            self.direction_vector_ema = None
-        
-        return cursor_x, cursor_y
-
-    def _apply_ema_smoothing(self, raw_x, raw_y):
-        if self.cursor_x_ema is None or self.cursor_y_ema is None:
-            self.cursor_x_ema = raw_x
-            self.cursor_y_ema = raw_y
-            return raw_x, raw_y
-        
-        dx = raw_x - self.cursor_x_ema
-        dy = raw_y - self.cursor_y_ema
-        
-        if abs(dx) > self.deadzone_threshold or abs(dy) > self.deadzone_threshold:
-            self.cursor_x_ema = self.ema_alpha * raw_x + (1 - self.ema_alpha) * self.cursor_x_ema
-            self.cursor_y_ema = self.ema_alpha * raw_y + (1 - self.ema_alpha) * self.cursor_y_ema
-        
-        return self.cursor_x_ema, self.cursor_y_ema
+    def warm_up(self):
+        # Graph inferensi baru benar-benar diinisialisasi pada frame pertama;
+        # jalankan dengan frame kosong seukuran crop ROI dan frame penuh yang
+        # diperkecil supaya frame client pertama tidak membayarnya
+        size = self.resolution.size
+        return self.backend.warm_up((size, 2 * size))
 
-    def read(self):
-        if not self.cap.isOpened():
+    def is_open(self):
+        return self.cap is not None and self.cap.is_open()
+
+    def grab(self, out=None):
+        # out: frame lama yang boleh ditimpa; cap.read() menulis ke sana jika
+        # ukurannya cocok sehingga tidak ada alokasi gambar per frame
+        if not self.is_open():
             return None
-            
-        ret, frame = self.cap.read()
+
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter_ns()
+
+        ret, frame = self.cap.read(out)
+
+        if metrics is not None:
+            metrics.record("capture", started)
         if not ret:
             return None
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(rgb)
+        self.captured_at = self.cap.timestamp
+        return frame
 
-        data = {
-            "x": None,
-            "y": None,
-            "armed": False,
-            "shoot": False
-        }
+    def read(self):
+        # Sinkron, jadi frame sebelumnya selalu bebas dipakai ulang
+        frame = self.grab(self.last_frame)
+        if frame is None:
+            return None
 
-        if not result.multi_hand_landmarks:
-            self.loss_frame_count += 1
-            
-            if self.loss_frame_count <= self.max_loss_frames and self.last_valid_x is not None:
-                data["x"] = self.last_valid_x
-                data["y"] = self.last_valid_y
-                data["armed"] = self.last_valid_armed
-                return data
-            else:
-                if self.loss_frame_count > self.max_loss_frames:
-                    self.rules.reset()
-                    self.cursor_x_ema = None
-                    self.cursor_y_ema = None
-                    self.direction_vector_ema = None
-                    self.last_valid_x = None
-                    self.last_valid_y = None
-                    self.last_valid_armed = False
+        self.last_frame = frame
+        return self.process(frame, self.captured_at)
+
+    def process(self, frame, timestamp=None):
+        # timestamp: saat frame di-capture (time.monotonic); None -> sekarang
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.frame_timestamp = timestamp
+        metrics = self.metrics
+        if metrics is not None:
+            self._stage_start = time.perf_counter_ns()
+
+        gate = self.motion_gate
+        if gate is not None:
+            # Setelah tembakan frame berikutnya selalu diproses agar state
+            # shoot di rules berjalan seperti biasa
+            force = self.last_data is None or any_player(self.last_data, "shoot")
+            if not gate.should_infer(frame, timestamp, force):
+                if metrics is not None:
+                    metrics.record("motion_gate", self._stage_start)
+                data = dict(self.last_data, shoot=False)
+                if self.frame_hook is not None:
+                    self.frame_hook(frame, self.last_hands, data)
                 return data
 
-        self.loss_frame_count = 0
-        lm = result.multi_hand_landmarks[0].landmark
+        if self.multi is not None:
+            hands = self._detect_many(frame)
+            lm = hands[0][0] if hands else None
+        else:
+            lm = self._detect(frame)
+
+        if metrics is not None:
+            started = time.perf_counter_ns()
+        data = self.multi.update(hands) if self.multi is not None else self.processor.update(lm)
+        if metrics is not None:
+            metrics.record("rules", started)
+        if gate is not None:
+            gate.observe(timestamp, lm is not None, any_player(data, "armed"))
 
-        armed = self.rules.is_armed(lm)
-        
-        raw_x, raw_y = self._compute_directional_cursor(lm, armed)
-        
-        smooth_x, smooth_y = self._apply_ema_smoothing(raw_x, raw_y)
+        if self.recorder is not None:
+            self.recorder.write(timestamp, lm, data)
 
-        data["x"] = smooth_x
-        data["y"] = smooth_y
-        data["armed"] = armed
+        self.last_data = data
+        if self.frame_hook is not None:
+            if self.multi is not None:
+                self.last_hands = [hand for hand, _ in hands]
+            else:
+                self.last_hands = [lm] if lm is not None else []
+            self.frame_hook(frame, self.last_hands, data)
+        return data
+
+    def _detect(self, frame):
+        frame_h, frame_w = frame.shape[:2]
+        pre = self.preprocess
 
-        if armed:
-            data["shoot"] = self.rules.detect_shoot(lm, armed)
+        box = None
+        if self.roi_enabled and self.prev_landmarks is not None and self.processor.loss_frame_count == 0:
+            box = self.roi.box(self.prev_landmarks, frame_w, frame_h)
+
+        if box is not None:
+            image = pre.prepare(frame, box, self.resolution.size)
+            self.last_mode = "roi"
+            self.roi_frames += 1
         else:
-            self.rules.reset()
+            # Tracking hilang: deteksi ulang di frame penuh (diperkecil)
+            if pre is not None:
+                image = pre.prepare(frame, long_side=2 * self.resolution.size if self.roi_enabled else None)
+            else:
+                image = frame
+            self.last_mode = "full"
+            self.full_frames += 1
 
-        self.last_valid_x = data["x"]
-        self.last_valid_y = data["y"]
-        self.last_valid_armed = data["armed"]
+        metrics = self.metrics
+        if metrics is not None:
+            # flip + crop/resize + cvtColor
+            metrics.record("preprocess", self._stage_start)
 
-        return data
+        started = time.perf_counter()
+        lm = self.backend.detect(image)
+        elapsed = time.perf_counter() - started
+        if self.roi_enabled:
+            self.resolution.update(elapsed)
+        if metrics is not None:
+            metrics.record_value("inference", int(elapsed * 1e9))
+
+        if lm is None:
+            self.prev_landmarks = None
+            return None
+
+        if box is not None:
+            self.roi.to_full_frame(lm, pre.source_box, frame_w, frame_h)
+        if pre is not None:
+            pre.mirror_landmarks(lm)
+
+        self.prev_landmarks = lm
+        return lm
+
+    def _detect_many(self, frame):
+        pre = self.preprocess
+        image = pre.prepare(frame, long_side=2 * self.resolution.size) if pre is not None else frame
+        self.last_mode = "full"
+        self.full_frames += 1
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.record("preprocess", self._stage_start)
+
+        started = time.perf_counter()
+        hands = self.backend.detect_many(image)
+        if metrics is not None:
+            metrics.record_value("inference", int((time.perf_counter() - started) * 1e9))
+        if pre is not None:
+            hands = [(pre.mirror_landmarks(lm), pre.mirror_handedness(handedness)) for lm, handedness in hands]
+        return hands
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "players": self.multi.max_hands if self.multi is not None else 1,
+            "roi_enabled": self.roi_enabled,
+            "mirror": self.preprocess.mirror if self.preprocess is not None else None,
+            "mode": self.last_mode,
+            "inference_size": self.resolution.size,
+            "inference_ms": (self.resolution.elapsed_ema or 0.0) * 1000,
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "motion_skip_ratio": self.motion_gate.skip_ratio() if self.motion_gate is not None else None,
+            "capture": self.cap.describe() if self.cap is not None else None,
+        }
 
     def release(self):
-        self.cap.release()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
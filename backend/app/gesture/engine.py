@@ -0,0 +1,456 @@
+from itertools import compress
+import numpy as np
+from app.gesture.finger_state import FingerStateDetector
+from app.gesture.landmarks import (
+    ANGLE_TRIPLETS, FINGERS, MIDDLE_MCP, NUM_LANDMARKS, WRIST,
+)
+
+# Gesture dideklarasikan sebagai data lalu dikompilasi sekali menjadi
+# beberapa matriks. Evaluasi per frame untuk semua gesture sekaligus:
+#
+#   1. nilai fitur (selisih koordinat, jarak, sudut sendi) -> kolom literal,
+#      satu blok matmul per jenis fitur
+#   2. literal = nilai > ambang (arah operator sudah dilipat ke tanda kolom)
+#   3. gerbang "minimal k dari n anak" berlapis (all_of, any_of, at_least):
+#      satu matmul + satu perbandingan per lapis
+#   4. jendela waktu per gesture sebagai bitmask riwayat
+#
+# Jika tiap gesture cukup sedikit literalnya, langkah 3 diganti tabel lookup
+# per gesture (bit literal -> hasil), lihat GestureEngine._build_tables.
+
+# Jumlah literal maksimum untuk tabel lookup (baris tabel = 2 ** n)
+TABLE_LITERALS = 12
+# Jendela waktu maksimum dalam frame (riwayat 16 bit)
+MAX_WINDOW = 16
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << MAX_WINDOW)], dtype=np.intp)
+
+# Operator -> (tanda, negasi): literal = (tanda * nilai > tanda * ambang) ^ negasi
+_OPERATORS = {
+    ">": (1.0, False),
+    "<": (-1.0, False),
+    "<=": (1.0, True),
+    ">=": (-1.0, True),
+}
+_AXES = {"x": 0, "y": 1, "z": 2}
+_FINGER_STATES = ("EXTENDED", "NEUTRAL", "FOLDED")
+
+
+class Compare:
+    # Satu perbandingan fitur dengan ambang. feature: tuple kunci fitur,
+    # lihat _FeatureBlocks.
+
+    def __init__(self, feature, op, threshold):
+        if op not in _OPERATORS:
+            raise ValueError(f"Operator tidak dikenal: {op}")
+        self.feature = feature
+        self.op = op
+        self.threshold = float(threshold)
+
+    def key(self):
+        return self.feature, self.op, self.threshold
+
+
+class Gate:
+    # Benar jika minimal k anak benar
+
+    def __init__(self, k, children):
+        self.k = k
+        self.children = list(children)
+
+
+def axis_delta(a, b, op, threshold, axis="y"):
+    # lm[a, axis] - lm[b, axis] op threshold
+    return Compare(("axis", a, b, _AXES[axis]), op, threshold)
+
+
+def above(a, b):
+    # Titik a lebih tinggi dari b di layar (y tumbuh ke bawah)
+    return axis_delta(b, a, ">", 0.0)
+
+
+def distance(a, b, op, threshold, scaled=False):
+    # Jarak 3D lm[a]-lm[b]; scaled: dibagi jarak wrist -> middle MCP
+    return Compare(("distance", a, b, bool(scaled)), op, threshold)
+
+
+def angle(a, b, c, op, threshold):
+    # Sudut sendi di b (radian), sama dengan joint_angles
+    return Compare(("angle", a, b, c), op, threshold)
+
+
+def finger(name, *states):
+    # Status jari seperti FingerStateDetector: rata-rata dua sudut sendi
+    # dibandingkan ambang EXTENDED/FOLDED jari tersebut
+    if name not in FINGERS:
+        raise ValueError(f"Jari tidak dikenal: {name}")
+    unknown = set(states) - set(_FINGER_STATES)
+    if unknown:
+        raise ValueError(f"Status jari tidak dikenal: {sorted(unknown)}")
+    detector = FingerStateDetector
+    if name == "thumb":
+        extended, folded = detector.THUMB_EXTENDED_THRESHOLD, detector.THUMB_FOLDED_THRESHOLD
+    else:
+        extended, folded = detector.EXTENDED_ANGLE_THRESHOLD, detector.FOLDED_ANGLE_THRESHOLD
+    feature = ("finger", FINGERS.index(name))
+    is_extended = Compare(feature, "<", extended)
+    is_folded = Compare(feature, ">", folded)
+    wanted = frozenset(states)
+    if wanted == {"EXTENDED"}:
+        return is_extended
+    if wanted == {"FOLDED"}:
+        return is_folded
+    if wanted == {"EXTENDED", "NEUTRAL"}:
+        return Compare(feature, "<=", folded)
+    if wanted == {"NEUTRAL", "FOLDED"}:
+        return Compare(feature, ">=", extended)
+    if wanted == {"NEUTRAL"}:
+        return all_of(Compare(feature, ">=", extended), Compare(feature, "<=", folded))
+    if wanted == {"EXTENDED", "FOLDED"}:
+        return any_of(is_extended, is_folded)
+    return Gate(0 if wanted else 1, [])
+
+
+def all_of(*conditions):
+    return Gate(len(conditions), conditions)
+
+
+def any_of(*conditions):
+    return Gate(1, conditions)
+
+
+def at_least(k, *conditions):
+    return Gate(k, conditions)
+
+
+class Gesture:
+    # Deklarasi gesture: semua kondisi harus benar (all_of), dan jika window
+    # > 1, kondisi itu harus terpenuhi di minimal min_frames dari window
+    # frame terakhir (default: semuanya).
+
+    def __init__(self, name, *conditions, window=1, min_frames=None):
+        if not 1 <= window <= MAX_WINDOW:
+            raise ValueError(f"window harus 1..{MAX_WINDOW}")
+        self.name = name
+        self.condition = all_of(*conditions)
+        self.window = window
+        self.min_frames = window if min_frames is None else min_frames
+        if not 1 <= self.min_frames <= window:
+            raise ValueError("min_frames harus 1..window")
+
+
+class _Features:
+    # Nilai fitur -> literal bool, dalam dua blok:
+    #
+    #   axis      ("axis", a, b, axis): lm[a, axis] - lm[b, axis], satu
+    #             matmul float64 (koefisien 0 dan +-1, jadi selisihnya sama
+    #             persis dengan pengurangan float Python)
+    #   geometri  ("angle", a, b, c): sudut sendi di b; ("finger", i): rata-
+    #             rata dua sudut jari FINGERS[i]; ("distance", a, b, scaled):
+    #             |lm[a] - lm[b]|, dibagi jarak wrist -> middle MCP jika
+    #             scaled. Semua vektor selisih dari satu matmul dan semua dot
+    #             product dari satu einsum, float32 seperti joint_angles.
+    #
+    # Tanda operator dilipat ke matriks, jadi compare() cukup nilai > ambang
+    # bertanda; literal <= dan >= adalah kebalikannya (negate). Literal axis
+    # harus lebih dulu dalam urutan literal, lihat
+    # GestureEngine._collect_literals.
+
+    def __init__(self, literals):
+        signs = np.array([_OPERATORS[lit.op][0] for lit in literals])
+        self.thresholds = signs * [lit.threshold for lit in literals]
+        self.negate = np.array([_OPERATORS[lit.op][1] for lit in literals])
+        self.any_negate = bool(self.negate.any())
+
+        axis = [j for j, lit in enumerate(literals) if lit.feature[0] == "axis"]
+        geometry = [j for j, lit in enumerate(literals) if lit.feature[0] != "axis"]
+        self.split = len(axis)
+
+        self.axis_matrix = None
+        if axis:
+            self.axis_matrix = np.zeros((NUM_LANDMARKS * 3, len(axis)))
+            for j in axis:
+                _, a, b, coordinate = literals[j].feature
+                self.axis_matrix[a * 3 + coordinate, j] += signs[j]
+                self.axis_matrix[b * 3 + coordinate, j] -= signs[j]
+
+        # Untuk GestureEngine.evaluate_rows(): koordinat (indeks flat) yang
+        # dipakai literal axis, dan per literal (kolom a, kolom b, tanda,
+        # ambang bertanda) di antara koordinat itu
+        pairs = [(a * 3 + coordinate, b * 3 + coordinate)
+                 for _, a, b, coordinate in (literals[j].feature for j in axis)]
+        columns = sorted({index for pair in pairs for index in pair})
+        self.axis_columns = np.array(columns, dtype=np.intp)
+        self.axis_terms = [(columns.index(a), columns.index(b), float(signs[j]), float(self.thresholds[j]))
+                           for j, (a, b) in zip(axis, pairs)]
+
+        self.operator = None
+        if geometry:
+            self._build_geometry([literals[j] for j in geometry], signs[self.split:])
+
+    def _build_geometry(self, literals, signs):
+        features = [lit.feature for lit in literals]
+        # Triplet jari di depan dengan urutan ANGLE_TRIPLETS supaya sudutnya
+        # identik dengan FingerStateDetector
+        triplets = []
+        if any(f[0] == "finger" for f in features):
+            triplets = [tuple(t) for t in ANGLE_TRIPLETS.tolist()]
+        triplets += sorted({f[1:] for f in features if f[0] == "angle"} - set(triplets))
+        pairs = sorted({f[1:3] for f in features if f[0] == "distance"})
+        self.scaled = np.array([f[0] == "distance" and f[3] for f in features])
+        if self.scaled.any() and (WRIST, MIDDLE_MCP) not in pairs:
+            pairs.append((WRIST, MIDDLE_MCP))
+
+        # Baris selisih: v1 tiap triplet, v2 tiap triplet, lalu pasangan
+        # jarak. Dot product: |v1|^2, |v2|^2, v1.v2, |d|^2.
+        n, m = len(triplets), len(pairs)
+        diff = np.zeros((2 * n + m, NUM_LANDMARKS), dtype=np.float32)
+        for i, (a, b, c) in enumerate(triplets):
+            diff[i, a] += 1
+            diff[i, b] -= 1
+            diff[n + i, c] += 1
+            diff[n + i, b] -= 1
+        for i, (a, b) in enumerate(pairs):
+            diff[2 * n + i, a] += 1
+            diff[2 * n + i, b] -= 1
+        distances = np.arange(2 * n, 2 * n + m)
+        left = np.concatenate([np.arange(2 * n), np.arange(n), distances])
+        right = np.concatenate([np.arange(2 * n), np.arange(n, 2 * n), distances])
+        self.operator = np.concatenate([diff[left], diff[right]])
+        self.products = len(left)
+        self.angle_count = n
+
+        # Sudut dan jarak -> nilai fitur bertanda (float32, seperti FINGER_MEAN)
+        self.combine = np.zeros((n + m, len(features)), dtype=np.float32)
+        for j, feature in enumerate(features):
+            if feature[0] == "finger":
+                self.combine[2 * feature[1]:2 * feature[1] + 2, j] = 0.5 * signs[j]
+            elif feature[0] == "angle":
+                self.combine[triplets.index(feature[1:]), j] = signs[j]
+            else:
+                self.combine[n + pairs.index(feature[1:3]), j] = signs[j]
+        self.scale_row = n + pairs.index((WRIST, MIDDLE_MCP)) if self.scaled.any() else None
+
+    def _geometry(self, lm):
+        n = self.angle_count
+        vectors = self.operator @ lm
+        products = np.einsum('...ij,...ij->...i', vectors[..., :self.products, :], vectors[..., self.products:, :])
+        parts = []
+        if n:
+            denom = np.sqrt(products[..., :n] * products[..., n:2 * n])
+            # Jika salah satu vektor nol, cos = 0 (pi/2) seperti joint_angles
+            parts.append(np.arccos(np.clip(products[..., 2 * n:3 * n] / np.maximum(denom, 1e-30), -1.0, 1.0)))
+        if self.products > 3 * n:
+            parts.append(np.sqrt(products[..., 3 * n:]))
+        measures = parts[0] if len(parts) == 1 else np.concatenate(parts, axis=-1)
+        values = measures @ self.combine
+        if self.scale_row is not None:
+            scale = np.maximum(measures[..., self.scale_row:self.scale_row + 1], 1e-6)
+            np.divide(values, scale, out=values, where=self.scaled)
+        return values
+
+    def compare(self, lm):
+        split = self.split
+        parts = []
+        if self.axis_matrix is not None:
+            flat = lm.reshape(lm.shape[:-2] + (NUM_LANDMARKS * 3,))
+            parts.append(flat @ self.axis_matrix > self.thresholds[:split])
+        if self.operator is not None:
+            parts.append(self._geometry(lm) > self.thresholds[split:])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=-1)
+
+
+class GestureEngine:
+    # Evaluasi semua gesture terdaftar dalam satu pass per frame.
+    # evaluate(lm) tanpa state (kondisi per frame, tanpa jendela waktu);
+    # update(lm, present) juga menerapkan jendela waktu per slot tangan.
+    # lm: (21, 3) atau (n, 21, 3) untuk beberapa tangan sekaligus.
+    #
+    # Jika tiap gesture memakai paling banyak TABLE_LITERALS literal, logika
+    # gerbangnya dikompilasi menjadi tabel per gesture: satu matmul memberi
+    # kode bit literal semua gesture, satu indeks membaca hasilnya. Jika
+    # tidak, gerbang dievaluasi lapis demi lapis.
+
+    def __init__(self, gestures, capacity=1):
+        self.gestures = list(gestures)
+        self.names = [g.name for g in self.gestures]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Nama gesture harus unik")
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        literals = self._collect_literals()
+        self.literal_count = len(literals)
+        self.features = _Features(literals) if literals else None
+        self.layers = self._build_layers()
+        self._build_tables()
+
+        self.window_mask = np.array([(1 << g.window) - 1 for g in self.gestures], dtype=np.intp)
+        self.min_frames = np.array([g.min_frames for g in self.gestures], dtype=np.intp)
+        self.temporal = bool((self.window_mask > 1).any())
+        self.capacity = capacity
+        self.history = np.zeros((capacity, len(self.gestures)), dtype=np.intp)
+
+    def _collect_literals(self):
+        # Literal unik (fitur, operator, ambang) dari semua gesture, literal
+        # axis di depan
+        found = {}
+
+        def walk(node):
+            if isinstance(node, Compare):
+                found.setdefault(node.key(), node)
+            else:
+                for child in node.children:
+                    walk(child)
+
+        for gesture in self.gestures:
+            walk(gesture.condition)
+        literals = sorted(found.values(), key=lambda lit: lit.feature[0] != "axis")
+        self._literal_ids = {lit.key(): i for i, lit in enumerate(literals)}
+        return literals
+
+    def _build_layers(self):
+        # Gerbang dikelompokkan per kedalaman (literal = 0). Node yang masih
+        # dipakai lapis lebih dalam diteruskan lewat gerbang identitas
+        # (k = 1, satu anak), jadi tiap lapis hanya bergantung lapis
+        # sebelumnya: W (slot masuk, slot keluar) dan ambang k.
+        gates, depth, needed = {}, {}, {}
+
+        def visit(node):
+            if isinstance(node, Compare):
+                return ("literal", self._literal_ids[node.key()])
+            ref = ("gate", id(node))
+            if ref not in depth:
+                children = [visit(child) for child in node.children]
+                depth[ref] = 1 + max((depth.get(child, 0) for child in children), default=0)
+                gates[ref] = (node.k, children)
+                for child in children:
+                    needed[child] = max(needed.get(child, 0), depth[ref] - 1)
+            return ref
+
+        roots = [visit(g.condition) for g in self.gestures]
+        total = max(depth.values())
+        for root in roots:
+            needed[root] = total
+
+        slots = [("literal", i) for i in range(self.literal_count)]
+        layers = []
+        for level in range(1, total + 1):
+            position = {ref: i for i, ref in enumerate(slots)}
+            outputs = [ref for ref in gates if depth[ref] == level]
+            outputs += [ref for ref in slots if needed.get(ref, 0) >= level]
+            weights = np.zeros((len(slots), len(outputs)), dtype=np.float32)
+            k = np.ones(len(outputs), dtype=np.float32)
+            for j, ref in enumerate(outputs):
+                if depth.get(ref, 0) == level:
+                    k[j], children = gates[ref]
+                    for child in children:
+                        weights[position[child], j] += 1
+                else:
+                    weights[position[ref], j] = 1
+            layers.append((weights, k))
+            slots = outputs
+        # Kolom lapis terakhir -> urutan gesture
+        self._outputs = np.array([slots.index(root) for root in roots], dtype=np.intp)
+        return layers
+
+    def _build_tables(self):
+        # Tabel per gesture atas literal yang dipakainya: kode = jumlah
+        # bit hasil compare() (literal_bits), hasil = table[offset gesture +
+        # kode]. Negasi literal <= dan >= sudah masuk ke tabel.
+        self.table = None
+        used = []
+        for gesture in self.gestures:
+            ids = set()
+            stack = [gesture.condition]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, Compare):
+                    ids.add(self._literal_ids[node.key()])
+                else:
+                    stack.extend(node.children)
+            used.append(sorted(ids))
+        if any(len(ids) > TABLE_LITERALS for ids in used):
+            return
+
+        self.literal_bits = np.zeros((self.literal_count, len(self.gestures)), dtype=np.intp)
+        tables = []
+        for g, ids in enumerate(used):
+            codes = np.arange(1 << len(ids))
+            literals = np.zeros((len(codes), self.literal_count), dtype=bool)
+            for bit, literal in enumerate(ids):
+                literals[:, literal] = codes >> bit & 1
+                self.literal_bits[literal, g] = 1 << bit
+            if self.features is not None:
+                literals ^= self.features.negate
+            tables.append(self._gates(literals)[:, g])
+        self.table_offsets = np.cumsum([0] + [len(t) for t in tables[:-1]])
+        self.table = np.concatenate(tables)
+        # Salinan list untuk evaluate_rows(): (offset, bit per literal) per gesture
+        self._row_tables = list(zip(self.table_offsets.tolist(), self.literal_bits.T.tolist()))
+        self._table_list = self.table.tolist()
+
+    def _gates(self, literals):
+        x = literals
+        for weights, k in self.layers:
+            x = x @ weights >= k
+        return x[..., self._outputs]
+
+    def literals(self, lm):
+        # Literal semua gesture untuk lm: bool (..., literal_count)
+        if self.features is None:
+            return np.zeros(lm.shape[:-2] + (0,), dtype=bool)
+        literals = self.features.compare(lm)
+        if self.features.any_negate:
+            literals ^= self.features.negate
+        return literals
+
+    def evaluate(self, lm):
+        # Kondisi per frame semua gesture: bool (..., jumlah gesture)
+        if self.table is not None and self.features is not None:
+            return self.table[self.features.compare(lm) @ self.literal_bits + self.table_offsets]
+        return self._gates(self.literals(lm))
+
+    def evaluate_rows(self, lm):
+        # evaluate() untuk beberapa tangan (n, 21, 3) sebagai list per
+        # tangan. Jika semua literal adalah axis dan gerbangnya tabel,
+        # selisih koordinat, ambang dan tabel dibaca di Python dari
+        # koordinat yang dipakai saja: untuk beberapa tangan per frame lebih murah dari
+        # rangkaian operasi numpy kecil, dan hasilnya sama (selisih dua
+        # float32 eksak di float64, seperti matmul axis_matrix).
+        features = self.features
+        if self.table is None or features is None or features.operator is not None:
+            return self.evaluate(lm).tolist()
+        terms = features.axis_terms
+        table = self._table_list
+        results = []
+        for row in lm.reshape(len(lm), NUM_LANDMARKS * 3).take(features.axis_columns, axis=1).tolist():
+            hits = [sign * (row[a] - row[b]) > threshold for a, b, sign, threshold in terms]
+            results.append([table[offset + sum(compress(bits, hits))] for offset, bits in self._row_tables])
+        return results
+
+    def update(self, lm, present=None):
+        # Dengan jendela waktu. lm (21, 3) -> (jumlah gesture,), lm
+        # (capacity, 21, 3) + present mask -> (capacity, jumlah gesture).
+        # Slot tanpa tangan dihitung sebagai frame tanpa gesture.
+        raw = self.evaluate(lm)
+        if not self.temporal:
+            return raw if present is None else raw & present[:, None]
+        if present is not None:
+            raw &= present[:, None]
+        self.history = history = (self.history << 1 | raw) & self.window_mask
+        active = _POPCOUNT[history] >= self.min_frames
+        return active[0] if lm.ndim == 2 else active
+
+    def miss(self):
+        # Frame tanpa tangan di semua slot: riwayat jendela waktu bergeser
+        # tanpa gesture, tanpa mengevaluasi landmark
+        self.history = (self.history << 1) & self.window_mask
+
+    def reset(self, slots=None):
+        if slots is None:
+            self.history[:] = 0
+        else:
+            self.history[slots] = 0
+
+    def as_dict(self, active):
+        return dict(zip(self.names, active.tolist()))
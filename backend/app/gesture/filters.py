@@ -0,0 +1,238 @@
+import math
+
+
+def _parse_param(key, value):
+    # Parameter filter: angka berhingga >= 0. ValueError untuk string, bool,
+    # list, null, NaN/inf dan negatif (sama seperti parse_max_rate).
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{key} harus angka: {value!r}")
+    try:
+        value = float(value)
+    except OverflowError:
+        raise ValueError(f"{key} terlalu besar") from None
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"{key} harus angka >= 0: {value!r}")
+    return value
+
+
+class CursorFilter:
+    # Antarmuka filter cursor. update() menerima posisi mentah (0..1) dan
+    # waktu capture-nya (detik), lalu mengembalikan estimasi saat itu.
+    # predict(lead) mengekstrapolasi estimasi terakhir `lead` detik ke depan.
+
+    name = None
+    defaults = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Parameter {self.name} tidak dikenal: {', '.join(sorted(unknown))}")
+        # Parameter datang dari pesan SET_FILTER client; ditolak di sini agar
+        # string/NaN tidak baru meledak (atau lolos ke JSON) saat update()
+        for key, value in params.items():
+            params[key] = _parse_param(key, value)
+        self.params = dict(self.defaults, **params)
+        self.reset()
+
+    def reset(self):
+        raise NotImplementedError
+
+    def update(self, x, y, t):
+        raise NotImplementedError
+
+    def predict(self, lead):
+        raise NotImplementedError
+
+
+class EmaFilter(CursorFilter):
+    # EMA tetap + deadzone, perilaku lama GestureProcessor. Tanpa estimasi
+    # kecepatan, jadi predict() tidak mengekstrapolasi.
+
+    name = "ema"
+    defaults = {"alpha": 0.7, "deadzone": 0.001}
+
+    def reset(self):
+        self.x = None
+        self.y = None
+
+    def update(self, x, y, t):
+        if self.x is None:
+            self.x, self.y = x, y
+            return x, y
+
+        alpha = self.params["alpha"]
+        deadzone = self.params["deadzone"]
+        if abs(x - self.x) > deadzone or abs(y - self.y) > deadzone:
+            self.x = alpha * x + (1 - alpha) * self.x
+            self.y = alpha * y + (1 - alpha) * self.y
+        return self.x, self.y
+
+    def predict(self, lead):
+        return self.x, self.y
+
+
+def _smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter(CursorFilter):
+    # One Euro filter (Casiez et al. 2012): cutoff naik sebanding kecepatan,
+    # jadi diam -> halus, gerak cepat -> lag kecil. Kecepatan terfilter
+    # dipakai untuk ekstrapolasi.
+
+    name = "one_euro"
+    defaults = {"min_cutoff": 1.0, "beta": 20.0, "d_cutoff": 1.0}
+
+    def reset(self):
+        self.t = None
+        self.x = self.y = None
+        self.dx = self.dy = 0.0
+
+    def update(self, x, y, t):
+        if self.t is None or t <= self.t:
+            if self.t is None:
+                self.x, self.y = x, y
+            self.t = t
+            return self.x, self.y
+
+        dt = t - self.t
+        self.t = t
+        p = self.params
+
+        a_d = _smoothing_factor(dt, p["d_cutoff"])
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        self.dy += a_d * ((y - self.y) / dt - self.dy)
+
+        speed = math.hypot(self.dx, self.dy)
+        a = _smoothing_factor(dt, p["min_cutoff"] + p["beta"] * speed)
+        self.x += a * (x - self.x)
+        self.y += a * (y - self.y)
+        return self.x, self.y
+
+    def predict(self, lead):
+        if self.x is None:
+            return None, None
+        return self.x + self.dx * lead, self.y + self.dy * lead
+
+
+class KalmanFilter(CursorFilter):
+    # Kalman kecepatan konstan, satu filter [posisi, kecepatan] per sumbu.
+    # process_noise: varians akselerasi (unit/s^2)^2, measurement_noise:
+    # varians jitter landmark (unit^2).
+
+    name = "kalman"
+    defaults = {"process_noise": 0.05, "measurement_noise": 4e-6}
+
+    def reset(self):
+        self.t = None
+        # State per sumbu: [p, v, P00, P01, P11]
+        self.axes = None
+
+    def _init_axis(self, p):
+        return [p, 0.0, self.params["measurement_noise"], 0.0, 1.0]
+
+    def _step(self, axis, z, dt):
+        p, v, p00, p01, p11 = axis
+        q = self.params["process_noise"]
+        r = self.params["measurement_noise"]
+
+        # Predict dengan model kecepatan konstan, noise akselerasi diskret
+        p += v * dt
+        dt2 = dt * dt
+        p00 += dt * (2 * p01 + dt * p11) + q * dt2 * dt2 / 4
+        p01 += dt * p11 + q * dt2 * dt / 2
+        p11 += q * dt2
+
+        # Update dengan pengukuran posisi
+        s = p00 + r
+        k0 = p00 / s
+        k1 = p01 / s
+        residual = z - p
+        p += k0 * residual
+        v += k1 * residual
+        p11 -= k1 * p01
+        p01 -= k0 * p01
+        p00 -= k0 * p00
+        axis[:] = (p, v, p00, p01, p11)
+
+    def update(self, x, y, t):
+        if self.axes is None:
+            self.axes = (self._init_axis(x), self._init_axis(y))
+            self.t = t
+            return x, y
+
+        dt = t - self.t
+        if dt > 0:
+            self.t = t
+            self._step(self.axes[0], x, dt)
+            self._step(self.axes[1], y, dt)
+        return self.axes[0][0], self.axes[1][0]
+
+    def predict(self, lead):
+        if self.axes is None:
+            return None, None
+        ax, ay = self.axes
+        return ax[0] + ax[1] * lead, ay[0] + ay[1] * lead
+
+
+FILTERS = {cls.name: cls for cls in (EmaFilter, OneEuroFilter, KalmanFilter)}
+
+
+def create_filter(name, **params):
+    if name not in FILTERS:
+        raise ValueError(f"Filter tidak dikenal: {name}")
+    return FILTERS[name](**params)
+
+
+class ClientCursor:
+    # Filter cursor milik satu client, dijalankan di atas output bersama
+    # station (raw_x/raw_y). Dengan predict, cursor diekstrapolasi sebesar
+    # latency capture -> kirim yang terukur, dibatasi max_lead. Pada mode
+    # beberapa pemain tiap pemain mendapat salinan filter sendiri.
+
+    def __init__(self, cursor_filter, predict=True, max_lead=0.1):
+        self.filter = cursor_filter
+        self.player_filters = [cursor_filter]
+        self.predict = predict
+        self.max_lead = max_lead
+        self.last_lead = 0.0
+
+    def apply(self, gesture, captured_at, now):
+        players = gesture.get("players")
+        if players is None:
+            return self._apply(self.filter, gesture, captured_at, now)
+
+        while len(self.player_filters) < len(players):
+            self.player_filters.append(type(self.filter)(**self.filter.params))
+        players = [
+            self._apply(cursor_filter, player, captured_at, now)
+            for cursor_filter, player in zip(self.player_filters, players)
+        ]
+        return dict(gesture, x=players[0]["x"], y=players[0]["y"], players=players)
+
+    def _apply(self, cursor_filter, gesture, captured_at, now):
+        raw_x, raw_y = gesture.get("raw_x"), gesture.get("raw_y")
+        if gesture.get("x") is None:
+            cursor_filter.reset()
+            return gesture
+        if raw_x is None:
+            # Tangan sementara hilang: tahan estimasi terakhir filter ini
+            x, y = cursor_filter.predict(0.0)
+            if x is None:
+                return gesture
+            return dict(gesture, x=x, y=y)
+
+        x, y = cursor_filter.update(raw_x, raw_y, captured_at)
+        if self.predict:
+            self.last_lead = min(max(now - captured_at, 0.0), self.max_lead)
+            x, y = cursor_filter.predict(self.last_lead)
+        return dict(gesture, x=min(max(x, 0.0), 1.0), y=min(max(y, 0.0), 1.0))
+
+    def describe(self):
+        return {
+            "filter": self.filter.name,
+            "params": self.filter.params,
+            "predict": self.predict,
+            "max_lead": self.max_lead,
+        }
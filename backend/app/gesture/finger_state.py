@@ -1,79 +1,54 @@
 import numpy as np
+from app.gesture.landmarks import FINGERS, joint_angles
+
+# Matriks rata-rata (5, 10): dua sudut sendi per jari -> satu sudut rata-rata
+FINGER_MEAN = np.kron(np.eye(len(FINGERS)), [0.5, 0.5]).astype(np.float32)
 
 class FingerStateDetector:
-    
+
     EXTENDED_ANGLE_THRESHOLD = 0.5
     FOLDED_ANGLE_THRESHOLD = 1.0
     NEUTRAL_ANGLE_MIN = 0.3
     NEUTRAL_ANGLE_MAX = 1.2
-    
+
+    THUMB_EXTENDED_THRESHOLD = 0.6
+    THUMB_FOLDED_THRESHOLD = 0.9
+
     def __init__(self):
-        pass
-    
+        # Threshold per jari, urutan sama dengan FINGERS (thumb terakhir)
+        self.extended_thresholds = (self.EXTENDED_ANGLE_THRESHOLD,) * 4 + (self.THUMB_EXTENDED_THRESHOLD,)
+        self.folded_thresholds = (self.FOLDED_ANGLE_THRESHOLD,) * 4 + (self.THUMB_FOLDED_THRESHOLD,)
+
     def compute_angle(self, p1, p2, p3):
-        v1 = np.array([p1.x - p2.x, p1.y - p2.y, p1.z - p2.z])
-        v2 = np.array([p3.x - p2.x, p3.y - p2.y, p3.z - p2.z])
-        
-        norm1 = np.linalg.norm(v1)
-        norm2 = np.linalg.norm(v2)
-        
+        v1 = p1 - p2
+        v2 = p3 - p2
+
+        norm1 = np.sqrt(v1.dot(v1))
+        norm2 = np.sqrt(v2.dot(v2))
+
         if norm1 == 0 or norm2 == 0:
             return np.pi / 2
-        
-        v1_norm = v1 / norm1
-        v2_norm = v2 / norm2
-        
-        dot_product = np.clip(np.dot(v1_norm, v2_norm), -1.0, 1.0)
-        angle = np.arccos(dot_product)
-        
-        return angle
-    
+
+        dot_product = np.clip(v1.dot(v2) / (norm1 * norm2), -1.0, 1.0)
+        return np.arccos(dot_product)
+
+    def compute_finger_angles(self, lm):
+        # Rata-rata dua sudut sendi per jari, shape (5,)
+        return FINGER_MEAN @ joint_angles(lm)
+
+    def _classify(self, avg_angles):
+        return [
+            'EXTENDED' if angle < extended else 'FOLDED' if angle > folded else 'NEUTRAL'
+            for angle, extended, folded in zip(
+                avg_angles.tolist(), self.extended_thresholds, self.folded_thresholds
+            )
+        ]
+
     def get_finger_state(self, lm, finger_type):
-        if finger_type == 'index':
-            mcp, pip, dip, tip = lm[5], lm[6], lm[7], lm[8]
-        elif finger_type == 'middle':
-            mcp, pip, dip, tip = lm[9], lm[10], lm[11], lm[12]
-        elif finger_type == 'ring':
-            mcp, pip, dip, tip = lm[13], lm[14], lm[15], lm[16]
-        elif finger_type == 'pinky':
-            mcp, pip, dip, tip = lm[17], lm[18], lm[19], lm[20]
-        elif finger_type == 'thumb':
-            return self._get_thumb_state(lm)
-        else:
+        if finger_type not in FINGERS:
             return 'NEUTRAL'
-        
-        angle_pip = self.compute_angle(mcp, pip, dip)
-        angle_dip = self.compute_angle(pip, dip, tip)
-        
-        avg_angle = (angle_pip + angle_dip) / 2
-        
-        if avg_angle < self.EXTENDED_ANGLE_THRESHOLD:
-            return 'EXTENDED'
-        elif avg_angle > self.FOLDED_ANGLE_THRESHOLD:
-            return 'FOLDED'
-        else:
-            return 'NEUTRAL'
-    
-    def _get_thumb_state(self, lm):
-        cmc, mcp, ip, tip = lm[2], lm[3], lm[4], lm[5]
-        wrist = lm[0]
-        
-        angle_mcp = self.compute_angle(wrist, mcp, ip)
-        angle_ip = self.compute_angle(mcp, ip, tip)
-        avg_angle = (angle_mcp + angle_ip) / 2
-        
-        if avg_angle < 0.6:
-            return 'EXTENDED'
-        elif avg_angle > 0.9:
-            return 'FOLDED'
-        else:
-            return 'NEUTRAL'
-    
+        return self.get_all_finger_states(lm)[finger_type]
+
     def get_all_finger_states(self, lm):
-        return {
-            'index': self.get_finger_state(lm, 'index'),
-            'middle': self.get_finger_state(lm, 'middle'),
-            'ring': self.get_finger_state(lm, 'ring'),
-            'pinky': self.get_finger_state(lm, 'pinky'),
-            'thumb': self.get_finger_state(lm, 'thumb')
-        }
+        states = self._classify(self.compute_finger_angles(lm))
+        return dict(zip(FINGERS, states))
@@ -1,5 +1,6 @@
 import time
 from enum import Enum
+from app.gesture.windows import RollingWindow
 
 class GestureState(Enum):
     IDLE = "idle"
@@ -9,7 +10,9 @@ class GestureState(Enum):
 
 class GestureStateMachine:
     
-    def __init__(self):
+    def __init__(self, clock=time.monotonic, history_size=7):
+        self.clock = clock
+
         self.MIN_ARMED_FRAMES = 1
         self.MIN_IDLE_FRAMES = 2
         self.SHOOT_COOLDOWN = 0.3
@@ -18,23 +21,17 @@ class GestureStateMachine:
         self.ARMED_EXIT_THRESHOLD = 0.1
         
         self.current_state = GestureState.IDLE
-        self.state_history = []
-        self.history_size = 7
-        self.last_shoot_time = 0
+        self.history_size = history_size
+        self.state_history = RollingWindow(history_size)
+        self.last_shoot_time = float("-inf")
         self.armed_frame_count = 0
         self.idle_frame_count = 0
         
     def update(self, is_armed_raw, is_shoot_raw):
-        now = time.time()
-        
-        self.state_history.append(is_armed_raw)
-        if len(self.state_history) > self.history_size:
-            self.state_history.pop(0)
+        now = self.clock()
         
-        if len(self.state_history) > 0:
-            armed_ratio = sum(self.state_history) / len(self.state_history)
-        else:
-            armed_ratio = 0.0
+        self.state_history.push(is_armed_raw)
+        armed_ratio = self.state_history.mean
         
         if self.current_state == GestureState.IDLE:
             if is_armed_raw or armed_ratio >= self.ARMED_ENTER_THRESHOLD:
@@ -80,7 +77,7 @@ class GestureStateMachine:
     
     def reset(self):
         self.current_state = GestureState.IDLE
-        self.state_history = []
+        self.state_history.clear()
         self.armed_frame_count = 0
         self.idle_frame_count = 0
-        self.last_shoot_time = 0
+        self.last_shoot_time = float("-inf")
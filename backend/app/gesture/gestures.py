@@ -0,0 +1,56 @@
+from app.gesture.engine import Gesture, above, any_of, at_least, axis_delta, distance, finger
+from app.gesture.landmarks import (
+    INDEX_MCP, INDEX_PIP, INDEX_TIP, MIDDLE_MCP, MIDDLE_PIP, MIDDLE_TIP, PINKY_MCP, PINKY_PIP, PINKY_TIP,
+    RING_MCP, RING_PIP, RING_TIP, THUMB_TIP,
+)
+
+
+def _bent(tip, pip, mcp):
+    # Ujung jari di bawah PIP atau MCP (y layar), ambang seperti heuristik lama
+    return any_of(axis_delta(tip, pip, ">", 0.003), axis_delta(tip, mcp, ">", 0.002))
+
+
+# Pose pistol: telunjuk lurus ke atas, minimal dua dari tiga jari lain
+# menekuk. Ini yang menentukan armed di GestureRules.
+ARMED = Gesture(
+    "armed",
+    above(INDEX_TIP, INDEX_PIP),
+    at_least(2, _bent(MIDDLE_TIP, MIDDLE_PIP, MIDDLE_MCP), _bent(RING_TIP, RING_PIP, RING_MCP),
+             _bent(PINKY_TIP, PINKY_PIP, PINKY_MCP)),
+)
+
+# Pose pistol versi sudut sendi (tidak bergantung arah tangan)
+POINTING = Gesture(
+    "pointing",
+    finger("index", "EXTENDED", "NEUTRAL"),
+    at_least(2, *(finger(name, "NEUTRAL", "FOLDED") for name in ("middle", "ring", "pinky"))),
+)
+
+# Sudut sendi finger() mengukur sudut dalam (jari lurus ~pi), jadi status
+# EXTENDED/FOLDED-nya tidak bisa membedakan telapak terbuka dari kepalan.
+# Gesture yang dilaporkan memakai uji ujung jari vs sendi seperti ARMED
+# (tangan tegak di depan kamera).
+OPEN_PALM = Gesture(
+    "open_palm",
+    above(INDEX_TIP, INDEX_PIP), above(MIDDLE_TIP, MIDDLE_PIP), above(RING_TIP, RING_PIP),
+    above(PINKY_TIP, PINKY_PIP),
+)
+
+FIST = Gesture(
+    "fist",
+    _bent(INDEX_TIP, INDEX_PIP, INDEX_MCP), _bent(MIDDLE_TIP, MIDDLE_PIP, MIDDLE_MCP),
+    _bent(RING_TIP, RING_PIP, RING_MCP), _bent(PINKY_TIP, PINKY_PIP, PINKY_MCP),
+)
+
+# Ujung jempol dan telunjuk berdekatan, relatif terhadap ukuran tangan
+PINCH = Gesture("pinch", distance(THUMB_TIP, INDEX_TIP, "<", 0.35, scaled=True))
+
+# Telapak terbuka yang ditahan: 10 dari 12 frame terakhir
+PAUSE = Gesture("pause", OPEN_PALM.condition, window=12, min_frames=10)
+
+GESTURES = (ARMED, POINTING, OPEN_PALM, FIST, PINCH, PAUSE)
+
+# Gesture yang dilaporkan processor di samping armed/shoot: field
+# "gestures" (nama yang aktif) dan satu flag biner per gesture, urutan ini
+# menentukan bitnya (lihat protocol.GESTURE_FLAGS)
+REPORTED = (OPEN_PALM, FIST, PINCH, PAUSE)
@@ -0,0 +1,98 @@
+import math
+from itertools import chain
+from operator import attrgetter
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+WRIST = 0
+THUMB_CMC, THUMB_MCP, THUMB_IP, THUMB_TIP = 1, 2, 3, 4
+INDEX_MCP, INDEX_PIP, INDEX_DIP, INDEX_TIP = 5, 6, 7, 8
+MIDDLE_MCP, MIDDLE_PIP, MIDDLE_DIP, MIDDLE_TIP = 9, 10, 11, 12
+RING_MCP, RING_PIP, RING_DIP, RING_TIP = 13, 14, 15, 16
+PINKY_MCP, PINKY_PIP, PINKY_DIP, PINKY_TIP = 17, 18, 19, 20
+
+FINGERS = ('index', 'middle', 'ring', 'pinky', 'thumb')
+
+# Dua sudut sendi per jari, urutan sama dengan FINGERS. Sudut dihitung di titik
+# tengah setiap triplet (a, b, c). Thumb memakai wrist dan lm[5] seperti
+# implementasi FingerStateDetector sebelumnya.
+ANGLE_TRIPLETS = np.array([
+    (5, 6, 7), (6, 7, 8),
+    (9, 10, 11), (10, 11, 12),
+    (13, 14, 15), (14, 15, 16),
+    (17, 18, 19), (18, 19, 20),
+    (0, 3, 4), (3, 4, 5),
+], dtype=np.intp)
+
+PALM_INDICES = np.array([WRIST, INDEX_MCP, MIDDLE_MCP, RING_MCP, PINKY_MCP], dtype=np.intp)
+
+
+def _build_angle_operator(triplets):
+    # Matriks selisih (2N, 21): baris i = lm[a] - lm[b], baris N+i = lm[c] - lm[b].
+    # Baris-baris itu lalu disusun menjadi dua blok (3N, 21) yang ditumpuk,
+    # sehingga satu matmul + satu einsum memberi |v1|^2, |v2|^2 dan v1.v2.
+    n = len(triplets)
+    diff = np.zeros((2 * n, NUM_LANDMARKS), dtype=np.float32)
+    for i, (a, b, c) in enumerate(triplets):
+        diff[i, a] += 1
+        diff[i, b] -= 1
+        diff[n + i, c] += 1
+        diff[n + i, b] -= 1
+    left = np.concatenate([np.arange(2 * n), np.arange(n)])
+    right = np.concatenate([np.arange(2 * n), np.arange(n, 2 * n)])
+    return np.concatenate([diff[left], diff[right]])
+
+
+_ANGLE_OPERATOR = _build_angle_operator(ANGLE_TRIPLETS)
+_NUM_ANGLES = len(ANGLE_TRIPLETS)
+_xyz = attrgetter('x', 'y', 'z')
+
+
+def landmarks_to_array(landmarks, out=None):
+    # Konversi sekali per frame dari objek landmark MediaPipe ke array
+    # float32 (21, 3) yang contiguous.
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    out.reshape(-1)[:] = list(chain.from_iterable(map(_xyz, landmarks)))
+    return out
+
+
+def joint_angles(lm):
+    n = _NUM_ANGLES
+    vectors = _ANGLE_OPERATOR @ lm
+    products = np.einsum('ij,ij->i', vectors[:3 * n], vectors[3 * n:])
+    denom = np.sqrt(products[:n] * products[n:2 * n])
+
+    # Jika salah satu vektor nol, dot juga nol sehingga cos = 0 dan sudutnya
+    # pi/2, sama seperti fallback compute_angle.
+    return np.arccos(np.clip(products[2 * n:] / np.maximum(denom, 1e-30), -1.0, 1.0))
+
+
+def palm_normal(lm):
+    (wx, wy, wz), (ix, iy, iz), (px, py, pz) = lm[_NORMAL_INDICES].tolist()
+    v1x, v1y, v1z = ix - wx, iy - wy, iz - wz
+    v2x, v2y, v2z = px - wx, py - wy, pz - wz
+
+    nx = v1y * v2z - v1z * v2y
+    ny = v1z * v2x - v1x * v2z
+    nz = v1x * v2y - v1y * v2x
+    norm = math.sqrt(nx * nx + ny * ny + nz * nz)
+    if norm == 0:
+        return None
+    return np.array((nx / norm, ny / norm, nz / norm))
+
+
+def palm_center(lm):
+    return _PALM_MEAN @ lm
+
+
+def hand_scale(lm):
+    (wx, wy, wz), (mx, my, mz) = lm[_SCALE_INDICES].tolist()
+    return math.sqrt((mx - wx) ** 2 + (my - wy) ** 2 + (mz - wz) ** 2)
+
+
+_NORMAL_INDICES = np.array([WRIST, INDEX_MCP, PINKY_MCP], dtype=np.intp)
+_SCALE_INDICES = np.array([WRIST, MIDDLE_MCP], dtype=np.intp)
+_PALM_MEAN = np.zeros(NUM_LANDMARKS, dtype=np.float32)
+_PALM_MEAN[PALM_INDICES] = 1.0 / len(PALM_INDICES)
@@ -0,0 +1,99 @@
+import os
+import cv2
+import numpy as np
+
+# GESTURE_MOTION_GATE=0 mematikan gate; GESTURE_MOTION_RATIO mengatur
+# trade-off CPU vs sensitivitas (fraksi piksel yang berubah)
+MOTION_GATE_ENABLED = os.environ.get("GESTURE_MOTION_GATE", "1") != "0"
+MOTION_RATIO = float(os.environ.get("GESTURE_MOTION_RATIO", "0.002"))
+
+
+class MotionGate:
+    # Memutuskan apakah sebuah frame perlu inferensi MediaPipe dengan
+    # membandingkan versi grayscale kecilnya terhadap frame terakhir yang
+    # diinferensi (bukan frame sebelumnya, jadi gerakan lambat tetap
+    # terakumulasi sampai melewati ambang).
+    #
+    #   ada gerakan                    -> inferensi (laju penuh)
+    #   tangan ada, diam               -> pakai hasil lama, refresh tiap max_reuse detik
+    #   tangan baru hilang (< hand_timeout) -> laju penuh supaya cepat ketemu lagi
+    #   tidak ada tangan, tanpa gerak  -> deteksi ulang tiap idle_interval detik
+    #
+    # motion_ratio adalah kenop utama: makin besar, makin banyak frame dilewati
+    # tapi gerakan kecil baru terdeteksi setelah terakumulasi. Saat armed
+    # dipakai armed_ratio (default: satu piksel berubah sudah cukup) karena
+    # deteksi tembakan membandingkan posisi pergelangan antar frame yang
+    # diproses: gerakan sub-piksel yang terakumulasi bisa terbaca sebagai
+    # hentakan.
+
+    def __init__(self, size=(160, 120), pixel_threshold=12, motion_ratio=MOTION_RATIO,
+                 armed_ratio=None, idle_interval=0.2, max_reuse=0.5, hand_timeout=0.5):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.motion_ratio = motion_ratio
+        self.armed_ratio = 1.0 / (size[0] * size[1]) if armed_ratio is None else armed_ratio
+        self.idle_interval = idle_interval
+        self.max_reuse = max_reuse
+        self.hand_timeout = hand_timeout
+
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._reference = np.empty_like(self._gray)
+        self._diff = np.empty_like(self._gray)
+        self.has_reference = False
+
+        self.last_inference = None
+        self.last_hand = None
+        self.hand_visible = False
+        self.armed = False
+        self.last_motion = 0.0
+        self.inferred = 0
+        self.skipped = 0
+
+    def reset(self):
+        self.has_reference = False
+        self.last_inference = None
+        self.last_hand = None
+        self.hand_visible = False
+        self.armed = False
+
+    def should_infer(self, frame, now, force=False):
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self.has_reference:
+            cv2.absdiff(self._gray, self._reference, dst=self._diff)
+            cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+            self.last_motion = cv2.countNonZero(self._diff) / self._diff.size
+        else:
+            self.last_motion = 1.0
+
+        threshold = self.armed_ratio if self.armed else self.motion_ratio
+        if force or self.last_inference is None or self.last_motion >= threshold:
+            run = True
+        elif self.hand_visible:
+            run = now - self.last_inference >= self.max_reuse
+        elif self.last_hand is not None and now - self.last_hand < self.hand_timeout:
+            run = True
+        else:
+            run = now - self.last_inference >= self.idle_interval
+
+        if run:
+            self._reference, self._gray = self._gray, self._reference
+            self.has_reference = True
+            self.last_inference = now
+            self.inferred += 1
+        else:
+            self.skipped += 1
+        return run
+
+    def observe(self, now, has_hand, armed=False):
+        # Hasil inferensi terakhir: apakah tangan ditemukan dan armed
+        self.hand_visible = has_hand
+        self.armed = armed
+        if has_hand:
+            self.last_hand = now
+
+    def skip_ratio(self):
+        total = self.inferred + self.skipped
+        return self.skipped / total if total else 0.0
@@ -0,0 +1,305 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+MODE_ACTIVE = "active"
+MODE_PRESENCE = "presence"
+MODE_PAUSED = "paused"
+MODES = (MODE_ACTIVE, MODE_PRESENCE, MODE_PAUSED)
+
+
+class CaptureGate:
+    # Mengatur laju capture thread sesuai mode:
+    #   active   -> secepat kamera
+    #   presence -> beberapa frame per detik, cukup untuk tahu ada tangan (menu)
+    #   paused   -> thread tidur di Event sampai mode berubah, tanpa polling
+
+    def __init__(self, presence_fps=2.0):
+        self.mode = MODE_ACTIVE
+        self.presence_interval = 1.0 / presence_fps
+        self._wakeup = threading.Event()
+
+    def set_mode(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"Mode tidak dikenal: {mode}")
+        self.mode = mode
+        self._wakeup.set()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def wait_ready(self):
+        # Blok selama paused. True jika capture boleh membaca frame sekarang.
+        if self.mode != MODE_PAUSED:
+            return True
+        self._wakeup.wait()
+        self._wakeup.clear()
+        return False
+
+    def pace(self):
+        # Dipanggil setelah satu frame diambil
+        if self.mode == MODE_PRESENCE and self._wakeup.wait(self.presence_interval):
+            self._wakeup.clear()
+
+
+class LatestSlot:
+    # Slot berisi satu item saja: put() menimpa item lama yang belum diambil
+    # sehingga consumer selalu mendapat frame terbaru, bukan antrean frame basi.
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._timestamp = 0.0
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item, timestamp=None):
+        # Mengembalikan item lama yang tertimpa (None jika tidak ada)
+        with self._cond:
+            dropped = self._item
+            if dropped is not None:
+                self.dropped += 1
+            self._item = item
+            self._timestamp = time.monotonic() if timestamp is None else timestamp
+            self.put_count += 1
+            self._cond.notify()
+        return dropped
+
+    def take(self, timeout=None):
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            if self._item is None:
+                return None, None
+            item, timestamp = self._item, self._timestamp
+            self._item = None
+            return item, timestamp
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ResultPublisher:
+    # Menyerahkan hasil dari thread worker ke event loop asyncio. Hanya hasil
+    # terbaru yang disimpan; consumer menunggu lewat next_result().
+
+    def __init__(self):
+        self._loop = None
+        self._result_event = None
+        self._result = None
+        self._result_seq = 0
+        self._result_time = 0.0
+
+    def _bind_loop(self, loop=None):
+        self._loop = loop or asyncio.get_running_loop()
+        self._result_event = asyncio.Event()
+
+    def publish_threadsafe(self, gesture, captured_at):
+        # Mengembalikan False jika event loop sudah ditutup
+        try:
+            self._loop.call_soon_threadsafe(self._publish, gesture, captured_at)
+        except RuntimeError:
+            return False
+        return True
+
+    def _publish(self, gesture, captured_at):
+        self._result = gesture
+        self._result_seq += 1
+        self._result_time = captured_at
+
+        event = self._result_event
+        self._result_event = asyncio.Event()
+        event.set()
+
+    async def next_result(self, after_seq=0, timeout=None):
+        # Menunggu hasil yang lebih baru dari after_seq dan mengembalikan
+        # (seq, gesture, captured_at). Hasil lama yang terlewat tidak pernah
+        # diantrekan. captured_at memakai time.monotonic().
+        while self._result_seq <= after_seq:
+            event = self._result_event
+            if event is None:
+                return after_seq, None, None
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return after_seq, None, None
+
+        return self._result_seq, self._result, self._result_time
+
+    @property
+    def result_seq(self):
+        # Seq hasil terakhir yang diterbitkan (0 jika belum ada)
+        return self._result_seq
+
+    def result_age(self):
+        if self._result_seq == 0:
+            return None
+        return time.monotonic() - self._result_time
+
+
+class GesturePipeline(ResultPublisher):
+    # Capture thread -> LatestSlot -> inference thread -> asyncio loop.
+    # cap.read() dan hands.process() tidak pernah berjalan di thread event loop.
+
+    def __init__(self, detector, capture_retry_delay=0.01, metrics=None, presence_fps=2.0):
+        super().__init__()
+        self.detector = detector
+        self.metrics = metrics
+        self.capture_retry_delay = capture_retry_delay
+        self.gate = CaptureGate(presence_fps)
+
+        self.frame_slot = LatestSlot()
+        # Frame yang sudah diproses atau tertimpa di slot, dipakai ulang
+        # cap.read() sebagai buffer (append/pop deque aman antar thread)
+        self._free_frames = deque()
+        self._stop = threading.Event()
+        # Dilepas oleh capture thread sendiri saat keluar (stop(release=True)),
+        # jadi kamera tidak pernah ditutup di tengah grab()
+        self._release = False
+        self._capture_thread = None
+        self._inference_thread = None
+        # Capture thread yang belum selesai saat stop() menyerah menunggu
+        self._lingering = None
+
+        self.frames_captured = 0
+        self.capture_failures = 0
+        self.frames_processed = 0
+        self.inference_errors = 0
+        self.last_queue_age = 0.0
+        self.max_queue_age = 0.0
+        self.last_inference_time = 0.0
+
+    @property
+    def running(self):
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
+    @property
+    def mode(self):
+        return self.gate.mode
+
+    def set_mode(self, mode):
+        self.gate.set_mode(mode)
+
+    def start(self, loop=None):
+        if self.running:
+            return
+
+        if self._lingering is not None:
+            # Thread lama bisa masih akan melepas kamera; tunggu sebelum dibuka lagi
+            self._lingering.join()
+            self._lingering = None
+        self._bind_loop(loop)
+        self._release = False
+        self._stop.clear()
+        self.frame_slot = LatestSlot()
+        if hasattr(self.detector, "open"):
+            # Kamera bisa sudah dilepas oleh stop(release=True) saat idle
+            self.detector.open()
+
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, name="gesture-capture", daemon=True
+        )
+        self._inference_thread = threading.Thread(
+            target=self._inference_loop, name="gesture-inference", daemon=True
+        )
+        self._capture_thread.start()
+        self._inference_thread.start()
+
+    def stop(self, timeout=1.0, release=False):
+        self._release = release
+        self._stop.set()
+        self.gate.wake()
+        self.frame_slot.close()
+        for thread in (self._capture_thread, self._inference_thread):
+            if thread is not None:
+                thread.join(timeout)
+        capture = self._capture_thread
+        self._capture_thread = None
+        self._inference_thread = None
+        if capture is not None and capture.is_alive():
+            # Masih di dalam grab(): kamera dilepas oleh thread itu sendiri
+            print("Warning: capture thread belum berhenti, kamera dilepas saat thread selesai")
+            self._lingering = capture
+        elif release:
+            self.detector.release()
+
+    def _capture_loop(self):
+        try:
+            self._capture_frames()
+        finally:
+            if self._release:
+                self.detector.release()
+
+    def _capture_frames(self):
+        while not self._stop.is_set():
+            if not self.gate.wait_ready():
+                continue
+
+            buffer = self._free_frames.pop() if self._free_frames else None
+            frame = self.detector.grab(buffer)
+            if frame is None:
+                if buffer is not None:
+                    self._free_frames.append(buffer)
+                self.capture_failures += 1
+                if not self.detector.is_open():
+                    print("Warning: Kamera tertutup, capture thread berhenti")
+                    break
+                time.sleep(self.capture_retry_delay)
+                continue
+
+            self.frames_captured += 1
+            dropped = self.frame_slot.put(frame, self.detector.captured_at)
+            if dropped is not None:
+                self._free_frames.append(dropped)
+            self.gate.pace()
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            frame, captured_at = self.frame_slot.take(timeout=0.1)
+            if frame is None:
+                continue
+
+            started = time.monotonic()
+            queue_age = started - captured_at
+            self.last_queue_age = queue_age
+            if queue_age > self.max_queue_age:
+                self.max_queue_age = queue_age
+            if self.metrics is not None:
+                self.metrics.record_value("queue_wait", int(queue_age * 1e9))
+
+            try:
+                gesture = self.detector.process(frame, captured_at)
+            except Exception as e:
+                self.inference_errors += 1
+                print(f"Error processing frame: {e}")
+                continue
+            finally:
+                self._free_frames.append(frame)
+
+            self.last_inference_time = time.monotonic() - started
+            self.frames_processed += 1
+
+            if not self.publish_threadsafe(gesture, captured_at):
+                break
+
+    def stats(self):
+        result_age = self.result_age()
+        stats = {
+            "mode": self.mode,
+            "frames_captured": self.frames_captured,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frame_slot.dropped,
+            "capture_failures": self.capture_failures,
+            "inference_errors": self.inference_errors,
+            "queue_age_ms": self.last_queue_age * 1000,
+            "max_queue_age_ms": self.max_queue_age * 1000,
+            "inference_ms": self.last_inference_time * 1000,
+            "result_age_ms": None if result_age is None else result_age * 1000,
+        }
+        if hasattr(self.detector, "stats"):
+            stats["detector"] = self.detector.stats()
+        return stats
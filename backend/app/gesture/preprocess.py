@@ -0,0 +1,87 @@
+import os
+import cv2
+import numpy as np
+
+# GESTURE_MIRROR: "landmarks" (default) menjalankan inferensi pada frame
+# kamera apa adanya lalu mencerminkan x landmark; "image" membalik gambar
+# inferensi seperti cara lama (setelah diperkecil, in-place)
+MIRROR_MODE = os.environ.get("GESTURE_MIRROR", "landmarks")
+MIRROR_MODES = ("landmarks", "image")
+
+_SWAPPED_HANDEDNESS = {"Left": "Right", "Right": "Left"}
+
+
+class FrameBuffer:
+    # Buffer uint8 yang hanya tumbuh. view() memberi array kontigu dengan
+    # shape yang diminta di awal buffer, jadi crop ROI yang ukurannya
+    # berubah tiap frame tetap tidak mengalokasikan gambar baru.
+
+    def __init__(self):
+        self._data = np.empty(0, dtype=np.uint8)
+
+    def view(self, shape):
+        size = shape[0] * shape[1] * shape[2]
+        if size > self._data.size:
+            self._data = np.empty(size, dtype=np.uint8)
+        return self._data[:size].reshape(shape)
+
+
+class FramePreprocessor:
+    # Frame kamera BGR (belum di-mirror) -> gambar RGB untuk backend, ditulis
+    # ke buffer yang dipakai ulang (tidak ada alokasi gambar per frame).
+    # Box ROI masuk dan landmark keluar selalu dalam koordinat tampilan
+    # (sudah di-mirror), apa pun mode-nya. Crop dan resize selalu dikerjakan
+    # pada frame kamera, jadi frame penuh tidak pernah dibalik:
+    #
+    #   landmarks -> gambar inferensi tidak dibalik; x landmark hasil
+    #                dicerminkan (1 - x)
+    #   image     -> gambar inferensi (sudah kecil) dibalik in-place setelah
+    #                cvtColor, landmark keluar seperti cara lama
+    #
+    # MediaPipe mengasumsikan input selfie (mirror), jadi di mode landmarks
+    # label handedness ikut ditukar.
+
+    def __init__(self, mirror=MIRROR_MODE):
+        if mirror not in MIRROR_MODES:
+            raise ValueError(f"Mode mirror tidak dikenal: {mirror}")
+        self.mirror = mirror
+        self._resized = FrameBuffer()
+        self._rgb = FrameBuffer()
+        # Box crop terakhir dalam koordinat gambar yang diinferensi, untuk
+        # HandRoi.to_full_frame
+        self.source_box = None
+
+    def prepare(self, frame, box=None, long_side=None):
+        # box: crop ROI (koordinat tampilan) yang diskalakan sehingga sisi
+        # panjangnya long_side. Tanpa box: frame penuh, diperkecil jika sisi
+        # panjangnya melebihi long_side.
+        region = frame
+        self.source_box = box
+        if box is not None:
+            x0, y0, x1, y1 = box
+            w = frame.shape[1]
+            region = frame[y0:y1, w - x1:w - x0]
+            if self.mirror == "landmarks":
+                self.source_box = (w - x1, y0, w - x0, y1)
+
+        rh, rw = region.shape[:2]
+        if long_side is not None and (box is not None or max(rw, rh) > long_side):
+            scale = long_side / max(rw, rh)
+            size = max(1, round(rw * scale)), max(1, round(rh * scale))
+            region = cv2.resize(region, size, dst=self._resized.view((size[1], size[0], 3)),
+                                interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(region, cv2.COLOR_BGR2RGB, dst=self._rgb.view(region.shape))
+        if self.mirror == "image":
+            cv2.flip(rgb, 1, dst=rgb)
+        return rgb
+
+    def mirror_landmarks(self, lm):
+        # In-place, setelah landmark dipetakan ke frame penuh
+        if self.mirror == "landmarks":
+            np.subtract(1.0, lm[:, 0], out=lm[:, 0])
+        return lm
+
+    def mirror_handedness(self, handedness):
+        if self.mirror == "landmarks":
+            return _SWAPPED_HANDEDNESS.get(handedness, handedness)
+        return handedness
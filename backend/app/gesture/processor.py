@@ -0,0 +1,197 @@
+import time
+from itertools import compress
+import numpy as np
+from app.gesture.engine import GestureEngine
+from app.gesture.filters import EmaFilter
+from app.gesture.gestures import REPORTED
+from app.gesture.landmarks import INDEX_TIP, NUM_LANDMARKS, palm_center
+from app.gesture.classifier import create_rules
+from app.gesture.tracking import HandTracker
+
+PLAYER_FIELDS = ("x", "y", "armed", "shoot", "gestures", "raw_x", "raw_y")
+
+class GestureProcessor:
+    # Bagian GestureDetector yang tidak butuh kamera maupun MediaPipe:
+    # rules, state machine, filter cursor dan penanganan frame yang hilang.
+    # Input per frame adalah array landmark (21, 3) atau None. rules:
+    # GestureRules atau ClassifierRules; default lewat create_rules()
+    # (GESTURE_CLASSIFIER). "gestures": nama gesture yang aktif dari
+    # GestureEngine atas `gestures` (default REPORTED, termasuk jendela waktu
+    # seperti PAUSE); gestures=() mematikannya, field tetap list kosong.
+
+    def __init__(self, clock=time.monotonic, cursor_filter=None, rules=None, gestures=REPORTED):
+        self.clock = clock
+        self.rules = rules or create_rules(clock)
+        self.gestures = GestureEngine(gestures) if gestures else None
+
+        # Default EMA alpha 0.7 + deadzone 0.001 seperti sebelumnya; client
+        # bisa memilih filter sendiri di atas raw_x/raw_y (lihat ClientCursor)
+        self.cursor_filter = cursor_filter or EmaFilter()
+        
+        self.last_valid_x = None
+        self.last_valid_y = None
+        self.last_valid_armed = False
+        self.loss_frame_count = 0
+        self.max_loss_frames = 5
+
+    def _compute_directional_cursor(self, lm, is_armed):
+        # Cursor mengikuti ujung telunjuk, baik armed maupun tidak
+        return float(lm[INDEX_TIP, 0]), float(lm[INDEX_TIP, 1])
+
+    def update(self, lm):
+        data = {
+            "x": None,
+            "y": None,
+            "armed": False,
+            "shoot": False,
+            "gestures": [],
+            "raw_x": None,
+            "raw_y": None
+        }
+
+        if lm is None:
+            if self.gestures is not None:
+                self.gestures.miss()
+            self.loss_frame_count += 1
+            
+            if self.loss_frame_count <= self.max_loss_frames and self.last_valid_x is not None:
+                data["x"] = self.last_valid_x
+                data["y"] = self.last_valid_y
+                data["armed"] = self.last_valid_armed
+                return data
+            else:
+                if self.loss_frame_count > self.max_loss_frames:
+                    self.rules.reset()
+                    self.cursor_filter.reset()
+                    if self.gestures is not None:
+                        self.gestures.reset()
+                    self.last_valid_x = None
+                    self.last_valid_y = None
+                    self.last_valid_armed = False
+                return data
+
+        self.loss_frame_count = 0
+
+        armed = self.rules.is_armed(lm)
+        
+        raw_x, raw_y = self._compute_directional_cursor(lm, armed)
+        
+        smooth_x, smooth_y = self.cursor_filter.update(raw_x, raw_y, self.clock())
+
+        data["x"] = smooth_x
+        data["y"] = smooth_y
+        data["raw_x"] = raw_x
+        data["raw_y"] = raw_y
+        data["armed"] = armed
+        if self.gestures is not None:
+            data["gestures"] = list(compress(self.gestures.names, self.gestures.update(lm).tolist()))
+
+        if armed:
+            data["shoot"] = self.rules.detect_shoot(lm, armed)
+        else:
+            self.rules.reset()
+
+        self.last_valid_x = data["x"]
+        self.last_valid_y = data["y"]
+        self.last_valid_armed = data["armed"]
+
+        return data
+
+
+def any_player(data, key):
+    # True jika salah satu pemain (atau data satu tangan) punya key truthy
+    players = data.get("players")
+    if players is None:
+        return bool(data.get(key))
+    return any(player[key] for player in players)
+
+
+class MultiHandProcessor:
+    # GestureProcessor untuk beberapa pemain di satu kamera. HandTracker
+    # memetakan tangan dari backend ke slot pemain; rules semua slot adalah
+    # satu objek batch (create_rules(slots=...): BatchedGestureRules, atau
+    # classifier jika GESTURE_CLASSIFIER diisi) dengan state per slot dalam
+    # array, dievaluasi sekali per frame untuk semua slot; begitu juga
+    # GestureEngine REPORTED (satu baris riwayat per slot). Filter cursor dan
+    # penanganan frame hilang per slot.
+    # Output: field pemain 0 di level atas (kompatibel dengan client satu
+    # pemain) plus "players".
+
+    def __init__(self, max_hands=2, clock=time.monotonic, make_filter=EmaFilter, rules=None):
+        self.clock = clock
+        self.max_hands = max_hands
+        self.max_loss_frames = 5
+        self.tracker = HandTracker(max_hands=max_hands, max_loss_frames=self.max_loss_frames)
+        self.rules = rules or create_rules(clock, slots=max_hands)
+        self.gestures = GestureEngine(REPORTED, capacity=max_hands)
+        self.cursor_filters = [make_filter() for _ in range(max_hands)]
+
+        # Landmark frame ini: urutan deteksi, lalu per slot untuk rules
+        self.detected = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.landmarks = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.present = np.zeros(max_hands, dtype=bool)
+        self.last_valid = [None] * max_hands
+        self.loss_frame_count = [0] * max_hands
+
+    def _reset_slot(self, slot):
+        self.rules.reset(slot)
+        self.gestures.reset(slot)
+        self.cursor_filters[slot].reset()
+        self.last_valid[slot] = None
+
+    def update(self, hands):
+        # hands: list (landmark (21, 3), handedness atau None)
+        count = len(hands)
+        if count > len(self.detected):
+            self.detected = np.zeros((count, NUM_LANDMARKS, 3), dtype=np.float32)
+        detected = self.detected[:count]
+        for row, (lm, _) in enumerate(hands):
+            detected[row] = lm
+        centers = palm_center(detected)[:, :2].tolist() if count > 1 else None
+
+        slots, started = self.tracker.update(hands, centers)
+        for slot in started:
+            self._reset_slot(slot)
+        detections = self.tracker.detections
+        armed = shoot = tips = active = None
+        if not count:
+            self.gestures.miss()
+        else:
+            # Satu update() rules untuk semua slot, urutan sama dengan
+            # GestureProcessor.update (rules, lalu filter cursor)
+            for slot, lm in enumerate(slots):
+                if lm is not None:
+                    self.landmarks[slot] = lm
+            self.present[:] = [d is not None for d in detections]
+            armed, shoot = self.rules.update(self.present, self.landmarks)
+            armed, shoot = armed.tolist(), shoot.tolist()
+            names = self.gestures.names
+            active = [list(compress(names, row)) for row in self.gestures.update(self.landmarks, self.present).tolist()]
+            tips = self.landmarks[:, INDEX_TIP, :2].tolist()
+            now = self.clock()
+
+        players = []
+        for slot, (d, track) in enumerate(zip(detections, self.tracker.slots)):
+            if d is not None:
+                self.loss_frame_count[slot] = 0
+                raw_x, raw_y = tips[slot]
+                x, y = self.cursor_filters[slot].update(raw_x, raw_y, now)
+                self.last_valid[slot] = (x, y, armed[slot])
+                players.append({"player": slot, "track": track.id, "x": x, "y": y,
+                                "armed": armed[slot], "shoot": shoot[slot], "gestures": active[slot],
+                                "raw_x": raw_x, "raw_y": raw_y})
+                continue
+
+            x = y = None
+            slot_armed = False
+            self.loss_frame_count[slot] += 1
+            if self.loss_frame_count[slot] <= self.max_loss_frames and self.last_valid[slot] is not None:
+                x, y, slot_armed = self.last_valid[slot]
+            elif self.loss_frame_count[slot] > self.max_loss_frames and self.last_valid[slot] is not None:
+                self._reset_slot(slot)
+            players.append({"player": slot, "track": track.id if track is not None else None, "x": x, "y": y,
+                            "armed": slot_armed, "shoot": False, "gestures": [], "raw_x": None, "raw_y": None})
+
+        data = {key: players[0][key] for key in PLAYER_FIELDS}
+        data["players"] = players
+        return data
@@ -0,0 +1,195 @@
+import argparse
+import struct
+import numpy as np
+from app.gesture.landmarks import NUM_LANDMARKS
+
+# Format file rekaman (.grec):
+#   header 16 byte: magic "GREC", versi (u16), ukuran record (u16), 8 byte cadangan
+#   lalu record berukuran tetap RECORD_DTYPE, little-endian, tanpa kompresi.
+# Ukuran record tetap membuat file bisa dibuka langsung dengan np.memmap dan
+# jumlah frame cukup dihitung dari ukuran file, jadi header tidak perlu
+# ditulis ulang saat rekaman ditutup.
+
+MAGIC = b"GREC"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+
+FLAG_HAS_HAND = 1
+FLAG_HAS_XY = 2
+FLAG_ARMED = 4
+FLAG_SHOOT = 8
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("flags", "u1"),
+    ("reserved", "u1", (3,)),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 3)),
+])
+
+
+class SessionRecorder:
+    # Menulis frame secara streaming. Record dikumpulkan dalam buffer numpy
+    # lalu ditulis per blok supaya loop deteksi tidak melakukan write() per frame.
+
+    def __init__(self, path, flush_every=256):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self._buffer = np.zeros(flush_every, dtype=RECORD_DTYPE)
+        self._pending = 0
+        self.frames_written = 0
+
+    def write(self, timestamp, landmarks, gesture):
+        record = self._buffer[self._pending]
+        flags = 0
+
+        if landmarks is not None:
+            flags |= FLAG_HAS_HAND
+            record["landmarks"] = landmarks
+        else:
+            record["landmarks"] = 0
+
+        if gesture.get("x") is not None and gesture.get("y") is not None:
+            flags |= FLAG_HAS_XY
+            record["x"] = gesture["x"]
+            record["y"] = gesture["y"]
+        else:
+            record["x"] = 0
+            record["y"] = 0
+
+        if gesture.get("armed"):
+            flags |= FLAG_ARMED
+        if gesture.get("shoot"):
+            flags |= FLAG_SHOOT
+
+        record["timestamp"] = timestamp
+        record["flags"] = flags
+
+        self._pending += 1
+        self.frames_written += 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_session(path):
+    # Mengembalikan np.memmap read-only berisi RECORD_DTYPE; tidak ada data
+    # yang disalin ke memori sampai record benar-benar dibaca.
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+
+    if len(header) < HEADER.size:
+        raise ValueError(f"File rekaman terlalu pendek: {path}")
+
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Bukan file rekaman gesture: {path}")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Versi rekaman tidak didukung: {version} (record {record_size} byte)")
+
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size)
+
+
+def recorded_gesture(record):
+    flags = int(record["flags"])
+    has_xy = bool(flags & FLAG_HAS_XY)
+    return {
+        "x": float(record["x"]) if has_xy else None,
+        "y": float(record["y"]) if has_xy else None,
+        "armed": bool(flags & FLAG_ARMED),
+        "shoot": bool(flags & FLAG_SHOOT),
+    }
+
+
+def record_synthetic(path, seconds=60.0, fps=30.0, seed=0, start_time=1000.0, rest=0.0,
+                     truth=False, scale=1.0, roll=0.0, yaw=0.0):
+    # Membuat sesi rekaman tanpa kamera dari SyntheticHand, dengan output
+    # GestureProcessor sebagai ground truth. truth: flag armed/shoot diambil
+    # dari maksud generator (SyntheticHand.truth), untuk label training.
+    from app.gesture.processor import GestureProcessor
+    from app.gesture.synthetic import SyntheticHand
+
+    hand = SyntheticHand(seed=seed, rest=rest, scale=scale, roll=roll, yaw=yaw)
+    clock = [start_time]
+    processor = GestureProcessor(clock=lambda: clock[0])
+
+    with SessionRecorder(path) as recorder:
+        for i in range(int(seconds * fps)):
+            t = i / fps
+            clock[0] = start_time + t
+            lm = hand.landmarks(t)
+            gesture = processor.update(lm)
+            if truth:
+                armed, shoot = hand.truth(t) or (False, False)
+                gesture = dict(gesture, armed=armed, shoot=shoot)
+            recorder.write(clock[0], lm, gesture)
+        return recorder.frames_written
+
+
+def record_camera(path, seconds=None):
+    from app.gesture.detector import GestureDetector
+
+    detector = GestureDetector()
+    detector.recorder = SessionRecorder(path)
+    print(f"Merekam ke {path}. Tekan Ctrl+C untuk berhenti")
+
+    start = detector.frame_timestamp
+    try:
+        while seconds is None or detector.frame_timestamp - start < seconds:
+            if detector.read() is None:
+                print("Gagal baca frame")
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.recorder.close()
+        detector.release()
+
+    print(f"{detector.recorder.frames_written} frame tersimpan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rekam sesi landmark gesture ke file .grec")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    camera = sub.add_parser("camera", help="rekam dari webcam")
+    camera.add_argument("output")
+    camera.add_argument("--seconds", type=float, default=None)
+
+    synthetic = sub.add_parser("synthetic", help="buat sesi sintetis tanpa kamera")
+    synthetic.add_argument("output")
+    synthetic.add_argument("--seconds", type=float, default=60.0)
+    synthetic.add_argument("--fps", type=float, default=30.0)
+    synthetic.add_argument("--seed", type=int, default=0)
+    synthetic.add_argument("--rest", type=float, default=0.0, help="detik diam per siklus 8 detik")
+    synthetic.add_argument("--truth", action="store_true", help="label armed/shoot dari generator, bukan dari rules")
+    synthetic.add_argument("--scale", type=float, default=1.0, help="ukuran tangan relatif")
+    synthetic.add_argument("--roll", type=float, default=0.0, help="kemiringan tangan di bidang gambar (derajat)")
+    synthetic.add_argument("--yaw", type=float, default=0.0, help="putaran tangan menyamping (derajat)")
+
+    args = parser.parse_args()
+    if args.command == "camera":
+        record_camera(args.output, args.seconds)
+    else:
+        count = record_synthetic(args.output, args.seconds, args.fps, args.seed, rest=args.rest,
+                                 truth=args.truth, scale=args.scale, roll=args.roll, yaw=args.yaw)
+        print(f"{count} frame tersimpan ke {args.output}")
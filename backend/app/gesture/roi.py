@@ -0,0 +1,78 @@
+class AdaptiveResolution:
+    # Memilih ukuran inferensi dari daftar `sizes` berdasarkan EMA waktu
+    # hands.process per frame. Turun satu tingkat jika melewati budget, naik
+    # lagi jika jauh di bawah budget selama beberapa frame (hysteresis).
+
+    def __init__(self, sizes=(128, 160, 192, 224, 256), budget_ms=20.0,
+                 alpha=0.2, upgrade_ratio=0.6, hold_frames=15):
+        self.sizes = tuple(sorted(sizes))
+        self.budget = budget_ms / 1000.0
+        self.alpha = alpha
+        self.upgrade_ratio = upgrade_ratio
+        self.hold_frames = hold_frames
+
+        self.level = len(self.sizes) - 1
+        self.elapsed_ema = None
+        self.frames_since_change = 0
+
+    @property
+    def size(self):
+        return self.sizes[self.level]
+
+    def update(self, elapsed):
+        if self.elapsed_ema is None:
+            self.elapsed_ema = elapsed
+        else:
+            self.elapsed_ema = self.alpha * elapsed + (1 - self.alpha) * self.elapsed_ema
+
+        self.frames_since_change += 1
+        if self.frames_since_change < self.hold_frames:
+            return
+
+        if self.elapsed_ema > self.budget and self.level > 0:
+            self.level -= 1
+            self.frames_since_change = 0
+        elif self.elapsed_ema < self.budget * self.upgrade_ratio and self.level < len(self.sizes) - 1:
+            self.level += 1
+            self.frames_since_change = 0
+
+
+class HandRoi:
+    # Bounding box tangan dari landmark frame sebelumnya, diberi padding agar
+    # gerakan antar frame tetap berada di dalam crop.
+
+    def __init__(self, padding=0.4, min_fraction=0.15):
+        self.padding = padding
+        self.min_fraction = min_fraction
+
+    def box(self, lm, frame_w, frame_h):
+        xs = lm[:, 0] * frame_w
+        ys = lm[:, 1] * frame_h
+        x_min, x_max = float(xs.min()), float(xs.max())
+        y_min, y_max = float(ys.min()), float(ys.max())
+
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+        side = max(side, self.min_fraction * max(frame_w, frame_h))
+        cx = (x_min + x_max) / 2
+        cy = (y_min + y_max) / 2
+
+        x0 = int(max(0, cx - side / 2))
+        y0 = int(max(0, cy - side / 2))
+        x1 = int(min(frame_w, cx + side / 2))
+        y1 = int(min(frame_h, cy + side / 2))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def to_full_frame(self, lm, box, frame_w, frame_h):
+        # Landmark hasil inferensi ternormalisasi terhadap crop; ubah in-place
+        # menjadi ternormalisasi terhadap frame penuh. z MediaPipe memakai skala
+        # lebar gambar sehingga ikut diskalakan dengan lebar crop.
+        x0, y0, x1, y1 = box
+        scale_x = (x1 - x0) / frame_w
+        scale_y = (y1 - y0) / frame_h
+        lm[:, 0] = lm[:, 0] * scale_x + x0 / frame_w
+        lm[:, 1] = lm[:, 1] * scale_y + y0 / frame_h
+        lm[:, 2] *= scale_x
+        return lm
+
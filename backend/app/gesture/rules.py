@@ -1,26 +1,62 @@
 import time
 import numpy as np
-from app.gesture.finger_state import FingerStateDetector
+from app.gesture.engine import GestureEngine
 from app.gesture.gesture_state import GestureStateMachine
+from app.gesture import gestures
+from app.gesture.landmarks import hand_scale, palm_center
 from app.gesture.orientation import HandOrientationDetector
+from app.gesture.windows import RollingWindow
+
+# Dikompilasi sekali; evaluate() tanpa state sehingga dipakai bersama
+ARMED_RULES = GestureEngine([gestures.ARMED])
+
+# Ambang gerakan (SHOOT_THRESHOLD dkk.) dinyatakan per frame pada FPS ini.
+# Delta wrist diukur atas rentang waktu sekitar satu interval referensi dan
+# diskalakan dengan rentang sebenarnya, jadi hentakan yang sama terdeteksi
+# sama di 15, 30 atau 60 FPS.
+REFERENCE_FPS = 30.0
+REFERENCE_INTERVAL = 1.0 / REFERENCE_FPS
+# Frame yang lebih dekat dari ini ke sampel wrist pembanding dilewati (di 60
+# FPS tiap frame kedua), jadi noise landmark per frame tidak ikut terskala
+# naik dan jumlah perbandingan per detik sama dengan 30 FPS
+MIN_MOTION_SPAN = 0.75 * REFERENCE_INTERVAL
+# Jeda frame lebih dari ini (detik) memutus perbandingan dengan posisi wrist
+# sebelumnya; timestamp yang tidak maju juga tidak dibandingkan
+MAX_FRAME_GAP = 0.25
+# Output shoot bertahan selama ini setelah tembakan (2 frame di 30 FPS);
+# frame armed pertama sesudahnya dilewati tanpa deteksi
+SHOOT_HOLD = 1.5 * REFERENCE_INTERVAL
+
+
+def motion_scale(dt):
+    # Pengali delta wrist atas rentang dt ke satuan frame REFERENCE_FPS;
+    # None jika dt tidak bisa dipakai
+    if 0.0 < dt <= MAX_FRAME_GAP:
+        return REFERENCE_INTERVAL / dt
+    return None
+
 
 class GestureRules:
     
-    def __init__(self):
+    def __init__(self, clock=time.monotonic, velocity_window=5, state_window=7, orientation_window=5):
+        # clock: timestamp capture frame yang sedang diproses (lihat
+        # GestureDetector.process); cooldown dan kecepatan dihitung darinya
+        self.clock = clock
+
         self.SHOOT_COOLDOWN = 0.3
         self.SHOOT_THRESHOLD = 0.002
         self.MIN_VELOCITY_THRESHOLD = 0.0015
         
         self.prev_wrist_y = None
         self.prev_index_y = None
-        self.velocity_buffer = []
-        self.velocity_buffer_size = 5
+        self.prev_time = None
+        self.velocity_buffer_size = velocity_window
+        self.velocity_buffer = RollingWindow(velocity_window)
         self.shoot_detected = False
-        self.shoot_frame_count = 0
+        self.shoot_time = None
         
-        self.finger_detector = FingerStateDetector()
-        self.state_machine = GestureStateMachine()
-        self.orientation_detector = HandOrientationDetector()
+        self.state_machine = GestureStateMachine(clock=clock, history_size=state_window)
+        self.orientation_detector = HandOrientationDetector(history_size=orientation_window)
         
         self.palm_center = None
         self.hand_scale = None
@@ -28,93 +64,58 @@ class GestureRules:
     def reset(self):
         self.prev_wrist_y = None
         self.prev_index_y = None
-        self.velocity_buffer = []
+        self.prev_time = None
+        self.velocity_buffer.clear()
         self.shoot_detected = False
-        self.shoot_frame_count = 0
+        self.shoot_time = None
         self.state_machine.reset()
         self.palm_center = None
         self.hand_scale = None
 
     def _normalize_landmarks(self, lm):
-        wrist = lm[0]
-        index_mcp = lm[5]
-        middle_mcp = lm[9]
-        ring_mcp = lm[13]
-        pinky_mcp = lm[17]
-        
-        palm_center = np.array([
-            (wrist.x + index_mcp.x + middle_mcp.x + ring_mcp.x + pinky_mcp.x) / 5,
-            (wrist.y + index_mcp.y + middle_mcp.y + ring_mcp.y + pinky_mcp.y) / 5,
-            (wrist.z + index_mcp.z + middle_mcp.z + ring_mcp.z + pinky_mcp.z) / 5
-        ])
-        
-        wrist_pos = np.array([wrist.x, wrist.y, wrist.z])
-        middle_mcp_pos = np.array([middle_mcp.x, middle_mcp.y, middle_mcp.z])
-        hand_scale = np.linalg.norm(middle_mcp_pos - wrist_pos)
-        
-        self.palm_center = palm_center
-        self.hand_scale = max(hand_scale, 0.01)
-        
-        return palm_center, hand_scale
+        center = palm_center(lm)
+        scale = hand_scale(lm)
+
+        self.palm_center = center
+        self.hand_scale = max(scale, 0.01)
+
+        return center, scale
 
     def is_armed(self, lm):
-        try:
-            finger_states = self.finger_detector.get_all_finger_states(lm)
-            
-            index_not_folded = finger_states['index'] != 'FOLDED'
-            middle_folded = finger_states['middle'] in ['FOLDED', 'NEUTRAL']
-            ring_folded = finger_states['ring'] in ['FOLDED', 'NEUTRAL']
-            pinky_folded = finger_states['pinky'] in ['FOLDED', 'NEUTRAL']
-            
-            folded_count = sum([middle_folded, ring_folded, pinky_folded])
-            is_armed_angle = (index_not_folded and folded_count >= 2)
-        except:
-            is_armed_angle = False
-        
-        index_tip, index_mid, index_pip = lm[8], lm[6], lm[5]
-        middle_tip, middle_mid, middle_pip = lm[12], lm[10], lm[9]
-        ring_tip, ring_mid, ring_pip = lm[16], lm[14], lm[13]
-        pinky_tip, pinky_mid, pinky_pip = lm[20], lm[18], lm[17]
-        
-        index_straight = index_tip.y < index_mid.y
-        
-        middle_bent = (middle_tip.y - middle_mid.y) > 0.003 or (middle_tip.y - middle_pip.y) > 0.002
-        ring_bent = (ring_tip.y - ring_mid.y) > 0.003 or (ring_tip.y - ring_pip.y) > 0.002
-        pinky_bent = (pinky_tip.y - pinky_mid.y) > 0.003 or (pinky_tip.y - pinky_pip.y) > 0.002
-        
-        bent_count = sum([middle_bent, ring_bent, pinky_bent])
-        is_armed_distance = index_straight and bent_count >= 2
-        
-        is_armed_raw = is_armed_distance
-        
+        # Pose pistol dari deklarasi ARMED (app.gesture.gestures)
+        is_armed_raw = bool(ARMED_RULES.evaluate(lm)[0])
+
         current_state, is_armed_stable, _ = self.state_machine.update(is_armed_raw, False)
-        
+
         return is_armed_raw
 
     def detect_shoot(self, lm, is_armed_current):
-        wrist = lm[0]
-        index_tip = lm[8]
-        now = time.time()
+        wrist_y = float(lm[0, 1])
+        index_tip_y = float(lm[8, 1])
+        now = self.clock()
 
         if self.shoot_detected:
-            self.shoot_frame_count += 1
-            if self.shoot_frame_count >= 2:
+            if now - self.shoot_time >= SHOOT_HOLD:
                 self.shoot_detected = False
-                self.shoot_frame_count = 0
+                self.shoot_time = None
                 return False
             return True
 
+        scale = None
         if self.prev_wrist_y is not None:
-            delta_y = self.prev_wrist_y - wrist.y
+            span = now - self.prev_time
+            if 0.0 < span < MIN_MOTION_SPAN:
+                # Tetap membandingkan dengan sampel yang sama di frame berikutnya
+                return False
+            scale = motion_scale(span)
+        if scale is not None:
+            delta_y = (self.prev_wrist_y - wrist_y) * scale
             
-            self.velocity_buffer.append(abs(delta_y))
-            if len(self.velocity_buffer) > self.velocity_buffer_size:
-                self.velocity_buffer.pop(0)
+            self.velocity_buffer.push(abs(delta_y))
             
             if len(self.velocity_buffer) >= 3:
-                velocities = np.array(self.velocity_buffer)
-                max_velocity = np.max(velocities)
-                std_velocity = np.std(velocities)
+                max_velocity = self.velocity_buffer.max
+                std_velocity = self.velocity_buffer.std
             else:
                 max_velocity = abs(delta_y)
                 std_velocity = 0
@@ -129,8 +130,7 @@ class GestureRules:
             
             is_accelerating = False
             if len(self.velocity_buffer) >= 2:
-                recent_velocities = self.velocity_buffer[-2:]
-                is_accelerating = recent_velocities[-1] > recent_velocities[0] * 1.2
+                is_accelerating = self.velocity_buffer[-1] > self.velocity_buffer[-2] * 1.2
 
             is_shoot_raw = (
                 (is_moving_down or is_moving_up) and
@@ -144,13 +144,169 @@ class GestureRules:
             )
             
             if is_shoot_raw and is_armed_current:
-                self.prev_wrist_y = wrist.y
-                self.prev_index_y = index_tip.y
-                self.velocity_buffer = []
+                self.prev_wrist_y = wrist_y
+                self.prev_index_y = index_tip_y
+                self.prev_time = now
+                self.velocity_buffer.clear()
                 self.shoot_detected = True
-                self.shoot_frame_count = 0
+                self.shoot_time = now
                 return True
 
-        self.prev_wrist_y = wrist.y
-        self.prev_index_y = index_tip.y
+        self.prev_wrist_y = wrist_y
+        self.prev_index_y = index_tip_y
+        self.prev_time = now
         return False
+
+
+# Baris BatchedGestureRules.state, satu kolom per slot: waktu tembakan
+# terakhir, waktu tembakan yang output-nya sedang ditahan (selain itu NaN),
+# lalu waktu dan y wrist sampel pembanding
+LAST_SHOT, SHOT, PREVIOUS, PREVIOUS_WRIST = range(4)
+# Nilai state setelah reset: belum pernah menembak, tidak ada output shoot
+# yang ditahan, belum ada sampel wrist
+RESET_STATE = np.array([-np.inf, np.nan, np.nan, np.nan])
+# Bit kode keputusan per slot. Enam bit pertama adalah elapsed > batas untuk
+# baris state LAST_SHOT, SHOT dan PREVIOUS (NaN selalu False):
+#   COOLDOWN_OVER  now - LAST_SHOT > SHOOT_COOLDOWN
+#   SHOT_PENDING   SHOT bukan NaN (output shoot ditahan atau baru lepas)
+#   SPAN_POSITIVE  dt > 0 ke sampel wrist pembanding
+#   HOLD_OVER      now - SHOT >= SHOOT_HOLD
+#   SPAN_MIN       dt >= MIN_MOTION_SPAN
+#   SPAN_FAR       dt > MAX_FRAME_GAP
+# lalu |delta wrist| > SHOOT_THRESHOLD dan armed
+(COOLDOWN_OVER, SHOT_PENDING, SPAN_POSITIVE, HOLD_OVER, SPAN_MIN, SPAN_FAR, MOTION, IS_ARMED) = range(8)
+# Aksi per baris state: tetap atau isi nilai frame ini (now atau y wrist)
+STORE_NONE = (False, False, False, False)
+STORE_WRIST = (False, False, True, True)
+# Sampai sekian slot (dua pemain) ARMED_RULES dievaluasi per baris di
+# Python (evaluate_rows), di atasnya dengan tabel numpy (evaluate) yang
+# biayanya hampir tetap
+ROW_EVALUATE_SLOTS = 2
+
+
+class BatchedGestureRules:
+    # GestureRules untuk banyak tangan sekaligus: pemain di satu kamera
+    # (MultiHandProcessor) dan sesi ingest (ratusan sampai ribuan). State
+    # tiap slot disimpan dalam array dan satu update() mengevaluasi semua
+    # tangan dengan operasi numpy, tanpa loop Python per tangan.
+    #
+    # Hanya bagian yang menentukan output yang dihitung. GestureProcessor
+    # mereset rules di setiap frame tidak armed, jadi riwayat state machine
+    # hanya berisi frame armed dan state machine selalu ARMED ketika
+    # hentakan lolos cooldown; satu-satunya pengaruhnya ke output adalah
+    # last_shoot_time, yaitu waktu tembakan terakhir sejak reset (baris
+    # LAST_SHOT). Buffer kecepatan juga tidak ikut memutuskan armed/shoot.
+    #
+    # Array sekecil ini didominasi overhead per operasi numpy, bukan jumlah
+    # slot, jadi percabangan detect_shoot dijadikan tabel: kondisi tiap slot
+    # dikumpulkan sebagai bit satu byte kode keputusan, lalu tabel yang
+    # dibangun dari _decide() (versi skalar) memberi output shoot dan baris
+    # state yang diisi.
+
+    def __init__(self, capacity, clock=time.monotonic):
+        # clock() boleh mengembalikan array (capacity,) berisi timestamp
+        # capture per slot, mis. untuk sesi ingest dengan jam client masing-masing
+        self.clock = clock
+
+        # Sama dengan GestureRules dan GestureStateMachine
+        self.SHOOT_COOLDOWN = 0.3
+        self.SHOOT_THRESHOLD = 0.002
+
+        # Batas elapsed (baris LAST_SHOT, SHOT, PREVIOUS) untuk bit 0..2 dan
+        # (SHOT, PREVIOUS) untuk bit 3..4; ">=" ditulis sebagai "> float
+        # sebelumnya"
+        self.limits = np.array([self.SHOOT_COOLDOWN, -np.inf, 0.0])[:, None]
+        self.upper_limits = np.array([
+            np.nextafter(SHOOT_HOLD, -np.inf), np.nextafter(MIN_MOTION_SPAN, -np.inf),
+        ])[:, None]
+        self._build_tables()
+
+        self.capacity = 0
+        self.state = np.zeros((len(RESET_STATE), 0))
+        self.resize(capacity)
+
+    def _decide(self, code):
+        # detect_shoot untuk satu kode keputusan tangan armed. Mengembalikan
+        # output shoot dan baris state yang diisi nilai frame ini.
+        bit = [bool(code >> i & 1) for i in range(IS_ARMED + 1)]
+        if not bit[IS_ARMED]:
+            return False, STORE_NONE
+        if bit[SHOT_PENDING]:
+            # Output ditahan selama SHOOT_HOLD; frame armed pertama
+            # sesudahnya dilewati tanpa deteksi (SHOT dikosongkan di update)
+            return not bit[HOLD_OVER], STORE_NONE
+        if bit[SPAN_POSITIVE] and not bit[SPAN_MIN]:
+            # Terlalu dekat dengan sampel pembanding: tunggu frame berikutnya
+            return False, STORE_NONE
+        if bit[SPAN_MIN] and not bit[SPAN_FAR] and bit[MOTION] and bit[COOLDOWN_OVER]:
+            return True, (True, True, True, True)
+        return False, STORE_WRIST
+
+    def _build_tables(self):
+        self.shoot_table = np.zeros(256, dtype=bool)
+        self.store_table = np.zeros((256, len(RESET_STATE)), dtype=bool)
+        for code in range(256):
+            self.shoot_table[code], self.store_table[code] = self._decide(code)
+
+    def resize(self, capacity):
+        # State slot lama dipertahankan, slot baru mulai dari awal
+        # (dipakai sesi ingest yang jumlahnya tumbuh)
+        keep = min(self.capacity, capacity)
+        state = np.repeat(RESET_STATE[:, None], capacity, axis=1)
+        state[:, :keep] = self.state[:, :keep]
+        self.state = state
+        self.capacity = capacity
+        self._bits = np.zeros((IS_ARMED + 1, capacity), dtype=bool)
+        self._stored = np.zeros((len(RESET_STATE), capacity))
+
+    def reset(self, slots):
+        # slots: indeks atau mask boolean
+        self.state.T[slots] = RESET_STATE
+
+    def update(self, present, lm, slots=None):
+        # present: mask slot yang punya tangan frame ini, lm: (n, 21, 3).
+        # slots: indeks slot untuk baris present/lm (mis. hanya sesi ingest
+        # yang punya frame baru); None berarti semua slot. State baris itu
+        # dikumpulkan, diperbarui, lalu ditulis kembali. Mengembalikan mask
+        # armed dan shoot per baris; armed bisa berupa buffer internal yang
+        # ditimpa update() berikutnya.
+        now = self.clock()
+        if slots is None:
+            state, bits, stored = self.state, self._bits, self._stored
+        else:
+            state = self.state[:, slots]
+            bits = np.empty((IS_ARMED + 1, len(slots)), dtype=bool)
+            stored = np.empty(state.shape)
+            if np.ndim(now):
+                now = now[slots]
+        armed = bits[IS_ARMED]
+        if len(lm) <= ROW_EVALUATE_SLOTS:
+            armed[:] = [row[0] for row in ARMED_RULES.evaluate_rows(lm)]
+        else:
+            armed[:] = ARMED_RULES.evaluate(lm)[:, 0]
+        armed &= present
+        wrist = lm[:, 0, 1]
+
+        elapsed = now - state[:PREVIOUS_WRIST]
+        np.greater(elapsed, self.limits, out=bits[:HOLD_OVER])
+        np.greater(elapsed[SHOT:], self.upper_limits, out=bits[HOLD_OVER:SPAN_FAR])
+        np.greater(elapsed[PREVIOUS], MAX_FRAME_GAP, out=bits[SPAN_FAR])
+        # motion_scale() untuk semua slot; dt di luar rentang tidak dipakai
+        # (bit SPAN_*) dan dibatasi supaya tidak dibagi nol. |delta| >
+        # ambang sama dengan "turun atau naik" di GestureRules.
+        dt = np.maximum(elapsed[PREVIOUS], MIN_MOTION_SPAN)
+        np.greater(np.abs((state[PREVIOUS_WRIST] - wrist) * (REFERENCE_INTERVAL / dt)), self.SHOOT_THRESHOLD,
+                   out=bits[MOTION])
+
+        code = np.packbits(bits, axis=0, bitorder="little")[0]
+        shoot = self.shoot_table[code]
+        stored[:PREVIOUS_WRIST] = now
+        stored[PREVIOUS_WRIST] = wrist
+        np.copyto(state, stored, where=self.store_table[code].T)
+        # Output shoot yang lepas dari SHOOT_HOLD, lalu reset seperti
+        # GestureProcessor untuk tangan yang tidak armed
+        np.copyto(state[SHOT], np.nan, where=armed & bits[HOLD_OVER])
+        np.copyto(state, RESET_STATE[:, None], where=present ^ armed)
+        if slots is not None:
+            self.state[:, slots] = state
+        return armed, shoot
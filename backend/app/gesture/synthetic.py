@@ -0,0 +1,231 @@
+import time
+import cv2
+import numpy as np
+from app.gesture.processor import GestureProcessor, MultiHandProcessor
+
+# Pose tangan "pistol" dalam koordinat ternormalisasi (y ke bawah):
+# telunjuk lurus ke atas, jari tengah/manis/kelingking menekuk.
+GUN_POSE = np.array([
+    (0.500, 0.800, 0.000),
+    (0.450, 0.750, -0.010), (0.420, 0.700, -0.015), (0.400, 0.660, -0.020), (0.390, 0.620, -0.025),
+    (0.470, 0.620, -0.010), (0.470, 0.550, -0.015), (0.470, 0.500, -0.020), (0.470, 0.450, -0.025),
+    (0.500, 0.620, -0.010), (0.500, 0.570, -0.015), (0.510, 0.600, -0.020), (0.505, 0.640, -0.020),
+    (0.530, 0.630, -0.010), (0.530, 0.580, -0.015), (0.535, 0.610, -0.020), (0.532, 0.650, -0.020),
+    (0.560, 0.650, -0.010), (0.560, 0.610, -0.015), (0.565, 0.635, -0.020), (0.562, 0.660, -0.020),
+], dtype=np.float32)
+
+# Telapak terbuka: semua jari lurus ke atas
+OPEN_POSE = GUN_POSE.copy()
+OPEN_POSE[9:13] = [(0.500, 0.620, -0.010), (0.500, 0.550, -0.015), (0.500, 0.500, -0.020), (0.500, 0.450, -0.025)]
+OPEN_POSE[13:17] = [(0.530, 0.630, -0.010), (0.530, 0.560, -0.015), (0.530, 0.515, -0.020), (0.530, 0.470, -0.025)]
+OPEN_POSE[17:21] = [(0.560, 0.650, -0.010), (0.560, 0.595, -0.015), (0.560, 0.560, -0.020), (0.560, 0.525, -0.025)]
+
+# Tulang tangan (pasangan indeks landmark) untuk menggambar frame sintetis
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def transform_pose(pose, scale=1.0, roll=0.0, yaw=0.0):
+    # Pose diskalakan dan diputar di sekitar pusat telapak: roll di bidang
+    # gambar (derajat, tangan miring), yaw di sumbu vertikal (tangan
+    # menyamping ke kamera)
+    center = pose[[0, 5, 9, 13, 17]].mean(axis=0)
+    x, y, z = (pose - center).T
+    a, b = np.radians(yaw), np.radians(roll)
+    x, z = x * np.cos(a) - z * np.sin(a), x * np.sin(a) + z * np.cos(a)
+    x, y = x * np.cos(b) - y * np.sin(b), x * np.sin(b) + y * np.cos(b)
+    return (center + scale * np.stack([x, y, z], axis=1)).astype(np.float32)
+
+
+class SyntheticHand:
+    # Generator landmark deterministik untuk benchmark dan replay tanpa kamera.
+    # Siklus: tangan hilang, telapak terbuka, lalu pose pistol yang membidik
+    # sambil sesekali menembak (hentakan cepat ke atas). `rest` detik di akhir
+    # tiap siklus tangan diam membidik tanpa menembak. scale/roll/yaw mengubah
+    # bentuk tangan (tangan kecil, miring, menyamping); hentakan tembakan
+    # ikut diskalakan.
+
+    def __init__(self, seed=0, noise=0.0005, cycle=8.0, shoot_interval=1.5, rest=0.0,
+                 scale=1.0, roll=0.0, yaw=0.0):
+        self.rng = np.random.default_rng(seed)
+        self.noise = noise
+        self.cycle = cycle
+        self.shoot_interval = shoot_interval
+        self.rest = rest
+        self.scale = scale
+        self.gun_pose, self.open_pose = GUN_POSE, OPEN_POSE
+        if (scale, roll, yaw) != (1.0, 0.0, 0.0):
+            self.gun_pose = transform_pose(GUN_POSE, scale, roll, yaw)
+            self.open_pose = transform_pose(OPEN_POSE, scale, roll, yaw)
+
+    def truth(self, t):
+        # Maksud generator pada waktu t: None (tangan hilang) atau
+        # (armed, shoot), shoot selama hentakan terlihat (frame pertama
+        # hentakan belum bergeser)
+        phase = t % self.cycle
+        if phase < 0.5:
+            return None
+        if phase < 1.5:
+            return False, False
+        resting = self.rest and phase >= self.cycle - self.rest
+        return True, bool(not resting and 1e-6 < (phase - 1.5) % self.shoot_interval < 0.1)
+
+    def landmarks(self, t):
+        phase = t % self.cycle
+        if phase < 0.5:
+            return None
+
+        gun = phase >= 1.5
+        lm = (self.gun_pose if gun else self.open_pose).copy()
+
+        resting = self.rest and phase >= self.cycle - self.rest
+        if resting:
+            # Posisi dibekukan di awal fase diam
+            t -= phase - (self.cycle - self.rest)
+
+        lm[:, 0] += 0.15 * np.sin(t * 0.7)
+        lm[:, 1] += 0.08 * np.sin(t * 0.5)
+
+        if gun and not resting:
+            shoot_phase = (phase - 1.5) % self.shoot_interval
+            if shoot_phase < 0.1:
+                lm[:, 1] -= 0.4 * self.scale * shoot_phase
+
+        if self.noise:
+            lm += self.rng.normal(0.0, self.noise, lm.shape).astype(np.float32)
+        return lm
+
+
+class SyntheticPlayers:
+    # Beberapa SyntheticHand berdampingan untuk mode beberapa pemain. Pemain
+    # digeser horizontal dan siklusnya berbeda supaya tembakan tidak
+    # serempak; pemain 0 sama persis dengan SyntheticHand(seed).
+
+    def __init__(self, count, seed=0, noise=0.0005, spacing=0.45):
+        self.players = [
+            (SyntheticHand(seed=seed + i, noise=noise, cycle=8.0 + i),
+             (i - (count - 1) / 2) * spacing)
+            for i in range(count)
+        ]
+
+    def landmarks(self, t):
+        # Landmark per pemain (None jika tangannya tidak terlihat)
+        result = []
+        for hand, offset in self.players:
+            lm = hand.landmarks(t)
+            if lm is not None:
+                lm[:, 0] += offset
+            result.append(lm)
+        return result
+
+    def hands(self, t):
+        # list (landmark, handedness) pemain yang tangannya terlihat
+        return [
+            (lm, "Right" if offset > 0 else "Left")
+            for lm, (_, offset) in zip(self.landmarks(t), self.players)
+            if lm is not None
+        ]
+
+
+class HandRenderer:
+    # Menggambar landmark sebagai kerangka tangan di atas background statis
+    # bertekstur dengan noise sensor, supaya kode berbasis piksel (motion
+    # gate, preprocessing) bisa diuji tanpa kamera.
+
+    def __init__(self, shape=(480, 640, 3), noise=2.0, seed=0, noise_frames=8):
+        rng = np.random.default_rng(seed)
+        height, width = shape[:2]
+        coarse = rng.integers(40, 200, (height // 40, width // 40, 3), dtype=np.uint8)
+        background = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_LINEAR)
+
+        # Noise dibuat sekali lalu dipakai bergiliran (murah per frame)
+        self.backgrounds = [
+            np.clip(background + rng.normal(0.0, noise, shape), 0, 255).astype(np.uint8)
+            for _ in range(noise_frames)
+        ]
+        self.shape = tuple(shape)
+        self.count = 0
+
+    def render(self, lm, out=None):
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        np.copyto(out, self.backgrounds[self.count % len(self.backgrounds)])
+        self.count += 1
+        if lm is None:
+            return out
+
+        height, width = self.shape[:2]
+        points = [(int(x * width), int(y * height)) for x, y in lm[:, :2].tolist()]
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(out, points[a], points[b], (140, 170, 215), 12, cv2.LINE_AA)
+        for point in points:
+            cv2.circle(out, point, 7, (120, 150, 200), -1, cv2.LINE_AA)
+        return out
+
+
+class SyntheticDetector:
+    # Pengganti GestureDetector tanpa kamera dan MediaPipe: grab() memberi
+    # frame kosong pada laju `fps`, process() membakar CPU selama `work_ms`
+    # (meniru inferensi) lalu menjalankan rules pada landmark SyntheticHand.
+    # Pose tangan dan clock rules mengikuti timestamp capture seperti
+    # GestureDetector. players > 1: beberapa tangan lewat MultiHandProcessor.
+
+    def __init__(self, fps=30.0, work_ms=0.0, seed=0, shape=(480, 640, 3), players=1):
+        self.start = time.monotonic()
+        self.frame_timestamp = self.captured_at = self.start
+        clock = lambda: self.frame_timestamp
+        self.hand = SyntheticHand(seed=seed)
+        self.processor = GestureProcessor(clock=clock)
+        self.players = SyntheticPlayers(players, seed=seed) if players > 1 else None
+        self.multi = MultiHandProcessor(players, clock=clock) if players > 1 else None
+        self.interval = 1.0 / fps if fps else 0.0
+        self.work_ms = work_ms
+        self.frame = np.zeros(shape, dtype=np.uint8)
+        self.next_time = self.start
+        self.opened = True
+
+    def open(self):
+        if not self.opened:
+            self.opened = True
+            self.next_time = time.monotonic()
+
+    def is_open(self):
+        return self.opened
+
+    def warm_up(self):
+        return 0.0
+
+    def grab(self, out=None):
+        if not self.opened:
+            return None
+        if self.interval:
+            self.next_time += self.interval
+            delay = self.next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.next_time = time.monotonic()
+        self.captured_at = time.monotonic()
+        return self.frame
+
+    def process(self, frame, timestamp=None):
+        self.frame_timestamp = time.monotonic() if timestamp is None else timestamp
+        if self.work_ms:
+            deadline = time.perf_counter() + self.work_ms / 1000
+            while time.perf_counter() < deadline:
+                pass
+        t = self.frame_timestamp - self.start
+        if self.multi is not None:
+            return self.multi.update(self.players.hands(t))
+        return self.processor.update(self.hand.landmarks(t))
+
+    def release(self):
+        self.opened = False
+
+    def stats(self):
+        return {"synthetic": True, "work_ms": self.work_ms, "players": self.multi.max_hands if self.multi else 1}
@@ -0,0 +1,105 @@
+from app.gesture.landmarks import palm_center
+
+
+class HandTrack:
+    __slots__ = ("id", "slot", "handedness", "center", "lost")
+
+    def __init__(self, track_id, slot, handedness, center):
+        self.id = track_id
+        self.slot = slot
+        self.handedness = handedness
+        self.center = center
+        self.lost = 0
+
+
+class HandTracker:
+    # Memberi ID stabil ke tangan yang terdeteksi antar frame. Deteksi
+    # dipasangkan ke track lama berdasarkan jarak pusat telapak (x, y) plus
+    # penalti jika handedness berbeda, greedy dari pasangan termurah (jumlah
+    # tangan kecil, jadi tidak perlu Hungarian). Track yang tidak terpasang
+    # bertahan max_loss_frames frame sebelum dilepas. Tangan baru mengambil
+    # slot kosong terkecil, jadi slot = nomor pemain selama track hidup.
+
+    def __init__(self, max_hands=2, max_distance=0.25, handedness_penalty=0.15, max_loss_frames=5):
+        self.max_hands = max_hands
+        self.max_distance = max_distance
+        self.handedness_penalty = handedness_penalty
+        self.max_loss_frames = max_loss_frames
+        self.slots = [None] * max_hands
+        # Indeks deteksi (urutan input update) per slot frame ini
+        self.detections = [None] * max_hands
+        self.next_id = 1
+
+    def reset(self):
+        self.slots = [None] * self.max_hands
+        self.detections = [None] * self.max_hands
+
+    def _cost(self, track, center, handedness):
+        cost = ((track.center[0] - center[0]) ** 2 + (track.center[1] - center[1]) ** 2) ** 0.5
+        if track.handedness and handedness and track.handedness != handedness:
+            cost += self.handedness_penalty
+        return cost
+
+    def update(self, hands, centers=None):
+        # hands: list (landmark (21, 3), handedness atau None). Mengembalikan
+        # landmark per slot (None jika tidak terlihat) dan slot yang baru
+        # memulai track (state pemain di slot itu harus direset). centers:
+        # pusat telapak (x, y) per tangan jika sudah dihitung pemanggil.
+        if centers is None:
+            centers = [palm_center(lm)[:2].tolist() for lm, _ in hands]
+        tracks = [track for track in self.slots if track is not None]
+
+        pairs = sorted(
+            (self._cost(track, center, handedness), t, d)
+            for t, track in enumerate(tracks)
+            for d, (center, (_, handedness)) in enumerate(zip(centers, hands))
+        )
+        track_for = [None] * len(hands)
+        matched = set()
+        for cost, t, d in pairs:
+            if cost > self.max_distance:
+                break
+            if t in matched or track_for[d] is not None:
+                continue
+            matched.add(t)
+            track_for[d] = tracks[t]
+
+        for t, track in enumerate(tracks):
+            if t not in matched:
+                track.lost += 1
+                if track.lost > self.max_loss_frames:
+                    self.slots[track.slot] = None
+
+        started = []
+        detections = [None] * self.max_hands
+        for d, (lm, handedness) in enumerate(hands):
+            track = track_for[d]
+            if track is None:
+                slot = self._free_slot()
+                if slot is None:
+                    continue
+                track = HandTrack(self.next_id, slot, handedness, centers[d])
+                self.next_id += 1
+                self.slots[slot] = track
+                started.append(slot)
+            track.center = centers[d]
+            track.lost = 0
+            if handedness:
+                track.handedness = handedness
+            detections[track.slot] = d
+
+        self.detections = detections
+        return [hands[d][0] if d is not None else None for d in detections], started
+
+    def _free_slot(self):
+        for slot, track in enumerate(self.slots):
+            if track is None:
+                return slot
+        # Semua slot terisi: ambil slot track yang paling lama hilang
+        lost = [track for track in self.slots if track.lost > 0]
+        if not lost:
+            return None
+        return max(lost, key=lambda track: track.lost).slot
+
+    def track_ids(self):
+        return [track.id if track is not None else None for track in self.slots]
@@ -0,0 +1,162 @@
+import math
+from collections import deque
+
+
+class RollingWindow:
+    # Jendela geser berkapasitas tetap untuk angka. push() O(1): jumlah,
+    # mean dan varians (Welford) diperbarui saat nilai masuk dan keluar,
+    # max memakai deque monoton (amortized O(1)). Tidak ada list baru per frame.
+
+    # Setelah sekian kali eviction, sum/M2 dihitung ulang dari isi buffer
+    # supaya galat floating point tidak menumpuk
+    RESYNC_EVERY = 1024
+    # M2 sekecil ini relatif terhadap skala nilai berarti jendela hampir
+    # konstan; sisa pembatalan Welford bisa lebih besar dari varians aslinya
+    NEAR_CONSTANT = 1e-8
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity harus >= 1")
+        self.capacity = capacity
+        self._values = [0.0] * capacity
+        self._start = 0
+        self._count = 0
+        self._max = deque()
+        self._pushed = 0
+        self._evictions = 0
+        self._peak = 0.0
+        self.sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        # Indeks relatif dari yang terlama (0) atau terbaru (-1)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index di luar jendela")
+        return self._values[(self._start + index) % self.capacity]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._values[(self._start + i) % self.capacity]
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+        self._max.clear()
+        self._peak = 0.0
+        self.sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value):
+        value = float(value)
+        if self._count == self.capacity:
+            self._evict()
+
+        self._values[(self._start + self._count) % self.capacity] = value
+        self._count += 1
+        self._pushed += 1
+        if abs(value) > self._peak:
+            self._peak = abs(value)
+
+        self.sum += value
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self._pushed, value))
+
+    def _evict(self):
+        old = self._values[self._start]
+        self._start = (self._start + 1) % self.capacity
+        self._count -= 1
+        # Nomor urut nilai terlama yang masih ada di jendela
+        if self._max[0][0] <= self._pushed - self._count:
+            self._max.popleft()
+
+        self._evictions += 1
+        if self._count == 0:
+            self.sum = self._mean = self._m2 = self._peak = 0.0
+        elif self._evictions % self.RESYNC_EVERY == 0:
+            self._resync()
+        else:
+            self.sum -= old
+            delta = old - self._mean
+            self._mean -= delta / self._count
+            self._m2 -= delta * (old - self._mean)
+
+    def _resync(self):
+        values = list(self)
+        self.sum = math.fsum(values)
+        self._mean = self.sum / len(values)
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in values)
+        self._peak = max(map(abs, values))
+
+    @property
+    def mean(self):
+        # sum / n (bukan mean Welford) agar sama persis dengan sum(list) / len
+        return self.sum / self._count if self._count else 0.0
+
+    @property
+    def variance(self):
+        # Varians populasi, sama seperti np.var / np.std default
+        if self._count == 0:
+            return 0.0
+        if self._m2 < self.NEAR_CONSTANT * self._peak * self._peak * self._count:
+            self._resync()
+        return max(self._m2, 0.0) / self._count
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+
+class RollingMode:
+    # Jendela geser untuk label kategori dengan modus O(1) per push
+    # (jumlah kategori kecil dan tetap). Jika seri, modus lama dipertahankan
+    # sehingga hasilnya deterministik.
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity harus >= 1")
+        self.capacity = capacity
+        self._values = deque()
+        self._counts = {}
+        self.mode = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        self._values.clear()
+        self._counts.clear()
+        self.mode = None
+
+    def push(self, value):
+        counts = self._counts
+        if len(self._values) == self.capacity:
+            old = self._values.popleft()
+            counts[old] -= 1
+            if old == self.mode:
+                best = counts[old]
+                for label, count in counts.items():
+                    if count > best:
+                        self.mode, best = label, count
+
+        self._values.append(value)
+        count = counts.get(value, 0) + 1
+        counts[value] = count
+        if self.mode is None or count > counts[self.mode]:
+            self.mode = value
+        return self.mode
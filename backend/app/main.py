@@ -1,15 +1,27 @@
 import asyncio
+import os
 import websockets
-from app.websocket.handler import handler
+from app.metrics import METRICS_PORT, serve_metrics
+from app.websocket.handler import handler, metrics, telemetry
+from app.websocket.ingest import INGEST_PATH
+
+PORT = int(os.environ.get("GESTURE_PORT", "8765"))
 
 async def main():
     print("=" * 50)
     print("Math Shooter Backend")
     print("=" * 50)
-    print("Backend aktif di ws://localhost:8765")
-    print("Menunggu koneksi client...")
-    print("=" * 50)
-    async with websockets.serve(handler, "localhost", 8765):
+    if metrics is not None and METRICS_PORT:
+        metrics_server = await serve_metrics(metrics, METRICS_PORT)
+        print(f"Metrics aktif di http://localhost:{METRICS_PORT}/metrics")
+    if telemetry is not None:
+        print(f"Telemetri sesi ditulis ke {telemetry.path}")
+    # Kamera dan model baru dimuat saat client pertama terhubung
+    async with websockets.serve(handler, "localhost", PORT):
+        print(f"Backend aktif di ws://localhost:{PORT}")
+        print(f"Mode ingest landmark di ws://localhost:{PORT}{INGEST_PATH}")
+        print("Menunggu koneksi client...")
+        print("=" * 50)
         await asyncio.Future()
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+
+# Instrumentasi latency per stage. Matikan dengan GESTURE_METRICS=0: semua
+# titik ukur memeriksa `metrics is not None` sehingga tidak ada biaya sama
+# sekali saat nonaktif. GESTURE_METRICS_PORT=<port> membuka endpoint teks
+# lokal (format Prometheus) untuk diambil oleh scraper atau curl.
+METRICS_ENABLED = os.environ.get("GESTURE_METRICS", "1") != "0"
+METRICS_PORT = int(os.environ.get("GESTURE_METRICS_PORT", "0") or 0)
+
+# Bucket log-linear ala HDR histogram dalam mikrodetik: nilai < 32 us
+# disimpan persis, di atasnya setiap pangkat dua dibagi 16 sub-bucket
+# (presisi relatif ~6%). 400 bucket mencakup hingga > 100 detik.
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+EXACT_LIMIT = 2 * SUB_BUCKETS
+NUM_BUCKETS = 400
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def bucket_index(us):
+    if us < EXACT_LIMIT:
+        return us
+    shift = us.bit_length() - SUB_BUCKET_BITS - 1
+    index = (shift << SUB_BUCKET_BITS) + (us >> shift)
+    return index if index < NUM_BUCKETS else NUM_BUCKETS - 1
+
+
+def bucket_value(index):
+    # Nilai tengah bucket dalam mikrodetik
+    if index < EXACT_LIMIT:
+        return float(index)
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = index - (shift << SUB_BUCKET_BITS)
+    return ((mantissa << shift) + ((mantissa + 1) << shift)) / 2
+
+
+class RollingHistogram:
+    # Histogram per jendela waktu; snapshot menggabungkan `windows` jendela
+    # terakhir sehingga persentil mencerminkan kondisi terkini saja.
+
+    def __init__(self, window=10.0, windows=6):
+        self.window_ns = int(window * 1e9)
+        self.windows = windows
+        self.counts = [[0] * NUM_BUCKETS for _ in range(windows)]
+        self.maxima = [0] * windows
+        self.window_ids = [None] * windows
+        self.slot = 0
+
+    def record(self, value_ns, now_ns):
+        window_id = now_ns // self.window_ns
+        if window_id != self.window_ids[self.slot]:
+            self._rotate(window_id)
+
+        us = value_ns // 1000 if value_ns > 0 else 0
+        self.counts[self.slot][bucket_index(us)] += 1
+        if us > self.maxima[self.slot]:
+            self.maxima[self.slot] = us
+
+    def _rotate(self, window_id):
+        self.slot = window_id % self.windows
+        if self.window_ids[self.slot] != window_id:
+            self.counts[self.slot] = [0] * NUM_BUCKETS
+            self.maxima[self.slot] = 0
+            self.window_ids[self.slot] = window_id
+
+    def snapshot(self, now_ns=None):
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        oldest = now_ns // self.window_ns - self.windows + 1
+
+        merged = [0] * NUM_BUCKETS
+        maximum = 0
+        for slot in range(self.windows):
+            window_id = self.window_ids[slot]
+            if window_id is None or window_id < oldest:
+                continue
+            for i, count in enumerate(self.counts[slot]):
+                if count:
+                    merged[i] += count
+            maximum = max(maximum, self.maxima[slot])
+
+        total = sum(merged)
+        result = {"count": total, "max_ms": maximum / 1000}
+        if total == 0:
+            for q in QUANTILES:
+                result[f"p{q * 100:g}_ms"] = None
+            result["mean_ms"] = None
+            return result
+
+        mean = sum(bucket_value(i) * c for i, c in enumerate(merged) if c) / total
+        result["mean_ms"] = mean / 1000
+
+        targets = [(q, q * total) for q in QUANTILES]
+        seen = 0
+        for i, count in enumerate(merged):
+            if not count:
+                continue
+            seen += count
+            while targets and seen >= targets[0][1]:
+                q, _ = targets.pop(0)
+                result[f"p{q * 100:g}_ms"] = min(bucket_value(i), maximum) / 1000
+            if not targets:
+                break
+        return result
+
+
+class StageMetrics:
+
+    def __init__(self, window=10.0, windows=6):
+        self.window = window
+        self.windows = windows
+        self.histograms = {}
+
+    def _histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = RollingHistogram(self.window, self.windows)
+        return histogram
+
+    def record(self, stage, start_ns):
+        # Catat durasi dari start_ns (time.perf_counter_ns) sampai sekarang
+        now = time.perf_counter_ns()
+        self._histogram(stage).record(now - start_ns, now)
+
+    def record_value(self, stage, value_ns):
+        self._histogram(stage).record(value_ns, time.perf_counter_ns())
+
+    def snapshot(self):
+        now = time.perf_counter_ns()
+        return {stage: h.snapshot(now) for stage, h in sorted(self.histograms.items())}
+
+    def render_text(self):
+        lines = [
+            "# TYPE gesture_stage_latency_ms summary",
+        ]
+        for stage, snap in self.snapshot().items():
+            for q in QUANTILES:
+                value = snap[f"p{q * 100:g}_ms"]
+                if value is not None:
+                    lines.append(f'gesture_stage_latency_ms{{stage="{stage}",quantile="{q:g}"}} {value:.3f}')
+            lines.append(f'gesture_stage_latency_ms_max{{stage="{stage}"}} {snap["max_ms"]:.3f}')
+            lines.append(f'gesture_stage_latency_ms_count{{stage="{stage}"}} {snap["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+def create_metrics():
+    return StageMetrics() if METRICS_ENABLED else None
+
+
+async def serve_metrics(metrics, port, host="localhost"):
+    # Endpoint HTTP minimal: setiap GET dibalas dengan render_text()
+    async def handle(reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+
+        body = metrics.render_text().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/plain; version=0.0.4\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Connection: close\r\n\r\n" + body
+        )
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,198 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from app.gesture.capture import SyntheticCapture, create_capture
+from app.gesture.pipeline import CaptureGate, ResultPublisher
+from app.station.ring import FrameRing
+from app.station.worker import run_worker
+
+
+class Station(ResultPublisher):
+    # Satu play station: capture thread di proses utama menulis frame ke
+    # FrameRing, satu proses worker menjalankan inferensi + rules, dan hasilnya
+    # diterbitkan ke event loop dengan antarmuka yang sama seperti GesturePipeline.
+
+    def __init__(self, station_id, source, shape=(480, 640, 3), slots=4,
+                 inference="mediapipe", fps=30.0, metrics=None, presence_fps=2.0):
+        super().__init__()
+        self.station_id = station_id
+        self.source = source
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.inference = inference
+        self.fps = fps
+        self.metrics = metrics
+
+        self.gate = CaptureGate(presence_fps)
+        self.ring = None
+        self.process = None
+        self._stop = threading.Event()
+        self._threads = []
+
+        self.frames_captured = 0
+        self.capture_failures = 0
+        self.frames_processed = 0
+        self.worker_skipped = 0
+        self.worker_torn = 0
+        self.last_inference_time = 0.0
+        self.last_result_latency = 0.0
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive()
+
+    @property
+    def mode(self):
+        return self.gate.mode
+
+    def set_mode(self, mode):
+        self.gate.set_mode(mode)
+
+    def start(self, loop=None):
+        if self.running:
+            return
+
+        self._bind_loop(loop)
+        self._stop.clear()
+
+        ctx = mp.get_context("spawn")
+        self.ring = FrameRing(self.shape, self.slots)
+        self._frame_ready = ctx.Event()
+        self._worker_stop = ctx.Event()
+        self._results = ctx.Queue(maxsize=8)
+        self.process = ctx.Process(
+            target=run_worker,
+            args=(self.ring.spec(), self._frame_ready, self._results, self._worker_stop, self.inference),
+            name=f"station-{self.station_id}",
+            daemon=True,
+        )
+        self.process.start()
+
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name=f"station-{self.station_id}-capture", daemon=True),
+            threading.Thread(target=self._result_loop, name=f"station-{self.station_id}-results", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=2.0, release=True):
+        # Worker dan sumber video selalu dilepas; `release` hanya untuk
+        # antarmuka yang sama dengan GesturePipeline.stop()
+        self._stop.set()
+        self.gate.wake()
+        if self.process is not None:
+            self._worker_stop.set()
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def _open_capture(self):
+        # Sumber rekaman (video, direktori gambar, synthetic) diputar pada
+        # FPS station, bukan secepat decode
+        if self.source == "synthetic":
+            cap = SyntheticCapture(self.shape, self.fps)
+        else:
+            cap = create_capture(self.source)
+            if not cap.live:
+                cap.fps = self.fps
+        cap.open()
+        return cap
+
+    def _capture_loop(self):
+        try:
+            cap = self._open_capture()
+        except RuntimeError as e:
+            print(f"Station {self.station_id}: {e}")
+            return
+
+        height, width = self.shape[:2]
+
+        try:
+            while not self._stop.is_set():
+                if not self.gate.wait_ready():
+                    continue
+
+                seq, slot = self.ring.next_slot()
+                ret, frame = cap.read(image=slot)
+                if not ret:
+                    self.capture_failures += 1
+                    time.sleep(0.01)
+                    continue
+
+                if frame is not slot:
+                    if frame.shape != self.shape:
+                        cv2.resize(frame, (width, height), dst=slot)
+                    else:
+                        np.copyto(slot, frame)
+
+                self.ring.commit(seq, cap.timestamp)
+                self._frame_ready.set()
+                self.frames_captured += 1
+                self.gate.pace()
+        finally:
+            cap.release()
+
+    def _result_loop(self):
+        while not self._stop.is_set():
+            try:
+                seq, gesture, captured_at, inference_time, skipped, torn = self._results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            self.frames_processed += 1
+            self.worker_skipped = skipped
+            self.worker_torn = torn
+            self.last_inference_time = inference_time
+            self.last_result_latency = time.monotonic() - captured_at
+            if self.metrics is not None:
+                self.metrics.record_value(f"station_{self.station_id}_latency", int(self.last_result_latency * 1e9))
+
+            if not self.publish_threadsafe(gesture, captured_at):
+                break
+
+    def stats(self):
+        return {
+            "station": self.station_id,
+            "mode": self.mode,
+            "source": str(self.source),
+            "worker_alive": self.running,
+            "frames_captured": self.frames_captured,
+            "frames_processed": self.frames_processed,
+            "frames_skipped": self.worker_skipped,
+            "torn_reads": self.worker_torn,
+            "capture_failures": self.capture_failures,
+            "inference_ms": self.last_inference_time * 1000,
+            "latency_ms": self.last_result_latency * 1000,
+        }
+
+
+class StationManager:
+
+    def __init__(self, sources, inference="mediapipe", fps=30.0, metrics=None):
+        self.stations = {
+            str(i): Station(str(i), source, inference=inference, fps=fps, metrics=metrics)
+            for i, source in enumerate(sources)
+        }
+
+    def start(self, loop=None):
+        for station in self.stations.values():
+            station.start(loop)
+
+    def stop(self):
+        for station in self.stations.values():
+            station.stop()
+
+    def stats(self):
+        return {station_id: station.stats() for station_id, station in self.stations.items()}
@@ -0,0 +1,89 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+# Header ring (int64/float64, 8 byte per field):
+#   [0]              write_seq: sequence frame terakhir yang selesai ditulis
+#   [1 .. n]         seq tiap slot
+#   [n+1 .. 2n]      timestamp capture tiap slot (float64, time.monotonic)
+HEADER_FIELDS = 1
+
+
+class FrameRing:
+    # Ring buffer frame di multiprocessing.shared_memory. Producer menulis
+    # langsung ke slot (cap.read(image=slot) tanpa salinan tambahan), consumer
+    # di proses lain hanya membaca frame terbaru. Frame tidak pernah di-pickle.
+
+    def __init__(self, shape, slots=4, name=None, create=True):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (HEADER_FIELDS + 2 * slots)
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = create
+
+        buf = self.shm.buf
+        self.header = np.ndarray((HEADER_FIELDS + slots,), dtype=np.int64, buffer=buf)
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf,
+                                     offset=8 * (HEADER_FIELDS + slots))
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=header_bytes)
+
+        if create:
+            self.header[:] = 0
+            self.timestamps[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        # Argumen yang cukup untuk membuka ring yang sama di proses lain
+        return {"name": self.name, "shape": self.shape, "slots": self.slots}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], spec["slots"], name=spec["name"], create=False)
+
+    @property
+    def write_seq(self):
+        return int(self.header[0])
+
+    def next_slot(self):
+        # Slot untuk frame berikutnya; producer mengisi lalu memanggil commit().
+        # Slot ditandai -1 selama ditulis supaya consumer bisa mendeteksi
+        # torn read.
+        seq = self.write_seq + 1
+        slot = seq % self.slots
+        self.header[HEADER_FIELDS + slot] = -1
+        return seq, self.frames[slot]
+
+    def commit(self, seq, timestamp):
+        slot = seq % self.slots
+        self.timestamps[slot] = timestamp
+        self.header[HEADER_FIELDS + slot] = seq
+        self.header[0] = seq
+
+    def read_latest(self, out, after_seq=0):
+        # Salin frame terbaru ke `out`. Mengembalikan (seq, timestamp) atau
+        # (None, None) jika tidak ada frame baru atau slot tertimpa producer
+        # selama disalin (torn read).
+        seq = self.write_seq
+        if seq <= after_seq:
+            return None, None
+
+        slot = seq % self.slots
+        timestamp = float(self.timestamps[slot])
+        np.copyto(out, self.frames[slot])
+        if int(self.header[HEADER_FIELDS + slot]) != seq:
+            return None, None
+        return seq, timestamp
+
+    def close(self):
+        # Lepaskan view numpy dulu supaya buffer shared memory bisa ditutup
+        self.header = self.timestamps = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import websockets
+from app.station.manager import StationManager
+from app.websocket.handler import handler, metrics, register_station
+
+
+async def main(args):
+    manager = StationManager(args.sources, inference=args.inference, fps=args.fps, metrics=metrics)
+    for station_id, station in manager.stations.items():
+        register_station(station_id, station)
+
+    print("=" * 50)
+    print("Math Shooter Backend - Multi Station")
+    print("=" * 50)
+    for station_id, station in manager.stations.items():
+        print(f"Station {station_id}: {station.source} -> ws://{args.host}:{args.port}/station/{station_id}")
+    print("=" * 50)
+
+    manager.start()
+    try:
+        async with websockets.serve(handler, args.host, args.port):
+            await asyncio.Future()
+    finally:
+        manager.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Satu backend untuk beberapa play station / webcam")
+    parser.add_argument("sources", nargs="+", help="per station: index kamera (0, 1, ...), path video, direktori gambar atau synthetic")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--inference", choices=("mediapipe", "onnx", "synthetic"), default="mediapipe")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
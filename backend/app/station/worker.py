@@ -0,0 +1,78 @@
+import queue
+import time
+import cv2
+import numpy as np
+from app.station.ring import FrameRing
+
+
+class SyntheticInference:
+    # Pengganti GestureDetector untuk benchmark tanpa MediaPipe: beban CPU
+    # tetap per frame (blur OpenCV satu thread) lalu landmark SyntheticHand.
+
+    def __init__(self, blur_passes=4):
+        from app.gesture.processor import GestureProcessor
+        from app.gesture.synthetic import SyntheticHand
+
+        self.blur_passes = blur_passes
+        self.hand = SyntheticHand()
+        self.timestamp = time.monotonic()
+        self.processor = GestureProcessor(clock=lambda: self.timestamp)
+        self.start = self.timestamp
+
+    def process(self, frame, timestamp=None):
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        image = frame
+        for _ in range(self.blur_passes):
+            image = cv2.GaussianBlur(image, (15, 15), 0)
+        return self.processor.update(self.hand.landmarks(self.timestamp - self.start))
+
+
+def create_inference(kind):
+    if kind == "synthetic":
+        return SyntheticInference()
+    # Selain itu nama backend landmark (mediapipe, onnx)
+    from app.gesture.detector import GestureDetector
+    return GestureDetector(camera=None, backend=kind)
+
+
+def run_worker(ring_spec, frame_ready, results, stop, inference="mediapipe"):
+    # Entry point proses inferensi per station. Hanya dict gesture kecil yang
+    # dikirim balik lewat `results`; frame dibaca dari shared memory.
+    cv2.setNumThreads(1)
+    ring = FrameRing.attach(ring_spec)
+    frame = np.empty(ring.shape, dtype=np.uint8)
+    detector = create_inference(inference)
+    if hasattr(detector, "warm_up"):
+        detector.warm_up()
+
+    last_seq = 0
+    skipped = 0
+    torn = 0
+    try:
+        while not stop.is_set():
+            if not frame_ready.wait(0.1):
+                continue
+            frame_ready.clear()
+
+            latest = ring.write_seq
+            seq, captured_at = ring.read_latest(frame, last_seq)
+            if seq is None:
+                if latest > last_seq:
+                    torn += 1
+                continue
+
+            skipped += seq - last_seq - 1
+            last_seq = seq
+
+            started = time.perf_counter()
+            gesture = detector.process(frame, captured_at)
+            inference_time = time.perf_counter() - started
+
+            try:
+                results.put_nowait((seq, gesture, captured_at, inference_time, skipped, torn))
+            except queue.Full:
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
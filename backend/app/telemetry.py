@@ -0,0 +1,356 @@
+import argparse
+import atexit
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+import numpy as np
+from app.gesture.recording import FLAG_ARMED, FLAG_HAS_XY, FLAG_SHOOT
+
+# Telemetri sesi (jalur aim, tembakan, transisi armed/idle, latency per
+# frame) untuk menyetel ambang GestureRules dan GestureStateMachine.
+# GESTURE_TELEMETRY=<file.sqlite> mengaktifkan; tanpa itu create_telemetry()
+# mengembalikan None dan semua titik catat memeriksa `telemetry is not None`
+# seperti metrics.
+TELEMETRY_PATH = os.environ.get("GESTURE_TELEMETRY", "")
+# Event yang boleh menunggu writer; lebih dari itu dibuang dan dihitung
+QUEUE_SIZE = int(os.environ.get("GESTURE_TELEMETRY_QUEUE", "65536"))
+# Writer menguras antrean tiap FLUSH_INTERVAL detik, paling banyak
+# BATCH_SIZE event per transaksi
+FLUSH_INTERVAL = 0.5
+BATCH_SIZE = 8192
+# Jeda minimal antar peringatan event dibuang (detik)
+DROP_REPORT_INTERVAL = 10.0
+
+# Jenis item di antrean
+_SESSION = 0
+_END = 1
+_FRAME = 2
+_EVENT = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY, name TEXT, kind TEXT, started REAL, ended REAL
+);
+CREATE TABLE IF NOT EXISTS frames (
+    session INTEGER, player INTEGER, t REAL, x REAL, y REAL, flags INTEGER, latency_ms REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    session INTEGER, player INTEGER, t REAL, kind TEXT, detail TEXT
+);
+CREATE INDEX IF NOT EXISTS frames_session ON frames (session, t);
+CREATE INDEX IF NOT EXISTS events_session ON events (session, t);
+"""
+
+
+def gesture_flags(gesture):
+    # Bit flag sama dengan file rekaman .grec
+    flags = 0
+    if gesture["x"] is not None:
+        flags |= FLAG_HAS_XY
+    if gesture["armed"]:
+        flags |= FLAG_ARMED
+    if gesture["shoot"]:
+        flags |= FLAG_SHOOT
+    return flags
+
+
+class TelemetrySink:
+    # Producer (loop gesture, event loop, thread mana pun) hanya menambah
+    # tuple ke deque: append/len deque atomik di CPython, jadi tidak ada
+    # lock maupun I/O di jalur frame. Batas antrean lunak (cek lalu append);
+    # event yang tidak muat dibuang dan dihitung di `dropped`. Thread writer
+    # menguras antrean ke SQLite dalam satu transaksi per batch dan
+    # menurunkan event armed/idle/shoot dari flag frame per sesi dan pemain.
+    # Waktu dari producer adalah time.monotonic(), disimpan sebagai epoch.
+
+    def __init__(self, path, queue_size=QUEUE_SIZE, interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.path = path
+        self.queue_size = queue_size
+        self.interval = interval
+        self.batch_size = batch_size
+        self.queue = deque()
+        self._ids = itertools.count(1)
+        self._offset = time.time() - time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.dropped = 0
+        self.frames_written = 0
+        self.events_written = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_batch_ms = 0.0
+        self.errors = 0
+        self._reported_drops = 0
+        self._last_report = 0.0
+
+        # Writer: id sesi producer -> id baris sessions; flag terakhir per
+        # (sesi, pemain) untuk transisi
+        self._session_rows = {}
+        self._last_flags = {}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gesture-telemetry", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _put(self, item):
+        queue = self.queue
+        if len(queue) >= self.queue_size:
+            self.dropped += 1
+            return
+        queue.append(item)
+
+    # Jalur producer
+
+    def open_session(self, name, kind, t=None):
+        session = next(self._ids)
+        self._put((_SESSION, session, time.monotonic() if t is None else t, name, kind))
+        return session
+
+    def close_session(self, session, t=None):
+        self._put((_END, session, time.monotonic() if t is None else t))
+
+    def event(self, session, kind, detail=None, t=None, player=0):
+        self._put((_EVENT, session, time.monotonic() if t is None else t, kind, detail, player))
+
+    def frame(self, session, t, gesture, latency=None, player=0):
+        # gesture: dict dengan x, y, armed, shoot; latency dalam detik
+        self._put((_FRAME, session, t, gesture["x"], gesture["y"], gesture_flags(gesture), latency, player))
+
+    def frames(self, session, t, gesture, latency=None):
+        # Hasil pipeline: satu frame per pemain jika ada "players"
+        players = gesture.get("players")
+        if players is None:
+            self.frame(session, t, gesture, latency)
+            return
+        for player, data in enumerate(players):
+            self.frame(session, t, data, latency, player)
+
+    # Thread writer
+
+    def _run(self):
+        db = sqlite3.connect(self.path)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            while not self._stop.wait(self.interval):
+                self._drain(db)
+            self._drain(db)
+        finally:
+            db.close()
+
+    def _drain(self, db):
+        queue = self.queue
+        depth = len(queue)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        while queue:
+            popleft = queue.popleft
+            items = [popleft() for _ in range(min(len(queue), self.batch_size))]
+            started = time.perf_counter()
+            try:
+                self._write(db, items)
+            except sqlite3.Error as e:
+                self.errors += 1
+                print(f"Telemetry gagal ditulis: {e}")
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+            self.batches += 1
+        self._report_drops()
+
+    def _write(self, db, items):
+        offset = self._offset
+        rows = self._session_rows
+        last_flags = self._last_flags
+        frames, events, ends = [], [], []
+        with db:
+            for item in items:
+                kind = item[0]
+                if kind == _FRAME:
+                    _, session, t, x, y, flags, latency, player = item
+                    row = rows.get(session)
+                    if row is None:
+                        continue
+                    t += offset
+                    frames.append((row, player, t, x, y, flags, None if latency is None else latency * 1000))
+                    key = (session, player)
+                    changed = (flags ^ last_flags.get(key, 0)) & FLAG_ARMED
+                    last_flags[key] = flags
+                    if changed:
+                        events.append((row, player, t, "armed" if flags & FLAG_ARMED else "idle", None))
+                    if flags & FLAG_SHOOT:
+                        events.append((row, player, t, "shoot", None))
+                elif kind == _EVENT:
+                    _, session, t, name, detail, player = item
+                    if session in rows:
+                        events.append((rows[session], player, t + offset, name, detail))
+                elif kind == _SESSION:
+                    _, session, t, name, session_kind = item
+                    rows[session] = db.execute(
+                        "INSERT INTO sessions (name, kind, started) VALUES (?, ?, ?)",
+                        (name, session_kind, t + offset)).lastrowid
+                else:
+                    _, session, t = item
+                    row = rows.pop(session, None)
+                    if row is not None:
+                        ends.append((t + offset, row))
+                    for key in [key for key in last_flags if key[0] == session]:
+                        del last_flags[key]
+            db.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?)", frames)
+            db.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)", events)
+            db.executemany("UPDATE sessions SET ended = ? WHERE id = ?", ends)
+        self.frames_written += len(frames)
+        self.events_written += len(events)
+
+    def _report_drops(self):
+        dropped = self.dropped
+        now = time.monotonic()
+        if dropped > self._reported_drops and now - self._last_report >= DROP_REPORT_INTERVAL:
+            print(f"Telemetry tertinggal: {dropped - self._reported_drops} event dibuang "
+                  f"(total {dropped}, antrean {self.queue_size})")
+            self._reported_drops = dropped
+            self._last_report = now
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "queued": len(self.queue),
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "frames_written": self.frames_written,
+            "events_written": self.events_written,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "errors": self.errors,
+        }
+
+
+def create_telemetry(path=None):
+    path = path if path is not None else TELEMETRY_PATH
+    if not path:
+        return None
+    sink = TelemetrySink(path).start()
+    # Sisa antrean ditulis saat proses keluar
+    atexit.register(sink.close)
+    return sink
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else None
+
+
+def summarize(db, session):
+    # Ringkasan satu sesi dari tabel frames/events
+    sid, name, kind, started, ended = session
+    frames = np.array(db.execute(
+        "SELECT player, t, COALESCE(x, 'nan'), COALESCE(y, 'nan'), flags, COALESCE(latency_ms, 'nan') "
+        "FROM frames WHERE session = ? ORDER BY player, t", (sid,)).fetchall(), dtype=np.float64).reshape(-1, 6)
+    events = db.execute(
+        "SELECT player, t, kind FROM events WHERE session = ? ORDER BY player, t", (sid,)).fetchall()
+
+    end = ended if ended is not None else (frames[:, 1].max() if len(frames) else started)
+    duration = max(end - started, 0.0)
+    flags = frames[:, 4].astype(np.int64)
+    latency = frames[:, 5][~np.isnan(frames[:, 5])]
+
+    # Panjang jalur aim per pemain: jumlah jarak antar frame berurutan yang
+    # sama-sama punya cursor
+    path_length = 0.0
+    for player in np.unique(frames[:, 0]):
+        rows = frames[frames[:, 0] == player]
+        step = np.hypot(np.diff(rows[:, 2]), np.diff(rows[:, 3]))
+        path_length += float(step[~np.isnan(step)].sum())
+
+    # Lama armed sampai tiap tembakan dan lama tiap periode armed
+    shots = sum(event == "shoot" for _, _, event in events)
+    armed_periods, to_shot = [], []
+    armed_at = {}
+    for player, t, event in events:
+        if event == "armed":
+            armed_at[player] = t
+        elif event == "idle" and player in armed_at:
+            armed_periods.append(t - armed_at.pop(player))
+        elif event == "shoot" and player in armed_at:
+            to_shot.append(t - armed_at[player])
+
+    return {
+        "session": sid,
+        "name": name,
+        "kind": kind,
+        "started": started,
+        "duration_s": duration,
+        "frames": len(frames),
+        "hand_ratio": float((flags & FLAG_HAS_XY != 0).mean()) if len(frames) else 0.0,
+        "armed_ratio": float((flags & FLAG_ARMED != 0).mean()) if len(frames) else 0.0,
+        "shots": shots,
+        "shots_per_min": shots / duration * 60 if duration else 0.0,
+        "armed_periods": sum(event == "armed" for _, _, event in events),
+        "armed_median_s": _percentile(armed_periods, 50),
+        "armed_to_shot_median_s": _percentile(to_shot, 50),
+        "aim_path": path_length,
+        "latency_p50_ms": _percentile(latency, 50),
+        "latency_p95_ms": _percentile(latency, 95),
+        "latency_max_ms": float(latency.max()) if len(latency) else None,
+    }
+
+
+def summaries(path, name=None, last=None):
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        query = "SELECT id, name, kind, started, ended FROM sessions"
+        params = ()
+        if name is not None:
+            query += " WHERE name LIKE ?"
+            params = (name,)
+        query += " ORDER BY id"
+        sessions = db.execute(query, params).fetchall()
+        if last:
+            sessions = sessions[-last:]
+        return [summarize(db, session) for session in sessions]
+    finally:
+        db.close()
+
+
+def _fmt(value, spec):
+    # None -> "-" dengan lebar kolom yang sama
+    return format("-", spec.split(".")[0]) if value is None else format(value, spec)
+
+
+def print_summaries(results):
+    print(f"{'id':>5} {'nama':<14} {'mulai':<19} {'detik':>7} {'frame':>7} {'tangan':>7} {'armed':>6} "
+          f"{'tembak':>6} {'/menit':>6} {'armed->tembak s':>15} {'jalur':>7} {'p50 ms':>7} {'p95 ms':>7}")
+    for r in results:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["started"]))
+        print(f"{r['session']:>5} {r['name'][:14]:<14} {started:<19} {r['duration_s']:>7.1f} {r['frames']:>7} "
+              f"{r['hand_ratio'] * 100:>6.0f}% {r['armed_ratio'] * 100:>5.0f}% {r['shots']:>6} "
+              f"{r['shots_per_min']:>6.1f} {_fmt(r['armed_to_shot_median_s'], '>15.2f')} {r['aim_path']:>7.2f} "
+              f"{_fmt(r['latency_p50_ms'], '>7.1f')} {_fmt(r['latency_p95_ms'], '>7.1f')}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ringkasan telemetri sesi gesture (file GESTURE_TELEMETRY)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="ringkasan per sesi")
+    summary.add_argument("path", help="file SQLite telemetri")
+    summary.add_argument("--name", help="filter nama sesi (pola LIKE SQL, mis. 'station/%%')")
+    summary.add_argument("--last", type=int, help="hanya N sesi terakhir")
+    summary.add_argument("--json", action="store_true", help="cetak JSON")
+    args = parser.parse_args()
+
+    results = summaries(args.path, args.name, args.last)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_summaries(results)
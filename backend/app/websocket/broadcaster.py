@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+
+
+def is_shoot(gesture):
+    if gesture.get("shoot"):
+        return True
+    players = gesture.get("players")
+    return players is not None and any(player["shoot"] for player in players)
+
+
+class Subscription:
+    # Mailbox per client yang hanya menyimpan hasil terbaru: hasil baru
+    # menimpa yang belum terkirim, jadi client lambat kehilangan posisi lama
+    # tanpa pernah menahan producer atau client lain. Frame shoot tidak
+    # pernah ditimpa; ia tetap antre (urut seq) dan hanya posisi non-shoot
+    # yang digabung.
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.items = deque()
+        self._event = asyncio.Event()
+        self.delivered = 0
+        self.dropped = 0
+        self.shots = 0
+        self.closed = False
+
+    def push(self, item):
+        if self.closed:
+            return
+        items = self.items
+        if is_shoot(item[1]):
+            self.shots += 1
+        while len(items) >= self.maxsize:
+            # Buang hasil non-shoot tertua; jika semua shoot, antre melebihi maxsize
+            for i, old in enumerate(items):
+                if not is_shoot(old[1]):
+                    del items[i]
+                    self.dropped += 1
+                    break
+            else:
+                break
+        items.append(item)
+        self._event.set()
+
+    async def get(self, timeout=None):
+        if not self.items:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        item = self.items.popleft()
+        self.delivered += 1
+        return item
+
+    def stats(self):
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "shots": self.shots,
+            "pending": len(self.items),
+        }
+
+
+class GestureBroadcaster:
+    # Satu producer (GesturePipeline) untuk semua client. Rules dan EMA hanya
+    # dijalankan sekali per frame, lalu hasilnya dikirim ke setiap Subscription.
+    # Dengan telemetry, setiap kali loop ini berjalan (ada client) dicatat
+    # sebagai satu sesi; latency frame = saat dipublikasikan - saat capture.
+
+    def __init__(self, source, queue_size=1, result_timeout=1.0, telemetry=None, name="station"):
+        self.source = source
+        self.telemetry = telemetry
+        self.name = name
+        self.queue_size = queue_size
+        self.result_timeout = result_timeout
+        self.subscribers = set()
+        self.published = 0
+        # Seq hasil terakhir yang sudah diteruskan; bertahan antar restart _run
+        self.last_seq = 0
+        # Id sesi telemetry selama _run berjalan
+        self.session = None
+        self._task = None
+
+    def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        self.subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        self.subscribers.discard(subscription)
+
+    async def _run(self):
+        telemetry = self.telemetry
+        session = self.session = telemetry.open_session(self.name, "station") if telemetry is not None else None
+        # Setelah berhenti (tidak ada client) hasil terakhir source bisa
+        # berasal dari sebelum jeda, mis. shoot atau cursor lama: mulai dari
+        # seq source saat ini sehingga hanya hasil baru yang diteruskan
+        self.last_seq = max(self.last_seq, self.source.result_seq)
+        try:
+            while self.subscribers:
+                seq, gesture, captured_at = await self.source.next_result(
+                    self.last_seq, timeout=self.result_timeout
+                )
+                if gesture is None:
+                    continue
+                self.last_seq = seq
+
+                self.published += 1
+                item = (seq, gesture, captured_at)
+                for subscription in list(self.subscribers):
+                    subscription.push(item)
+                if telemetry is not None:
+                    now = time.monotonic()
+                    telemetry.frames(session, now, gesture,
+                                     now - captured_at if captured_at is not None else None)
+        finally:
+            if telemetry is not None:
+                telemetry.close_session(session)
+                self.session = None
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+        }
@@ -1,54 +1,439 @@
 import asyncio
 import json
+import os
+import time
+import traceback
+from functools import partial
 import websockets
-from app.gesture.detector import GestureDetector
+from app.gesture.filters import ClientCursor, create_filter
+from app.gesture.pipeline import MODE_ACTIVE, MODE_PAUSED, MODE_PRESENCE, GesturePipeline
+from app.metrics import create_metrics
+from app.telemetry import create_telemetry
+from app.websocket.broadcaster import GestureBroadcaster
+from app.websocket.ingest import INGEST_PATH, IngestHub, ingest_handler
+from app.websocket.protocol import FORMATS, PROTOCOL_VERSION, GestureEncoder, parse_max_rate
+from app.websocket.sender import SendWindow, configure_transport
+
+metrics = create_metrics()
+# Telemetri sesi ke SQLite (GESTURE_TELEMETRY); None jika tidak diaktifkan
+telemetry = create_telemetry()
+ingest_hub = IngestHub(telemetry=telemetry)
+
+RESULT_TIMEOUT = 1.0
+DEFAULT_STATION = "0"
+STATION_PATH_PREFIX = "/station/"
+
+# Capture dan inferensi dihentikan (kamera dilepas) jika station tidak punya
+# client selama ini (detik). Nilai negatif mematikan fitur ini.
+IDLE_TIMEOUT = float(os.environ.get("GESTURE_IDLE_TIMEOUT", "30"))
+PRESENCE_INTERVAL = 0.5
+
+# Sumber station default: "camera" (MediaPipe + webcam) atau "synthetic"
+# (SyntheticDetector, tanpa kamera; untuk pengembangan dan benchmark)
+GESTURE_SOURCE = os.environ.get("GESTURE_SOURCE", "camera")
+# Laju frame dan CPU inferensi tiruan per frame (ms) SyntheticDetector
+SYNTHETIC_FPS = float(os.environ.get("GESTURE_SYNTHETIC_FPS", "30"))
+SYNTHETIC_WORK_MS = float(os.environ.get("GESTURE_SYNTHETIC_WORK_MS", "0"))
+# Jumlah pemain di depan satu kamera (mode dua pemain: 2)
+PLAYERS = int(os.environ.get("GESTURE_PLAYERS", "1"))
+
+# Pesan {"type": "STATUS", "status": ...} ke client
+STATUS_WARMING = "WARMING"
+STATUS_READY = "READY"
+STATUS_ERROR = "ERROR"
+
+
+class ClientSession:
+    # Status satu koneksi. mode None berarti client belum mengirim
+    # START/PAUSE (mis. tutorial) dan tetap mendapat frame selama ada tangan.
+
+    def __init__(self):
+        self.subscription = None
+        self.encoder = GestureEncoder()
+        self.mode = None
+        self.last_sent = 0.0
+        # Filter cursor pilihan client; None -> output station apa adanya
+        self.cursor = None
+        # ACK seq dari client: umur end-to-end dan batas frame in-flight
+        self.window = SendWindow()
+
+    def set_filter(self, name, params=None, predict=True):
+        # Filter lama tetap dipakai jika nama/params ditolak (ValueError)
+        if name in (None, "none"):
+            self.cursor = None
+        else:
+            if params is not None and not isinstance(params, dict):
+                raise ValueError(f"params harus objek: {params!r}")
+            self.cursor = ClientCursor(create_filter(name, **(params or {})), predict=bool(predict))
+
+
+class StationState:
+    # Satu sumber gesture (GesturePipeline atau Station multi-kamera) beserta
+    # broadcaster dan client-nya. Mode sumber mengikuti kebutuhan client:
+    # active jika ada yang bermain, presence jika hanya menu, paused jika
+    # semua client PAUSE.
+
+    def __init__(self, source=None, factory=None, idle_timeout=IDLE_TIMEOUT, name="station"):
+        # Tanpa source, factory() dipanggil di thread executor saat client
+        # pertama datang (import cv2/MediaPipe, buka kamera, warm-up graph)
+        self.factory = factory
+        self.name = name
+        self.source = None
+        self.broadcaster = None
+        self.clients = set()
+        self.idle_timeout = idle_timeout
+        self._idle_handle = None
+        self._stopping = None
+        self._loading = None
+        if source is not None:
+            self.attach(source)
+
+    def attach(self, source):
+        # Sumber diam sampai ada client yang membutuhkannya
+        source.set_mode(MODE_PAUSED)
+        self.source = source
+        self.broadcaster = GestureBroadcaster(source, telemetry=telemetry, name=self.name)
+
+    @property
+    def ready(self):
+        return self.source is not None and self.source.running
+
+    @property
+    def is_running(self):
+        return any(client.mode == MODE_ACTIVE for client in self.clients)
+
+    def required_mode(self):
+        modes = {client.mode for client in self.clients}
+        if None in modes or MODE_ACTIVE in modes:
+            return MODE_ACTIVE
+        if MODE_PRESENCE in modes:
+            return MODE_PRESENCE
+        return MODE_PAUSED
+
+    def update_mode(self):
+        if self.source is None:
+            return
+        mode = self.required_mode()
+        if self.source.mode != mode:
+            self.source.set_mode(mode)
+            print(f"Mode gesture: {mode}")
+
+    def add_client(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        session = ClientSession()
+        self.clients.add(session)
+        return session
+
+    async def ensure_ready(self):
+        # Semua client yang datang selama warm-up menunggu satu proses load
+        # yang sama; shield supaya client yang putus tidak membatalkannya
+        if self.ready:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        await asyncio.shield(self._loading)
+
+    async def _load(self):
+        loop = asyncio.get_running_loop()
+        try:
+            if self._stopping is not None:
+                # Tunggu stop karena idle selesai sebelum kamera dibuka lagi
+                await self._stopping
+            if self.source is None:
+                started = time.perf_counter()
+                self.attach(await loop.run_in_executor(None, self.factory))
+                print(f"Gesture source siap dalam {time.perf_counter() - started:.2f} detik")
+            self.update_mode()
+            # start() membuka kamera lagi jika sempat dilepas karena idle
+            await loop.run_in_executor(None, self.source.start, loop)
+        finally:
+            self._loading = None
+
+    def subscribe(self, session):
+        session.subscription = self.broadcaster.subscribe()
+        self.update_mode()
+
+    def leave(self, session):
+        if session.subscription is not None:
+            self.broadcaster.unsubscribe(session.subscription)
+        self.clients.discard(session)
+        self.update_mode()
+        if not self.clients and self.idle_timeout >= 0 and self.source is not None:
+            loop = asyncio.get_running_loop()
+            self._idle_handle = loop.call_later(self.idle_timeout, self._idle_stop)
+
+    def _idle_stop(self):
+        self._idle_handle = None
+        if self.clients or not self.source.running:
+            return
+
+        print(f"Tidak ada client selama {self.idle_timeout:g} detik, kamera dilepas")
+        # stop() menunggu thread selesai, jadi jangan jalankan di event loop
+        loop = asyncio.get_running_loop()
+        self._stopping = loop.run_in_executor(None, partial(self.source.stop, release=True))
+        self._stopping.add_done_callback(self._stopped)
+
+    def _stopped(self, future):
+        self._stopping = None
+
+    def stats(self):
+        return {
+            "mode": self.source.mode if self.source is not None else None,
+            "clients": len(self.clients),
+            "playing": self.is_running,
+            "running": self.ready,
+        }
+
+
+stations = {}
+
+
+def register_station(station_id, source):
+    stations[station_id] = StationState(source, name=f"station/{station_id}")
+    return stations[station_id]
+
+
+def create_default_source():
+    # Berjalan di thread executor: import berat ditunda sampai di sini
+    if GESTURE_SOURCE == "synthetic":
+        from app.gesture.synthetic import SyntheticDetector
+        detector = SyntheticDetector(fps=SYNTHETIC_FPS, work_ms=SYNTHETIC_WORK_MS, players=PLAYERS)
+    else:
+        from app.gesture.detector import GestureDetector
+        detector = GestureDetector(metrics=metrics, players=PLAYERS)
+    warm_up_time = detector.warm_up()
+    print(f"Warm-up model selesai dalam {warm_up_time * 1000:.0f} ms")
+    return GesturePipeline(detector, metrics=metrics)
+
+
+def default_station():
+    # Mode satu kamera: pipeline dibuat saat client pertama datang
+    if DEFAULT_STATION not in stations:
+        stations[DEFAULT_STATION] = StationState(factory=create_default_source, name=f"station/{DEFAULT_STATION}")
+    return stations[DEFAULT_STATION]
+
+
+async def send_status(websocket, status, **extra):
+    await websocket.send(json.dumps(dict(extra, type="STATUS", status=status)))
+
+
+def request_path(websocket):
+    request = getattr(websocket, "request", None)
+    if request is not None:
+        return request.path
+    return getattr(websocket, "path", "/")
+
+
+def station_for(websocket):
+    # ws://host:8765/station/<id> memilih station; path lain -> station default
+    path = request_path(websocket).split("?", 1)[0]
+    if path.startswith(STATION_PATH_PREFIX):
+        station_id = path[len(STATION_PATH_PREFIX):].strip("/")
+        return stations.get(station_id)
+    if stations:
+        return stations.get(DEFAULT_STATION)
+    return default_station()
+
+
+def record_control(station, action):
+    # START/PAUSE/PRESENCE dicatat sebagai event di sesi telemetry station
+    if telemetry is not None and station.broadcaster.session is not None:
+        telemetry.event(station.broadcaster.session, "control", action)
+
+
+async def handle_message(websocket, station, session, data):
+    if data.get("type") == "CONTROL":
+        action = data.get("action")
+        if action in ("START", "PAUSE", "PRESENCE"):
+            record_control(station, action)
+        if action == "START":
+            session.mode = MODE_ACTIVE
+            station.update_mode()
+            print("GAME STARTED - Gesture detection aktif")
+        elif action == "PAUSE":
+            session.mode = MODE_PAUSED
+            station.update_mode()
+            print("GAME PAUSED")
+        elif action == "PRESENCE":
+            session.mode = MODE_PRESENCE
+            station.update_mode()
+            print("MENU - Gesture presence saja")
+        elif action == "SET_FORMAT":
+            if data.get("format") in FORMATS:
+                session.encoder.set_format(data["format"])
+            await websocket.send(json.dumps({
+                "type": "FORMAT",
+                "format": session.encoder.format,
+                "version": PROTOCOL_VERSION
+            }))
+        elif action == "SET_RATE":
+            reply = {"type": "RATE"}
+            try:
+                session.encoder.set_max_rate(parse_max_rate(data.get("max_rate")))
+            except ValueError as e:
+                reply["error"] = str(e)
+            reply["max_rate"] = session.encoder.max_rate
+            await websocket.send(json.dumps(reply))
+        elif action == "SET_FILTER":
+            reply = {"type": "FILTER"}
+            try:
+                session.set_filter(data.get("filter"), data.get("params"), data.get("predict", True))
+            except (TypeError, ValueError) as e:
+                reply["error"] = str(e)
+            reply.update(session.cursor.describe() if session.cursor is not None else {"filter": "none"})
+            await websocket.send(json.dumps(reply))
+    elif data.get("type") == "ACK":
+        acked = session.window.ack(data.get("seq"))
+        if acked is not None and metrics is not None:
+            age, rtt = acked
+            metrics.record_value("client_age", int(age * 1e9))
+            metrics.record_value("client_rtt", int(rtt * 1e9))
+    elif data.get("type") == "STATS":
+        await websocket.send(json.dumps({
+            "type": "STATS",
+            "station": station.stats(),
+            "status": STATUS_READY if station.ready else STATUS_WARMING,
+            "client_mode": session.mode,
+            "pipeline": station.source.stats(),
+            "broadcaster": station.broadcaster.stats(),
+            "subscription": session.subscription.stats(),
+            "encoder": session.encoder.stats(),
+            "sender": session.window.stats(),
+            "filter": session.cursor.describe() if session.cursor is not None else None,
+            "latency": metrics.snapshot() if metrics is not None else None,
+            "telemetry": telemetry.stats() if telemetry is not None else None
+        }))
+
+
+async def receive_loop(websocket, station, session):
+    # Pesan client diproses begitu datang, tidak menunggu giliran dengan
+    # pengiriman frame
+    async for message in websocket:
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            print(f"Invalid JSON received: {message}")
+            continue
+        await handle_message(websocket, station, session, data)
+
+
+def has_cursor(gesture):
+    players = gesture.get("players")
+    if players is not None:
+        return any(player["x"] is not None for player in players)
+    return gesture.get("x") is not None and gesture.get("y") is not None
+
+
+async def send_loop(websocket, station, session):
+    # Satu task pengirim per client. Hasil diambil dari Subscription hanya
+    # saat window ACK terbuka, dan send() menunggu drain buffer transport;
+    # selama menunggu, hasil baru menimpa posisi lama di Subscription
+    # (frame shoot tetap antre)
+    subscription = session.subscription
+    window = session.window
+    while True:
+        await window.wait_open()
+        item = await subscription.get(timeout=RESULT_TIMEOUT)
+        if item is None:
+            if station.source.mode == MODE_ACTIVE:
+                print("Warning: Kamera gagal membaca frame")
+            continue
+
+        if session.mode == MODE_PAUSED:
+            continue
+
+        seq, gesture, captured_at = item
+        if session.mode is None and not has_cursor(gesture):
+            continue
+
+        now = time.monotonic()
+        if session.mode == MODE_PRESENCE and now - session.last_sent < PRESENCE_INTERVAL:
+            continue
+
+        try:
+            if metrics is not None:
+                started = time.perf_counter_ns()
+            if session.cursor is not None:
+                gesture = session.cursor.apply(gesture, captured_at, now)
+            payload = session.encoder.encode(seq, gesture, captured_at)
+            if metrics is not None:
+                metrics.record("serialize", started)
+
+            if payload is not None:
+                if metrics is not None:
+                    started = time.perf_counter_ns()
+                await websocket.send(payload)
+                session.last_sent = now
+                window.sent(seq, now, captured_at)
+                if metrics is not None:
+                    metrics.record("send", started)
+                    metrics.record_value("end_to_end", int((time.monotonic() - captured_at) * 1e9))
+        except websockets.exceptions.ConnectionClosed:
+            raise
+        except Exception as e:
+            print(f"Error reading gesture: {e}")
+            traceback.print_exc()
 
-detector = GestureDetector()
-is_running = False
 
 async def handler(websocket):
-    global is_running
+    if request_path(websocket).split("?", 1)[0].rstrip("/") == INGEST_PATH:
+        await ingest_handler(websocket, ingest_hub)
+        return
+
+    station = station_for(websocket)
+    if station is None:
+        print(f"Station tidak dikenal: {request_path(websocket)}")
+        await websocket.close(code=1008, reason="Unknown station")
+        return
+
     print("Client connected")
-    print("Kamera sedang diakses...")
+    configure_transport(websocket)
 
+    session = station.add_client()
     try:
-        while True:
-            try:
-                message = await asyncio.wait_for(websocket.recv(), timeout=0.01)
-                try:
-                    data = json.loads(message)
-
-                    if data.get("type") == "CONTROL":
-                        if data.get("action") == "START":
-                            is_running = True
-                            print("GAME STARTED - Gesture detection aktif")
-                        elif data.get("action") == "PAUSE":
-                            is_running = False
-                            print("GAME PAUSED")
-                except json.JSONDecodeError:
-                    print(f"Invalid JSON received: {message}")
-
-            except asyncio.TimeoutError:
-                pass
+        if not station.ready:
+            print("Kamera sedang diakses...")
+            await send_status(websocket, STATUS_WARMING)
+            await station.ensure_ready()
+        station.subscribe(session)
+        await send_status(websocket, STATUS_READY)
+    except websockets.exceptions.ConnectionClosed:
+        station.leave(session)
+        return
+    except asyncio.CancelledError:
+        station.leave(session)
+        raise
+    except Exception as e:
+        # Kamera tidak ada / model gagal dimuat: server tetap hidup, client
+        # berikutnya mencoba lagi
+        print(f"Gesture source gagal disiapkan: {e}")
+        station.leave(session)
+        try:
+            await send_status(websocket, STATUS_ERROR, error=str(e))
+            await websocket.close(code=1011, reason="Gesture source unavailable")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        return
 
-            try:
-                gesture = detector.read()
-                if gesture is None:
-                    print("Warning: Kamera gagal membaca frame")
-                    continue
-                
-                if is_running:
-                    await websocket.send(json.dumps(gesture))
-                elif gesture.get("x") is not None or gesture.get("y") is not None:
-                    await websocket.send(json.dumps(gesture))
-            except Exception as e:
-                print(f"Error reading gesture: {e}")
-                import traceback
-                traceback.print_exc()
+    tasks = {
+        asyncio.create_task(receive_loop(websocket, station, session)),
+        asyncio.create_task(send_loop(websocket, station, session)),
+    }
 
-    except websockets.exceptions.ConnectionClosed:
+    try:
+        # Koneksi selesai begitu salah satu sisi berhenti (client menutup
+        # koneksi atau send gagal)
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, websockets.exceptions.ConnectionClosed):
+                print(f"WebSocket handler error: {error}")
+                traceback.print_exception(type(error), error, error.__traceback__)
         print("Client disconnected")
-    except Exception as e:
-        print(f"WebSocket handler error: {e}")
-        import traceback
-        traceback.print_exc()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        station.leave(session)
@@ -0,0 +1,372 @@
+import asyncio
+import heapq
+import json
+import os
+import time
+import numpy as np
+import websockets
+from app.gesture.landmarks import INDEX_TIP, NUM_LANDMARKS
+from app.gesture.rules import BatchedGestureRules
+from app.websocket.protocol import (
+    FORMAT_BINARY, FORMATS, LANDMARK_SCALE, LANDMARK_VALUES, PROTOCOL_VERSION, GestureEncoder,
+    decode_landmarks_into, parse_max_rate,
+)
+
+# Mode ingest: client menjalankan hand tracking sendiri (mis. MediaPipe di
+# browser) dan mengirim frame landmark ke path ini; server hanya menjalankan
+# rules, state machine dan filter cursor
+INGEST_PATH = "/ingest"
+# Batas sesi ingest bersamaan; koneksi berikutnya ditolak (close 1013)
+MAX_SESSIONS = int(os.environ.get("GESTURE_INGEST_SESSIONS", "8192"))
+# Jeda (detik) sebelum batch diproses setelah frame pertama masuk. 0: batch
+# berisi semua frame yang terbaca dalam iterasi event loop yang sama
+BATCH_DELAY = float(os.environ.get("GESTURE_INGEST_DELAY", "0"))
+INITIAL_CAPACITY = 64
+# Frame landmark tidak valid dihitung per sesi dan di STATS; log paling
+# sering sekali per sekian detik supaya client tidak bisa membanjiri log
+INVALID_REPORT_INTERVAL = 10.0
+
+
+def _grown(array, capacity, fill):
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SessionBatch:
+    # Rules, state machine, filter cursor EMA dan penanganan frame hilang
+    # semua sesi ingest, satu slot array per sesi. Hasilnya sama dengan satu
+    # GestureProcessor (GestureRules + EmaFilter) per sesi, tapi update()
+    # memproses semua sesi yang punya frame baru sekaligus. Frame landmark
+    # disalin langsung ke baris int16 slot-nya (decode_landmarks_into) dan
+    # dikonversi ke float32 sekali per batch. Slot bebas dipakai ulang mulai
+    # dari indeks terkecil; kapasitas berlipat saat penuh.
+    #
+    # Clock rules tiap slot adalah timestamp capture dari frame client (ms,
+    # u32 yang boleh wrap), bukan jam server saat batch diproses, jadi
+    # jitter jaringan dan ukuran batch tidak mengubah kecepatan hentakan
+    # maupun cooldown.
+
+    def __init__(self, capacity=INITIAL_CAPACITY, max_loss_frames=5, alpha=0.7, deadzone=0.001):
+        self.max_loss_frames = max_loss_frames
+        # Sama dengan default EmaFilter
+        self.alpha = alpha
+        self.deadzone = deadzone
+        self.rules = BatchedGestureRules(0, clock=lambda: self.times)
+
+        self.capacity = 0
+        self.free = []
+        self.raw = np.zeros((0, LANDMARK_VALUES), dtype="<i2")
+        self.pending = np.zeros(0, dtype=bool)
+        self.has_hand = np.zeros(0, dtype=bool)
+        self.loss = np.zeros(0, dtype=np.intp)
+        # Posisi EMA dan output terakhir (ditahan selama frame hilang); NaN
+        # berarti belum ada
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.last_x = np.zeros(0)
+        self.last_y = np.zeros(0)
+        self.last_armed = np.zeros(0, dtype=bool)
+        # Timestamp client terakhir per slot: ms tanpa wrap (-1: belum ada)
+        # dan detik untuk rules
+        self.client_ms = np.zeros(0, dtype=np.int64)
+        self.times = np.zeros(0)
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for slot in range(self.capacity, capacity):
+            heapq.heappush(self.free, slot)
+        self.capacity = capacity
+        self.rules.resize(capacity)
+        self.raw = _grown(self.raw, capacity, 0)
+        self.landmarks = np.zeros((capacity, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.pending = _grown(self.pending, capacity, False)
+        self.has_hand = _grown(self.has_hand, capacity, False)
+        self.loss = _grown(self.loss, capacity, 0)
+        self.x = _grown(self.x, capacity, np.nan)
+        self.y = _grown(self.y, capacity, np.nan)
+        self.last_x = _grown(self.last_x, capacity, np.nan)
+        self.last_y = _grown(self.last_y, capacity, np.nan)
+        self.last_armed = _grown(self.last_armed, capacity, False)
+        self.client_ms = _grown(self.client_ms, capacity, -1)
+        self.times = _grown(self.times, capacity, 0.0)
+        # Tujuan salinan byte landmark tiap slot
+        self.buffers = [memoryview(row).cast("B") for row in self.raw]
+
+    def open(self):
+        if not self.free:
+            self._grow(max(2 * self.capacity, INITIAL_CAPACITY))
+        slot = heapq.heappop(self.free)
+        self.rules.reset(slot)
+        self.pending[slot] = self.has_hand[slot] = self.last_armed[slot] = False
+        self.loss[slot] = 0
+        self.client_ms[slot] = -1
+        self.x[slot] = self.y[slot] = self.last_x[slot] = self.last_y[slot] = np.nan
+        return slot
+
+    def close(self, slot):
+        self.pending[slot] = False
+        heapq.heappush(self.free, slot)
+
+    def submit(self, slot, payload):
+        # Frame landmark biner untuk slot; diproses di update() berikutnya.
+        # ValueError jika frame tidak valid (slot tidak berubah).
+        seq, timestamp_ms, has_hand = decode_landmarks_into(payload, self.buffers[slot])
+        last = int(self.client_ms[slot])
+        if last < 0:
+            elapsed = timestamp_ms
+        else:
+            # Selisih u32 bertanda: wrap maju maupun sedikit mundur
+            elapsed = last + ((timestamp_ms - last + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        self.client_ms[slot] = elapsed
+        self.times[slot] = elapsed / 1000
+        self.has_hand[slot] = has_hand
+        self.pending[slot] = True
+        return seq, timestamp_ms
+
+    def update(self):
+        # Memproses semua slot pending. Mengembalikan slot-slot tersebut dan
+        # x, y (NaN tanpa cursor), armed, shoot per slot. Hanya baris slot
+        # pending yang dikumpulkan (np.flatnonzero) untuk konversi landmark,
+        # rules dan EMA, lalu hasilnya ditulis kembali ke slot masing-masing,
+        # jadi biaya batch mengikuti jumlah frame, bukan kapasitas.
+        slots = np.flatnonzero(self.pending)
+        self.pending[slots] = False
+        count = len(slots)
+        hand = self.has_hand[slots]
+        lost = ~hand
+
+        landmarks = self.landmarks[:count]
+        np.multiply(self.raw[slots], LANDMARK_SCALE, out=landmarks.reshape(count, LANDMARK_VALUES))
+        armed, shoot = self.rules.update(hand, landmarks, slots)
+
+        # Frame hilang: output terakhir ditahan max_loss_frames frame, lalu
+        # state slot direset seperti GestureProcessor
+        loss = np.where(hand, 0, self.loss[slots] + 1)
+        self.loss[slots] = loss
+        x, y = self.x[slots], self.y[slots]
+        last_x, last_y = self.last_x[slots], self.last_y[slots]
+        last_armed = self.last_armed[slots]
+        expired = lost & (loss > self.max_loss_frames)
+        if expired.any():
+            self.rules.reset(slots[expired])
+            x[expired] = y[expired] = last_x[expired] = last_y[expired] = np.nan
+            last_armed[expired] = False
+
+        # EmaFilter.update untuk semua tangan sekaligus (float64 seperti
+        # float(lm[...]) di GestureProcessor)
+        raw_x = landmarks[:, INDEX_TIP, 0].astype(np.float64)
+        raw_y = landmarks[:, INDEX_TIP, 1].astype(np.float64)
+        alpha = self.alpha
+        first = hand & np.isnan(x)
+        moved = hand & ((np.abs(raw_x - x) > self.deadzone) | (np.abs(raw_y - y) > self.deadzone))
+        x = np.where(first, raw_x, np.where(moved, alpha * raw_x + (1 - alpha) * x, x))
+        y = np.where(first, raw_y, np.where(moved, alpha * raw_y + (1 - alpha) * y, y))
+
+        last_x = np.where(hand, x, last_x)
+        last_y = np.where(hand, y, last_y)
+        last_armed = np.where(hand, armed, last_armed)
+        self.x[slots], self.y[slots] = x, y
+        self.last_x[slots], self.last_y[slots] = last_x, last_y
+        self.last_armed[slots] = last_armed
+        return slots, last_x, last_y, last_armed, shoot
+
+
+def gestures(x, y, armed, shoot):
+    # Output SessionBatch.update() sebagai dict gesture per slot; mode ingest
+    # hanya menghitung armed/shoot, "gestures" selalu kosong
+    for gx, gy, garmed, gshoot in zip(x.tolist(), y.tolist(), armed.tolist(), shoot.tolist()):
+        has_xy = gx == gx
+        yield {"x": gx if has_xy else None, "y": gy if has_xy else None, "armed": garmed, "shoot": gshoot, "gestures": ()}
+
+
+class IngestSession:
+    # Satu koneksi ingest: slot di SessionBatch, encoder balasan (biner
+    # secara default, SET_FORMAT/SET_RATE seperti mode station) dan frame
+    # yang menunggu hasil
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.encoder = GestureEncoder(FORMAT_BINARY)
+        self.seq = 0
+        self.timestamp_ms = 0
+        self.waiter = None
+        self.received_at = 0.0
+        self.telemetry_id = None
+        self.frames = 0
+        self.invalid = 0
+
+    def stats(self):
+        return {"slot": self.slot, "frames": self.frames, "invalid": self.invalid,
+                "encoder": self.encoder.stats()}
+
+
+class IngestHub:
+    # Mengumpulkan frame landmark dari semua koneksi ingest dan memprosesnya
+    # sebagai satu batch SessionBatch. Batch dijadwalkan saat frame pertama
+    # masuk (call_soon, atau call_later jika BATCH_DELAY > 0); tiap koneksi
+    # menunggu hasil frame-nya sebelum membaca frame berikutnya, jadi state
+    # satu sesi tidak pernah diperbarui dua kali dalam satu batch.
+
+    def __init__(self, max_sessions=MAX_SESSIONS, delay=BATCH_DELAY, telemetry=None):
+        self.batch = SessionBatch()
+        self.max_sessions = max_sessions
+        self.delay = delay
+        self.telemetry = telemetry
+        self.sessions = {}
+        self._handle = None
+
+        self.frames = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.busy = 0.0
+        self.rejected = 0
+        self.invalid = 0
+        self.last_invalid = None
+        self._reported_invalid = 0
+        self._last_report = float("-inf")
+
+    def open(self):
+        if len(self.sessions) >= self.max_sessions:
+            self.rejected += 1
+            return None
+        session = IngestSession(self.batch.open())
+        self.sessions[session.slot] = session
+        if self.telemetry is not None:
+            session.telemetry_id = self.telemetry.open_session(f"ingest/{session.slot}", "ingest")
+        return session
+
+    def close(self, session):
+        if self.sessions.pop(session.slot, None) is None:
+            return
+        self.batch.close(session.slot)
+        if self.telemetry is not None:
+            self.telemetry.close_session(session.telemetry_id)
+        if session.waiter is not None and not session.waiter.done():
+            session.waiter.cancel()
+
+    def submit(self, session, payload):
+        # Future berisi frame gesture balasan (None jika ditekan encoder);
+        # ValueError jika frame landmark tidak valid
+        session.seq, session.timestamp_ms = self.batch.submit(session.slot, payload)
+        session.frames += 1
+        session.received_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        session.waiter = loop.create_future()
+        if self._handle is None:
+            if self.delay > 0:
+                self._handle = loop.call_later(self.delay, self.flush)
+            else:
+                self._handle = loop.call_soon(self.flush)
+        return session.waiter
+
+    def reject_frame(self, session, error):
+        session.invalid += 1
+        self.invalid += 1
+        self.last_invalid = str(error)
+        now = time.monotonic()
+        if now - self._last_report >= INVALID_REPORT_INTERVAL:
+            print(f"Frame landmark tidak valid: {self.invalid - self._reported_invalid} frame "
+                  f"(total {self.invalid}), terakhir: {error}")
+            self._reported_invalid = self.invalid
+            self._last_report = now
+
+    def flush(self):
+        self._handle = None
+        started = time.perf_counter()
+        slots, x, y, armed, shoot = self.batch.update()
+        now = time.monotonic()
+        sessions = self.sessions
+        telemetry = self.telemetry
+        for slot, gesture in zip(slots.tolist(), gestures(x, y, armed, shoot)):
+            session = sessions[slot]
+            if telemetry is not None:
+                # Latency server: frame diterima sampai hasil batch siap
+                telemetry.frame(session.telemetry_id, now, gesture, now - session.received_at)
+            if not session.waiter.done():
+                session.waiter.set_result(session.encoder.encode(
+                    session.seq, gesture, None, now, timestamp_ms=session.timestamp_ms))
+
+        self.frames += len(slots)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(slots))
+        self.busy += time.perf_counter() - started
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "capacity": self.batch.capacity,
+            "frames": self.frames,
+            "batches": self.batches,
+            "mean_batch": self.frames / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            # Detik di flush(): rules, cursor dan encode semua batch
+            "busy": self.busy,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "last_invalid": self.last_invalid,
+            # CPU proses server, untuk mengukur biaya per sesi dari luar
+            "process_time": time.process_time(),
+        }
+
+
+async def handle_ingest_message(websocket, hub, session, message):
+    try:
+        data = json.loads(message)
+    except json.JSONDecodeError:
+        print(f"Invalid JSON received: {message}")
+        return
+    if data.get("type") == "CONTROL":
+        action = data.get("action")
+        if action == "SET_FORMAT":
+            if data.get("format") in FORMATS:
+                session.encoder.set_format(data["format"])
+            await websocket.send(json.dumps({
+                "type": "FORMAT",
+                "format": session.encoder.format,
+                "version": PROTOCOL_VERSION
+            }))
+        elif action == "SET_RATE":
+            reply = {"type": "RATE"}
+            try:
+                session.encoder.set_max_rate(parse_max_rate(data.get("max_rate")))
+            except ValueError as e:
+                reply["error"] = str(e)
+            reply["max_rate"] = session.encoder.max_rate
+            await websocket.send(json.dumps(reply))
+    elif data.get("type") == "STATS":
+        await websocket.send(json.dumps({
+            "type": "STATS",
+            "ingest": hub.stats(),
+            "session": session.stats(),
+            "telemetry": hub.telemetry.stats() if hub.telemetry is not None else None,
+        }))
+
+
+async def ingest_handler(websocket, hub):
+    # ws://host:8765/ingest: client mengirim frame landmark biner (lihat
+    # protocol.py), server membalas dengan frame gesture yang membawa seq
+    # dan timestamp frame landmark tersebut. Frame yang tidak berubah dan
+    # yang melebihi SET_RATE ditekan seperti di mode station; shoot selalu
+    # dikirim. Tanpa print per koneksi karena sesinya bisa ribuan.
+    session = hub.open()
+    if session is None:
+        await websocket.close(code=1013, reason="Too many ingest sessions")
+        return
+    try:
+        async for message in websocket:
+            if isinstance(message, str):
+                await handle_ingest_message(websocket, hub, session, message)
+                continue
+            try:
+                waiter = hub.submit(session, message)
+            except ValueError as e:
+                hub.reject_frame(session, e)
+                continue
+            payload = await waiter
+            if payload is not None:
+                await websocket.send(payload)
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        hub.close(session)
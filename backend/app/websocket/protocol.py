@@ -0,0 +1,247 @@
+import json
+import math
+import struct
+import time
+import numpy as np
+from app.gesture.gestures import REPORTED
+
+# Frame biner gesture (12 byte, little-endian):
+#   u8  versi protokol
+#   u16 sequence number (wrap di 65536)
+#   u32 timestamp capture dalam ms sejak koneksi dibuka (wrap)
+#   u16 x, u16 y terkuantisasi 0..65535 untuk rentang 0..1
+#   u8  flag: HAS_XY, ARMED, SHOOT, KEEPALIVE, lalu satu bit per gesture
+#       REPORTED (OPEN_PALM, FIST, PINCH, PAUSE)
+# Mode beberapa pemain menambahkan satu record 5 byte (u16 x, u16 y, u8
+# flag) per pemain berikutnya; frame di atas milik pemain 0. Client lama
+# yang hanya membaca 12 byte pertama tetap berjalan.
+PROTOCOL_VERSION = 1
+BINARY_FRAME = struct.Struct("<BHIHHB")
+PLAYER_RECORD = struct.Struct("<HHB")
+
+FLAG_HAS_XY = 1
+FLAG_ARMED = 2
+FLAG_SHOOT = 4
+FLAG_KEEPALIVE = 8
+# Nama gesture -> flag, bit 4..7 sesuai urutan REPORTED
+GESTURE_FLAGS = {gesture.name: 16 << i for i, gesture in enumerate(REPORTED)}
+
+QUANT_MAX = 65535
+
+# Field gesture yang dikirim dalam format JSON; field lain (raw_x/raw_y)
+# hanya untuk pemrosesan di server
+JSON_FIELDS = ("x", "y", "armed", "shoot", "gestures")
+PLAYER_JSON_FIELDS = ("player",) + JSON_FIELDS
+
+# Frame landmark dari client mode ingest (hand tracking di browser, lihat
+# app/websocket/ingest.py), little-endian:
+#   u8  versi protokol landmark
+#   u16 sequence number, dikembalikan di frame gesture balasan
+#   u32 timestamp capture client dalam ms, dikembalikan apa adanya
+#   u8  flag: LANDMARK_HAS_HAND
+# Jika ada tangan, diikuti 21 x (x, y, z) int16 fixed point (nilai * 16384,
+# rentang -2..2). Frame tanpa tangan hanya header 8 byte.
+LANDMARK_VERSION = 1
+LANDMARK_HEADER = struct.Struct("<BHIB")
+LANDMARK_HAS_HAND = 1
+LANDMARK_SCALE = 1.0 / 16384
+LANDMARK_VALUES = 63
+LANDMARK_BYTES = LANDMARK_VALUES * 2
+
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+FORMATS = (FORMAT_JSON, FORMAT_BINARY)
+
+
+def quantize(value):
+    if value <= 0.0:
+        return 0
+    if value >= 1.0:
+        return QUANT_MAX
+    return int(value * QUANT_MAX + 0.5)
+
+
+def encode_binary(seq, timestamp_ms, qx, qy, flags, players=()):
+    # players: (qx, qy, flag) untuk pemain 1, 2, ...
+    payload = BINARY_FRAME.pack(
+        PROTOCOL_VERSION, seq & 0xFFFF, timestamp_ms & 0xFFFFFFFF, qx, qy, flags
+    )
+    if players:
+        payload += b"".join(PLAYER_RECORD.pack(*player) for player in players)
+    return payload
+
+
+def quantize_player(gesture):
+    x, y = gesture.get("x"), gesture.get("y")
+    flags = 0
+    qx = qy = 0
+    if x is not None and y is not None:
+        flags |= FLAG_HAS_XY
+        qx, qy = quantize(x), quantize(y)
+    if gesture.get("armed"):
+        flags |= FLAG_ARMED
+    if gesture.get("shoot"):
+        flags |= FLAG_SHOOT
+    for name in gesture.get("gestures") or ():
+        flags |= GESTURE_FLAGS[name]
+    return qx, qy, flags
+
+
+def _decode_player(qx, qy, flags):
+    has_xy = bool(flags & FLAG_HAS_XY)
+    return {
+        "x": qx / QUANT_MAX if has_xy else None,
+        "y": qy / QUANT_MAX if has_xy else None,
+        "armed": bool(flags & FLAG_ARMED),
+        "shoot": bool(flags & FLAG_SHOOT),
+        "gestures": [name for name, flag in GESTURE_FLAGS.items() if flags & flag],
+    }
+
+
+def decode_binary(payload):
+    version, seq, timestamp_ms, qx, qy, flags = BINARY_FRAME.unpack_from(payload)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Versi protokol tidak didukung: {version}")
+    extra = len(payload) - BINARY_FRAME.size
+    if extra % PLAYER_RECORD.size:
+        raise ValueError(f"Panjang frame tidak valid: {len(payload)}")
+
+    data = {"seq": seq, "t": timestamp_ms}
+    data.update(_decode_player(qx, qy, flags))
+    data["keepalive"] = bool(flags & FLAG_KEEPALIVE)
+    if extra:
+        players = [dict(_decode_player(qx, qy, flags), player=0)]
+        for i, offset in enumerate(range(BINARY_FRAME.size, len(payload), PLAYER_RECORD.size), 1):
+            players.append(dict(_decode_player(*PLAYER_RECORD.unpack_from(payload, offset)), player=i))
+        data["players"] = players
+    return data
+
+
+def encode_landmarks(seq, timestamp_ms, lm=None):
+    # lm: array (21, 3) atau None jika tangan tidak terlihat
+    if lm is None:
+        return LANDMARK_HEADER.pack(LANDMARK_VERSION, seq & 0xFFFF, timestamp_ms & 0xFFFFFFFF, 0)
+    values = np.rint(np.asarray(lm, dtype=np.float64).reshape(LANDMARK_VALUES) / LANDMARK_SCALE)
+    header = LANDMARK_HEADER.pack(LANDMARK_VERSION, seq & 0xFFFF, timestamp_ms & 0xFFFFFFFF, LANDMARK_HAS_HAND)
+    return header + np.clip(values, -32768, 32767).astype("<i2").tobytes()
+
+
+def decode_landmarks_into(payload, out):
+    # out: memoryview byte (LANDMARK_BYTES) ke baris int16 milik sesi; nilai
+    # landmark disalin langsung ke sana, tanpa array baru per frame.
+    # Mengembalikan (seq, timestamp_ms, ada tangan).
+    if len(payload) < LANDMARK_HEADER.size:
+        raise ValueError(f"Panjang frame landmark tidak valid: {len(payload)}")
+    version, seq, timestamp_ms, flags = LANDMARK_HEADER.unpack_from(payload)
+    if version != LANDMARK_VERSION:
+        raise ValueError(f"Versi frame landmark tidak didukung: {version}")
+    has_hand = flags & LANDMARK_HAS_HAND
+    if len(payload) != LANDMARK_HEADER.size + (LANDMARK_BYTES if has_hand else 0):
+        raise ValueError(f"Panjang frame landmark tidak valid: {len(payload)}")
+    if has_hand:
+        out[:] = memoryview(payload)[LANDMARK_HEADER.size:]
+    return seq, timestamp_ms, bool(has_hand)
+
+
+def parse_max_rate(value):
+    # max_rate dari pesan SET_RATE client: angka >= 0 (0 = tanpa batas).
+    # ValueError untuk string, bool, list, null, NaN/inf dan negatif.
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"max_rate harus angka: {value!r}")
+    try:
+        value = float(value)
+    except OverflowError:
+        raise ValueError("max_rate terlalu besar") from None
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"max_rate harus angka >= 0: {value!r}")
+    return value
+
+
+class GestureEncoder:
+    # State encoder per client: format yang dinegosiasikan, batas rate kirim,
+    # dan nilai terakhir yang terkirim untuk menekan frame yang tidak berubah.
+    # Frame shoot selalu dikirim, tidak terkena suppression maupun rate limit.
+
+    def __init__(self, format=FORMAT_JSON, max_rate=None, heartbeat=1.0, epoch=None):
+        self.format = format
+        self.min_interval = 0.0
+        self.heartbeat = heartbeat
+        self.epoch = time.monotonic() if epoch is None else epoch
+        self.set_max_rate(max_rate)
+
+        self.last_key = None
+        self.last_sent = None
+        self.sent = 0
+        self.suppressed = 0
+        self.keepalives = 0
+        self.bytes_sent = 0
+
+    def set_format(self, format):
+        if format not in FORMATS:
+            raise ValueError(f"Format tidak dikenal: {format}")
+        self.format = format
+        # Paksa frame berikutnya terkirim dalam format baru
+        self.last_key = None
+
+    def set_max_rate(self, max_rate):
+        self.max_rate = max_rate if max_rate and max_rate > 0 else None
+        self.min_interval = 1.0 / self.max_rate if self.max_rate else 0.0
+
+    def encode(self, seq, gesture, captured_at, now=None, timestamp_ms=None):
+        # timestamp_ms: timestamp frame biner apa adanya (mode ingest
+        # mengembalikan timestamp client); None -> dari captured_at
+        if now is None:
+            now = time.monotonic()
+
+        qx, qy, flags = quantize_player(gesture)
+        shoot = bool(flags & FLAG_SHOOT)
+        players = gesture.get("players")
+        extra = ()
+        if players is not None:
+            # Tembakan pemain mana pun tidak boleh tertahan suppression
+            extra = tuple(quantize_player(player) for player in players[1:])
+            shoot = shoot or any(player[2] & FLAG_SHOOT for player in extra)
+
+        key = (qx, qy, flags, extra)
+        since_last = float("inf") if self.last_sent is None else now - self.last_sent
+
+        if shoot:
+            pass
+        elif key != self.last_key:
+            if since_last < self.min_interval:
+                self.suppressed += 1
+                return None
+        elif since_last >= self.heartbeat:
+            flags |= FLAG_KEEPALIVE
+            self.keepalives += 1
+        else:
+            self.suppressed += 1
+            return None
+
+        self.last_key = key
+        self.last_sent = now
+        self.sent += 1
+
+        if self.format == FORMAT_BINARY:
+            if timestamp_ms is None:
+                timestamp_ms = int((captured_at - self.epoch) * 1000)
+            payload = encode_binary(seq, timestamp_ms, qx, qy, flags, extra)
+        else:
+            message = {key: gesture.get(key) for key in JSON_FIELDS}
+            # seq untuk ACK client (sama dengan seq frame biner)
+            message["seq"] = seq & 0xFFFF
+            if players is not None:
+                message["players"] = [{key: player[key] for key in PLAYER_JSON_FIELDS} for player in players]
+            payload = json.dumps(message)
+        self.bytes_sent += len(payload)
+        return payload
+
+    def stats(self):
+        return {
+            "format": self.format,
+            "max_rate": self.max_rate,
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "keepalives": self.keepalives,
+            "bytes_sent": self.bytes_sent,
+        }
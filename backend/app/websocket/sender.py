@@ -0,0 +1,131 @@
+import asyncio
+import os
+import socket
+import time
+from collections import OrderedDict
+from app.gesture.windows import RollingWindow
+
+# Frame gesture yang boleh belum di-ACK client sekaligus. Client lama yang
+# tidak pernah mengirim ACK tidak dibatasi window, hanya buffer transport.
+SEND_WINDOW = int(os.environ.get("GESTURE_SEND_WINDOW", "3"))
+# SO_SNDBUF socket client dalam byte. 0: buffer socket dan transport
+# dibiarkan default (frame bisa menumpuk puluhan KB di link lambat).
+SEND_BUFFER = int(os.environ.get("GESTURE_SEND_BUFFER", "8192"))
+# Frame tanpa ACK selama ini dianggap hilang dan keluar dari window
+ACK_TIMEOUT = 1.0
+# Frame in-flight yang dilacak untuk client tanpa ACK
+MAX_TRACKED = 256
+
+
+def configure_transport(websocket, send_buffer=None):
+    # send() websockets menunggu drain saat buffer transport melewati batas
+    # atas; dengan batas 0 frame berikutnya baru dikirim setelah frame
+    # sebelumnya seluruhnya masuk socket, dan SO_SNDBUF kecil menjaga
+    # antrean di kernel tetap pendek. Hasil yang datang selama menunggu
+    # digabung di Subscription.
+    if send_buffer is None:
+        send_buffer = SEND_BUFFER
+    transport = getattr(websocket, "transport", None)
+    if not send_buffer or transport is None:
+        return False
+    transport.set_write_buffer_limits(high=0, low=0)
+    sock = transport.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer)
+    return True
+
+
+class SendWindow:
+    # Frame terkirim per client vs ACK dari client ({"type": "ACK", "seq": n},
+    # kumulatif, seq 16 bit seperti frame biner). Memberi umur end-to-end
+    # (capture -> ACK diterima server) dan RTT per frame, dan membatasi frame
+    # in-flight supaya frame tidak antre di jaringan: selama window penuh,
+    # send loop tidak mengambil hasil baru sehingga posisi digabung.
+
+    def __init__(self, window=None, ack_timeout=ACK_TIMEOUT, history=60):
+        self.window = SEND_WINDOW if window is None else window
+        self.ack_timeout = ack_timeout
+        # seq -> (sent_at, captured_at), urut kirim
+        self.in_flight = OrderedDict()
+        self.acks_enabled = False
+        self.ages = RollingWindow(history)
+        self.rtts = RollingWindow(history)
+        self.last_age = None
+        self.acked = 0
+        self.timeouts = 0
+        self.waits = 0
+        self._acked_event = asyncio.Event()
+
+    def sent(self, seq, sent_at, captured_at):
+        in_flight = self.in_flight
+        in_flight[seq & 0xFFFF] = (sent_at, captured_at)
+        if len(in_flight) > MAX_TRACKED:
+            in_flight.popitem(last=False)
+
+    def ack(self, seq, now=None):
+        # Mengembalikan (umur, rtt) frame seq, atau None jika seq tidak dikenal
+        # (duplikat atau sudah kedaluwarsa). ACK tanpa seq hanya menandai
+        # client akan mengirim ACK, supaya window berlaku sejak frame pertama.
+        self.acks_enabled = True
+        if not isinstance(seq, int):
+            return None
+        seq &= 0xFFFF
+        if seq not in self.in_flight:
+            return None
+        if now is None:
+            now = time.monotonic()
+        while True:
+            acked_seq, (sent_at, captured_at) = self.in_flight.popitem(last=False)
+            self.acked += 1
+            if acked_seq == seq:
+                break
+        age, rtt = now - captured_at, now - sent_at
+        self.last_age = age
+        self.ages.push(age)
+        self.rtts.push(rtt)
+        self._acked_event.set()
+        return age, rtt
+
+    def _expire(self, now):
+        in_flight = self.in_flight
+        while in_flight:
+            sent_at = next(iter(in_flight.values()))[0]
+            if now - sent_at < self.ack_timeout:
+                return sent_at
+            in_flight.popitem(last=False)
+            self.timeouts += 1
+        return None
+
+    def is_open(self, now=None):
+        if not self.acks_enabled or not self.window:
+            return True
+        self._expire(time.monotonic() if now is None else now)
+        return len(self.in_flight) < self.window
+
+    async def wait_open(self):
+        if self.is_open():
+            return
+        self.waits += 1
+        while True:
+            now = time.monotonic()
+            oldest = self._expire(now)
+            if oldest is None or len(self.in_flight) < self.window:
+                return
+            self._acked_event.clear()
+            try:
+                await asyncio.wait_for(self._acked_event.wait(), oldest + self.ack_timeout - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self):
+        return {
+            "window": self.window if self.acks_enabled else None,
+            "in_flight": len(self.in_flight),
+            "acked": self.acked,
+            "timeouts": self.timeouts,
+            "waits": self.waits,
+            "age_ms": self.last_age * 1000 if self.last_age is not None else None,
+            "age_mean_ms": self.ages.mean * 1000 if len(self.ages) else None,
+            "age_max_ms": self.ages.max * 1000 if len(self.ages) else None,
+            "rtt_mean_ms": self.rtts.mean * 1000 if len(self.rtts) else None,
+        }
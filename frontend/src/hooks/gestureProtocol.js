@@ -0,0 +1,50 @@
+// Decoder frame biner gesture, harus sama dengan backend/app/websocket/protocol.py
+// Layout (12 byte, little-endian): u8 versi, u16 seq, u32 timestamp ms,
+// u16 x, u16 y, u8 flag (bit 4..7: GESTURE_FLAGS). Mode beberapa pemain: tambahan record 5 byte
+// (u16 x, u16 y, u8 flag) per pemain berikutnya.
+export const PROTOCOL_VERSION = 1;
+export const BINARY_FRAME_SIZE = 12;
+export const PLAYER_RECORD_SIZE = 5;
+
+const FLAG_HAS_XY = 1;
+const FLAG_ARMED = 2;
+const FLAG_SHOOT = 4;
+const FLAG_KEEPALIVE = 8;
+// Urutan sama dengan REPORTED di backend/app/gesture/gestures.py
+const GESTURE_FLAGS = [["open_palm", 16], ["fist", 32], ["pinch", 64], ["pause", 128]];
+const QUANT_MAX = 65535;
+
+function decodePlayer(view, offset) {
+  const flags = view.getUint8(offset + 4);
+  const hasXY = (flags & FLAG_HAS_XY) !== 0;
+  return {
+    x: hasXY ? view.getUint16(offset, true) / QUANT_MAX : null,
+    y: hasXY ? view.getUint16(offset + 2, true) / QUANT_MAX : null,
+    armed: (flags & FLAG_ARMED) !== 0,
+    shoot: (flags & FLAG_SHOOT) !== 0,
+    gestures: GESTURE_FLAGS.filter(([, flag]) => (flags & flag) !== 0).map(([name]) => name),
+  };
+}
+
+export function decodeGestureFrame(buffer) {
+  if (buffer.byteLength < BINARY_FRAME_SIZE) return null;
+
+  const view = new DataView(buffer);
+  if (view.getUint8(0) !== PROTOCOL_VERSION) return null;
+
+  const flags = view.getUint8(11);
+  const frame = {
+    seq: view.getUint16(1, true),
+    t: view.getUint32(3, true),
+    ...decodePlayer(view, 7),
+    keepalive: (flags & FLAG_KEEPALIVE) !== 0,
+  };
+
+  if (buffer.byteLength > BINARY_FRAME_SIZE) {
+    frame.players = [{ player: 0, ...decodePlayer(view, 7) }];
+    for (let offset = BINARY_FRAME_SIZE; offset + PLAYER_RECORD_SIZE <= buffer.byteLength; offset += PLAYER_RECORD_SIZE) {
+      frame.players.push({ player: frame.players.length, ...decodePlayer(view, offset) });
+    }
+  }
+  return frame;
+}
@@ -1,16 +1,22 @@
 import { useEffect, useRef, useState, useCallback } from "react";
+import { decodeGestureFrame } from "./gestureProtocol";
 
 export function useGestureSocket() {
   const wsRef = useRef(null);
   const [gesture, setGesture] = useState(null);
   const [connected, setConnected] = useState(false);
+  // Status backend: WARMING saat kamera/model dimuat, READY, atau ERROR
+  const [status, setStatus] = useState(null);
   const reconnectTimeoutRef = useRef(null);
   
   const smoothXRef = useRef(null);
   const smoothYRef = useRef(null);
   const smoothingFactor = 0.65;
   const lossFrameCountRef = useRef(0);
-  const maxLossFrames = 3;
+  // Backend sudah menahan posisi terakhir selama max_loss_frames dan tidak
+  // mengirim ulang frame yang tidak berubah, jadi frame tanpa x/y berarti
+  // tangan benar-benar hilang.
+  const maxLossFrames = 0;
 
   useEffect(() => {
     let ws = null;
@@ -37,6 +43,7 @@ export function useGestureSocket() {
 
       try {
         ws = new WebSocket("ws://localhost:8765");
+        ws.binaryType = "arraybuffer";
         wsRef.current = ws;
 
         connectionTimeout = setTimeout(() => {
@@ -52,6 +59,9 @@ export function useGestureSocket() {
           }
           if (isMounted && shouldReconnect) {
             setConnected(true);
+            ws.send(JSON.stringify({ type: "CONTROL", action: "SET_FORMAT", format: "binary" }));
+            // Menyatakan client mengirim ACK, window server berlaku sejak frame pertama
+            ws.send(JSON.stringify({ type: "ACK" }));
             if (reconnectTimeoutRef.current) {
               clearTimeout(reconnectTimeoutRef.current);
               reconnectTimeoutRef.current = null;
@@ -66,6 +76,7 @@ export function useGestureSocket() {
           }
           if (isMounted && shouldReconnect) {
             setConnected(false);
+            setStatus(null);
             wsRef.current = null;
             if (event.code !== 1000 && !reconnectTimeoutRef.current) {
               reconnectTimeoutRef.current = setTimeout(() => {
@@ -91,8 +102,25 @@ export function useGestureSocket() {
         ws.onmessage = (e) => {
           if (isMounted && shouldReconnect) {
             try {
-              const data = JSON.parse(e.data);
-              
+              let data;
+              if (typeof e.data === "string") {
+                data = JSON.parse(e.data);
+                if (data.type === "STATUS") {
+                  setStatus(data.status);
+                  return;
+                }
+                // Balasan kontrol (FORMAT, STATS) bukan frame gesture
+                if (data.type) return;
+              } else {
+                data = decodeGestureFrame(e.data);
+                if (!data) return;
+              }
+
+              // ACK seq: server membatasi frame in-flight dan mengukur umur frame
+              if (data.seq !== undefined && ws.readyState === WebSocket.OPEN) {
+                ws.send(JSON.stringify({ type: "ACK", seq: data.seq }));
+              }
+
               if (data.x !== null && data.y !== null) {
                 lossFrameCountRef.current = 0;
                 
@@ -217,7 +245,9 @@ export function useGestureSocket() {
   return {
     gesture,
     connected,
+    status,
     start: () => sendControl("START"),
     pause: () => sendControl("PAUSE"),
+    presence: () => sendControl("PRESENCE"),
   };
 }